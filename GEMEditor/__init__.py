@@ -66,6 +66,12 @@ DB_GET_REACT_NAME = True
 # Use the formula and charge from the database
 DB_GET_FL_AND_CH = True
 
+# Read sbml files larger than this size (in bytes) incrementally
+RW_STREAMING_MIN_SIZE = 50 * 1024 ** 2
+
+# Maximum number of progress dialog updates per second
+PROGRESS_MAX_RATE = 30
+
 
 def log_package_versions():
     """ Log the versions of all dependencies """
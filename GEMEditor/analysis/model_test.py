@@ -1,11 +1,31 @@
+import hashlib
 import logging
-from PyQt5.QtWidgets import QApplication
+import math
+import os
+import pickle
+import time
+import zipfile
+import numpy
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from cobra.core import Solution
+from cobra.core.reaction import separate_forward_and_reverse_bounds
+from cobra.util.solver import linear_reaction_coefficients, check_solver_status
+from pandas import Series
+from GEMEditor.base.classes import ProgressReporter
 from GEMEditor.solution.base import fluxes_from_solution
-from GEMEditor.model.classes.modeltest import ReactionSetting
+from GEMEditor.model.classes.cobra import Reaction, Gene
+from GEMEditor.model.classes.modeltest import ModelTest, ReactionSetting
 
 
 LOGGER = logging.getLogger(__name__)
 
+RESULTS_SUFFIX = ".results"
+
+# Number of testcases from which on incremental_run_tests runs
+# the affected testcases in worker processes
+PARALLEL_TESTS_THRESHOLD = 200
+
 
 def _get_original_settings(model):
     """ Get all settings needed to prepare for test run
@@ -74,8 +94,6 @@ def _run_single_test(model, testcase):
         FBA solution of the simulation run
 
     """
-    status = False
-
     # Apply all settings
     for setting in testcase.all_settings():
         setting.do()
@@ -87,15 +105,31 @@ def _run_single_test(model, testcase):
     for setting in reversed(testcase.all_settings()):
         setting.undo()
 
-    # Check solution
+    return _check_solution(testcase, solution), solution
+
+
+def _check_solution(testcase, solution):
+    """ Check the solution against the outcomes of the testcase
+
+    Parameters
+    ----------
+    testcase: GEMEditor.model.classes.ModelTest,
+    solution: cobra.core.Solution,
+
+    Returns
+    -------
+    status: bool,
+        True if the solution matches all test conditions,
+        False otherwise
+    """
+    status = False
     if solution and solution.status == "optimal":
         fluxes = fluxes_from_solution(solution)
         status = all([x.check(fluxes) for x in testcase.outcomes])
-
-    return status, solution
+    return status
 
 
-def run_tests(test_cases, model, progress):
+def run_tests(test_cases, model, progress, processes=None, warm_start=False):
     """ Run and check test cases
 
     Before running the test cases the model is prepared by:
@@ -112,12 +146,22 @@ def run_tests(test_cases, model, progress):
         Model for which to run the test
     progress: QProgressDialog,
         Progress dialog to notify user
+    processes: int
+        Run the tests in parallel using parallel_run_tests
+        with the specified number of worker processes
+    warm_start: bool
+        Run the tests using warm_start_run_tests
 
     Returns
     -------
     results: dict,
         Collected results of the individual tests
     """
+    if processes:
+        return parallel_run_tests(test_cases, model, progress, processes=processes)
+    elif warm_start:
+        return warm_start_run_tests(test_cases, model, progress)
+
     results = dict()
 
     # Prepare model for running tests
@@ -126,6 +170,7 @@ def run_tests(test_cases, model, progress):
         setting.do()
 
     LOGGER.debug("Running test cases..")
+    progress = ProgressReporter.wrap(progress)
     progress.setLabelText("Running test cases..")
     progress.setRange(0, len(test_cases))
 
@@ -135,7 +180,6 @@ def run_tests(test_cases, model, progress):
             LOGGER.debug("Running test aborted at #{0!s}".format(i))
             break
         progress.setValue(i)
-        QApplication.processEvents()
 
         # Run test
         results[test_case] = _run_single_test(model, test_case)
@@ -145,3 +189,782 @@ def run_tests(test_cases, model, progress):
         setting.undo()
 
     return results
+
+
+def _get_test_changes(testcase, objective):
+    """ Get the reaction changes caused by the settings of a testcase
+
+    Applying a reaction setting sets the upper and then the lower
+    bound of the reaction, which raises the upper bound to a higher
+    lower bound. The gene settings are applied and undone in order
+    to resolve them into the reactions they switch off.
+
+    Parameters
+    ----------
+    testcase: GEMEditor.model.classes.ModelTest,
+    objective: dict,
+        Objective coefficients of the prepared model by reaction id
+
+    Returns
+    -------
+    changes: tuple,
+        Tuples of reaction id, lower bound, upper bound and objective
+        coefficient with all settings of the testcase applied
+    """
+
+    changes = dict()
+    for setting in testcase.reaction_settings:
+        changes[setting.reaction.id] = (setting.reaction.id, setting.lower_bound,
+                                        max(setting.upper_bound, setting.lower_bound),
+                                        setting.objective_coefficient)
+
+    for setting in testcase.gene_settings:
+        setting.do()
+    for setting in testcase.gene_settings:
+        for reaction, _, _ in setting._changed_reactions:
+            coefficient = changes[reaction.id][3] if reaction.id in changes else objective.get(reaction.id, 0.)
+            changes[reaction.id] = (reaction.id, reaction.lower_bound, reaction.upper_bound, coefficient)
+    for setting in reversed(testcase.gene_settings):
+        setting.undo()
+
+    return tuple(changes.values())
+
+
+class ModelTestSolver:
+    """ Solve the changes of testcases on a single solver problem
+
+    Instead of changing the model and solving it from scratch for
+    every testcase, only the bounds and objective coefficients that
+    differ from the previously solved testcase are set on the
+    variables of the problem. The problem is thereby solved starting
+    from the basis of the previous solution. Testcases changing the
+    same reactions are solved next to each other, as they need the
+    fewest changes and iterations.
+
+    The solutions are identical to the ones of model.optimize() for
+    the same bounds and objective.
+
+    Parameters
+    ----------
+    problem: optlang.interface.Model,
+        Solver problem of the prepared model
+    reactions: list,
+        Tuples of reaction id, lower bound, upper bound, objective
+        coefficient, forward and reverse variable name for every
+        reaction of the prepared model
+    metabolites: list,
+        Metabolite ids
+    """
+
+    def __init__(self, problem, reactions, metabolites):
+        self.problem = problem
+        self.reaction_ids = [x[0] for x in reactions]
+        self.metabolite_ids = list(metabolites)
+        self.original = dict((x[0], x[1:4]) for x in reactions)
+        self.variables = dict((x[0], (problem.variables[x[4]], problem.variables[x[5]])) for x in reactions)
+        self.applied = dict()
+
+        # Positions of the reaction variables and metabolite constraints in the problem
+        variable_index = dict((x.name, i) for i, x in enumerate(problem.variables))
+        self._forward = numpy.array([variable_index[x[4]] for x in reactions], dtype=int)
+        self._reverse = numpy.array([variable_index[x[5]] for x in reactions], dtype=int)
+        constraint_index = dict((x.name, i) for i, x in enumerate(problem.constraints))
+        self._constraints = numpy.array([constraint_index[x] for x in self.metabolite_ids], dtype=int)
+
+    @classmethod
+    def from_model(cls, model):
+        """ Get a solver working on the problem of the prepared model
+
+        Parameters
+        ----------
+        model: cobra.core.Model,
+            Model prepared for running tests
+
+        Returns
+        -------
+        ModelTestSolver
+        """
+        return cls(model.solver, *cls.model_state(model))
+
+    @staticmethod
+    def model_state(model):
+        """ Get the reactions and metabolites needed to setup a solver
+
+        Parameters
+        ----------
+        model: cobra.core.Model,
+
+        Returns
+        -------
+        reactions: list
+        metabolites: list
+        """
+        objective = dict((x.id, v) for x, v in linear_reaction_coefficients(model).items())
+        reactions = [(x.id, x.lower_bound, x.upper_bound, objective.get(x.id, 0.), x.forward_variable.name,
+                      x.reverse_variable.name) for x in model.reactions]
+        return reactions, [x.id for x in model.metabolites]
+
+    def _set(self, reaction_id, values, previous):
+        forward, reverse = self.variables[reaction_id]
+        if values[:2] != previous[:2]:
+            reverse_lb, reverse_ub, forward_lb, forward_ub = separate_forward_and_reverse_bounds(*values[:2])
+            forward.set_bounds(lb=forward_lb, ub=forward_ub)
+            reverse.set_bounds(lb=reverse_lb, ub=reverse_ub)
+        if values[2] != previous[2]:
+            self.problem.objective.set_linear_coefficients({forward: values[2], reverse: -values[2]})
+
+    def apply(self, changes):
+        """ Set the changes of a testcase on the problem
+
+        Parameters
+        ----------
+        changes: tuple,
+            Tuples of reaction id, lower bound, upper bound and
+            objective coefficient as returned by _get_test_changes
+        """
+        target = dict((x[0], tuple(x[1:])) for x in changes)
+        for reaction_id in [x for x in self.applied if x not in target]:
+            self._set(reaction_id, self.original[reaction_id], self.applied.pop(reaction_id))
+        for reaction_id, values in target.items():
+            self._set(reaction_id, values, self.applied.get(reaction_id, self.original[reaction_id]))
+            self.applied[reaction_id] = values
+
+    def restore(self):
+        """ Restore the bounds and objective of the prepared model """
+        self.apply(())
+
+    def solve(self, changes):
+        """ Solve the problem for the changes of a testcase
+
+        Parameters
+        ----------
+        changes: tuple,
+
+        Returns
+        -------
+        solution: cobra.core.Solution
+        """
+        self.apply(changes)
+        status = self.problem.optimize()
+        check_solver_status(status)
+
+        primals = numpy.fromiter(self.problem.primal_values.values(), dtype=float)
+        fluxes = primals[self._forward] - primals[self._reverse]
+        if self.problem.is_integer:
+            reduced = numpy.full(len(self.reaction_ids), numpy.nan)
+            shadow = numpy.full(len(self.metabolite_ids), numpy.nan)
+        else:
+            duals = numpy.fromiter(self.problem.reduced_costs.values(), dtype=float)
+            reduced = duals[self._forward] - duals[self._reverse]
+            shadow = numpy.fromiter(self.problem.shadow_prices.values(), dtype=float)[self._constraints]
+
+        return Solution(self.problem.objective.value, status,
+                        Series(index=self.reaction_ids, data=fluxes, name="fluxes"),
+                        Series(index=self.reaction_ids, data=reduced, name="reduced_costs"),
+                        Series(index=self.metabolite_ids, data=shadow, name="shadow_prices"))
+
+    @staticmethod
+    def order(changes):
+        """ Order testcases such that similar changes are solved next to each other
+
+        Parameters
+        ----------
+        changes: list,
+            Changes of the individual testcases
+
+        Returns
+        -------
+        order: list,
+            Indices of the testcases in the order they should be solved
+        """
+        return sorted(range(len(changes)), key=lambda i: sorted(changes[i]))
+
+
+# Solver of a worker process
+_test_context = {}
+
+
+def _init_test_worker(problem, reactions, metabolites):
+    _test_context["solver"] = ModelTestSolver(pickle.loads(problem), reactions, metabolites)
+
+
+def _run_test_shard(shard):
+    """ Solve the changes of every testcase in the shard
+
+    Parameters
+    ----------
+    shard: list,
+        Changes of the individual testcases as returned by _get_test_changes
+
+    Returns
+    -------
+    results: list,
+        Tuples of the solution and the time in seconds
+        spent solving it
+    """
+    solver = _test_context["solver"]
+    results = []
+    for changes in shard:
+        start = time.perf_counter()
+        solution = solver.solve(changes)
+        results.append((solution, time.perf_counter() - start))
+    return results
+
+
+def warm_start_run_tests(test_cases, model, progress, timings=None):
+    """ Run and check test cases reusing the solver between tests
+
+    The model is prepared as in run_tests, while the testcases are
+    solved by a ModelTestSolver on the problem of the model, which
+    only applies the changes between consecutive testcases.
+
+    Parameters
+    ----------
+    test_cases: list,
+        Testcases that should be run
+    model: GEMEditor.model.classes.Model,
+        Model for which to run the test
+    progress: QProgressDialog,
+        Progress dialog to notify user
+    timings: dict, optional
+        Filled with the time in seconds spent solving
+        each testcase
+
+    Returns
+    -------
+    results: dict,
+        Collected results of the individual tests
+    """
+
+    test_cases = list(test_cases)
+    solutions = dict()
+
+    # Prepare model for running tests
+    original_settings = _get_original_settings(model)
+    for setting in original_settings:
+        setting.do()
+
+    LOGGER.debug("Running test cases..")
+    progress = ProgressReporter.wrap(progress)
+    progress.setLabelText("Running test cases..")
+    progress.setRange(0, len(test_cases))
+
+    try:
+        reactions, metabolites = ModelTestSolver.model_state(model)
+        objective = dict((x[0], x[3]) for x in reactions)
+        changes = [_get_test_changes(x, objective) for x in test_cases]
+        solver = ModelTestSolver(model.solver, reactions, metabolites)
+        try:
+            for i, index in enumerate(solver.order(changes)):
+                if progress.wasCanceled():
+                    LOGGER.debug("Running test aborted at #{0!s}".format(i))
+                    break
+                progress.setValue(i)
+                start = time.perf_counter()
+                solutions[index] = solver.solve(changes[index])
+                if timings is not None:
+                    timings[test_cases[index]] = time.perf_counter() - start
+        finally:
+            solver.restore()
+    finally:
+        # Restore original values
+        for setting in reversed(original_settings):
+            setting.undo()
+
+    return dict((test_cases[i], (_check_solution(test_cases[i], solutions[i]), solutions[i]))
+                for i in sorted(solutions))
+
+
+def parallel_run_tests(test_cases, model, progress, processes=None, shard_size=None, timings=None):
+    """ Run and check test cases using multiple processes
+
+    The model is prepared as in run_tests and the settings of every
+    testcase are resolved to the reaction bounds and objective
+    coefficients they set. The solver problem of the prepared model
+    is passed to a pool of worker processes, which solve it for these
+    changes using a ModelTestSolver. The solutions are checked against
+    the outcomes in the main process. The model itself is only
+    modified while preparing the tests and is restored afterwards.
+
+    Parameters
+    ----------
+    test_cases: list,
+        Testcases that should be run
+    model: GEMEditor.model.classes.Model,
+        Model for which to run the test
+    progress: QProgressDialog,
+        Progress dialog to notify user
+    processes: int
+        Number of worker processes, defaults to the number of cpus
+    shard_size: int
+        Number of testcases per task, defaults to splitting
+        the testcases into four tasks per process
+    timings: dict, optional
+        Filled with the time in seconds spent solving
+        each testcase
+
+    Returns
+    -------
+    results: dict,
+        Collected results of the individual tests
+    """
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if shard_size is None:
+        shard_size = max(math.ceil(len(test_cases) / (4 * processes)), 1)
+
+    test_cases = list(test_cases)
+    solutions = dict()
+
+    # Prepare model for running tests
+    original_settings = _get_original_settings(model)
+    for setting in original_settings:
+        setting.do()
+
+    try:
+        reactions, metabolites = ModelTestSolver.model_state(model)
+        objective = dict((x[0], x[3]) for x in reactions)
+        changes = [_get_test_changes(x, objective) for x in test_cases]
+        problem = pickle.dumps(model.solver)
+    finally:
+        # Restore original values
+        for setting in reversed(original_settings):
+            setting.undo()
+
+    LOGGER.debug("Running test cases in {0!s} processes..".format(processes))
+    progress = ProgressReporter.wrap(progress)
+    progress.setLabelText("Running test cases..")
+    progress.setRange(0, len(test_cases))
+
+    # Similar testcases are solved by the same worker
+    order = ModelTestSolver.order(changes)
+    shards = [order[i:i + shard_size] for i in range(0, len(order), shard_size)]
+
+    with ProcessPoolExecutor(processes, initializer=_init_test_worker,
+                             initargs=(problem, reactions, metabolites)) as executor:
+        futures = [executor.submit(_run_test_shard, [changes[i] for i in x]) for x in shards]
+
+        done = 0
+        for shard, future in zip(shards, futures):
+            if progress.wasCanceled():
+                LOGGER.debug("Running test aborted at #{0!s}".format(done))
+                for x in futures:
+                    x.cancel()
+                break
+            progress.setValue(done)
+
+            for index, (solution, duration) in zip(shard, future.result()):
+                solutions[index] = solution
+                if timings is not None:
+                    timings[test_cases[index]] = duration
+            done += len(shard)
+
+    return dict((test_cases[i], (_check_solution(test_cases[i], solutions[i]), solutions[i]))
+                for i in sorted(solutions))
+
+
+def _get_components(model):
+    """ Get the connected components of the reaction network
+
+    Parameters
+    ----------
+    model: GEMEditor.model.classes.Model,
+
+    Returns
+    -------
+    components: dict,
+        Frozenset of the reactions and metabolites in the
+        connected component by reaction and metabolite
+    """
+
+    components = dict()
+    for reaction in model.reactions:
+        if reaction in components:
+            continue
+
+        component = {reaction}
+        stack = [reaction]
+        while stack:
+            for metabolite in stack.pop().metabolites:
+                if metabolite not in component:
+                    component.add(metabolite)
+                    new_reactions = metabolite.reactions - component
+                    component.update(new_reactions)
+                    stack.extend(new_reactions)
+
+        component = frozenset(component)
+        components.update(dict.fromkeys(component, component))
+    return components
+
+
+def _get_test_footprint(testcase, components):
+    """ Get the components of the network a testcase depends on
+
+    Parameters
+    ----------
+    testcase: GEMEditor.model.classes.ModelTest,
+    components: dict,
+        Components of the network as returned by _get_components
+
+    Returns
+    -------
+    footprint: frozenset,
+        Components containing the reactions of the settings
+        and outcomes of the testcase
+    """
+
+    reactions = [x.reaction for x in testcase.reaction_settings]
+    reactions.extend(x.reaction for x in testcase.outcomes)
+    for setting in testcase.gene_settings:
+        reactions.extend(setting.gene.reactions)
+    return frozenset(components[x] for x in reactions if x in components)
+
+
+def _get_test_signature(testcase):
+    """ Get the values of the settings and outcomes of a testcase """
+    return (tuple((x.reaction.id, x.upper_bound, x.lower_bound, x.objective_coefficient)
+                  for x in testcase.reaction_settings),
+            tuple((x.gene.id, x.activity) for x in testcase.gene_settings),
+            tuple((x.reaction.id, x.value, x.operator) for x in testcase.outcomes))
+
+
+def _get_item_state(item):
+    """ Get the state of a reaction or metabolite relevant to test results
+
+    The objective coefficients are not part of the state as
+    they are reset when preparing the model for running tests.
+    """
+    if isinstance(item, Reaction):
+        return (item.model, item.lower_bound, item.upper_bound, item.gene_reaction_rule,
+                item.functional, frozenset(item.metabolites.items()))
+    return item.model, frozenset(item.reactions)
+
+
+def _model_feasible(model):
+    """ Check that the model prepared for running tests is feasible """
+    testcase = ModelTest()
+    status, _ = run_tests([testcase], model, None)[testcase]
+    return status
+
+
+def incremental_run_tests(test_cases, model, progress, **kwargs):
+    """ Run the test cases affected by changes since the last run
+
+    The results are cached on the model together with the footprint
+    of the testcase, i.e. the connected components of the reaction
+    network containing the reactions of its settings and outcomes.
+    The reactions and metabolites changed through the tables of the
+    model since the last run are compared to their state at the last
+    run, changed genes by the reactions they are linked to. A cached
+    result is discarded if the testcase has been changed or if an
+    item with a changed state is part of the footprint before or after
+    the change.
+
+    Changes outside of the footprint affect the result of a testcase
+    only by making the model infeasible. The cached results are kept
+    if the prepared model is feasible and the testcase was solved to
+    optimality. The fluxes of the changed reactions outside of the
+    footprint in a cached solution are those of the previous run.
+
+    If at least PARALLEL_TESTS_THRESHOLD testcases have to be run and
+    more than one cpu is available, the testcases are run in worker
+    processes unless the number of processes is passed explicitly.
+    Otherwise the testcases are run using warm_start_run_tests unless
+    warm_start is set to False.
+
+    Parameters
+    ----------
+    test_cases: list,
+        Testcases that should be run
+    model: GEMEditor.model.classes.Model,
+        Model for which to run the test
+    progress: QProgressDialog,
+        Progress dialog to notify user
+    kwargs:
+        Passed to run_tests for running the affected testcases
+
+    Returns
+    -------
+    results: dict,
+        Collected results of the individual tests
+    """
+
+    cache = model.cached_test_results
+    states = model.cached_item_states
+    components = _get_components(model)
+
+    candidates = set()
+    for item in model.changed_items:
+        if isinstance(item, Gene):
+            candidates.update(item.reactions)
+        else:
+            candidates.add(item)
+    changed = set(x for x in candidates if states.get(x) != _get_item_state(x))
+
+    model_feasible = None
+    current_tests = set(model.tests)
+    for testcase, (signature, footprint, status, solution) in list(cache.items()):
+        new_footprint = _get_test_footprint(testcase, components)
+        if (testcase not in current_tests or signature != _get_test_signature(testcase) or
+                any(not changed.isdisjoint(x) for x in footprint | new_footprint)):
+            del cache[testcase]
+        elif changed:
+            if model_feasible is None:
+                model_feasible = _model_feasible(model)
+            if model_feasible and solution.status == "optimal":
+                cache[testcase] = (signature, new_footprint, status, solution)
+            else:
+                del cache[testcase]
+
+    # Store the state the cached results are valid for
+    model.changed_items.clear()
+    if changed or not states:
+        states.clear()
+        states.update((x, _get_item_state(x)) for x in model.reactions)
+        states.update((x, _get_item_state(x)) for x in model.metabolites)
+
+    test_cases = list(test_cases)
+    affected = [x for x in test_cases if x not in cache]
+    LOGGER.debug("Reusing {0!s} cached test results..".format(len(test_cases) - len(affected)))
+    if affected:
+        # Reuse the results of previous runs of the same model content
+        fingerprint = model_fingerprint(model)
+        keys = dict((x, get_result_key(fingerprint, x)) for x in affected)
+        results = dict()
+        for testcase in affected:
+            result = result_cache.get(keys[testcase])
+            if result is not None:
+                results[testcase] = result
+
+        to_run = [x for x in affected if x not in results]
+        if to_run:
+            cpus = os.cpu_count() or 1
+            if "processes" not in kwargs and cpus > 1 and len(to_run) >= PARALLEL_TESTS_THRESHOLD:
+                kwargs["processes"] = cpus
+            kwargs.setdefault("warm_start", True)
+            results.update(run_tests(to_run, model, progress, **kwargs))
+
+        for testcase, (status, solution) in results.items():
+            result_cache.put(keys[testcase], (status, solution))
+            cache[testcase] = (_get_test_signature(testcase), _get_test_footprint(testcase, components),
+                               status, solution)
+
+    return dict((x, cache[x][2:]) for x in test_cases if x in cache)
+
+
+def model_fingerprint(model):
+    """ Get a digest of the model content the test results depend on
+
+    The digest covers the stoichiometry, bounds and gene reaction
+    rules of the reactions and the functional state of the genes.
+    The objective is not included as it is reset when preparing the
+    model for running tests.
+
+    Parameters
+    ----------
+    model: GEMEditor.model.classes.Model,
+
+    Returns
+    -------
+    fingerprint: bytes
+    """
+
+    digest = hashlib.sha1()
+    for reaction in model.reactions:
+        digest.update(repr((reaction.id, reaction.lower_bound, reaction.upper_bound, reaction.gene_reaction_rule,
+                            sorted((x.id, v) for x, v in reaction.metabolites.items()))).encode("UTF-8"))
+    for gene in model.genes:
+        digest.update(repr((gene.id, gene.functional)).encode("UTF-8"))
+    return digest.digest()
+
+
+def get_result_key(fingerprint, testcase):
+    """ Get the key of the result of a testcase in the result cache
+
+    Parameters
+    ----------
+    fingerprint: bytes,
+        Fingerprint of the model as returned by model_fingerprint
+    testcase: GEMEditor.model.classes.ModelTest,
+
+    Returns
+    -------
+    key: str
+    """
+    digest = hashlib.sha1(fingerprint)
+    digest.update(repr(_get_test_signature(testcase)).encode("UTF-8"))
+    return digest.hexdigest()
+
+
+class ModelTestResultCache:
+    """ Bounded cache of test results
+
+    The results are stored by a key computed from the content of the
+    model and the definition of the testcase, see get_result_key. The
+    least recently used results are dropped once more than maxsize
+    results are stored.
+    """
+
+    def __init__(self, maxsize=2048):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+
+    def __len__(self):
+        return len(self._results)
+
+    def __contains__(self, key):
+        return key in self._results
+
+    def get(self, key):
+        """ Get the cached result
+
+        Parameters
+        ----------
+        key: str
+
+        Returns
+        -------
+        result: tuple or None,
+            Status and solution of the testcase or
+            None if the result is not cached
+        """
+        try:
+            result = self._results[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        else:
+            self._results.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        """ Store the status and solution of a testcase """
+        self._results[key] = result
+        self._results.move_to_end(key)
+        if len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+    def clear(self):
+        """ Drop all results and reset the counters """
+        self._results.clear()
+        self.hits = self.misses = 0
+
+    def write(self, path, keys):
+        """ Write the cached results to file
+
+        The status, objective value, fluxes, reduced costs and shadow
+        prices of the solutions are stored in a numpy archive. All
+        solutions have to belong to the same model.
+
+        Parameters
+        ----------
+        path: str
+        keys: list,
+            Keys of the results to store, missing keys are skipped
+
+        Returns
+        -------
+        None
+        """
+
+        keys = [x for x in keys if x in self._results]
+        results = [self._results[x] for x in keys]
+        reactions = results[0][1].fluxes.index if results else []
+        metabolites = results[0][1].shadow_prices.index if results else []
+
+        def stack(series, index):
+            return numpy.array([x.reindex(index).values for x in series], dtype=float).reshape(len(series),
+                                                                                              len(index))
+
+        with open(path, "wb") as open_file:
+            numpy.savez_compressed(open_file,
+                                   keys=numpy.array(keys, dtype=str),
+                                   status=numpy.array([x[0] for x in results], dtype=bool),
+                                   solver_status=numpy.array([x[1].status for x in results], dtype=str),
+                                   objective=numpy.array([numpy.nan if x[1].objective_value is None else
+                                                          x[1].objective_value for x in results], dtype=float),
+                                   reactions=numpy.array(reactions, dtype=str),
+                                   metabolites=numpy.array(metabolites, dtype=str),
+                                   fluxes=stack([x[1].fluxes for x in results], reactions),
+                                   reduced_costs=stack([x[1].reduced_costs for x in results], reactions),
+                                   shadow_prices=stack([x[1].shadow_prices for x in results], metabolites))
+        LOGGER.debug("Test results written: {}".format(path))
+
+    def read(self, path):
+        """ Add the results written to path to the cache
+
+        Parameters
+        ----------
+        path: str
+
+        Returns
+        -------
+        None
+        """
+
+        with numpy.load(path, allow_pickle=False) as content:
+            # Every access decompresses the array again
+            arrays = dict((x, content[x]) for x in content.files)
+
+        reactions = list(arrays["reactions"])
+        metabolites = list(arrays["metabolites"])
+        for i, key in enumerate(arrays["keys"]):
+            objective = arrays["objective"][i]
+            solution = Solution(None if numpy.isnan(objective) else float(objective),
+                                str(arrays["solver_status"][i]),
+                                Series(arrays["fluxes"][i], index=reactions, name="fluxes"),
+                                Series(arrays["reduced_costs"][i], index=reactions, name="reduced_costs"),
+                                Series(arrays["shadow_prices"][i], index=metabolites, name="shadow_prices"))
+            self.put(str(key), (bool(arrays["status"][i]), solution))
+        LOGGER.debug("Test results read: {}".format(path))
+
+
+# Results of the test cases shared by all models
+result_cache = ModelTestResultCache()
+
+
+def results_path(path):
+    """ Path of the test results belonging to the model file at path """
+    return path + RESULTS_SUFFIX
+
+
+def write_test_results(model, path):
+    """ Write the cached test results next to the model file
+
+    Parameters
+    ----------
+    model: GEMEditor.model.classes.Model,
+    path: str,
+        Path of the sbml file the model has been saved to
+
+    Returns
+    -------
+    None
+    """
+    fingerprint = model_fingerprint(model)
+    result_cache.write(results_path(path), [get_result_key(fingerprint, x) for x in model.tests])
+
+
+def read_test_results(path):
+    """ Read the test results belonging to the model file
+
+    Parameters
+    ----------
+    path: str,
+        Path of the sbml file
+
+    Returns
+    -------
+    None
+    """
+    if not os.path.isfile(results_path(path)):
+        return
+
+    try:
+        result_cache.read(results_path(path))
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        LOGGER.warning("Test results could not be read: {}".format(results_path(path)), exc_info=True)
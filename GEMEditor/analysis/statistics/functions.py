@@ -1,6 +1,6 @@
 import logging
 from collections import OrderedDict
-from GEMEditor.analysis.model_test import run_tests
+from GEMEditor.analysis.model_test import incremental_run_tests
 from GEMEditor.model.classes import Reaction, Metabolite, Gene
 from GEMEditor.model.display.proxymodels import metabolite_is_dead_end
 
@@ -219,7 +219,7 @@ def modeltest_statistics(model, progress):
     num_failing = 0
     num_not_run = 0
 
-    test_results = run_tests(model.tests, model, progress)
+    test_results = incremental_run_tests(model.tests, model, progress)
 
     for testcase in model.tests:
         try:
@@ -1,9 +1,12 @@
 from unittest.mock import Mock
 import GEMEditor
 import pytest
-from GEMEditor.analysis.model_test import _get_original_settings, run_tests
-from GEMEditor.model.classes.cobra import Reaction, Metabolite, Model
-from GEMEditor.model.classes.modeltest import ModelTest, ReactionSetting, Outcome
+from functools import partial
+from GEMEditor.analysis.model_test import _get_original_settings, _get_test_changes, run_tests, \
+    parallel_run_tests, warm_start_run_tests, incremental_run_tests, ModelTestSolver, ModelTestResultCache, \
+    model_fingerprint, get_result_key, read_test_results, write_test_results
+from GEMEditor.model.classes.cobra import Reaction, Metabolite, Model, Gene
+from GEMEditor.model.classes.modeltest import ModelTest, ReactionSetting, GeneSetting, Outcome
 from cobra.core.solution import LegacySolution
 
 
@@ -243,3 +246,339 @@ class TestRunTest:
         assert GEMEditor.analysis.model_test._get_original_settings.called is True
         for x in original_settings:
             assert x.do.called is True
+
+
+class TestParallelRunTests:
+
+    @pytest.fixture(autouse=True)
+    def setup_model(self):
+        self.model = Model("id")
+        m1 = Metabolite("m1")
+        m2 = Metabolite("m2")
+        self.uptake = Reaction("uptake", lower_bound=-1000., upper_bound=1000.)
+        self.uptake.add_metabolites({m1: -1})
+        self.conversion = Reaction("conversion", lower_bound=0., upper_bound=1000.)
+        self.conversion.add_metabolites({m1: -1, m2: 1})
+        self.secretion = Reaction("secretion", lower_bound=0., upper_bound=1000.)
+        self.secretion.add_metabolites({m2: -1})
+        self.model.add_reactions((self.uptake, self.conversion, self.secretion))
+        self.gene = Gene("g1")
+        self.model.add_gene(self.gene)
+        self.conversion.add_child(self.gene)
+        self.secretion.objective_coefficient = 1.
+
+        def testcase(settings, outcomes):
+            result = ModelTest()
+            for setting in settings:
+                result.add_setting(setting)
+            for outcome in outcomes:
+                result.add_outcome(outcome)
+            return result
+
+        open_uptake = ReactionSetting(self.uptake, 1000., -10., 0.)
+        objective = ReactionSetting(self.secretion, 1000., 0., 1.)
+        self.tests = [testcase((open_uptake, objective), (Outcome(self.secretion, 5., "greater than"),)),
+                      testcase((open_uptake, objective, GeneSetting(self.gene, False)),
+                               (Outcome(self.secretion, 5., "greater than"),)),
+                      testcase((objective,), (Outcome(self.secretion, 1., "less than"),)),
+                      testcase((ReactionSetting(self.conversion, 5., 5., 0.),),
+                               (Outcome(self.secretion, 1., "less than"),))]
+
+    @pytest.mark.parametrize("runner", [partial(parallel_run_tests, processes=1),
+                                        partial(parallel_run_tests, processes=2, shard_size=1),
+                                        partial(parallel_run_tests, processes=2, shard_size=3),
+                                        warm_start_run_tests])
+    def test_results_match_serial_run(self, runner):
+        original = [(x.lower_bound, x.upper_bound, x.objective_coefficient) for x in self.model.reactions]
+        variables = [(x.name, x.lb, x.ub) for x in self.model.solver.variables]
+        serial = run_tests(self.tests, self.model, None)
+
+        parallel = runner(self.tests, self.model, None)
+
+        assert list(parallel) == list(serial) == self.tests
+        assert [x[0] for x in parallel.values()] == [True, False, True, False]
+        for testcase, (status, solution) in serial.items():
+            assert parallel[testcase][0] is status
+            assert parallel[testcase][1].status == solution.status
+            if solution.status == "optimal":
+                assert parallel[testcase][1].fluxes.equals(solution.fluxes)
+        assert serial[self.tests[3]][1].status == "infeasible"
+
+        # The model is restored
+        assert [(x.lower_bound, x.upper_bound, x.objective_coefficient) for x in self.model.reactions] == original
+        assert [(x.name, x.lb, x.ub) for x in self.model.solver.variables] == variables
+        assert self.gene.functional is True
+
+    def test_changes_match_applied_settings(self):
+        testcase = ModelTest()
+        testcase.add_setting(ReactionSetting(self.uptake, 5., 10., 0.))
+        testcase.add_setting(ReactionSetting(self.conversion, 1000., 0., 2.))
+        testcase.add_setting(ReactionSetting(self.conversion, 100., -100., 3.))
+        testcase.add_setting(GeneSetting(self.gene, False))
+
+        changes = _get_test_changes(testcase, {"secretion": 1.})
+
+        for setting in testcase.all_settings():
+            setting.do()
+        expected = tuple((x.id, x.lower_bound, x.upper_bound, x.objective_coefficient)
+                         for x in (self.uptake, self.conversion))
+        for setting in reversed(testcase.all_settings()):
+            setting.undo()
+        assert changes == expected == (("uptake", 10., 10., 0.), ("conversion", 0., 0., 3.))
+        assert self.gene.functional is True
+
+    def test_run_tests_dispatches_to_parallel_runner(self, monkeypatch):
+        parallel = Mock(return_value={})
+        monkeypatch.setattr("GEMEditor.analysis.model_test.parallel_run_tests", parallel)
+
+        run_tests(self.tests, self.model, None, processes=2)
+        parallel.assert_called_once_with(self.tests, self.model, None, processes=2)
+
+        warm_start = Mock(return_value={})
+        monkeypatch.setattr("GEMEditor.analysis.model_test.warm_start_run_tests", warm_start)
+        run_tests(self.tests, self.model, None, warm_start=True)
+        warm_start.assert_called_once_with(self.tests, self.model, None)
+
+    def test_canceled_run(self):
+        progress = Mock(wasCanceled=Mock(return_value=True))
+        assert parallel_run_tests(self.tests, self.model, progress, processes=1) == {}
+
+
+class TestModelTestSolver:
+
+    @pytest.fixture(autouse=True)
+    def setup_model(self):
+        self.model = Model("id")
+        m1 = Metabolite("m1")
+        m2 = Metabolite("m2")
+        self.r1 = Reaction("r1", lower_bound=-10., upper_bound=10.)
+        self.r1.add_metabolites({m1: -1})
+        self.r2 = Reaction("r2", lower_bound=-1000., upper_bound=1000.)
+        self.r2.add_metabolites({m1: -1, m2: 1})
+        self.r3 = Reaction("r3", lower_bound=0., upper_bound=1000.)
+        self.r3.add_metabolites({m2: -1})
+        self.model.add_reactions((self.r1, self.r2, self.r3))
+        self.r3.objective_coefficient = 1.
+
+    def changes(self, *settings):
+        testcase = ModelTest()
+        for setting in settings:
+            testcase.add_setting(setting)
+        return _get_test_changes(testcase, {"r3": 1.})
+
+    def test_solution_matches_optimize(self):
+        all_changes = [self.changes(ReactionSetting(self.r2, 5., -3., 0.)),
+                       self.changes(ReactionSetting(self.r1, 0., -10., 0.), ReactionSetting(self.r3, 0., -1000., -1.)),
+                       self.changes(ReactionSetting(self.r2, 5., 5., 0.), ReactionSetting(self.r1, 0., 0., 0.))]
+        expected = []
+        for changes in all_changes:
+            original = [(x, x.bounds, x.objective_coefficient) for x in self.model.reactions]
+            for reaction_id, lower_bound, upper_bound, objective_coefficient in changes:
+                reaction = self.model.reactions.get_by_id(reaction_id)
+                reaction.bounds = lower_bound, upper_bound
+                reaction.objective_coefficient = objective_coefficient
+            expected.append(self.model.optimize())
+            for reaction, bounds, objective_coefficient in original:
+                reaction.bounds = bounds
+                reaction.objective_coefficient = objective_coefficient
+
+        variables = [(x.name, x.lb, x.ub) for x in self.model.solver.variables]
+        solver = ModelTestSolver.from_model(self.model)
+        solutions = [solver.solve(x) for x in all_changes]
+        solver.restore()
+
+        assert [x.status for x in solutions] == [x.status for x in expected] == ["optimal", "optimal", "infeasible"]
+        for solution, reference in zip(solutions[:2], expected[:2]):
+            assert solution.objective_value == reference.objective_value
+            assert solution.fluxes.equals(reference.fluxes)
+            assert solution.reduced_costs.equals(reference.reduced_costs)
+            assert solution.shadow_prices.equals(reference.shadow_prices)
+        assert [(x.name, x.lb, x.ub) for x in self.model.solver.variables] == variables
+        assert self.model.optimize().objective_value == 10.
+
+    def test_only_differences_are_applied(self):
+        solver = ModelTestSolver.from_model(self.model)
+        solver.apply(self.changes(ReactionSetting(self.r1, 1000., -1000., 0.), ReactionSetting(self.r2, 5., 0., 0.)))
+        assert solver.applied == {"r1": (-1000., 1000., 0.), "r2": (0., 5., 0.)}
+        assert self.model.solver.variables[self.r1.forward_variable.name].ub == 1000.
+
+        solver.apply(self.changes(ReactionSetting(self.r1, 1000., -1000., 0.)))
+        assert solver.applied == {"r1": (-1000., 1000., 0.)}
+        assert self.model.solver.variables[self.r2.reverse_variable.name].ub == 1000.
+
+        solver.restore()
+        assert solver.applied == {}
+        assert self.model.solver.variables[self.r1.forward_variable.name].ub == 10.
+
+    def test_order_groups_similar_changes(self):
+        changes = [(("r2", 0., 1., 0.),), (("r1", 0., 1., 0.),), (("r2", 0., 2., 0.),), (("r1", 0., 1., 0.),)]
+        assert ModelTestSolver.order(changes) == [1, 3, 0, 2]
+
+
+class TestIncrementalRunTests:
+
+    @pytest.fixture(autouse=True)
+    def setup_model(self, monkeypatch):
+        self.model = Model("id")
+        m1, m2, m3, m4 = (Metabolite(x) for x in ("m1", "m2", "m3", "m4"))
+        self.uptake = Reaction("uptake", lower_bound=-1000., upper_bound=1000.)
+        self.uptake.add_metabolites({m1: -1})
+        self.conversion = Reaction("conversion", lower_bound=0., upper_bound=1000.)
+        self.conversion.add_metabolites({m1: -1, m2: 1})
+        self.secretion = Reaction("secretion", lower_bound=0., upper_bound=1000.)
+        self.secretion.add_metabolites({m2: -1})
+        self.dead_end = Reaction("dead_end", lower_bound=0., upper_bound=1000.)
+        self.dead_end.add_metabolites({m3: -1, m4: 1})
+        self.model.add_reactions((self.uptake, self.conversion, self.secretion, self.dead_end))
+        self.model.setup_reaction_table()
+
+        self.tests = [ModelTest(), ModelTest()]
+        self.tests[0].add_setting(ReactionSetting(self.uptake, 1000., -10., 0.))
+        self.tests[0].add_setting(ReactionSetting(self.secretion, 1000., 0., 1.))
+        self.tests[0].add_outcome(Outcome(self.secretion, 5., "greater than"))
+        self.tests[1].add_setting(ReactionSetting(self.dead_end, 1000., 0., 1.))
+        self.tests[1].add_outcome(Outcome(self.dead_end, 1., "less than"))
+        for testcase in self.tests:
+            self.model.add_test(testcase)
+
+        self.run_tests = Mock(wraps=run_tests)
+        monkeypatch.setattr("GEMEditor.analysis.model_test.run_tests", self.run_tests)
+        self.result_cache = ModelTestResultCache()
+        monkeypatch.setattr("GEMEditor.analysis.model_test.result_cache", self.result_cache)
+
+    def run(self):
+        self.run_tests.reset_mock()
+        results = incremental_run_tests(self.tests, self.model, None)
+        assert list(results) == self.tests
+        rerun = [x for call in self.run_tests.call_args_list for x in call[0][0] if x in self.tests]
+        return [x[0] for x in results.values()], rerun
+
+    def change(self, reaction, **bounds):
+        for key, value in bounds.items():
+            setattr(reaction, key, value)
+        self.model.QtReactionTable.update_row_from_link(self.model.QtReactionTable.get_item_to_row_mapping()[reaction])
+
+    def test_unchanged_model_reuses_results(self):
+        assert self.run() == ([True, True], self.tests)
+        assert self.run() == ([True, True], [])
+        assert self.run_tests.call_count == 0
+
+    def test_tests_run_with_warm_start(self):
+        self.run()
+        assert self.run_tests.call_args[1] == {"warm_start": True}
+
+    def test_change_without_effect_on_results(self):
+        self.run()
+        self.change(self.conversion, name="Conversion")
+        assert self.run() == ([True, True], [])
+
+    def test_change_in_footprint(self):
+        self.run()
+        self.change(self.conversion, upper_bound=0.)
+        assert self.run() == ([False, True], [self.tests[0]])
+
+    def test_change_outside_of_footprint_keeps_feasible_results(self):
+        self.run()
+        self.change(self.dead_end, upper_bound=500.)
+        assert self.run() == ([True, True], [self.tests[1]])
+
+    def test_infeasible_model_reruns_all_tests(self):
+        self.run()
+        self.change(self.dead_end, lower_bound=1.)
+        assert self.run() == ([False, True], self.tests)
+
+        # Results of the original model are cached by fingerprint
+        self.change(self.dead_end, lower_bound=0.)
+        assert self.run() == ([True, True], [])
+
+    def test_changed_testcase(self):
+        self.run()
+        self.tests[1].outcomes[0].operator = "greater than"
+        assert self.run() == ([True, False], [self.tests[1]])
+
+    def test_removed_testcase_is_dropped(self):
+        self.run()
+        self.model.gem_remove_tests([self.tests[0]])
+        incremental_run_tests(self.tests[1:], self.model, None)
+        assert list(self.model.cached_test_results) == self.tests[1:]
+
+    def test_results_reused_by_fingerprint(self):
+        results = incremental_run_tests(self.tests, self.model, None)
+        self.model.cached_test_results.clear()
+        self.model.mark_items_changed(*self.model.reactions)
+
+        assert self.run() == ([True, True], [])
+        assert self.run_tests.call_count == 0
+        assert self.result_cache.hits == 2
+        assert [x[1] for x in incremental_run_tests(self.tests, self.model, None).values()] == \
+            [x[1] for x in results.values()]
+
+    def test_parallel_run_above_threshold(self, monkeypatch):
+        monkeypatch.setattr("GEMEditor.analysis.model_test.os.cpu_count", Mock(return_value=2))
+        monkeypatch.setattr("GEMEditor.analysis.model_test.PARALLEL_TESTS_THRESHOLD", 2)
+        parallel = Mock(wraps=parallel_run_tests)
+        monkeypatch.setattr("GEMEditor.analysis.model_test.parallel_run_tests", parallel)
+
+        assert self.run() == ([True, True], self.tests)
+        parallel.assert_called_once_with(self.tests, self.model, None, processes=2)
+
+        # Fewer testcases are run in the main process
+        parallel.reset_mock()
+        self.change(self.dead_end, upper_bound=500.)
+        assert self.run() == ([True, True], [self.tests[1]])
+        assert parallel.called is False
+
+    def test_result_key(self):
+        fingerprint = model_fingerprint(self.model)
+        key = get_result_key(fingerprint, self.tests[0])
+        assert get_result_key(fingerprint, self.tests[1]) != key
+
+        self.secretion.name = "Secretion"
+        self.secretion.objective_coefficient = 1.
+        assert get_result_key(model_fingerprint(self.model), self.tests[0]) == key
+
+        self.secretion.upper_bound = 5.
+        assert get_result_key(model_fingerprint(self.model), self.tests[0]) != key
+        self.secretion.upper_bound = 1000.
+        assert get_result_key(model_fingerprint(self.model), self.tests[0]) == key
+
+        self.tests[0].outcomes[0].value = 6.
+        assert get_result_key(model_fingerprint(self.model), self.tests[0]) != key
+
+    def test_write_and_read_results(self, tmpdir):
+        path = str(tmpdir.join("model.xml"))
+        results = incremental_run_tests(self.tests, self.model, None)
+        write_test_results(self.model, path)
+        self.result_cache.clear()
+
+        read_test_results(path)
+        fingerprint = model_fingerprint(self.model)
+        for testcase, (status, solution) in results.items():
+            cached_status, cached_solution = self.result_cache.get(get_result_key(fingerprint, testcase))
+            assert cached_status is status
+            assert cached_solution.status == solution.status
+            assert cached_solution.objective_value == solution.objective_value
+            for attribute in ("fluxes", "reduced_costs", "shadow_prices"):
+                assert getattr(cached_solution, attribute).equals(getattr(solution, attribute))
+
+    def test_read_invalid_results(self, tmpdir):
+        path = str(tmpdir.join("model.xml"))
+        read_test_results(path)
+
+        tmpdir.join("model.xml" + ".results").write("invalid")
+        read_test_results(path)
+        assert len(self.result_cache) == 0
+
+
+class TestModelTestResultCache:
+
+    def test_least_recently_used_dropped(self):
+        cache = ModelTestResultCache(maxsize=2)
+        cache.put("a", (True, None))
+        cache.put("b", (False, None))
+        assert cache.get("a") == (True, None)
+        cache.put("c", (True, None))
+
+        assert "a" in cache and "c" in cache
+        assert cache.get("b") is None
+        assert (cache.hits, cache.misses) == (1, 1)
@@ -1,31 +1,117 @@
 import logging
-from PyQt5 import QtCore, QtWidgets
+import time
+from GEMEditor import PROGRESS_MAX_RATE
+from PyQt5 import QtCore
 
 
 LOGGER = logging.getLogger(__name__)
 
 
-class ProgressDialog(QtWidgets.QProgressDialog):
+class ProgressReporter:
+    """ Rate limited progress reporting
 
-    def __init__(self, parent=None, title=None, label="", min=0, max=100, min_duration=500):
-        super(ProgressDialog, self).__init__(parent)
-        self.setWindowTitle(title)
-        self.setLabelText(label)
-        self.setMinimum(min)
-        self.setMaximum(max)
-        self.setMinimumDuration(min_duration)
+    Long running loops report their progress for every item.
+    The reporter only forwards the value to the progress dialog
+    and processes pending events at most max_rate times per
+    second, as updating the dialog for every item takes a large
+    share of the runtime.
 
-    def __enter__(self):
-        return self
+    Parameters
+    ----------
+    progress: QProgressDialog
+        Progress dialog to update
+    max_rate: int
+        Maximum number of updates per second
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        self.close()
+    """
+
+    def __init__(self, progress, max_rate=PROGRESS_MAX_RATE):
+        self.progress = progress
+        self.interval = 1. / max_rate
+        self._maximum = None
+        self._last_update = None
+
+    @classmethod
+    def wrap(cls, progress):
+        """ Get a reporter for progress
+
+        Parameters
+        ----------
+        progress: QProgressDialog, ProgressReporter or None
+
+        Returns
+        -------
+        ProgressReporter
+            HeadlessProgress if progress is None, progress
+            itself if it already is a reporter
+        """
+        if progress is None:
+            return HeadlessProgress()
+        elif isinstance(progress, ProgressReporter):
+            return progress
+        return cls(progress)
+
+    def wasCanceled(self):
+        return self.progress.wasCanceled()
+
+    def setLabelText(self, text):
+        self.progress.setLabelText(text)
+
+    def setRange(self, minimum, maximum):
+        self._maximum = maximum
+        # Always show the first value of a new range
+        self._last_update = None
+        self.progress.setRange(minimum, maximum)
+
+    def setMaximum(self, maximum):
+        self._maximum = maximum
+        self._last_update = None
+        self.progress.setMaximum(maximum)
+
+    def setValue(self, value):
+        now = time.monotonic()
+        if self._last_update is None or now - self._last_update >= self.interval or \
+                (self._maximum is not None and value >= self._maximum):
+            self._last_update = now
+            self._report(value)
+
+    def _report(self, value):
+        self.progress.setValue(value)
+        QtCore.QCoreApplication.processEvents()
+
+    def close(self):
+        self.progress.close()
+
+
+class HeadlessProgress(ProgressReporter):
+    """ Progress reporter without user interface
+
+    Used when running without a progress dialog e.g.
+    in scripts or tests. The progress is discarded and
+    the run can not be canceled.
+
+    """
+
+    def __init__(self):
+        super(HeadlessProgress, self).__init__(None)
+
+    def wasCanceled(self):
+        return False
+
+    def setLabelText(self, text):
+        pass
+
+    def setRange(self, minimum, maximum):
+        pass
+
+    def setMaximum(self, maximum):
+        pass
+
+    def setValue(self, value):
+        pass
 
     def close(self):
-        super(ProgressDialog, self).close()
-        # Schedule dialog for deletion
-        # Fixes external destruction warning
-        self.deleteLater()
+        pass
 
 
 class Settings(QtCore.QSettings):
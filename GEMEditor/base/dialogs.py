@@ -1,11 +1,34 @@
 from PyQt5 import QtCore
-from PyQt5.QtWidgets import QDialog, QGridLayout, QLabel, QComboBox
+from PyQt5.QtWidgets import QDialog, QGridLayout, QLabel, QComboBox, QProgressDialog
 from PyQt5.QtCore import QSortFilterProxyModel
 from PyQt5.QtGui import QStandardItemModel, QStandardItem
 from GEMEditor.base.ui import Ui_EmptyDialogHorzButtons, Ui_ListDisplayDialog, Ui_DataFrameDialog
 from GEMEditor.base import Settings, restore_geometry
 
 
+class ProgressDialog(QProgressDialog):
+
+    def __init__(self, parent=None, title=None, label="", min=0, max=100, min_duration=500):
+        super(ProgressDialog, self).__init__(parent)
+        self.setWindowTitle(title)
+        self.setLabelText(label)
+        self.setMinimum(min)
+        self.setMaximum(max)
+        self.setMinimumDuration(min_duration)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        super(ProgressDialog, self).close()
+        # Schedule dialog for deletion
+        # Fixes external destruction warning
+        self.deleteLater()
+
+
 class CustomStandardDialog(QDialog):
     def __init__(self, *args, **kwargs):
         QDialog.__init__(self, *args, **kwargs)
@@ -4,6 +4,6 @@ from unittest.mock import Mock
 
 @pytest.fixture()
 def progress_not_cancelled(monkeypatch):
-    monkeypatch.setattr("GEMEditor.base.classes.ProgressDialog.show", Mock())
-    monkeypatch.setattr("GEMEditor.base.classes.ProgressDialog.exec_", Mock())
-    monkeypatch.setattr("GEMEditor.base.classes.ProgressDialog.wasCanceled", Mock(return_value=False))
+    monkeypatch.setattr("GEMEditor.base.dialogs.ProgressDialog.show", Mock())
+    monkeypatch.setattr("GEMEditor.base.dialogs.ProgressDialog.exec_", Mock())
+    monkeypatch.setattr("GEMEditor.base.dialogs.ProgressDialog.wasCanceled", Mock(return_value=False))
@@ -1,6 +1,8 @@
 import gc
+from unittest.mock import Mock
+from PyQt5.QtCore import QCoreApplication
 from PyQt5.QtWidgets import QApplication, QDialog
-from GEMEditor.base.classes import WindowManager
+from GEMEditor.base.classes import WindowManager, ProgressReporter, HeadlessProgress
 
 
 # Make sure to only start an application
@@ -41,3 +43,62 @@ class TestWindowManager:
         manager.remove_all()
 
         assert not manager.windows
+
+
+class TestProgressReporter:
+
+    def test_updates_are_throttled(self, monkeypatch):
+        monkeypatch.setattr("PyQt5.QtCore.QCoreApplication.processEvents", Mock())
+        dialog = Mock(**{"wasCanceled.return_value": False})
+        progress = ProgressReporter(dialog, max_rate=30)
+
+        progress.setRange(0, 100000)
+        for i in range(100000):
+            progress.setValue(i)
+
+        assert dialog.setRange.called is True
+        assert 0 < dialog.setValue.call_count < 1000
+        assert QCoreApplication.processEvents.call_count == dialog.setValue.call_count
+
+    def test_first_and_last_value_reported(self, monkeypatch):
+        monkeypatch.setattr("PyQt5.QtCore.QCoreApplication.processEvents", Mock())
+        dialog = Mock()
+        progress = ProgressReporter(dialog, max_rate=1)
+
+        progress.setMaximum(10)
+        for i in range(11):
+            progress.setValue(i)
+
+        assert [x[0][0] for x in dialog.setValue.call_args_list] == [0, 10]
+
+    def test_forwarding(self):
+        dialog = Mock(**{"wasCanceled.return_value": True})
+        progress = ProgressReporter(dialog)
+
+        assert progress.wasCanceled() is True
+        progress.setLabelText("label")
+        dialog.setLabelText.assert_called_once_with("label")
+        progress.close()
+        assert dialog.close.called is True
+
+    def test_wrap(self):
+        dialog = Mock()
+        progress = ProgressReporter.wrap(dialog)
+        assert isinstance(progress, ProgressReporter)
+        assert progress.progress is dialog
+
+        # Reporters are not wrapped twice
+        assert ProgressReporter.wrap(progress) is progress
+        assert isinstance(ProgressReporter.wrap(None), HeadlessProgress)
+
+
+class TestHeadlessProgress:
+
+    def test_no_op(self):
+        progress = HeadlessProgress()
+        progress.setLabelText("label")
+        progress.setRange(0, 10)
+        progress.setMaximum(10)
+        progress.setValue(5)
+        progress.close()
+        assert progress.wasCanceled() is False
@@ -1,6 +1,10 @@
 import logging
 import os
 import sqlite3
+import hashlib
+import threading
+from collections import defaultdict, namedtuple, OrderedDict
+from itertools import groupby
 from GEMEditor.base.classes import Settings
 from GEMEditor.database import database_path as DB_PATH
 from GEMEditor.database.ui import Ui_MetaboliteEntryDisplayWidget, Ui_ReactionEntryDisplayWidget
@@ -8,6 +12,7 @@ from GEMEditor.model.classes.cobra import Metabolite, Reaction
 from GEMEditor.model.classes.annotation import Annotation
 from PyQt5 import QtCore, QtSql
 from PyQt5.QtWidgets import QMessageBox, QWidget, QTableWidgetItem
+from urllib.request import pathname2url
 
 LOGGER = logging.getLogger(__name__)
 
@@ -101,13 +106,536 @@ query_reaction_ids_from_participating_metabolite_ids = """SELECT DISTINCT(reacti
 FROM reaction_participants 
 WHERE metabolite_id = ?;"""
 
+# Temporary tables holding the values of batched queries
+create_query_annotations = """CREATE TEMP TABLE IF NOT EXISTS query_annotations 
+(collection TEXT, identifier TEXT);"""
+
+create_query_names = """CREATE TEMP TABLE IF NOT EXISTS query_names 
+(name TEXT COLLATE NOCASE);"""
+
+create_query_names_index = """CREATE INDEX IF NOT EXISTS temp.idx_query_names 
+ON query_names (name);"""
+
+create_query_formulas = """CREATE TEMP TABLE IF NOT EXISTS query_formulas 
+(formula TEXT);"""
+
+# The first resource with a collection is used as in get_ids_from_annotation
+query_metabolite_ids_from_annotations = """SELECT DISTINCT query.collection, query.identifier, metabolite_ids.metabolite_id 
+FROM query_annotations AS query 
+JOIN (SELECT miriam_collection, MIN(id) AS id, type FROM resources GROUP BY miriam_collection) AS resource 
+ON resource.miriam_collection = query.collection AND resource.type = 'metabolite' 
+JOIN metabolite_ids ON metabolite_ids.identifier = query.identifier 
+AND metabolite_ids.resource_id = resource.id;"""
+
+query_reaction_ids_from_annotations = """SELECT DISTINCT query.collection, query.identifier, reaction_ids.reaction_id 
+FROM query_annotations AS query 
+JOIN (SELECT miriam_collection, MIN(id) AS id, type FROM resources GROUP BY miriam_collection) AS resource 
+ON resource.miriam_collection = query.collection AND resource.type = 'reaction' 
+JOIN reaction_ids ON reaction_ids.identifier = query.identifier 
+AND reaction_ids.resource_id = resource.id;"""
+
+# Names are compared using the NOCASE collation of query_names
+query_metabolite_ids_from_names = """SELECT DISTINCT query.name, metabolite_names.metabolite_id 
+FROM metabolite_names 
+JOIN query_names AS query ON query.name = metabolite_names.name;"""
+
+query_reaction_ids_from_names = """SELECT DISTINCT query.name, reaction_names.reaction_id 
+FROM reaction_names 
+JOIN query_names AS query ON query.name = reaction_names.name;"""
+
+query_metabolite_ids_from_formulas = """SELECT DISTINCT query.formula, metabolites.id 
+FROM query_formulas AS query 
+JOIN metabolites ON metabolites.formula = query.formula;"""
+
+# Reaction signatures
+query_reaction_signatures_table = """SELECT name 
+FROM sqlite_master 
+WHERE type = 'table' AND name = 'reaction_signatures';"""
+
+query_has_reaction_signatures = """SELECT EXISTS (SELECT 1 FROM reaction_signatures) 
+OR NOT EXISTS (SELECT 1 FROM reaction_participants);"""
+
+create_temp_reaction_signatures = """CREATE TEMP TABLE IF NOT EXISTS reaction_signatures 
+(id INTEGER PRIMARY KEY, reaction_id INTEGER, signature INTEGER);"""
+
+create_temp_reaction_signatures_index = """CREATE INDEX IF NOT EXISTS temp.idx_reaction_signature 
+ON reaction_signatures (signature);"""
+
+query_participants_by_reaction = """SELECT reaction_id, metabolite_id 
+FROM reaction_participants 
+ORDER BY reaction_id;"""
+
+query_metabolite_ids_from_identifiers = """SELECT DISTINCT(metabolite_id) 
+FROM metabolite_ids 
+JOIN resources ON metabolite_ids.resource_id = resources.id 
+WHERE resources.miriam_collection = 'metanetx.chemical' AND identifier IN ({0});"""
+
+create_query_signatures = """CREATE TEMP TABLE IF NOT EXISTS query_signatures 
+(signature INTEGER);"""
+
+query_reaction_ids_from_signatures = """SELECT DISTINCT query.signature, reaction_signatures.reaction_id 
+FROM query_signatures AS query 
+JOIN reaction_signatures ON reaction_signatures.signature = query.signature;"""
+
+# Annotations packed per entry
+query_annotations_table = """SELECT name 
+FROM sqlite_master 
+WHERE type = 'table' AND name = '{0}_annotations';"""
+
+query_has_annotations = """SELECT EXISTS (SELECT 1 FROM {0}_annotations) 
+OR NOT EXISTS (SELECT 1 FROM {0}_ids);"""
+
+query_annotation_rows = """SELECT {0}_id, resource_id, identifier 
+FROM {0}_ids 
+ORDER BY {0}_id, id;"""
+
+query_annotation_resources = """SELECT id, miriam_collection, use_resource 
+FROM resources 
+WHERE miriam_collection IS NOT NULL;"""
+
+create_query_ids = """CREATE TEMP TABLE IF NOT EXISTS query_ids 
+(id INTEGER PRIMARY KEY);"""
+
+query_annotations_in_range = """SELECT id, annotations 
+FROM {0}_annotations 
+WHERE id BETWEEN ? AND ?;"""
+
+query_annotations_from_ids = """SELECT blobs.id, blobs.annotations 
+FROM query_ids AS query 
+JOIN {0}_annotations AS blobs ON blobs.id = query.id;"""
+
+query_annotation_rows_from_ids = """SELECT {0}_ids.{0}_id, {0}_ids.resource_id, {0}_ids.identifier 
+FROM query_ids AS query 
+JOIN {0}_ids ON {0}_ids.{0}_id = query.id 
+ORDER BY {0}_ids.id;"""
+
+# Full text search on the names of metabolites and reactions.
+# The trigram tokenizer matches any substring of at least three
+# characters case insensitive.
+query_names_search_table = """SELECT name 
+FROM sqlite_master 
+WHERE type = 'table' AND name = :name 
+UNION ALL SELECT name 
+FROM sqlite_temp_master 
+WHERE type = 'table' AND name = :name;"""
+
+create_names_search = """CREATE VIRTUAL TABLE IF NOT EXISTS {0}_names_search 
+USING fts5(name, content='{0}_names', content_rowid='id', tokenize='trigram');"""
+
+rebuild_names_search = """INSERT INTO {0}_names_search ({0}_names_search) 
+VALUES ('rebuild');"""
+
+create_temp_names_search = """CREATE VIRTUAL TABLE IF NOT EXISTS temp.{0}_names_search 
+USING fts5(name, content='', tokenize='trigram');"""
+
+fill_temp_names_search = """INSERT INTO temp.{0}_names_search (rowid, name) 
+SELECT id, name FROM {0}_names;"""
+
+query_ids_from_names_search = """SELECT names.{0}_id, names.name 
+FROM {0}_names_search AS search 
+JOIN {0}_names AS names ON names.id = search.rowid 
+WHERE search.{0}_names_search MATCH ? 
+LIMIT ?;"""
+
+query_ids_from_name_like = """SELECT {0}_id, name 
+FROM {0}_names 
+WHERE name LIKE ? ESCAPE '\\' 
+LIMIT ?;"""
+
+# Settings of the pooled connections. The database file is mapped
+# into memory so that connections share the page cache of the system.
+connection_pragmas = ("PRAGMA mmap_size = 268435456;",)
+
+# Name of the QtSql connection shared by the database widgets
+qt_connection_name = "GEMEditor_database"
+
+# MetaNetX identifiers of protons, which are
+# ignored when matching reactions by stoichiometry
+proton_identifiers = ("MNXM01", "MNXM1")
+
+
+def reaction_signature(metabolite_ids):
+    """ Get the signature of a reaction
+
+    The signature is a 64 bit hash of the sorted ids of
+    the database metabolites participating in the reaction.
+    Stoichiometry and compartments are not considered.
+
+    Parameters
+    ----------
+    metabolite_ids: iterable
+        Database ids of the participating metabolites
+
+    Returns
+    -------
+    int
+    """
+    key = ",".join(str(x) for x in sorted(set(metabolite_ids))).encode()
+    return int.from_bytes(hashlib.sha1(key).digest()[:8], "big", signed=True)
+
+
+def get_proton_ids(cursor):
+    """ Get the database ids of the proton metabolites
+
+    Parameters
+    ----------
+    cursor: sqlite3.Cursor
+
+    Returns
+    -------
+    set
+    """
+    cursor.execute(query_metabolite_ids_from_identifiers.format(", ".join("?" * len(proton_identifiers))),
+                   proton_identifiers)
+    return set(x[0] for x in cursor.fetchall())
+
+
+def iter_reaction_signatures(cursor, ignored_ids):
+    """ Compute the signatures of all reactions in the database
+
+    Parameters
+    ----------
+    cursor: sqlite3.Cursor
+    ignored_ids: set
+        Metabolite ids not part of the signature e.g. protons
+
+    Returns
+    -------
+    generator
+        Tuples of reaction id and signature. Reactions
+        without participants besides the ignored ones
+        are skipped.
+    """
+    cursor.execute(query_participants_by_reaction)
+    for reaction_id, rows in groupby(cursor, key=lambda row: row[0]):
+        metabolite_ids = set(row[1] for row in rows) - ignored_ids
+        if metabolite_ids:
+            yield reaction_id, reaction_signature(metabolite_ids)
+
+
+def substring_distance(pattern, text):
+    """ Get the edit distance of pattern to its closest match in text
+
+    Uses the bit-parallel algorithm of Myers (1999), where bit i of
+    the bit vectors holds the vertical and horizontal differences
+    of row i in the column of the current character of text.
+
+    Parameters
+    ----------
+    pattern: str
+    text: str
+
+    Returns
+    -------
+    int
+        The minimal number of insertions, deletions and substitutions
+        needed to turn pattern into any substring of text
+    """
+    if not pattern:
+        return 0
+
+    masks = dict()
+    for i, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    full = (1 << len(pattern)) - 1
+    last = 1 << (len(pattern) - 1)
+
+    positive, negative, score = full, 0, len(pattern)
+    best = score
+    for char in text:
+        match = masks.get(char, 0)
+        vertical = match | negative
+        horizontal = (((match & positive) + positive) ^ positive) | match
+        h_positive = negative | (~(horizontal | positive) & full)
+        h_negative = positive & horizontal
+        if h_positive & last:
+            score += 1
+        elif h_negative & last:
+            score -= 1
+        # Matches may start anywhere in text
+        h_positive = (h_positive << 1) & full
+        h_negative = (h_negative << 1) & full
+        positive = h_negative | (~(vertical | h_positive) & full)
+        negative = h_positive & vertical
+        best = min(best, score)
+    return best
+
+
+def split_term(term, parts):
+    """ Split a search term into parts of about equal length
+
+    A name matching the term with less than parts typos contains
+    at least one of the parts unchanged.
+
+    Parameters
+    ----------
+    term: str
+    parts: int
+
+    Returns
+    -------
+    list
+    """
+    bounds = [round(i * len(term) / parts) for i in range(parts + 1)]
+    return [term[start:stop] for start, stop in zip(bounds, bounds[1:])]
+
+
+def pack_annotations(rows):
+    """ Pack the annotations of an entry
+
+    Parameters
+    ----------
+    rows: iterable
+        Tuples of resource id and identifier
+
+    Returns
+    -------
+    bytes
+        One line of tab separated resource id and
+        identifier per annotation
+    """
+    return "\n".join("{0:d}\t{1!s}".format(*row) for row in rows).encode("UTF-8")
+
+
+def unpack_annotations(blob):
+    """ Unpack the annotations packed by pack_annotations
+
+    Parameters
+    ----------
+    blob: bytes
+
+    Returns
+    -------
+    list
+        Tuples of resource id and identifier
+    """
+    if not blob:
+        return []
+    return [(int(resource_id), identifier) for resource_id, identifier in
+            (line.split("\t", 1) for line in blob.decode("UTF-8").split("\n"))]
+
+
+def iter_annotation_blobs(cursor, entry_type):
+    """ Pack the annotations of all entries in the database
+
+    Parameters
+    ----------
+    cursor: sqlite3.Cursor
+    entry_type: str, "metabolite" or "reaction"
+
+    Returns
+    -------
+    generator
+        Tuples of entry id and packed annotations in the
+        order of the identifiers in the database
+    """
+    cursor.execute(query_annotation_rows.format(entry_type))
+    for entry_id, rows in groupby(cursor, key=lambda row: row[0]):
+        yield entry_id, pack_annotations(row[1:] for row in rows)
+
+
+def database_uri(database_path, read_only=True):
+    """ Get the URI to open the database
+
+    Read-only connections still use file locking, so changes
+    written by other connections are picked up.
+
+    Parameters
+    ----------
+    database_path: str
+    read_only: bool
+
+    Returns
+    -------
+    str
+    """
+    uri = "file:{0}".format(pathname2url(os.path.abspath(database_path)))
+    if read_only:
+        uri += "?mode=ro"
+    return uri
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class LookupCache:
+    """ Bounded cache of database lookups
+
+    The least recently used results are dropped once more
+    than maxsize results are stored. Results have to be
+    immutable as they are shared by all callers.
+    """
+
+    def __init__(self, maxsize=16384):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, function):
+        """ Get the cached result or compute it
+
+        Parameters
+        ----------
+        key: hashable
+        function: callable
+            Computes the result if not cached
+
+        Returns
+        -------
+        object
+        """
+        with self._lock:
+            try:
+                result = self._results[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return result
+
+        result = function()
+        with self._lock:
+            self._results[key] = result
+            if len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+        return result
+
+    def clear(self):
+        """ Drop all results and reset the counters """
+        with self._lock:
+            LOGGER.debug("Clearing lookup cache: {0!s}".format(self.info()))
+            self._results.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        """ Get the statistics of the cache
+
+        Returns
+        -------
+        CacheInfo
+        """
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._results))
+
+
+lookup_cache = LookupCache()
+
+
+def file_signature(path):
+    """ Get a signature changing whenever the file is replaced or modified """
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+class ConnectionPool:
+    """ Process wide pool of connections to the database
+
+    sqlite3 connections can only be used in the thread that
+    created them, so every thread gets its own connections.
+    These are kept open for the lifetime of the application
+    and shared by all DatabaseWrapper instances of the thread.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._signatures = dict()
+
+    @property
+    def generation(self):
+        """ Number of times the pool has been invalidated """
+        with self._lock:
+            return self._generation
+
+    def _connections(self):
+        """ Get the connections of the current thread
+
+        Connections opened before the last invalidation
+        are discarded in every thread. """
+        local = self._local
+        generation = self.generation
+        if getattr(local, "generation", None) != generation:
+            local.connections = dict()
+            local.generation = generation
+        return local.connections
+
+    def connection(self, database_path, read_only=True):
+        """ Get a connection to the database for the current thread
+
+        Parameters
+        ----------
+        database_path: str
+        read_only: bool
+
+        Returns
+        -------
+        sqlite3.Connection
+        """
+        # Start over if the file has been replaced
+        database_path = os.path.abspath(database_path)
+        signature = file_signature(database_path)
+        with self._lock:
+            changed = self._signatures.setdefault(database_path, signature) != signature
+        if changed:
+            LOGGER.debug("Database file {0} has changed.".format(database_path))
+            self.invalidate()
+            with self._lock:
+                self._signatures[database_path] = signature
+
+        connections = self._connections()
+        key = (database_path, read_only)
+        try:
+            return connections[key]
+        except KeyError:
+            pass
+
+        LOGGER.debug("Opening connection to {0} (read-only: {1})".format(*key))
+        connection = sqlite3.connect(database_uri(database_path, read_only), uri=True)
+        # Make results accessible by index and by column
+        connection.row_factory = sqlite3.Row
+        for pragma in connection_pragmas:
+            connection.execute(pragma)
+        connections[key] = connection
+        return connection
+
+    def invalidate(self):
+        """ Discard all pooled connections and cached lookups
+
+        Has to be called whenever the database file is changed, as
+        the cached lookups do not notice changes of the file. The
+        connections of all threads and DatabaseWrapper instances are
+        replaced on their next use. Discarded connections are closed
+        as soon as they are no longer in use.
+
+        Returns
+        -------
+        None
+        """
+        LOGGER.debug("Discarding pooled database connections.")
+        with self._lock:
+            self._generation += 1
+            self._signatures.clear()
+        self._local.__dict__.clear()
+        lookup_cache.clear()
+        if QtSql.QSqlDatabase.contains(qt_connection_name):
+            QtSql.QSqlDatabase.database(qt_connection_name, False).close()
+
+
+connection_pool = ConnectionPool()
+
 
 class DatabaseWrapper:
 
-    def __init__(self, database_path=None, selected_collections=set()):
-        self.connection = None
-        self.cursor = None
+    def __init__(self, database_path=None, selected_collections=set(), read_only=True):
+        self._connection = None
+        self._cursor = None
+        self._generation = None
+        self.database_path = None
         self.selected_collections = selected_collections
+        self.read_only = read_only
         self.setup_connection(database_path)
 
     def setup_connection(self, database_path):
@@ -117,10 +645,55 @@ class DatabaseWrapper:
         if not os.path.isfile(database_path):
             raise FileNotFoundError
 
-        self.connection = sqlite3.connect(database_path)
-        # Make results accessible by index and by column
-        self.connection.row_factory = sqlite3.Row
-        self.cursor = self.connection.cursor()
+        self.database_path = os.path.abspath(database_path)
+        self._connect()
+
+    def _connect(self):
+        """ Get a connection for the current pool generation """
+        self._connection = connection_pool.connection(self.database_path, self.read_only)
+        self._cursor = self._connection.cursor()
+        self._generation = connection_pool.generation
+        # Temporary tables are set up per connection
+        self._signatures_ready = False
+        self._names_search = dict()
+
+    @property
+    def connection(self):
+        """ Pooled connection to the database
+
+        A new connection is taken from the pool after
+        the pool has been invalidated. """
+        if self._generation != connection_pool.generation:
+            self._connect()
+        return self._connection
+
+    @property
+    def cursor(self):
+        if self._generation != connection_pool.generation:
+            self._connect()
+        return self._cursor
+
+    def _cached_query(self, query, *parameters, factory=tuple):
+        """ Get all rows of a query from the lookup cache
+
+        Parameters
+        ----------
+        query: str
+        parameters:
+            Parameters of the query
+        factory: callable
+            Converts a row into an immutable object
+
+        Returns
+        -------
+        tuple
+            The converted rows
+        """
+        def run_query():
+            self.cursor.execute(query, parameters)
+            return tuple(factory(row) for row in self.cursor.fetchall())
+
+        return lookup_cache.get((self.database_path, query) + parameters, run_query)
 
     def get_synonyms_from_id(self, identifier, entry_type):
         """ Get all synonyms for entry in database with given identifier
@@ -136,14 +709,14 @@ class DatabaseWrapper:
         """
 
         if entry_type.lower() == "metabolite":
-            self.cursor.execute(query_metabolite_synonyms_from_id, (str(identifier),))
+            rows = self._cached_query(query_metabolite_synonyms_from_id, str(identifier))
         elif entry_type.lower() == "reaction":
-            self.cursor.execute(query_reaction_synonyms_from_id, (str(identifier),))
+            rows = self._cached_query(query_reaction_synonyms_from_id, str(identifier))
         else:
             raise ValueError("Unexpected entry_type: '{0!s}'".format(entry_type))
 
         # Return unpacked synonyms
-        return [x[0] for x in self.cursor.fetchall()]
+        return [x[0] for x in rows]
 
     def get_annotations_from_id(self, identifier, entry_type, get_all=False):
         """ Get all annotations from a database identifier
@@ -162,21 +735,19 @@ class DatabaseWrapper:
         # Run query depending on the specified type
         if entry_type.lower() == "metabolite":
             if get_all:
-                self.cursor.execute(query_all_annotation_from_metabolite_id, (str(identifier),))
+                query = query_all_annotation_from_metabolite_id
             else:
-                self.cursor.execute(query_annotation_from_metabolite_id, (str(identifier),))
+                query = query_annotation_from_metabolite_id
         elif entry_type.lower() == "reaction":
             if get_all:
-                self.cursor.execute(query_all_annotation_from_reaction_id, (str(identifier),))
+                query = query_all_annotation_from_reaction_id
             else:
-                self.cursor.execute(query_annotation_from_reaction_id, (str(identifier),))
+                query = query_annotation_from_reaction_id
         else:
             raise ValueError("Unexpected entry_type: '{0!s}'".format(entry_type))
 
-        # Return annotations
-        annotations = [Annotation(collection, identifier) for
-                       collection, identifier in self.cursor.fetchall()]
-        return annotations
+        # Annotations are immutable and can be shared
+        return list(self._cached_query(query, str(identifier), factory=lambda row: Annotation(*row)))
 
     def get_ids_from_annotation(self, identifier, collection):
         # Get resource type from collection
@@ -218,10 +789,334 @@ class DatabaseWrapper:
 
         return [x[0] for x in self.cursor.fetchall()]
 
+    def _setup_names_search(self, entry_type):
+        """ Make sure the names of entry_type can be searched
+
+        Databases created before the search index was introduced
+        lack the index. The names are indexed once per connection
+        into a temporary table, which takes the place of the index.
+
+        Parameters
+        ----------
+        entry_type: str, "metabolite" or "reaction"
+
+        Returns
+        -------
+        bool
+            True if the full text index is available, False if
+            names have to be searched by LIKE
+        """
+        if entry_type in self._names_search:
+            return self._names_search[entry_type]
+
+        self.cursor.execute(query_names_search_table, {"name": "{0}_names_search".format(entry_type)})
+        available = self.cursor.fetchone() is not None
+        if not available:
+            LOGGER.debug("Indexing {0} names..".format(entry_type))
+            try:
+                self.cursor.execute(create_temp_names_search.format(entry_type))
+                self.cursor.execute(fill_temp_names_search.format(entry_type))
+            except sqlite3.OperationalError:
+                LOGGER.debug("Full text search not supported:", exc_info=True)
+            else:
+                self.connection.commit()
+                available = True
+        self._names_search[entry_type] = available
+        return available
+
+    def _query_names(self, term, entry_type, indexed, limit):
+        """ Get ids and names of the entries with names containing term """
+        if indexed and len(term) >= 3:
+            self.cursor.execute(query_ids_from_names_search.format(entry_type),
+                                ('"{0}"'.format(term.replace('"', '""')), limit))
+        else:
+            pattern = "%{0}%".format(term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_"))
+            self.cursor.execute(query_ids_from_name_like.format(entry_type), (pattern, limit))
+        return self.cursor.fetchall()
+
+    def search_names(self, text, entry_type, limit=100, max_edits=2):
+        """ Search database entries by name
+
+        Entries with names containing text are ranked first, with
+        exact matches before names starting with text and shorter
+        names before longer ones. If there are less than limit
+        entries found, names containing text with typos are added.
+        One typo is tolerated per six characters of text.
+
+        Parameters
+        ----------
+        text: str
+        entry_type: str, "Metabolite" or "Reaction"
+        limit: int
+            Maximum number of entries returned
+        max_edits: int
+            Maximum number of typos tolerated
+
+        Returns
+        -------
+        list
+            Database ids ordered by relevance
+        """
+        entry_type = entry_type.lower()
+        if entry_type not in ("metabolite", "reaction"):
+            raise ValueError("Unexpected entry_type: '{0!s}'".format(entry_type))
+
+        text = text.strip()
+        if not text:
+            return []
+        term = text.lower()
+        indexed = self._setup_names_search(entry_type)
+
+        # Rank by number of typos, exact or prefix match and name length
+        ranks = dict()
+
+        def add(entry_id, name, distance):
+            name = name.lower()
+            key = (distance, 0 if name == term else 1 if name.startswith(term) else 2, len(name), name)
+            if entry_id not in ranks or key < ranks[entry_id]:
+                ranks[entry_id] = key
+
+        for entry_id in self.get_ids_from_name(text, entry_type):
+            add(entry_id, text, 0)
+        for entry_id, name in self._query_names(text, entry_type, indexed, limit * 10):
+            add(entry_id, name, 0)
+
+        edits = min(max_edits, len(text) // 6)
+        if len(ranks) < limit and edits:
+            for part in split_term(text, edits + 1):
+                for entry_id, name in self._query_names(part, entry_type, indexed, limit * 10):
+                    if entry_id in ranks and ranks[entry_id][0] == 0:
+                        continue
+                    distance = substring_distance(term, name.lower())
+                    if distance <= edits:
+                        add(entry_id, name, distance)
+
+        return sorted(ranks, key=ranks.get)[:limit]
+
     def get_ids_from_formula(self, formula):
         self.cursor.execute(query_metabolite_id_from_formula, (str(formula),))
         return [x[0] for x in self.cursor.fetchall()]
 
+    def _fill_query_table(self, table, rows, *statements):
+        """ Fill a temporary table with the values to query
+
+        Parameters
+        ----------
+        table: str
+            Name of the temporary table
+        rows: iterable
+            Rows to insert into the table
+        statements: str
+            Statements creating the table and its indices
+
+        Returns
+        -------
+        None
+        """
+        for statement in statements:
+            self.cursor.execute(statement)
+        self.cursor.execute("DELETE FROM {0};".format(table))
+
+        rows = list(rows)
+        if rows:
+            placeholders = ", ".join("?" * len(rows[0]))
+            self.cursor.executemany("INSERT INTO {0} VALUES ({1});".format(table, placeholders), rows)
+
+    @staticmethod
+    def _group_results(rows):
+        """ Group the ids in the last column by the preceding columns """
+        result = defaultdict(set)
+        for row in rows:
+            key = tuple(row[:-1])
+            result[key[0] if len(key) == 1 else key].add(row[-1])
+        return result
+
+    def get_ids_from_annotations(self, annotations, entry_type):
+        """ Find matching database entries for many annotations at once
+
+        Batched version of get_ids_from_annotation that
+        resolves all annotations in a single query.
+
+        Parameters
+        ----------
+        annotations: iterable
+            Annotation objects
+        entry_type: str, "Metabolite" or "Reaction"
+
+        Returns
+        -------
+        dict
+            Set of database ids per (collection, identifier)
+            for all annotations found in the database
+        """
+        if entry_type.lower() == "metabolite":
+            query = query_metabolite_ids_from_annotations
+        elif entry_type.lower() == "reaction":
+            query = query_reaction_ids_from_annotations
+        else:
+            raise ValueError("Unexpected entry_type: '{0!s}'".format(entry_type))
+
+        self._fill_query_table("query_annotations", set((x.collection, x.identifier) for x in annotations),
+                               create_query_annotations)
+        self.cursor.execute(query)
+        return self._group_results(self.cursor.fetchall())
+
+    def get_ids_from_names(self, names, entry_type):
+        """ Find matching database entries for many names at once
+
+        Batched version of get_ids_from_name. Names are
+        matched case insensitive.
+
+        Parameters
+        ----------
+        names: iterable
+        entry_type: str, "Metabolite" or "Reaction"
+
+        Returns
+        -------
+        dict
+            Set of database ids per name for all
+            names found in the database
+        """
+        if entry_type.lower() == "metabolite":
+            query = query_metabolite_ids_from_names
+        elif entry_type.lower() == "reaction":
+            query = query_reaction_ids_from_names
+        else:
+            raise ValueError("Unexpected entry_type: '{0!s}'".format(entry_type))
+
+        self._fill_query_table("query_names", set((str(x),) for x in names),
+                               create_query_names, create_query_names_index)
+        self.cursor.execute(query)
+        return self._group_results(self.cursor.fetchall())
+
+    def get_ids_from_formulas(self, formulas):
+        """ Find matching metabolite entries for many formulas at once
+
+        Parameters
+        ----------
+        formulas: iterable
+
+        Returns
+        -------
+        dict
+            Set of database ids per formula for all
+            formulas found in the database
+        """
+        self._fill_query_table("query_formulas", set((str(x),) for x in formulas),
+                               create_query_formulas)
+        self.cursor.execute(query_metabolite_ids_from_formulas)
+        return self._group_results(self.cursor.fetchall())
+
+    def get_proton_ids(self):
+        """ Get the database ids of the proton metabolites
+
+        Returns
+        -------
+        set
+        """
+        return get_proton_ids(self.cursor)
+
+    def _setup_reaction_signatures(self):
+        """ Make sure the reaction signatures are available
+
+        Databases created before the signatures were introduced
+        lack the signatures. These are computed once per connection
+        into a temporary table, which shadows the empty table.
+        """
+        if self._signatures_ready:
+            return
+
+        self.cursor.execute(query_reaction_signatures_table)
+        if self.cursor.fetchone() is None or not self.connection.execute(query_has_reaction_signatures).fetchone()[0]:
+            LOGGER.debug("Computing reaction signatures..")
+            self.cursor.execute(create_temp_reaction_signatures)
+            self.cursor.execute("DELETE FROM temp.reaction_signatures;")
+            signatures = iter_reaction_signatures(self.connection.cursor(), self.get_proton_ids())
+            self.cursor.executemany("INSERT INTO temp.reaction_signatures VALUES (NULL, ?, ?);", signatures)
+            self.cursor.execute(create_temp_reaction_signatures_index)
+        self._signatures_ready = True
+
+    def get_ids_from_signatures(self, signatures):
+        """ Find reactions matching the signatures
+
+        Parameters
+        ----------
+        signatures: iterable
+            Signatures as returned by reaction_signature
+
+        Returns
+        -------
+        dict
+            Set of reaction ids per signature for all
+            signatures found in the database
+        """
+        self._setup_reaction_signatures()
+        self._fill_query_table("query_signatures", set((x,) for x in signatures), create_query_signatures)
+        self.cursor.execute(query_reaction_ids_from_signatures)
+        return self._group_results(self.cursor.fetchall())
+
+    def get_annotations_from_ids(self, identifiers, entry_type, get_all=False):
+        """ Get the annotations of many database entries at once
+
+        Batched version of get_annotations_from_id reading the
+        annotations packed per entry. Dense ids, like those of a
+        model mapped to the database, are read in a single range
+        scan and filtered in memory.
+
+        Parameters
+        ----------
+        identifiers: iterable
+            Database ids of the entries
+        entry_type: str, "Metabolite" or "Reaction"
+        get_all: bool, Get all annotations irrespective if active or not
+
+        Returns
+        -------
+        dict
+            List of Annotation objects per database id
+            for all entries with annotations
+        """
+        entry_type = entry_type.lower()
+        if entry_type not in ("metabolite", "reaction"):
+            raise ValueError("Unexpected entry_type: '{0!s}'".format(entry_type))
+
+        identifiers = set(int(x) for x in identifiers)
+        if not identifiers:
+            return {}
+
+        self.cursor.execute(query_annotation_resources)
+        collections = dict((resource_id, collection) for resource_id, collection, use in self.cursor.fetchall()
+                           if get_all or use)
+
+        self.cursor.execute(query_annotations_table.format(entry_type))
+        if self.cursor.fetchone() is None or not self.connection.execute(
+                query_has_annotations.format(entry_type)).fetchone()[0]:
+            # Databases created before the packed annotations
+            self._fill_query_table("query_ids", ((x,) for x in identifiers), create_query_ids)
+            self.cursor.execute(query_annotation_rows_from_ids.format(entry_type))
+            entries = defaultdict(list)
+            for entry_id, resource_id, identifier in self.cursor.fetchall():
+                entries[entry_id].append((resource_id, identifier))
+            entries = entries.items()
+        else:
+            lowest, highest = min(identifiers), max(identifiers)
+            if highest - lowest < 4 * len(identifiers):
+                self.cursor.execute(query_annotations_in_range.format(entry_type), (lowest, highest))
+            else:
+                self._fill_query_table("query_ids", ((x,) for x in identifiers), create_query_ids)
+                self.cursor.execute(query_annotations_from_ids.format(entry_type))
+            entries = ((entry_id, unpack_annotations(blob)) for entry_id, blob in self.cursor.fetchall()
+                       if entry_id in identifiers)
+
+        result = dict()
+        for entry_id, rows in entries:
+            annotations = [Annotation(collections[resource_id], identifier) for resource_id, identifier in rows
+                           if resource_id in collections]
+            if annotations:
+                result[entry_id] = annotations
+        return result
+
     def get_metabolite_from_id(self, identifier):
         """ Retrieve metabolite from database
 
@@ -235,10 +1130,10 @@ class DatabaseWrapper:
 
         """
 
-        self.cursor.execute(query_metabolite_info_from_id, (str(identifier),))
-        metabolite_info = self.cursor.fetchone()
+        rows = self._cached_query(query_metabolite_info_from_id, str(identifier))
 
-        if metabolite_info:
+        if rows:
+            metabolite_info = rows[0]
             metabolite = Metabolite(name=metabolite_info[0],
                                     formula=metabolite_info[1],
                                     charge=metabolite_info[2])
@@ -272,10 +1167,9 @@ class DatabaseWrapper:
 
         """
 
-        self.cursor.execute(query_reaction_info_from_id, (identifier,))
-        result = self.cursor.fetchone()
-        if result:
-            return result["string"]
+        rows = self._cached_query(query_reaction_info_from_id, str(identifier))
+        if rows:
+            return rows[0][1]
 
     def get_reaction_from_id(self, identifier):
         """ Get an empty reaction from the database for a given identifier
@@ -289,8 +1183,7 @@ class DatabaseWrapper:
 
         """
         reaction = Reaction()
-        self.cursor.execute(query_reaction_info_from_id, (identifier,))
-        if not self.cursor.fetchone():
+        if not self._cached_query(query_reaction_info_from_id, str(identifier)):
             return
         annotations = self.get_annotations_from_id(identifier, "Reaction")
         reaction.annotation.update(annotations)
@@ -315,6 +1208,7 @@ class DatabaseWrapper:
 
         self.cursor.execute(query_update_resource, (int(value), resource))
         self.connection.commit()
+        connection_pool.invalidate()
 
     def get_reaction_id_from_participant_ids(self, metabolite_ids):
         sets = []
@@ -330,8 +1224,9 @@ class DatabaseWrapper:
 
     @QtCore.pyqtSlot()
     def close(self):
-        self.cursor.close()
-        self.connection.close()
+        # The connection is kept open by the pool
+        if self._cursor is not None:
+            self._cursor.close()
 
     @staticmethod
     def store_database_path(database_path):
@@ -550,6 +1445,9 @@ def factory_entry_widget(data_type, parent):
 def pyqt_database_connection(database_path=None):
     """ Open the SQLITE database containing the MetaNetX mappings
 
+    The read-only connection is shared by all callers and
+    stays open until the connection pool is invalidated.
+
     Returns
     -------
     db : QtSql.QSqlDatabase or None
@@ -575,10 +1473,22 @@ def pyqt_database_connection(database_path=None):
                                    QMessageBox.Close)
         return
 
+    # Reuse the open connection
+    uri = database_uri(database_path)
+    if QtSql.QSqlDatabase.contains(qt_connection_name):
+        db = QtSql.QSqlDatabase.database(qt_connection_name, False)
+        if db.isOpen() and db.databaseName() == uri:
+            return db
+        db.close()
+    else:
+        db = QtSql.QSqlDatabase.addDatabase('QSQLITE', qt_connection_name)
+
     # Set up database
-    db = QtSql.QSqlDatabase.addDatabase('QSQLITE')
-    db.setDatabaseName(database_path)
-    db.setConnectOptions("QSQLITE_OPEN_READONLY=1")
+    db.setDatabaseName(uri)
+    db.setConnectOptions("QSQLITE_OPEN_READONLY;QSQLITE_OPEN_URI")
+    if db.open():
+        for pragma in connection_pragmas:
+            QtSql.QSqlQuery(pragma, db)
     return db
 
 
@@ -2,17 +2,34 @@ import logging
 import re
 import os
 import sqlite3
-from collections import defaultdict, Counter
-from PyQt5.QtWidgets import QMessageBox, QApplication, QProgressDialog
+from collections import defaultdict, deque, Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import count, islice
+from PyQt5.QtWidgets import QMessageBox, QProgressDialog
+from GEMEditor.base.classes import ProgressReporter
 from GEMEditor.database import metanetx_url, metanetx_files, missing_prefix
 from GEMEditor.connect.urldownloader import DownloadProgressDialog, StopDownload
 from GEMEditor.database.tables import setup_empty_database
-from GEMEditor.database.base import DatabaseWrapper
+from GEMEditor.database.base import DatabaseWrapper, get_proton_ids, iter_reaction_signatures, \
+    create_names_search, rebuild_names_search, connection_pool, iter_annotation_blobs
 from urllib.request import urlretrieve, ContentTooShortError, HTTPError, URLError
 
 
 LOGGER = logging.getLogger(__name__)
 
+# Number of lines per parse task when building the database
+BUILD_CHUNK_SIZE = 2000
+
+# The database is discarded if the build fails, so
+# there is no need for a journal or syncing to disk
+build_pragmas = ("PRAGMA journal_mode = OFF;",
+                 "PRAGMA synchronous = OFF;",
+                 "PRAGMA cache_size = -16384;")
+restore_pragmas = ("PRAGMA journal_mode = DELETE;",
+                   "PRAGMA synchronous = FULL;",
+                   "PRAGMA cache_size = -2000;")
+
 
 def download_metanetx_files(parent=None):
     """ Download the data files from MetaNetX
@@ -86,23 +103,44 @@ def cleanup_files(files):
     LOGGER.debug("Cleanup complete.")
 
 
-def get_line_count(file_path):
-    """ Get the number of rows in a file
-    
+def get_progress_maximum(file_path):
+    """ Get the progress maximum for reading a file
+
+    The progress of reading a file is reported in kilobytes, which
+    keeps the size of large files within the range of the progress
+    dialog.
+
     Parameters
     ----------
     file_path: str
 
     Returns
     -------
+    int
+    """
+    return _kilobytes(os.path.getsize(file_path))
+
+
+def get_read_progress(open_file):
+    """ Get the number of kilobytes read from an open file
+
+    The position of the underlying binary buffer is used, as the
+    position of a text file can not be queried while iterating
+    its lines. The file is thereby read only once.
+
+    Parameters
+    ----------
+    open_file: io.TextIOWrapper
 
+    Returns
+    -------
+    int
     """
+    return _kilobytes(open_file.buffer.tell())
 
-    with open(file_path, encoding="UTF-8") as temp_file:
-        i = 0
-        for i, _ in enumerate(temp_file):
-            pass
-    return i
+
+def _kilobytes(size):
+    return -(-size // 1024)
 
 
 def get_resource_id(cursor, resource):
@@ -148,21 +186,20 @@ def add_valid_identifier(cursor, metabolite_id, identifier, resource_id):
         raise TypeError
 
 
-def add_identifier(cursor, metabolite_id, entry, prefix_resource_map, validators):
-    """ Add the identifier to the table an associate it to the proper resource
+def resolve_identifier(entry, prefix_resource_map, validators):
+    """ Get the resource and the identifier of a MetaNetX xref entry
 
     Parameters
     ----------
-    conn : sqlite3.connection
-    cursor : sqlite3.connection.cursor
-    metabolite_id : int, The id of the corresponding metabolite in the database
     entry: str, The xref entry in MetaNetX consisting of prefix:source_id
     prefix_resource_map: dict, A dictionary containing a map between the prefixes and the resource ids in the database
     validators: dict, A dictionary containing a mapping between the resource id and the corresponding precompiled regex validator
 
     Returns
     -------
-    None or True
+    resource_id: int or None, None if the entry can not be resolved
+    identifier: str or None
+    message: str or None, The reason why the entry can not be resolved
     """
 
     # Split of prefix
@@ -181,7 +218,7 @@ def add_identifier(cursor, metabolite_id, entry, prefix_resource_map, validators
     # original prefix has not been retained in MetaNetX
     identifier = "{}{}".format(missing_prefix[prefix], identifier)
 
-    resource_ids = prefix_resource_map[prefix]
+    resource_ids = prefix_resource_map.get(prefix, ())
 
     # The prefix uniquely identifies a resource
     if len(resource_ids) == 1:
@@ -189,25 +226,48 @@ def add_identifier(cursor, metabolite_id, entry, prefix_resource_map, validators
 
         # The identifier is valid part of the collection
         if re.match(validator, identifier):
-            add_valid_identifier(cursor, metabolite_id, identifier, resource_ids[0])
-            return True
+            return resource_ids[0], identifier, None
         else:
-            LOGGER.warning("The metabolite xref {} was not added to the database, as the identifier is invalid.".format(entry))
+            return None, None, "The metabolite xref {} was not added to the database, as the identifier is invalid.".format(entry)
 
     # The prefix corresponds to more than one resource
     elif len(resource_ids) > 1:
         for resource_id in resource_ids:
             validator = validators[resource_id]
             if re.match(validator, identifier):
-                add_valid_identifier(cursor, metabolite_id, identifier, resource_id)
-                return True
+                return resource_id, identifier, None
 
         # No match for any of the resources
-        LOGGER.warning("The metabolite xref {} was not added to the database, as the identifier is no valid member of any collection.".format(entry))
+        return None, None, "The metabolite xref {} was not added to the database, as the identifier is no valid member of any collection.".format(entry)
 
     # The prefix corresponds to no resource
     else:
-        LOGGER.warning("The metabolite xref {0} was not added to the database, as the prefix {1} is unknown.".format(entry, prefix))
+        return None, None, "The metabolite xref {0} was not added to the database, as the prefix {1} is unknown.".format(entry, prefix)
+
+
+def add_identifier(cursor, metabolite_id, entry, prefix_resource_map, validators):
+    """ Add the identifier to the table an associate it to the proper resource
+
+    Parameters
+    ----------
+    conn : sqlite3.connection
+    cursor : sqlite3.connection.cursor
+    metabolite_id : int, The id of the corresponding metabolite in the database
+    entry: str, The xref entry in MetaNetX consisting of prefix:source_id
+    prefix_resource_map: dict, A dictionary containing a map between the prefixes and the resource ids in the database
+    validators: dict, A dictionary containing a mapping between the resource id and the corresponding precompiled regex validator
+
+    Returns
+    -------
+    None or True
+    """
+
+    resource_id, identifier, message = resolve_identifier(entry, prefix_resource_map, validators)
+    if resource_id is None:
+        LOGGER.warning(message)
+    else:
+        add_valid_identifier(cursor, metabolite_id, identifier, resource_id)
+        return True
 
 
 def get_validators(conn, type="metabolite"):
@@ -472,6 +532,47 @@ def parse_reaction_formula(parse_string):
     return educts_result, products_result
 
 
+@lru_cache(maxsize=65536)
+def parse_side_stoichiometry(input_str):
+    """ Parse one side of a reaction equation
+
+    The sides of MetaNetX equations repeat a lot, so that the parsed
+    sides are memoized. The coefficients are summed as in
+    parse_reaction_formula.
+
+    Parameters
+    ----------
+    input_str: str
+
+    Returns
+    -------
+    tuple or None - Pairs of metabolite and coefficient in the order of
+                    the equation, None if the side does not pass the
+                    checks of parse_reaction_formula
+    """
+
+    stoichiometry = defaultdict(int)
+    for part in input_str.split(" + "):
+        stripped = part.strip(" ")
+
+        # Stripping other whitespace fails check_string
+        if stripped != part.strip():
+            return None
+
+        try:
+            split = get_stoichiometry_from_str(stripped)
+        except ValueError:
+            return None
+
+        if split:
+            metabolite, coefficient = split
+            if coefficient is None:
+                coefficient = 1.
+            stoichiometry[metabolite] += float(coefficient)
+
+    return tuple(stoichiometry.items())
+
+
 def get_equation_inserts(metabolite_map, reaction_id, equation, compartment_map):
     """ Add the metabolites contained in the equation
     in the reaction to the reaction_metabolite_map.
@@ -490,14 +591,22 @@ def get_equation_inserts(metabolite_map, reaction_id, equation, compartment_map)
     # Keep track of rows to insert
     inserts = []
 
-    educts, products = parse_reaction_formula(equation)
+    educts, products = None, None
+    if equation:
+        sides = split_reaction_at_arrow(equation)
+        if len(sides) == 2:
+            educts, products = parse_side_stoichiometry(sides[0]), parse_side_stoichiometry(sides[1])
+
+    # Let the full parser raise the appropriate error
+    if educts is None or products is None:
+        educts, products = (x.items() for x in parse_reaction_formula(equation))
 
-    for key, value in educts.items():
+    for key, value in educts:
         mnx_id, compartment = key.split("@")
         participant_id = metabolite_map[mnx_id]
         inserts.append((reaction_id, participant_id, -float(value), compartment_map[compartment]))
 
-    for key, value in products.items():
+    for key, value in products:
         mnx_id, compartment = key.split("@")
         participant_id = metabolite_map[mnx_id]
         inserts.append((reaction_id, participant_id, float(value), compartment_map[compartment]))
@@ -505,35 +614,55 @@ def get_equation_inserts(metabolite_map, reaction_id, equation, compartment_map)
     return inserts
 
 
-def get_ec_numer_inserts(reaction_id, resource_id, ec, validator):
-    """ Get the parameters for insertion of the ec number
+def parse_ec_numbers(ec, validator):
+    """ Split the EC number column of a reaction
 
     Parameters
     ----------
-    validator: 
-    resource_id: int
-    reaction_id : int
     ec : str
+    validator:
 
     Returns
     -------
-    list
+    valid: list, EC numbers completed to four levels
+    invalid: list
     """
 
-    inserts = []
+    valid, invalid = [], []
 
     split_ec = [x.strip() for x in ec.split(";")]
     for x in split_ec:
         if not x:
             continue
         elif validator.match(x):
-            inserts.append((reaction_id, resource_id, x))
+            valid.append(x)
         elif x.count(".") < 3 and x[-1].isnumeric():
             x += ".-"*(3-x.count("."))
-            inserts.append((reaction_id, resource_id, x))
+            valid.append(x)
         else:
-            LOGGER.warning("Invalid EC number '{}' not added to reaction with id '{}'.".format(x, str(reaction_id)))
-    return inserts
+            invalid.append(x)
+    return valid, invalid
+
+
+def get_ec_numer_inserts(reaction_id, resource_id, ec, validator):
+    """ Get the parameters for insertion of the ec number
+
+    Parameters
+    ----------
+    validator: 
+    resource_id: int
+    reaction_id : int
+    ec : str
+
+    Returns
+    -------
+    list
+    """
+
+    valid, invalid = parse_ec_numbers(ec, validator)
+    for x in invalid:
+        LOGGER.warning("Invalid EC number '{}' not added to reaction with id '{}'.".format(x, str(reaction_id)))
+    return [(reaction_id, resource_id, x) for x in valid]
 
 
 def load_reactions(conn, files, progress):
@@ -571,12 +700,10 @@ def load_reactions(conn, files, progress):
 
     compartment_map = dict(cursor.execute("SELECT mnx_id, id FROM compartments"))
 
-    # Get line count for updating the progress dialog
-    num_lines = get_line_count(files["Reactions"])
     progress.setLabelText("Reading reactions..")
-    progress.setMaximum(num_lines)
+    progress.setMaximum(get_progress_maximum(files["Reactions"]))
 
-    with open(files["Reactions"], "r") as reaction_file:
+    with open(files["Reactions"], encoding="UTF-8") as reaction_file:
 
         # Keep information for bulk insertion
         reaction_inserts = []
@@ -592,8 +719,7 @@ def load_reactions(conn, files, progress):
                 cursor.close()
                 return
             else:
-                progress.setValue(i)
-                QApplication.processEvents()
+                progress.setValue(get_read_progress(reaction_file))
 
             split_line = line.strip().split("\t")
             assert len(split_line) == 6
@@ -655,11 +781,10 @@ def load_reaction_xrefs(conn, files, progress):
     reaction_validators = get_validators(conn, type="reaction")
     prefix_resource_map = get_prefix_resource_id_map(conn, type="reaction")
 
-    num_lines = get_line_count(files["ReactionLinks"])
     progress.setLabelText("Reading reactions..")
-    progress.setMaximum(num_lines)
+    progress.setMaximum(get_progress_maximum(files["ReactionLinks"]))
 
-    with open(files["ReactionLinks"], "r") as open_file:
+    with open(files["ReactionLinks"], encoding="UTF-8") as open_file:
 
         for i, line in enumerate(open_file):
 
@@ -670,8 +795,7 @@ def load_reaction_xrefs(conn, files, progress):
                 cursor.close()
                 return
             else:
-                progress.setValue(i)
-                QApplication.processEvents()
+                progress.setValue(get_read_progress(open_file))
 
             split_line = [x.strip() for x in line.split("\t")]
             assert len(split_line) == 2
@@ -716,6 +840,70 @@ def load_reaction_xrefs(conn, files, progress):
         conn.commit()
 
 
+def load_reaction_signatures(conn, progress):
+    """ Store the signatures of all reactions
+
+    The signatures are used to match model reactions to the
+    database by their participating metabolites in a single
+    query.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+    progress: PyQt5.QWidgets.QProgressDialog
+
+    Returns
+    -------
+    """
+
+    # Quit if user canceled
+    if progress.wasCanceled():
+        return
+
+    progress.setLabelText("Computing reaction signatures..")
+    progress.setMaximum(0)
+
+    cursor = conn.cursor()
+    signatures = iter_reaction_signatures(conn.cursor(), get_proton_ids(cursor))
+    cursor.executemany("INSERT INTO reaction_signatures VALUES (NULL, ?, ?)", signatures)
+    cursor.close()
+    conn.commit()
+
+    LOGGER.debug("Reaction signatures successfully loaded into database.")
+
+
+def load_annotations(conn, progress):
+    """ Store the packed annotations of all entries
+
+    The annotations of a model mapped to the database
+    can thus be retrieved in a single range scan.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+    progress: PyQt5.QWidgets.QProgressDialog
+
+    Returns
+    -------
+    """
+
+    # Quit if user canceled
+    if progress.wasCanceled():
+        return
+
+    progress.setLabelText("Packing annotations..")
+    progress.setMaximum(0)
+
+    cursor = conn.cursor()
+    for entry_type in ("metabolite", "reaction"):
+        cursor.executemany("INSERT INTO {0}_annotations VALUES (?, ?)".format(entry_type),
+                           iter_annotation_blobs(conn.cursor(), entry_type))
+    cursor.close()
+    conn.commit()
+
+    LOGGER.debug("Annotations successfully packed.")
+
+
 def load_metabolites(conn, files, progress):
     """ Load MetaNetX metabolites into the database
 
@@ -742,13 +930,12 @@ def load_metabolites(conn, files, progress):
     inchi_resource_id = get_resource_id(cursor, 'inchi')
 
     # Update progress dialog
-    num_lines = get_line_count(files["Metabolites"])
     progress.setLabelText("Reading metabolites..")
-    progress.setMaximum(num_lines)
+    progress.setMaximum(get_progress_maximum(files["Metabolites"]))
 
     # Parse metabolite file
     LOGGER.debug("Importing metabolites to database.")
-    with open(files["Metabolites"]) as metabolite_file:
+    with open(files["Metabolites"], encoding="UTF-8") as metabolite_file:
 
         for i, line in enumerate(metabolite_file):
 
@@ -759,8 +946,7 @@ def load_metabolites(conn, files, progress):
                 LOGGER.debug("Metabolite import was aborted by user at line {0!s}".format(i))
                 return
             else:
-                progress.setValue(i)
-                QApplication.processEvents()
+                progress.setValue(get_read_progress(metabolite_file))
 
             split_line = [x.strip() for x in line.split("\t")]
             assert len(split_line) == 9
@@ -824,9 +1010,8 @@ def load_metabolites_xref(conn, files, progress):
     prefix_resource_map = get_prefix_resource_id_map(conn, type="metabolite")
 
     # Update progress dialog
-    num_lines = get_line_count(files["MetaboliteLinks"])
     progress.setLabelText("Reading metabolite xrefs..")
-    progress.setMaximum(num_lines)
+    progress.setMaximum(get_progress_maximum(files["MetaboliteLinks"]))
 
     LOGGER.debug("Importing metabolite cross-links to database.")
     with open(files["MetaboliteLinks"], encoding="UTF-8") as xref_file:
@@ -840,8 +1025,7 @@ def load_metabolites_xref(conn, files, progress):
                 LOGGER.debug("Metabolite xref import was aborted by user at line {0!s}".format(i))
                 return
             else:
-                progress.setValue(i)
-                QApplication.processEvents()
+                progress.setValue(get_read_progress(xref_file))
 
             # Split line in columns
             split_line = [x.strip() for x in line.split("\t")]
@@ -882,9 +1066,8 @@ def load_compartments(conn, files, progress):
     cursor = conn.cursor()
 
     # Update progress dialog
-    num_lines = get_line_count(files["Compartments"])
     progress.setLabelText("Reading Compartments..")
-    progress.setMaximum(num_lines)
+    progress.setMaximum(get_progress_maximum(files["Compartments"]))
 
     LOGGER.debug("Importing compartments to database.")
     with open(files["Compartments"], encoding="UTF-8") as open_file:
@@ -897,8 +1080,7 @@ def load_compartments(conn, files, progress):
                 LOGGER.debug("Compartment import was aborted by user at line {0!s}".format(i))
                 return
             else:
-                progress.setValue(i)
-                QApplication.processEvents()
+                progress.setValue(get_read_progress(open_file))
 
             # Split line in columns
             split_line = [x.strip() for x in line.split("\t")]
@@ -936,8 +1118,14 @@ def create_indices(conn, progress):
                "CREATE INDEX idx_met_xref_identifier2 ON metabolite_ids (metabolite_id);",  # User search
                "CREATE INDEX idx_met_formula ON metabolites (formula);",
                "CREATE INDEX idx_reactionid_participants ON reaction_participants (reaction_id)",  # Matching reaction to database
-               "CREATE INDEX idx_metid_participants ON reaction_participants (metabolite_id)"  # Matching metabolite to database
+               "CREATE INDEX idx_metid_participants ON reaction_participants (metabolite_id)",  # Matching metabolite to database
+               "CREATE INDEX idx_reaction_signature ON reaction_signatures (signature)",  # Matching reaction to database
+               "CREATE INDEX idx_metabolite_names_nocase ON metabolite_names (name COLLATE NOCASE)",  # Matching metabolite to database
+               "CREATE INDEX idx_reaction_names_nocase ON reaction_names (name COLLATE NOCASE)"  # Matching reaction to database
                ]
+    # Full text search on names
+    for entry_type in ("metabolite", "reaction"):
+        indices.extend((create_names_search.format(entry_type), rebuild_names_search.format(entry_type)))
 
     progress.setMaximum(len(indices))
     progress.setLabelText("Setting up indices..")
@@ -946,12 +1134,691 @@ def create_indices(conn, progress):
 
     for i, index in enumerate(indices):
         progress.setValue(i)
-        QApplication.processEvents()
         LOGGER.debug("Running: {}".format(index))
         cursor.execute(index)
     conn.commit()
 
 
+class _IdentityMap(dict):
+    """ Map every key onto itself
+
+    Used to keep the MetaNetX ids in the parsed rows, which are
+    replaced by the database ids in the main process.
+    """
+
+    def __missing__(self, key):
+        return key
+
+
+# Lookup tables shared by all parse tasks of a worker
+_build_context = {}
+
+
+def _init_build_worker(context):
+    _build_context.clear()
+    _build_context.update(context)
+
+
+# The parsers below run in the worker processes. Instead of logging,
+# they return the messages of a line alongside its rows, so that the
+# main process only logs the messages of lines added to the database.
+
+def _parse_metabolite_lines(start, lines):
+    result = []
+    for line in lines:
+        if line.startswith("#"):
+            continue
+
+        split_line = [x.strip() for x in line.split("\t")]
+        assert len(split_line) == 9
+        mnx_id, description, formula, charge, mass, inchi, smiles, _, _ = split_line
+        result.append((mnx_id, description, formula, charge, inchi))
+    return result
+
+
+def _parse_metabolite_xref_lines(start, lines):
+    prefix_resource_map = _build_context["metabolite_prefixes"]
+    validators = _build_context["metabolite_validators"]
+
+    result = []
+    for line in lines:
+        if line.startswith("#"):
+            continue
+
+        entry, met_id, evidence, description = [x.strip() for x in line.split("\t")]
+
+        # Skip entries that map to themselves
+        if entry == met_id:
+            result.append((entry, met_id, None, None, None))
+            continue
+
+        identifiers, names, messages = [], [], []
+        resource_id, identifier, message = resolve_identifier(entry, prefix_resource_map, validators)
+        if resource_id is None:
+            messages.append((logging.WARNING, message))
+        else:
+            identifiers.append((resource_id, identifier))
+
+        # Same as add_names_from_description
+        for x in description.split("|"):
+            if ":" in x and x.split(":", 1)[0] in prefix_resource_map:
+                resource_id, identifier, message = resolve_identifier(x, prefix_resource_map, validators)
+                if resource_id is not None:
+                    identifiers.append((resource_id, identifier))
+                    break
+                messages.append((logging.WARNING, message))
+            names.append(x)
+
+        result.append((entry, met_id, identifiers, names, messages))
+    return result
+
+
+def _parse_reaction_lines(start, lines):
+    ec_validator = _build_context["ec_validator"]
+    identity = _IdentityMap()
+
+    result = []
+    for i, line in enumerate(lines, start):
+        if line.startswith("#"):
+            continue
+
+        split_line = line.strip().split("\t")
+        assert len(split_line) == 6
+        mnx_id, equation, description, balance, ec, source = split_line
+        reaction_id = i + 1
+
+        try:
+            participants = get_equation_inserts(identity, reaction_id, equation, identity)
+        except Exception as e:
+            result.append((reaction_id, mnx_id, None, str(e), None))
+            continue
+
+        result.append((reaction_id, mnx_id, description, participants, parse_ec_numbers(ec, ec_validator)))
+    return result
+
+
+def _parse_reaction_xref_lines(start, lines):
+    prefix_resource_map = _build_context["reaction_prefixes"]
+    validators = _build_context["reaction_validators"]
+
+    result = []
+    for line in lines:
+        if line.startswith("#"):
+            continue
+
+        split_line = [x.strip() for x in line.split("\t")]
+        assert len(split_line) == 2
+        link, mnx_id = split_line
+
+        try:
+            resource, identifier = link.split(":", 1)
+        except ValueError:
+            resource = "mnx"
+            identifier = link
+
+        # Substitute deprecated with MetaNetX prefix
+        if resource == "deprecated":
+            resource = "mnx"
+
+        resource_id = prefix_resource_map[resource]
+        if len(resource_id) != 1:
+            result.append((mnx_id, link, None, None))
+            continue
+
+        resource_id = resource_id[0]
+        validator = validators[resource_id]
+
+        # Some of the reactome identifiers are missing the prefix
+        if resource == "reactome" and not re.match(validator, identifier):
+            identifier = "{}{}".format(missing_prefix[resource], identifier)
+
+        result.append((mnx_id, link, resource_id if re.match(validator, identifier) else None, identifier))
+    return result
+
+
+_line_parsers = {"Metabolites": _parse_metabolite_lines,
+                 "MetaboliteLinks": _parse_metabolite_xref_lines,
+                 "Reactions": _parse_reaction_lines,
+                 "ReactionLinks": _parse_reaction_xref_lines}
+
+
+def _parse_chunk(key, start, lines):
+    """ Parse a chunk of lines of a MetaNetX file
+
+    Parameters
+    ----------
+    key : str
+        Key of the file in metanetx_files
+    start : int
+        Line number of the first line in the chunk
+    lines : list
+
+    Returns
+    -------
+    list
+    """
+    return _line_parsers[key](start, lines)
+
+
+def _iter_chunks(files, keys, chunk_size):
+    """ Read the files in chunks of lines
+
+    Yields
+    ------
+    key, start, lines, size
+        The size is the number of bytes read for the chunk
+    """
+    for key in keys:
+        with open(files[key], encoding="UTF-8") as open_file:
+            start, position = 0, 0
+            while True:
+                lines = list(islice(open_file, chunk_size))
+                if not lines:
+                    break
+                size = open_file.buffer.tell() - position
+                position += size
+                yield key, start, lines, size
+                start += len(lines)
+
+
+def _iter_parsed_chunks(chunks, processes, context):
+    """ Parse chunks in worker processes
+
+    Chunks are parsed ahead of the insertion by a bounded number
+    of tasks, and the results are returned in order of the input.
+
+    Yields
+    ------
+    key, size, rows
+    """
+
+    if processes <= 1:
+        _init_build_worker(context)
+        for key, start, lines, size in chunks:
+            yield key, size, _parse_chunk(key, start, lines)
+        return
+
+    with ProcessPoolExecutor(processes, initializer=_init_build_worker, initargs=(context,)) as executor:
+        pending = deque()
+        try:
+            for key, start, lines, size in chunks:
+                pending.append((key, size, executor.submit(_parse_chunk, key, start, lines)))
+                if len(pending) > 2 * processes:
+                    key, size, future = pending.popleft()
+                    yield key, size, future.result()
+            while pending:
+                key, size, future = pending.popleft()
+                yield key, size, future.result()
+        finally:
+            for _, _, future in pending:
+                future.cancel()
+
+
+def _log_messages(messages):
+    for level, message in messages:
+        LOGGER.log(level, message)
+
+
+def build_database(conn, files, progress, processes=None, chunk_size=BUILD_CHUNK_SIZE):
+    """ Load the MetaNetX files into the database
+
+    The files are parsed in worker processes while the main process
+    inserts the parsed rows chunk by chunk. Journaling and syncing
+    are disabled during the build as the database is discarded if
+    the build fails. Indices are created at the end.
+
+    The resulting tables are identical to loading the files with
+    load_metabolites, load_metabolites_xref, load_compartments,
+    load_reactions, load_reaction_xrefs and load_reaction_signatures.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+    files : dict
+    progress : GEMEditor.base.classes.ProgressReporter
+    processes : int, optional
+        Number of worker processes, defaults to the number of cpus
+    chunk_size : int
+        Number of lines per parse task
+
+    Returns
+    -------
+    bool
+        False if the build has been canceled, True otherwise
+    """
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    conn.commit()
+    for statement in build_pragmas:
+        conn.execute(statement)
+
+    try:
+        return _build_database(conn, files, progress, processes, chunk_size)
+    finally:
+        conn.commit()
+        for statement in restore_pragmas:
+            conn.execute(statement)
+
+
+def _get_parse_context(conn):
+    """ Get the lookup tables needed by the parse workers """
+    return {"metabolite_prefixes": get_prefix_resource_id_map(conn, type="metabolite"),
+            "metabolite_validators": get_validators(conn, type="metabolite"),
+            "reaction_prefixes": get_prefix_resource_id_map(conn, type="reaction"),
+            "reaction_validators": get_validators(conn, type="reaction"),
+            "ec_validator": re.compile(r"^\d+\.-\.-\.-|\d+\.\d+\.-\.-|\d+\.\d+\.\d+\.-|\d+\.\d+\.\d+\.(n)?\d+$")}
+
+
+def _load_parsed_files(conn, files, progress, processes, chunk_size, compartment_map, get_metabolite_id,
+                       get_reaction_id, prefix=""):
+    """ Insert the rows parsed from the MetaNetX files
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+    files : dict
+    progress : GEMEditor.base.classes.ProgressReporter
+    processes : int
+    chunk_size : int
+    compartment_map : dict
+        Database ids of the compartments by MetaNetX id
+    get_metabolite_id : callable
+        Returns the database id for a MetaNetX metabolite id
+    get_reaction_id : callable
+        Returns the database id for a MetaNetX reaction id and
+        the line based id of the reaction
+    prefix : str
+        Prefix of the tables the rows are inserted into
+
+    Returns
+    -------
+    bool
+        False if the user canceled, True otherwise
+    """
+
+    cursor = conn.cursor()
+    mnx_metabolite_resource_id = get_resource_id(cursor, 'metanetx.chemical')
+    inchi_resource_id = get_resource_id(cursor, 'inchi')
+    mnx_reaction_resource_id = get_resource_id(cursor, 'metanetx.reaction')
+    ec_number_resource_id = get_resource_id(cursor, 'ec-code')
+
+    insert_metabolites = "INSERT INTO {0}metabolites VALUES (?, ?, ?, ?)".format(prefix)
+    insert_metabolite_ids = "INSERT INTO {0}metabolite_ids VALUES (NULL, ?, ?, ?)".format(prefix)
+    insert_metabolite_names = "INSERT INTO {0}metabolite_names VALUES (NULL, ?, ?)".format(prefix)
+    insert_reactions = "INSERT INTO {0}reactions VALUES (?, ?)".format(prefix)
+    insert_reaction_ids = "INSERT INTO {0}reaction_ids VALUES (NULL, ?, ?, ?)".format(prefix)
+    insert_participants = "INSERT INTO {0}reaction_participants VALUES (NULL, ?, ?, ?, ?)".format(prefix)
+
+    keys = ("Metabolites", "MetaboliteLinks", "Reactions", "ReactionLinks")
+    labels = {"Metabolites": "Reading metabolites..",
+              "MetaboliteLinks": "Reading metabolite xrefs..",
+              "Reactions": "Reading reactions..",
+              "ReactionLinks": "Reading reaction xrefs.."}
+    progress.setLabelText(labels[keys[0]])
+    progress.setRange(0, _kilobytes(sum(os.path.getsize(files[key]) for key in keys)))
+
+    metabolite_map = dict()
+    reaction_map = dict()
+    self_references = 0
+    done = 0
+    current = keys[0]
+
+    chunks = _iter_chunks(files, keys, chunk_size)
+    for key, size, rows in _iter_parsed_chunks(chunks, processes, _get_parse_context(conn)):
+
+        if progress.wasCanceled():
+            LOGGER.debug("Loading of the MetaNetX files was aborted by user.")
+            return False
+        elif key != current:
+            current = key
+            progress.setLabelText(labels[key])
+
+        identifier_inserts = []
+
+        if key == "Metabolites":
+            metabolite_inserts, name_inserts = [], []
+            for mnx_id, description, formula, charge, inchi in rows:
+                metabolite_id = get_metabolite_id(mnx_id)
+                metabolite_map[mnx_id] = metabolite_id
+                metabolite_inserts.append((metabolite_id, description, formula, charge))
+                identifier_inserts.append((metabolite_id, mnx_metabolite_resource_id, mnx_id))
+                name_inserts.append((metabolite_id, description))
+                if inchi:
+                    identifier_inserts.append((metabolite_id, inchi_resource_id, inchi))
+
+            cursor.executemany(insert_metabolites, metabolite_inserts)
+            cursor.executemany(insert_metabolite_ids, identifier_inserts)
+            cursor.executemany(insert_metabolite_names, name_inserts)
+
+        elif key == "MetaboliteLinks":
+            name_inserts = []
+            for entry, met_id, identifiers, names, messages in rows:
+                if identifiers is None:
+                    self_references += 1
+                    continue
+
+                try:
+                    database_id = metabolite_map[met_id]
+                except KeyError:
+                    LOGGER.warning("Xref {entry} skipped as no metabolite with ID '{mnx_id}' found in "
+                                   "database".format(entry=entry, mnx_id=met_id))
+                    continue
+
+                _log_messages(messages)
+                identifier_inserts.extend((database_id, resource_id, identifier)
+                                          for resource_id, identifier in identifiers)
+                name_inserts.extend((database_id, name) for name in names)
+
+            cursor.executemany(insert_metabolite_ids, identifier_inserts)
+            cursor.executemany(insert_metabolite_names, name_inserts)
+
+        elif key == "Reactions":
+            reaction_inserts, participant_inserts = [], []
+            for line_id, mnx_id, description, participants, ec_numbers in rows:
+                try:
+                    if description is None:
+                        # Participants contain the parsing error
+                        raise ValueError(participants)
+                    participants = [(metabolite_map[x[1]], x[2], compartment_map[x[3]]) for x in participants]
+                except (KeyError, ValueError) as e:
+                    LOGGER.warning("Reaction '{}' skipped due to a parsing error. {}".format(mnx_id, str(e)))
+                    continue
+
+                reaction_id = get_reaction_id(mnx_id, line_id)
+                reaction_map[mnx_id] = reaction_id
+                reaction_inserts.append((reaction_id, description))
+                participant_inserts.extend((reaction_id,) + x for x in participants)
+                identifier_inserts.append((reaction_id, mnx_reaction_resource_id, mnx_id))
+
+                valid, invalid = ec_numbers
+                identifier_inserts.extend((reaction_id, ec_number_resource_id, x) for x in valid)
+                for x in invalid:
+                    LOGGER.warning("Invalid EC number '{}' not added to reaction with id '{}'.".format(x, str(reaction_id)))
+
+            cursor.executemany(insert_reactions, reaction_inserts)
+            cursor.executemany(insert_reaction_ids, identifier_inserts)
+            cursor.executemany(insert_participants, participant_inserts)
+
+        else:
+            for mnx_id, link, resource_id, identifier in rows:
+                try:
+                    reaction_id = reaction_map[mnx_id]
+                except KeyError:
+                    # Reaction has been excluded in reaction loading
+                    continue
+
+                if identifier is None:
+                    LOGGER.warning("Link '{link}' skipped for {metanetx_id}, does not map to a unique "
+                                   "resource!".format(link=link, metanetx_id=mnx_id))
+                elif resource_id is None:
+                    LOGGER.warning("Identifier {0} has not been added to reactioin '{1}' the database, "
+                                   "as it is invalid!".format(identifier, reaction_id))
+                else:
+                    identifier_inserts.append((reaction_id, resource_id, identifier))
+
+            cursor.executemany(insert_reaction_ids, identifier_inserts)
+
+        done += size
+        progress.setValue(_kilobytes(done))
+
+    cursor.close()
+
+    # MetaNetX lists every metabolite as its own xref, so
+    # logging these individually would flood the log
+    LOGGER.info("Skipped {0!s} metabolite xrefs referencing the metabolite itself.".format(self_references))
+    return True
+
+
+def _build_database(conn, files, progress, processes, chunk_size):
+
+    # Compartments are needed to resolve the reaction equations
+    load_compartments(conn, files, progress)
+    if progress.wasCanceled():
+        return False
+
+    compartment_map = dict(conn.execute("SELECT mnx_id, id FROM compartments"))
+    metabolite_ids = count(1)
+    if not _load_parsed_files(conn, files, progress, processes, chunk_size, compartment_map,
+                              get_metabolite_id=lambda mnx_id: next(metabolite_ids),
+                              get_reaction_id=lambda mnx_id, line_id: line_id):
+        return False
+    conn.commit()
+
+    load_reaction_signatures(conn, progress)
+    load_annotations(conn, progress)
+    create_indices(conn, progress)
+    return not progress.wasCanceled()
+
+
+# Tables changed by update_database. Entries are identified by their
+# id, while the rows of the other tables are identified by all columns
+# but their id.
+_updated_entries = (("compartments", ("mnx_id", "name")),
+                    ("metabolites", ("name", "formula", "charge")),
+                    ("reactions", ("string",)))
+_updated_rows = (("metabolite_ids", ("metabolite_id", "resource_id", "identifier")),
+                 ("metabolite_names", ("metabolite_id", "name")),
+                 ("reaction_ids", ("reaction_id", "resource_id", "identifier")),
+                 ("reaction_participants", ("reaction_id", "metabolite_id", "stoichiometry", "compartment_id")),
+                 ("reaction_signatures", ("reaction_id", "signature")))
+# Tables derived from the updated tables
+_updated_annotations = (("metabolite_annotations", ("annotations",)),
+                        ("reaction_annotations", ("annotations",)))
+
+# The MetaNetX id of an entry is the first MetaNetX identifier
+# added, as the xrefs might contain deprecated MetaNetX ids
+query_mnx_ids = """SELECT identifier, {0}_id 
+FROM {0}_ids 
+WHERE id IN (SELECT MIN(id) FROM {0}_ids WHERE resource_id=? GROUP BY {0}_id);"""
+
+# The largest id given to an entry of the table, which is larger than
+# the ids of all existing entries unless the last entries were deleted
+query_last_id = """SELECT MAX(IFNULL((SELECT last_id FROM main.id_counters WHERE name='{0}'), 0), 
+IFNULL((SELECT MAX(id) FROM main.{0}), 0));"""
+
+update_last_id = """INSERT OR REPLACE INTO main.id_counters (name, last_id) 
+VALUES ('{0}', MAX(?, IFNULL((SELECT MAX(id) FROM main.{0}), 0)));"""
+
+
+def _update_entries(cursor, table, columns):
+    """ Apply the staged entries to a table
+
+    Returns
+    -------
+    tuple
+        Number of inserted, updated and deleted entries
+    """
+
+    staged = "temp.update_{0}".format(table)
+    names = ", ".join(columns)
+    changed = " OR ".join("main.{0}.{1} IS NOT s.{1}".format(table, x) for x in columns)
+
+    deleted = cursor.execute("DELETE FROM main.{0} WHERE id NOT IN (SELECT id FROM {1});".format(table, staged))
+    deleted = deleted.rowcount
+    updated = cursor.execute("UPDATE main.{0} SET ({2}) = (SELECT {2} FROM {1} s WHERE s.id = main.{0}.id) "
+                             "WHERE EXISTS (SELECT 1 FROM {1} s WHERE s.id = main.{0}.id AND ({3}));".format(
+                                 table, staged, names, changed)).rowcount
+    inserted = cursor.execute("INSERT INTO main.{0} (id, {2}) SELECT id, {2} FROM {1} "
+                              "WHERE id NOT IN (SELECT id FROM main.{0});".format(table, staged, names)).rowcount
+    return inserted, updated, deleted
+
+
+def _update_rows(cursor, table, columns):
+    """ Apply the staged rows to a table
+
+    Rows are inserted in the order they have been staged, so that
+    the MetaNetX id of a new entry is its first MetaNetX identifier.
+
+    Returns
+    -------
+    tuple
+        Number of inserted, updated and deleted rows
+    """
+
+    staged = "temp.update_{0}".format(table)
+    names = ", ".join(columns)
+    staged_row = " AND ".join("s.{1} = main.{0}.{1}".format(table, x) for x in columns)
+    new_row = " AND ".join("s.{0} = n.{0}".format(x) for x in columns)
+
+    cursor.execute("CREATE INDEX temp.idx_update_{0} ON update_{0} ({1});".format(table, names))
+    deleted = cursor.execute("DELETE FROM main.{0} WHERE NOT EXISTS (SELECT 1 FROM {1} s WHERE {2});".format(
+        table, staged, staged_row)).rowcount
+    inserted = cursor.execute("INSERT INTO main.{0} ({2}) SELECT {4} FROM "
+                              "(SELECT {2} FROM {1} EXCEPT SELECT {2} FROM main.{0}) n JOIN {1} s ON {3} "
+                              "GROUP BY {4} ORDER BY MIN(s.rowid);".format(
+                                  table, staged, names, new_row, ", ".join("n." + x for x in columns))).rowcount
+    return inserted, 0, deleted
+
+
+def update_database(conn, files, progress, processes=None, chunk_size=BUILD_CHUNK_SIZE):
+    """ Update an existing database from new MetaNetX files
+
+    Compartments, metabolites and reactions are matched to the
+    existing entries by their MetaNetX id. Matched entries keep
+    their database id, so that mappings stored with store_mapping
+    remain valid, new entries get ids larger than any id given
+    before and entries no longer in MetaNetX are deleted. Only the rows
+    that differ from the new files are inserted, updated or deleted
+    in a single transaction, which is rolled back if the update
+    fails or is canceled.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+    files : dict
+    progress : GEMEditor.base.classes.ProgressReporter
+    processes : int, optional
+        Number of worker processes, defaults to the number of cpus
+    chunk_size : int
+        Number of lines per parse task
+
+    Returns
+    -------
+    bool
+        False if the update has been canceled, True otherwise
+    """
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    conn.commit()
+    cursor = conn.cursor()
+
+    # Databases from before the reaction signatures and packed annotations lack the tables
+    cursor.execute("CREATE TABLE IF NOT EXISTS reaction_signatures (id INTEGER PRIMARY KEY, "
+                   "reaction_id INTEGER REFERENCES reactions (id), signature INTEGER);")
+    for entry_type in ("metabolite", "reaction"):
+        cursor.execute("CREATE TABLE IF NOT EXISTS {0}_annotations (id INTEGER PRIMARY KEY "
+                       "REFERENCES {0}s (id), annotations BLOB);".format(entry_type))
+    cursor.execute("CREATE TABLE IF NOT EXISTS id_counters (name VARCHAR PRIMARY KEY, last_id INTEGER);")
+
+    tables = [x[0] for x in _updated_entries + _updated_rows + _updated_annotations]
+    for table in tables:
+        cursor.execute("CREATE TEMP TABLE update_{0} AS SELECT * FROM main.{0} WHERE 0;".format(table))
+
+    try:
+        updated = _update_database(conn, files, progress, processes, chunk_size)
+    except Exception:
+        conn.rollback()
+        raise
+    else:
+        if updated:
+            conn.commit()
+        else:
+            conn.rollback()
+    finally:
+        for table in tables:
+            cursor.execute("DROP TABLE IF EXISTS temp.update_{0};".format(table))
+        cursor.close()
+
+    return updated
+
+
+def _update_database(conn, files, progress, processes, chunk_size):
+    cursor = conn.cursor()
+
+    # Ids of deleted entries are never given to new entries, as
+    # stored mappings might still reference the deleted entries
+    last_ids = dict((table, cursor.execute(query_last_id.format(table)).fetchone()[0])
+                    for table, _ in _updated_entries)
+
+    # Compartments
+    compartment_ids = dict(cursor.execute("SELECT mnx_id, id FROM main.compartments"))
+    new_ids = count(last_ids["compartments"] + 1)
+    compartment_map = dict()
+    with open(files["Compartments"], encoding="UTF-8") as open_file:
+        for line in open_file:
+            if line.startswith("#"):
+                continue
+            mnx_id, description, source = [x.strip() for x in line.split("\t")]
+            compartment_map[mnx_id] = compartment_ids[mnx_id] if mnx_id in compartment_ids else next(new_ids)
+            cursor.execute("INSERT INTO temp.update_compartments VALUES (?, ?, ?)",
+                           (compartment_map[mnx_id], mnx_id, description))
+
+    # Metabolites and reactions
+    metabolite_ids = dict(cursor.execute(query_mnx_ids.format("metabolite"),
+                                         (get_resource_id(cursor, 'metanetx.chemical'),)))
+    reaction_ids = dict(cursor.execute(query_mnx_ids.format("reaction"),
+                                       (get_resource_id(cursor, 'metanetx.reaction'),)))
+    new_metabolite_ids = count(last_ids["metabolites"] + 1)
+    new_reaction_ids = count(last_ids["reactions"] + 1)
+
+    def get_metabolite_id(mnx_id):
+        return metabolite_ids[mnx_id] if mnx_id in metabolite_ids else next(new_metabolite_ids)
+
+    def get_reaction_id(mnx_id, line_id):
+        return reaction_ids[mnx_id] if mnx_id in reaction_ids else next(new_reaction_ids)
+
+    if not _load_parsed_files(conn, files, progress, processes, chunk_size, compartment_map,
+                              get_metabolite_id, get_reaction_id, prefix="temp.update_"):
+        return False
+
+    # Apply the differences
+    progress.setLabelText("Applying changes..")
+    progress.setRange(0, len(_updated_entries) + len(_updated_rows))
+
+    for table, _ in _updated_entries:
+        cursor.execute("CREATE INDEX temp.idx_update_{0} ON update_{0} (id);".format(table))
+
+    steps = [(_update_rows, x) for x in _updated_rows[:-1]] + [(_update_entries, x) for x in _updated_entries]
+    for i, (function, (table, columns)) in enumerate(steps):
+        if progress.wasCanceled():
+            return False
+        progress.setValue(i)
+        LOGGER.info("{0}: {1} inserted, {2} updated, {3} deleted".format(table, *function(cursor, table, columns)))
+
+    for table, last_id in last_ids.items():
+        cursor.execute(update_last_id.format(table), (last_id,))
+
+    # The signatures depend on the updated participants
+    cursor.executemany("INSERT INTO temp.update_reaction_signatures VALUES (NULL, ?, ?)",
+                       iter_reaction_signatures(conn.cursor(), get_proton_ids(cursor)))
+    table, columns = _updated_rows[-1]
+    LOGGER.info("{0}: {1} inserted, {2} updated, {3} deleted".format(table, *_update_rows(cursor, table, columns)))
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_reaction_signature ON reaction_signatures (signature);")
+
+    # The packed annotations depend on the updated identifiers
+    for table, columns in _updated_annotations:
+        cursor.executemany("INSERT INTO temp.update_{0} VALUES (?, ?)".format(table),
+                           iter_annotation_blobs(conn.cursor(), table.split("_")[0]))
+        cursor.execute("CREATE INDEX temp.idx_update_{0} ON update_{0} (id);".format(table))
+        LOGGER.info("{0}: {1} inserted, {2} updated, {3} deleted".format(table, *_update_entries(cursor, table,
+                                                                                                 columns)))
+
+    # The name search index does not follow changes of the names
+    for entry_type in ("metabolite", "reaction"):
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_{0}_names_nocase ON {0}_names (name COLLATE NOCASE);".format(
+            entry_type))
+        cursor.execute(create_names_search.format(entry_type))
+        cursor.execute(rebuild_names_search.format(entry_type))
+
+    progress.setValue(len(steps) + 1)
+    cursor.close()
+    return not progress.wasCanceled()
+
+
 def create_database_de_novo(parent, database_path):
     """ Setup a new database from the MetaNetX files
     
@@ -965,6 +1832,9 @@ def create_database_de_novo(parent, database_path):
 
     """
 
+    # Release the pooled connections to the old database
+    connection_pool.invalidate()
+
     # Generate an empty database
     if not setup_empty_database(database_path):
         return
@@ -981,16 +1851,12 @@ def create_database_de_novo(parent, database_path):
         return
 
     # Setup progress dialog
-    progress = QProgressDialog()
-    progress.setAutoClose(0)
-    progress.setWindowTitle("Setting up tables..")
+    dialog = QProgressDialog()
+    dialog.setAutoClose(0)
+    dialog.setWindowTitle("Setting up tables..")
+    progress = ProgressReporter(dialog)
 
-    load_metabolites(connection, files, progress)
-    load_metabolites_xref(connection, files, progress)
-    load_compartments(connection, files, progress)
-    load_reactions(connection, files, progress)
-    load_reaction_xrefs(connection, files, progress)
-    create_indices(connection, progress)
+    build_database(connection, files, progress)
 
     # Cleanup files
     connection.close()
@@ -1008,9 +1874,56 @@ def create_database_de_novo(parent, database_path):
     return True
 
 
-def get_database_connection():
+def update_database_from_metanetx(parent):
+    """ Update the existing database from the latest MetaNetX files
+
+    Parameters
+    ----------
+    parent: GEMEditor.main.MainWindow
+
+    Returns
+    -------
+    True or None
+    """
+
+    # Download files
+    files = download_metanetx_files(parent)
+    if not files:
+        return
+
+    connection = get_database_connection()
+    if connection is None:
+        cleanup_files(files)
+        return
+
+    # Setup progress dialog
+    dialog = QProgressDialog()
+    dialog.setAutoClose(0)
+    dialog.setWindowTitle("Updating tables..")
+    progress = ProgressReporter(dialog)
+
+    # Pooled connections do not notice the changes
+    connection_pool.invalidate()
+    try:
+        result = update_database(connection, files, progress)
+    finally:
+        connection.close()
+        connection_pool.invalidate()
+        cleanup_files(files)
+        progress.close()
+
+    return result or None
+
+
+def get_database_connection(read_only=False):
     """ Get a connection to the MetaNetX database
 
+    Parameters
+    ----------
+    read_only: bool
+        Get the shared read-only connection from the connection
+        pool, which must not be closed by the caller
+
     Returns
     -------
     sqlite3.Connection or None
@@ -1018,10 +1931,12 @@ def get_database_connection():
     # Get database path
     database_path = DatabaseWrapper.get_database_path()
 
-    if os.path.isfile(database_path):
-        return sqlite3.connect(database_path)
-    else:
+    if not os.path.isfile(database_path):
         return None
+    elif read_only:
+        return connection_pool.connection(database_path)
+    else:
+        return sqlite3.connect(database_path)
 
 
 def database_exists(parent=None, create_otherwise=True):
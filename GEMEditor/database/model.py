@@ -5,10 +5,11 @@ from collections import defaultdict
 from PyQt5.QtWidgets import QMessageBox, QApplication, QProgressDialog
 from PyQt5 import QtSql
 from GEMEditor.database.create import get_database_connection
-from GEMEditor.database.base import DatabaseWrapper
+from GEMEditor.database.base import DatabaseWrapper, reaction_signature
 from GEMEditor.database.match import ManualMatchDialog
 from GEMEditor.database.query import AnnotationSettingsDialog
 from GEMEditor import formula_validator
+from GEMEditor.base.classes import ProgressReporter
 from GEMEditor.base.functions import unpack
 from cobra import Metabolite
 
@@ -16,56 +17,6 @@ from cobra import Metabolite
 LOGGER = logging.getLogger(__name__)
 
 
-def map_by_annotation(database, item):
-    """ Map model item by annotation
-
-    Parameters
-    ----------
-    database:   DatabaseWrapper
-    item:       GEMEditor.model.classes.cobra.Metabolite or
-                GEMEditor.model.classes.cobra.Reaction
-
-    Returns
-    -------
-    entries
-    """
-
-    entries = set()
-    for annotation in item.annotation:
-        ids = database.get_ids_from_annotation(annotation.identifier,
-                                               annotation.collection)
-        entries.update(ids)
-    return entries
-
-
-def get_reactions_with_same_signature(database, entries, signature, ignored_ids):
-    """ Get reactions from database that match signature
-
-    Parameters
-    ----------
-    database: DatabaseWrapper
-    entries: set, Containing the reaction ids to check for same signature
-    signature: set, Containing metabolite entry ids of the metabolites in the reaction
-    ignored_ids: set, Containing the metabolite entry ids to be ignored e.g. proton
-
-    Returns
-    -------
-    set
-    """
-    matches = set()
-
-    for reaction_id in entries:
-        participants = database.get_reaction_participants_from_id(reaction_id)
-
-        reaction_signature = set([row["metabolite_id"] for row in participants if
-                                  row["metabolite_id"] not in ignored_ids])
-
-        if reaction_signature == signature:
-            matches.add(reaction_id)
-
-    return matches
-
-
 def check_ambiguous_mappings(model, parent):
     """ Allow user to manually map ambiguously mapped metabolites
 
@@ -98,6 +49,11 @@ def check_ambiguous_mappings(model, parent):
 def update_metabolite_database_mapping(database, model, progress):
     """ Map all metabolites to database entries
 
+    Metabolites are mapped by annotation, metabolites without
+    matching annotation by name and the remaining ones by formula.
+    Every step is resolved for all metabolites in a single batched
+    query instead of one query per metabolite.
+
     Parameters
     ----------
     database: DatabaseWrapper
@@ -112,44 +68,48 @@ def update_metabolite_database_mapping(database, model, progress):
     LOGGER.debug("Updating metabolite to database mapping..")
 
     # Update progress dialog
+    progress = ProgressReporter.wrap(progress)
     progress.setLabelText("Mapping metabolites to database..")
-    progress.setRange(0, len(model.metabolites))
-
-    # Run the annotation
-    for i, metabolite in enumerate(model.metabolites):
-        if progress.wasCanceled() or metabolite in model.database_mapping:
-            LOGGER.debug("Metabolite {0!s} skipped - Already mapped or progress cancelled.".format(metabolite))
-            continue
-
-        # Update progress if not cancelled
-        progress.setValue(i)
-        QApplication.processEvents()
+    progress.setRange(0, 3)
 
-        # Database entries that the metabolite maps to
-        entries = set()
+    # Skip metabolites that have been mapped before
+    unmapped = [x for x in model.metabolites if x not in model.database_mapping]
+    entries = dict((x, set()) for x in unmapped)
 
-        # Find matches from annotations
+    # Find matches from annotations
+    annotation_map = database.get_ids_from_annotations((a for x in unmapped for a in x.annotation), "Metabolite")
+    for metabolite in unmapped:
         for annotation in metabolite.annotation:
-            entries.update(database.get_ids_from_annotation(identifier=annotation.identifier,
-                                                            collection=annotation.collection))
-
-        # Metabolite has not been matched by annotation
-        if not entries and metabolite.name:
-            entries.update(database.get_ids_from_name(name=metabolite.name,
-                                                      entry_type="Metabolite"))
+            entries[metabolite].update(annotation_map.get((annotation.collection, annotation.identifier), ()))
 
-        # Find matches by formula
-        if not entries and metabolite.formula:
-            entries.update(database.get_ids_from_formula(formula=metabolite.formula))
-
-        # Add found entries to mapping
-        if entries:
-            model.database_mapping[metabolite] = unpack(entries, list)
+    # Metabolites that have not been matched by annotation
+    if progress.wasCanceled():
+        return
+    progress.setValue(1)
+    by_name = [x for x in unmapped if not entries[x] and x.name]
+    name_map = database.get_ids_from_names((x.name for x in by_name), "Metabolite")
+    for metabolite in by_name:
+        entries[metabolite].update(name_map.get(str(metabolite.name), ()))
+
+    # Find matches by formula
+    if progress.wasCanceled():
+        return
+    progress.setValue(2)
+    by_formula = [x for x in unmapped if not entries[x] and x.formula]
+    formula_map = database.get_ids_from_formulas(x.formula for x in by_formula)
+    for metabolite in by_formula:
+        entries[metabolite].update(formula_map.get(str(metabolite.formula), ()))
+
+    # Add found entries to mapping
+    for metabolite in unmapped:
+        if entries[metabolite]:
+            model.database_mapping[metabolite] = unpack(entries[metabolite], list)
         else:
             model.database_mapping[metabolite] = None
 
         LOGGER.debug("Metabolite {0!s} mapped to {1!s}".format(metabolite,
                                                                model.database_mapping[metabolite]))
+    progress.setValue(3)
 
 
 def update_reaction_database_mapping(database, model, progress):
@@ -159,6 +119,9 @@ def update_reaction_database_mapping(database, model, progress):
     2)  Refine annotation mapping or do initial mapping
         by stoichiometry
 
+    The annotations and the signatures of all reactions
+    are looked up in the database in batched queries.
+
     Parameters
     ----------
     model: GEMEditor.model.classes.cobra.Model
@@ -175,33 +138,47 @@ def update_reaction_database_mapping(database, model, progress):
     mapping = model.database_mapping
 
     # Ignore protons when matching reactions
-    proton_entries = set()
-    for mnx_id in ("MNXM01", "MNXM1"):
-        ids = database.get_ids_from_annotation(identifier=mnx_id,
-                                               collection="metanetx.chemical")
-        proton_entries.update(ids)
+    proton_entries = database.get_proton_ids()
+
+    # Reactions to map
+    reactions = []
+    for reaction in model.reactions:
+        if reaction.boundary:
+            LOGGER.debug("Skip boundary reaction {0!s}".format(reaction.id))
+        elif reaction in mapping:
+            LOGGER.debug("Skip already mapped reaction {0!s}".format(reaction.id))
+        else:
+            reactions.append(reaction)
 
     # Update progress
+    progress = ProgressReporter.wrap(progress)
     progress.setLabelText("Mapping reactions..")
-    progress.setRange(0, len(model.reactions))
+    progress.setRange(0, len(reactions))
+
+    # Signatures of the reactions where all metabolites are mapped
+    signatures = {}
+    for reaction in reactions:
+        if all(m in mapping and isinstance(mapping[m], int) for m in reaction.metabolites):
+            clean_signature = set(mapping[m] for m in reaction.metabolites) - proton_entries
+            if clean_signature:
+                signatures[reaction] = reaction_signature(clean_signature)
+
+    # Lookup annotations and signatures
+    annotation_map = database.get_ids_from_annotations((a for x in reactions for a in x.annotation), "Reaction")
+    signature_map = database.get_ids_from_signatures(signatures.values())
 
     # Match reactions
-    for i, reaction in enumerate(model.reactions):
+    for i, reaction in enumerate(reactions):
         if progress.wasCanceled():
             return
-        elif reaction.boundary:
-            LOGGER.debug("Skip boundary reaction {0!s}".format(reaction.id))
-            continue
-        elif reaction in mapping:
-            LOGGER.debug("Skip already mapped reaction {0!s}".format(reaction.id))
-            continue
         else:
             LOGGER.debug("Mapping reaction reaction {0!s}".format(reaction.id))
             progress.setValue(i)
-            QApplication.processEvents()
 
         # First try to map by annotation
-        entries_by_annotation = map_by_annotation(database, reaction)
+        entries_by_annotation = set()
+        for annotation in reaction.annotation:
+            entries_by_annotation.update(annotation_map.get((annotation.collection, annotation.identifier), ()))
 
         # Directly map if unique
         if len(entries_by_annotation) == 1:
@@ -210,9 +187,7 @@ def update_reaction_database_mapping(database, model, progress):
             continue
 
         # Check if all metabolites are mapped
-        all_mapped = all(m in mapping and isinstance(mapping[m], int) for m in reaction.metabolites)
-
-        if not all_mapped:
+        if reaction not in signatures:
             if entries_by_annotation:
                 mapping[reaction] = unpack(entries_by_annotation, list)
                 LOGGER.debug("Mapped to {0!s} by annotation".format(mapping[reaction]))
@@ -220,16 +195,8 @@ def update_reaction_database_mapping(database, model, progress):
                 LOGGER.debug("No match found by annotation and stoichiometry")
             continue
 
-        # Store expected metabolite ids
-        metabolite_mapping = set(mapping[m] for m in reaction.metabolites)
-
-        # Remove proton entries
-        clean_signature = metabolite_mapping - proton_entries
-
         # Get reaction database entries that match the signature
-        common_ids = database.get_reaction_id_from_participant_ids(clean_signature)
-        entries_by_signature = get_reactions_with_same_signature(database, common_ids,
-                                                                 clean_signature, proton_entries)
+        entries_by_signature = set(signature_map.get(signatures[reaction], ()))
 
         # Find entries that match metabolites and annotations
         overlap = entries_by_signature.intersection(entries_by_annotation)
@@ -312,6 +279,12 @@ def run_auto_annotation(database, model, progress, parent):
     model.gem_update_metabolites(updates["metabolite_attributes"], progress)
     model.gem_update_reactions(updates["reaction_attributes"], progress)
 
+    # Annotations are not shown in the tables
+    if updates["metabolite_annotations"] or updates["metabolite_attributes"]:
+        model.mark_sections_dirty("metabolites")
+    if updates["reaction_annotations"] or updates["reaction_attributes"]:
+        model.mark_sections_dirty("reactions")
+
     return updates
 
 
@@ -331,7 +304,7 @@ def run_check_consistency(model, parent):
     errors = []
 
     # Check if database could be opened without errors
-    connection = get_database_connection()
+    connection = get_database_connection(read_only=True)
     if not connection:
         QMessageBox().critical(None, "Database error", "The database has not been found. Please set it up first!")
         return
@@ -350,10 +323,10 @@ def run_check_consistency(model, parent):
     cursor.execute("SELECT id, miriam_collection FROM resources;")
     resource_map = dict((result[1], result[0]) for result in cursor.fetchall())
 
+    progress = ProgressReporter.wrap(progress)
     progress.setRange(0, len(model.metabolites))
     for i, metabolite in enumerate(model.metabolites):
         progress.setValue(i)
-        QApplication.processEvents()
 
         mapped_items = defaultdict(set)
         for annotation in metabolite.annotation:
@@ -395,7 +368,6 @@ def run_check_consistency(model, parent):
 
     # Clean up
     cursor.close()
-    connection.close()
     progress.close()
 
     return errors
@@ -420,6 +392,7 @@ def update_reactions_from_database(model, progress):
     dict
     """
 
+    progress = ProgressReporter.wrap(progress)
     progress.setLabelText("Updating reactions..")
     progress.setRange(0, len(model.reactions))
 
@@ -428,9 +401,13 @@ def update_reactions_from_database(model, progress):
     updates = {"reaction_annotations": set(),
                "reaction_attributes": set()}
 
+    # Retrieve the annotations of all mapped reactions at once
+    annotation_map = database.get_annotations_from_ids((model.database_mapping[x] for x in model.reactions
+                                                        if isinstance(model.database_mapping.get(x), int)),
+                                                       "reaction")
+
     for i, reaction in enumerate(model.reactions):
         progress.setValue(i)
-        QApplication.processEvents()
 
         # Check requirements
         if reaction not in model.database_mapping:
@@ -440,8 +417,7 @@ def update_reactions_from_database(model, progress):
         else:
             entry_id = model.database_mapping[reaction]
 
-        database_annotations = database.get_annotations_from_id(identifier=entry_id,
-                                                                entry_type="reaction")
+        database_annotations = annotation_map.get(entry_id, [])
 
         new_annotations = set(database_annotations) - reaction.annotation
         if new_annotations:
@@ -471,6 +447,7 @@ def update_metabolites_from_database(model, progress, update_names=False, update
     LOGGER.debug("Updating metabolites from database..")
 
     # Update progress dialog
+    progress = ProgressReporter.wrap(progress)
     progress.setLabelText("Updating metabolites..")
     progress.setRange(0, len(model.metabolites))
 
@@ -480,13 +457,17 @@ def update_metabolites_from_database(model, progress, update_names=False, update
 
     with DatabaseWrapper() as database:
 
+        # Retrieve the annotations of all mapped metabolites at once
+        annotation_map = database.get_annotations_from_ids((model.database_mapping[x] for x in model.metabolites
+                                                            if isinstance(model.database_mapping.get(x), int)),
+                                                           "metabolite")
+
         # Run annotation
         for i, metabolite in enumerate(model.metabolites):
             if progress.wasCanceled():
                 break
             else:
                 progress.setValue(i)
-            QApplication.processEvents()
 
             # Get database id from mapping
             entry_id = model.database_mapping[metabolite]
@@ -496,8 +477,7 @@ def update_metabolites_from_database(model, progress, update_names=False, update
                 continue
 
             # Update annotations from database
-            annotations = set(database.get_annotations_from_id(entry_id,
-                                                               "Metabolite"))
+            annotations = set(annotation_map.get(entry_id, []))
             if annotations - metabolite.annotation:
                 # There are new annotations
                 metabolite.annotation.update(annotations)
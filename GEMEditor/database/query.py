@@ -186,7 +186,7 @@ class DatabaseSettingWidget(QWidget, Ui_ItemSettingWidget):
     def update_resource_state(self):
         checkbox = self.sender()
         resource_id = self.widget_resource_mapping[checkbox]
-        with DatabaseWrapper() as database:
+        with DatabaseWrapper(read_only=False) as database:
             database.update_use_resource(resource_id, checkbox.isChecked())
 
 
@@ -289,7 +289,7 @@ class DatabaseSearchWidget(QWidget, Ui_DatabaseSearchWidget):
     # Signal to be emitted when user selection changes
     signal_current_selection = QtCore.pyqtSignal(int)
 
-    def __init__(self, queries, headers, parent=None):
+    def __init__(self, queries, headers, parent=None, entry_type=None):
         super(DatabaseSearchWidget, self).__init__(parent)
         self.setupUi(self)
 
@@ -297,6 +297,10 @@ class DatabaseSearchWidget(QWidget, Ui_DatabaseSearchWidget):
         self.database = pyqt_database_connection()
         self.database.open()
 
+        # Connection used for the full text search on names
+        self.entry_type = entry_type
+        self.names_database = None
+
         self.databaseModel = QSqlQueryModel(self)
         self.dataView_search_results.setModel(self.databaseModel)
 
@@ -326,11 +330,38 @@ class DatabaseSearchWidget(QWidget, Ui_DatabaseSearchWidget):
         """
         LOGGER.debug("Updating search query..")
         query = self.queries[self.combo_search_options.currentText()]
-        # Todo: Slow query setting freezes ui
-        self.databaseModel.setQuery(query.format(input=self.lineEdit_search_input.text().strip()))
+        text = self.lineEdit_search_input.text().strip()
+        if "{hits}" in query:
+            query = query.format(hits=self.name_search_hits(text))
+        else:
+            query = query.format(input=text)
+        self.databaseModel.setQuery(query, self.database)
         LOGGER.debug(str(self.databaseModel.query().executedQuery()))
         LOGGER.debug("Search complete.")
 
+    def name_search_hits(self, text):
+        """ Search the database entries by name
+
+        Parameters
+        ----------
+        text: str
+
+        Returns
+        -------
+        str
+            SQL values of the database id and rank of the matching
+            entries, which are inserted into the queries by name
+        """
+        try:
+            if self.names_database is None:
+                self.names_database = DatabaseWrapper()
+        except FileNotFoundError:
+            LOGGER.debug("Database file not found.")
+            return "(NULL, NULL)"
+
+        entry_ids = self.names_database.search_names(text, self.entry_type)
+        return ", ".join("({0:d}, {1:d})".format(x, i) for i, x in enumerate(entry_ids)) or "(NULL, NULL)"
+
     def selected_id(self):
         """ Return the id of the currently selected item
 
@@ -410,11 +441,10 @@ def factory_search_widget(data_type, parent=None):
 
     if data_type.lower() == "metabolite":
         queries = OrderedDict([
-            ("by name", "SELECT metabolites.id, metabolites.name, metabolites.formula, metabolites.charge "
-                       "FROM metabolite_names JOIN metabolites "
-                       "ON metabolite_names.metabolite_id = metabolites.id "
-                       "WHERE metabolite_names.name LIKE '%{input}%' "
-                       "GROUP BY metabolite_names.metabolite_id;"),
+            ("by name", "WITH hits (id, rank) AS (VALUES {hits}) "
+                       "SELECT metabolites.id, metabolites.name, metabolites.formula, metabolites.charge "
+                       "FROM hits JOIN metabolites ON metabolites.id = hits.id "
+                       "ORDER BY hits.rank;"),
             ("by identifier", "SELECT metabolites.id, metabolites.name, metabolites.formula, metabolites.charge "
                              "FROM metabolite_ids JOIN metabolites "
                              "ON metabolite_ids.metabolite_id = metabolites.id "
@@ -422,14 +452,14 @@ def factory_search_widget(data_type, parent=None):
                              "GROUP BY metabolites.id;")
         ])
 
-        return DatabaseSearchWidget(queries=queries, headers=["ID", "Name", "Formula", "Charge"], parent=parent)
+        return DatabaseSearchWidget(queries=queries, headers=["ID", "Name", "Formula", "Charge"], parent=parent,
+                                    entry_type="metabolite")
     elif data_type.lower() == "reaction":
         queries = OrderedDict([
-            ("by name", "SELECT reactions.id, reactions.string "
-                       "FROM reaction_names JOIN reactions "
-                       "ON reaction_names.reaction_id = reactions.id "
-                       "WHERE reaction_names.name LIKE '%{input}%' "
-                       "GROUP BY reaction_names.reaction_id;"),
+            ("by name", "WITH hits (id, rank) AS (VALUES {hits}) "
+                       "SELECT reactions.id, reactions.string "
+                       "FROM hits JOIN reactions ON reactions.id = hits.id "
+                       "ORDER BY hits.rank;"),
             ("by identifier", "SELECT reactions.id, reactions.string "
                              "FROM reaction_ids JOIN reactions "
                              "ON reaction_ids.reaction_id = reactions.id "
@@ -441,7 +471,8 @@ def factory_search_widget(data_type, parent=None):
             #                              "WHERE identifier = '{input}'));")
         ])
 
-        return DatabaseSearchWidget(queries=queries, headers=["ID", "Formula"], parent=parent)
+        return DatabaseSearchWidget(queries=queries, headers=["ID", "Formula"], parent=parent,
+                                    entry_type="reaction")
     else:
         raise ValueError("Unknown input_type {0!s}".format(data_type))
 
@@ -3,7 +3,7 @@ import os.path
 from PyQt5.QtWidgets import QMessageBox, QDialogButtonBox
 from GEMEditor.database import miriam_databases
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import create_engine, Column, String, Integer, Float, ForeignKey, Boolean
+from sqlalchemy import create_engine, Column, String, Integer, Float, ForeignKey, Boolean, LargeBinary
 from sqlalchemy.orm import sessionmaker
 
 
@@ -59,6 +59,14 @@ class MetaboliteId(Base):
     identifier = Column(String)
 
 
+class MetaboliteAnnotations(Base):
+    __tablename__ = "metabolite_annotations"
+
+    # Packed metabolite_ids of the metabolite with the same id
+    id = Column(Integer, ForeignKey("metabolites.id"), primary_key=True)
+    annotations = Column(LargeBinary)
+
+
 class Reaction(Base):
     __tablename__ = "reactions"
 
@@ -83,6 +91,14 @@ class ReactionId(Base):
     identifier = Column(String)
 
 
+class ReactionAnnotations(Base):
+    __tablename__ = "reaction_annotations"
+
+    # Packed reaction_ids of the reaction with the same id
+    id = Column(Integer, ForeignKey("reactions.id"), primary_key=True)
+    annotations = Column(LargeBinary)
+
+
 class ReactionMember(Base):
     __tablename__ = "reaction_participants"
 
@@ -93,6 +109,23 @@ class ReactionMember(Base):
     compartment_id = Column(Integer, ForeignKey("compartments.id"))
 
 
+class ReactionSignature(Base):
+    __tablename__ = "reaction_signatures"
+
+    id = Column(Integer, primary_key=True)
+    reaction_id = Column(Integer, ForeignKey("reactions.id"))
+    signature = Column(Integer)
+
+
+class IdCounter(Base):
+    __tablename__ = "id_counters"
+
+    # Largest id ever given to an entry of the table
+    # so that ids of deleted entries are not reused
+    name = Column(String, primary_key=True)
+    last_id = Column(Integer)
+
+
 class Pathway(Base):
     __tablename__ = "pathways"
 
@@ -1,7 +1,22 @@
+import os
+import shutil
+import sqlite3
+import threading
 import pytest
-from GEMEditor.database.base import DatabaseWrapper
+from GEMEditor.database.base import DatabaseWrapper, reaction_signature, substring_distance, split_term, \
+    ConnectionPool, connection_pool, database_uri, pyqt_database_connection, LookupCache, lookup_cache, \
+    pack_annotations, unpack_annotations, iter_annotation_blobs
 from GEMEditor.model.classes.annotation import Annotation
 from GEMEditor.database.test.fixtures import database
+from PyQt5.QtSql import QSqlQuery
+from PyQt5.QtWidgets import QApplication
+
+# Make sure to only start an application
+# if there is no active one. Opening multiple
+# applications will lead to a crash.
+app = QApplication.instance()
+if app is None:
+    app = QApplication([])
 
 
 class TestDatabaseWrapper:
@@ -42,6 +57,34 @@ class TestDatabaseWrapper:
         with pytest.raises(ValueError):
             database.get_annotations_from_id(1, "pathway")
 
+    def test_get_annotations_from_ids(self, database, tmpdir):
+        expected = dict((x, database.get_annotations_from_id(x, "metabolite", get_all=True)) for x in range(1, 6))
+        assert database.get_annotations_from_ids([1, 2, 3, 4, 5, 99], "metabolite", get_all=True) == expected
+        assert database.get_annotations_from_ids([1], "reaction", get_all=True) == \
+            {1: database.get_annotations_from_id(1, "reaction", get_all=True)}
+
+        # Packed annotations
+        path = str(tmpdir.join("packed.db"))
+        shutil.copy(database.database_path, path)
+        connection = sqlite3.connect(path)
+        connection.executemany("INSERT INTO metabolite_annotations VALUES (?, ?)",
+                               iter_annotation_blobs(connection.cursor(), "metabolite"))
+        connection.commit()
+        connection.close()
+
+        with DatabaseWrapper(path) as packed:
+            # Dense and sparse ids
+            assert packed.get_annotations_from_ids([1, 2, 3, 4, 5], "metabolite", get_all=True) == expected
+            assert packed.get_annotations_from_ids([5, 1000], "Metabolite", get_all=True) == {5: expected[5]}
+            assert packed.get_annotations_from_ids([], "metabolite") == {}
+            with pytest.raises(ValueError):
+                packed.get_annotations_from_ids([1], "pathway")
+
+    def test_pack_annotations(self):
+        rows = [(1, "MNXM1"), (12, "CHEBI:1\u00e4")]
+        assert unpack_annotations(pack_annotations(rows)) == rows
+        assert unpack_annotations(pack_annotations([])) == []
+
     def test_get_ids_from_annotation(self, database):
         result = database.get_ids_from_annotation(identifier="MNXM2",
                                                   collection="metanetx.chemical")
@@ -79,6 +122,75 @@ class TestDatabaseWrapper:
         result = database.get_ids_from_formula("C5")
         assert result == []
 
+    def test_get_ids_from_annotations(self, database):
+        annotations = [Annotation("metanetx.chemical", "MNXM2"), Annotation("metanetx.chemical", "MNXM01"),
+                       Annotation("metanetx.chemical", "MNXM1"), Annotation("metanetx.chemical", "MNXM2000"),
+                       Annotation("metanetx.reaction", "MNXR14892"), Annotation("unknown", "MNXM2")]
+        result = database.get_ids_from_annotations(annotations, "metabolite")
+        assert result == {("metanetx.chemical", "MNXM2"): {1},
+                          ("metanetx.chemical", "MNXM01"): {5},
+                          ("metanetx.chemical", "MNXM1"): {5}}
+
+        result = database.get_ids_from_annotations(annotations, "reaCtion")
+        assert result == {("metanetx.reaction", "MNXR14892"): {1}}
+
+        assert database.get_ids_from_annotations([], "metabolite") == {}
+        with pytest.raises(ValueError):
+            database.get_ids_from_annotations(annotations, "pathway")
+
+    def test_get_ids_from_names(self, database):
+        result = database.get_ids_from_names(["Water", "phosphate", "ater", ""], "metabolite")
+        assert result == {"Water": {1}, "phosphate": {3}}
+
+        result = database.get_ids_from_names(["Glucose-6-Phosphatase"], "reaction")
+        assert result == {"Glucose-6-Phosphatase": {1}}
+
+    def test_get_ids_from_formulas(self, database):
+        result = database.get_ids_from_formulas(["H2O", "HO4P", "C5"])
+        assert result == {"H2O": {1}, "HO4P": {3}}
+
+    def test_get_proton_ids(self, database):
+        assert database.get_proton_ids() == {5}
+
+    def test_get_ids_from_signatures(self, database):
+        signature = reaction_signature([4, 3, 2, 1])
+        result = database.get_ids_from_signatures([signature, reaction_signature([1, 2, 3])])
+        assert result == {signature: {1}}
+
+    def test_reaction_signature(self):
+        assert reaction_signature([1, 2, 3]) == reaction_signature([3, 1, 2, 2])
+        assert reaction_signature([1, 2, 3]) != reaction_signature([1, 2])
+        assert reaction_signature([12, 3]) != reaction_signature([1, 23])
+
+    def test_search_names(self, database):
+        # Exact matches and prefixes first, then by length
+        assert database.search_names("phosphate", "metabolite") == [3, 2]
+        assert database.search_names("GLUCOSE", "metabolite") == [4, 2]
+        assert database.search_names("alpha", "Metabolite") == [4, 2]
+        # Terms shorter than a trigram
+        assert database.search_names("ro", "metabolite") == [5]
+        # Typos
+        assert database.search_names("phosphxte", "metabolite") == [3, 2]
+        assert database.search_names("phosphxte", "metabolite", max_edits=0) == []
+        assert database.search_names("glucose-6-phosphtase", "reaction") == [1]
+
+        assert database.search_names("a", "metabolite", limit=2) == [4, 2]
+        assert database.search_names(" ", "metabolite") == []
+        with pytest.raises(ValueError):
+            database.search_names("water", "pathway")
+
+    def test_substring_distance(self):
+        assert substring_distance("glucose", "alpha-D-glucose") == 0
+        assert substring_distance("glucxse", "alpha-D-glucose") == 1
+        assert substring_distance("gluose", "alpha-D-glucose") == 1
+        assert substring_distance("glucose", "water") > 2
+        assert substring_distance("glucose", "") == 7
+        assert substring_distance("", "water") == 0
+
+    def test_split_term(self):
+        assert split_term("glucose", 1) == ["glucose"]
+        assert split_term("phosphate", 3) == ["pho", "sph", "ate"]
+
     def test_get_metabolite_from_id(self, database):
         result = database.get_metabolite_from_id(1)
         assert result.formula == "H2O"
@@ -128,3 +240,172 @@ class TestDatabaseWrapper:
 
 
 
+
+
+class TestConnectionPool:
+
+    @pytest.fixture()
+    def path(self, database):
+        return database.connection.execute("PRAGMA database_list;").fetchone()[2]
+
+    def test_database_uri(self, tmpdir):
+        path = str(tmpdir.join("data base.db"))
+        assert database_uri(path).startswith("file:")
+        assert database_uri(path).endswith("data%20base.db?mode=ro")
+        assert database_uri(path, read_only=False).endswith("data%20base.db")
+
+    def test_connections_are_shared_per_thread(self, path):
+        pool = ConnectionPool()
+        connection = pool.connection(path)
+        assert pool.connection(path) is connection
+        assert pool.connection(path, read_only=False) is not connection
+
+        result = []
+        thread = threading.Thread(target=lambda: result.append(pool.connection(path)))
+        thread.start()
+        thread.join()
+        assert result[0] is not connection
+
+    def test_read_only_connection(self, path):
+        connection = ConnectionPool().connection(path)
+        assert connection.execute("PRAGMA mmap_size;").fetchone()[0] > 0
+        with pytest.raises(sqlite3.OperationalError):
+            connection.execute("DELETE FROM metabolites;")
+
+    def test_invalidate(self, path):
+        pool = ConnectionPool()
+        connection = pool.connection(path)
+        pool.invalidate()
+        assert pool.connection(path) is not connection
+        # Discarded connections stay usable while in use
+        assert connection.execute("SELECT COUNT(*) FROM metabolites;").fetchone()[0] == 5
+
+    def test_invalidate_from_other_thread(self, path):
+        pool = ConnectionPool()
+        connection = pool.connection(path)
+        thread = threading.Thread(target=pool.invalidate)
+        thread.start()
+        thread.join()
+        assert pool.connection(path) is not connection
+
+    def test_read_only_connection_sees_changes(self, path):
+        query = "SELECT name FROM metabolites WHERE id = 1;"
+        connection = connection_pool.connection(path)
+        name = connection.execute(query).fetchone()[0]
+
+        writer = sqlite3.connect(path)
+        writer.execute("UPDATE metabolites SET name = 'changed' WHERE id = 1;")
+        writer.commit()
+        try:
+            assert connection.execute(query).fetchone()[0] == "changed"
+        finally:
+            writer.execute("UPDATE metabolites SET name = ? WHERE id = 1;", (name,))
+            writer.commit()
+            writer.close()
+
+    def test_wrapper_reconnects_after_invalidate(self, path):
+        with DatabaseWrapper(path) as database:
+            connection = database.connection
+            thread = threading.Thread(target=connection_pool.invalidate)
+            thread.start()
+            thread.join()
+            assert database.connection is not connection
+            assert database.connection is connection_pool.connection(path)
+            assert database.cursor.connection is database.connection
+
+    def test_wrappers_share_connection(self, path):
+        with DatabaseWrapper(path) as first, DatabaseWrapper(path) as second:
+            assert first.connection is second.connection
+            assert first.connection is connection_pool.connection(path)
+
+    def test_update_use_resource(self, path):
+        with DatabaseWrapper(path) as database:
+            resource = database.get_miriam_collections("metabolite")[0]
+
+        with DatabaseWrapper(path, read_only=False) as database:
+            database.update_use_resource(resource["id"], not resource["use_resource"])
+        with DatabaseWrapper(path) as database:
+            assert database.get_miriam_collections("metabolite")[0]["use_resource"] != resource["use_resource"]
+
+        with DatabaseWrapper(path, read_only=False) as database:
+            database.update_use_resource(resource["id"], resource["use_resource"])
+
+    def test_pyqt_database_connection(self, path):
+        db = pyqt_database_connection(path)
+        assert db.open()
+        assert pyqt_database_connection(path).connectionName() == db.connectionName()
+
+        query = QSqlQuery("SELECT COUNT(*) FROM metabolites;", db)
+        assert query.next() and query.value(0) == 5
+        assert not QSqlQuery(db).exec_("DELETE FROM metabolites;")
+
+        connection_pool.invalidate()
+        assert not db.isOpen()
+        assert pyqt_database_connection(path).isOpen()
+
+
+class TestLookupCache:
+
+    def test_least_recently_used_are_dropped(self):
+        cache = LookupCache(maxsize=2)
+        assert cache.get("a", lambda: 1) == 1
+        assert cache.get("b", lambda: 2) == 2
+        # Access a so that b is dropped first
+        assert cache.get("a", lambda: None) == 1
+        assert cache.get("c", lambda: 3) == 3
+
+        assert cache.get("a", lambda: None) == 1
+        assert cache.get("b", lambda: 4) == 4
+        assert cache.info() == (2, 4, 2, 2)
+
+    def test_clear(self):
+        cache = LookupCache()
+        cache.get("a", lambda: 1)
+        cache.get("a", lambda: 1)
+        cache.clear()
+        assert cache.info() == (0, 0, cache.maxsize, 0)
+        assert cache.get("a", lambda: 2) == 2
+
+    def test_wrapper_lookups_are_cached(self, database):
+        lookup_cache.clear()
+        first = database.get_metabolite_from_id(2)
+        second = database.get_metabolite_from_id(2)
+
+        # New objects are returned for cached rows
+        assert first is not second
+        assert (first.name, first.formula, first.charge) == (second.name, second.formula, second.charge)
+        assert first.annotation == second.annotation
+        assert lookup_cache.info().hits == 2
+        assert lookup_cache.info().misses == 2
+
+        assert database.get_synonyms_from_id(2, "metabolite") == database.get_synonyms_from_id(2, "metabolite")
+        assert database.get_reaction_string_from_id(1) == database.get_reaction_string_from_id("1")
+        assert database.get_reaction_from_id(2) is None
+
+    def test_update_use_resource_clears_cache(self, database):
+        database.get_annotations_from_id(1, "metabolite")
+        resource = database.get_miriam_collections("metabolite")[0]
+
+        with DatabaseWrapper(database.database_path, read_only=False) as writable:
+            writable.update_use_resource(resource["id"], False)
+        assert lookup_cache.info().currsize == 0
+        with DatabaseWrapper(database.database_path) as new_database:
+            assert new_database.get_annotations_from_id(1, "metabolite") == []
+
+        with DatabaseWrapper(database.database_path, read_only=False) as writable:
+            writable.update_use_resource(resource["id"], resource["use_resource"])
+
+    def test_replaced_database_clears_cache(self, tmpdir):
+        path = str(tmpdir.join("database.db"))
+        for name in ("Water", "Ice"):
+            if os.path.exists(path):
+                os.remove(path)
+            connection = sqlite3.connect(path)
+            connection.execute("CREATE TABLE metabolites (id INTEGER PRIMARY KEY, name TEXT, formula TEXT, "
+                               "charge INTEGER);")
+            connection.execute("INSERT INTO metabolites VALUES (1, ?, 'H2O', 0);", (name,))
+            connection.commit()
+            connection.close()
+
+            with DatabaseWrapper(path) as database:
+                assert database._cached_query("SELECT name FROM metabolites WHERE id = ?;", "1") == ((name,),)
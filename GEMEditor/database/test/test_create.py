@@ -0,0 +1,383 @@
+import os
+from functools import partial
+import sqlite3
+import pytest
+from GEMEditor.base.classes import HeadlessProgress
+from GEMEditor.database import metanetx_files
+from GEMEditor.database.base import get_proton_ids, iter_reaction_signatures, iter_annotation_blobs
+from GEMEditor.database.create import load_metabolites, load_metabolites_xref, load_compartments, \
+    load_reactions, load_reaction_xrefs, load_reaction_signatures, create_indices, build_database, \
+    update_database, query_mnx_ids, load_annotations, get_equation_inserts, parse_reaction_formula
+from GEMEditor.database.tables import setup_empty_database
+
+
+metanetx_fixtures = dict((key, os.path.join(os.path.dirname(__file__), "data", "metanetx", value))
+                         for key, value in metanetx_files.items())
+
+tables = ("metabolites", "metabolite_ids", "metabolite_names", "compartments", "reactions",
+          "reaction_ids", "reaction_participants", "reaction_signatures", "metabolite_annotations",
+          "reaction_annotations")
+
+
+def load_sequentially(path):
+    setup_empty_database(path)
+    connection = sqlite3.connect(path)
+    progress = HeadlessProgress()
+    load_metabolites(connection, metanetx_fixtures, progress)
+    load_metabolites_xref(connection, metanetx_fixtures, progress)
+    load_compartments(connection, metanetx_fixtures, progress)
+    load_reactions(connection, metanetx_fixtures, progress)
+    load_reaction_xrefs(connection, metanetx_fixtures, progress)
+    load_reaction_signatures(connection, progress)
+    load_annotations(connection, progress)
+    create_indices(connection, progress)
+    connection.close()
+
+
+def get_tables(path):
+    connection = sqlite3.connect(path)
+    result = dict((table, connection.execute("SELECT * FROM {0} ORDER BY id".format(table)).fetchall())
+                  for table in tables)
+    connection.close()
+    return result
+
+
+class RecordingProgress(HeadlessProgress):
+    """ Record the values reported for each range """
+
+    def __init__(self):
+        super(RecordingProgress, self).__init__()
+        self.ranges = []
+
+    def setRange(self, minimum, maximum):
+        self.ranges.append((maximum, []))
+
+    def setMaximum(self, maximum):
+        self.ranges.append((maximum, []))
+
+    def setValue(self, value):
+        self.ranges[-1][1].append(value)
+
+
+class Identity(dict):
+
+    def __missing__(self, key):
+        return key
+
+
+def reference_equation_inserts(metabolite_map, reaction_id, equation, compartment_map):
+    """ Inserts as computed by parse_reaction_formula alone """
+    educts, products = parse_reaction_formula(equation)
+    inserts = []
+    for key, value in educts.items():
+        mnx_id, compartment = key.split("@")
+        inserts.append((reaction_id, metabolite_map[mnx_id], -float(value), compartment_map[compartment]))
+    for key, value in products.items():
+        mnx_id, compartment = key.split("@")
+        inserts.append((reaction_id, metabolite_map[mnx_id], float(value), compartment_map[compartment]))
+    return inserts
+
+
+def equation_inserts_or_error(function, equation, metabolite_map=Identity(), compartment_map=Identity()):
+    try:
+        return function(metabolite_map, 1, equation, compartment_map)
+    except Exception as e:
+        return type(e), str(e)
+
+
+class TestEquationInserts:
+
+    def test_fixture_equations(self):
+        with open(metanetx_fixtures["Reactions"], encoding="UTF-8") as open_file:
+            equations = [x.split("\t")[1] for x in open_file if not x.startswith("#")]
+
+        results = [equation_inserts_or_error(get_equation_inserts, x) for x in equations]
+        assert results == [equation_inserts_or_error(reference_equation_inserts, x) for x in equations]
+        # The fixtures contain valid and invalid equations
+        assert any(isinstance(x, list) for x in results)
+        assert any(isinstance(x, tuple) for x in results)
+
+    @pytest.mark.parametrize("equation", ["1 A@C = 2 B@D",
+                                          "A@C + A@C <=> 0.5 B@D + B@C",
+                                          "-0 A@C -> B@D",
+                                          "1e-3 A@C <- 2 B@D + ",
+                                          " = A@C",
+                                          "A@C = ",
+                                          "",
+                                          "A@C + B@C",
+                                          "A@C = B@D = C@C",
+                                          "A@C -> B@D <-> C@C",
+                                          "x A@C = B@D",
+                                          "1 2 A@C = B@D",
+                                          "1  A@C = B@D",
+                                          "\tA@C = B@D",
+                                          "1\t A@C = B@D",
+                                          "A@C = B@D\xa0",
+                                          "A = B@D",
+                                          "A@C@E = B@D"])
+    def test_edge_cases(self, equation):
+        assert equation_inserts_or_error(get_equation_inserts, equation) == \
+            equation_inserts_or_error(reference_equation_inserts, equation)
+
+    def test_missing_entries(self):
+        assert equation_inserts_or_error(get_equation_inserts, "A@C = B@D", {"A": 1}) == (KeyError, "'B'")
+        assert equation_inserts_or_error(get_equation_inserts, "A@C = B@D", compartment_map={"C": 1}) == \
+            (KeyError, "'D'")
+
+
+class TestBuildDatabase:
+
+    @pytest.fixture(scope="class")
+    def reference(self, tmpdir_factory):
+        path = str(tmpdir_factory.mktemp("reference").join("database.db"))
+        load_sequentially(path)
+        return get_tables(path)
+
+    @pytest.mark.parametrize("processes,chunk_size", [(1, 50), (2, 50), (2, 100000)])
+    def test_build_matches_sequential_loading(self, tmpdir, reference, processes, chunk_size):
+        path = str(tmpdir.join("database.db"))
+        setup_empty_database(path)
+        connection = sqlite3.connect(path)
+
+        assert build_database(connection, metanetx_fixtures, HeadlessProgress(), processes=processes,
+                              chunk_size=chunk_size) is True
+        connection.close()
+
+        result = get_tables(path)
+        assert all(result[x] for x in tables)
+        assert result == reference
+
+    def test_indices_are_created(self, tmpdir):
+        path = str(tmpdir.join("database.db"))
+        setup_empty_database(path)
+        connection = sqlite3.connect(path)
+        build_database(connection, metanetx_fixtures, HeadlessProgress(), processes=1)
+
+        indices = set(x[0] for x in connection.execute("SELECT name FROM sqlite_master WHERE type='index'"))
+        assert "idx_met_xref_identifier" in indices
+        assert "idx_reaction_signature" in indices
+        assert "idx_metabolite_names_nocase" in indices
+        virtual = set(x[0] for x in connection.execute("SELECT name FROM sqlite_master WHERE sql LIKE 'CREATE VIRTUAL%'"))
+        assert virtual == {"metabolite_names_search", "reaction_names_search"}
+        # Settings are restored after the build
+        assert connection.execute("PRAGMA journal_mode;").fetchone()[0] == "delete"
+        connection.close()
+
+    def test_canceled_build(self, tmpdir):
+        path = str(tmpdir.join("database.db"))
+        setup_empty_database(path)
+        connection = sqlite3.connect(path)
+        progress = HeadlessProgress()
+        progress.wasCanceled = lambda: True
+
+        assert build_database(connection, metanetx_fixtures, progress, processes=1) is False
+        connection.close()
+
+    @pytest.mark.parametrize("loaders,files", [((load_metabolites, load_metabolites_xref, load_compartments,
+                                                  load_reactions, load_reaction_xrefs),
+                                                 (("Metabolites",), ("MetaboliteLinks",), ("Compartments",),
+                                                  ("Reactions",), ("ReactionLinks",))),
+                                                ((partial(build_database, processes=1, chunk_size=50),),
+                                                 (("Compartments",),
+                                                  ("Metabolites", "MetaboliteLinks", "Reactions", "ReactionLinks")))])
+    def test_progress_by_bytes_read(self, tmpdir, loaders, files):
+        path = str(tmpdir.join("database.db"))
+        setup_empty_database(path)
+        connection = sqlite3.connect(path)
+        progress = RecordingProgress()
+        for function in loaders:
+            function(connection, metanetx_fixtures, progress)
+        connection.close()
+
+        # Reading the files is reported in kilobytes
+        expected = [-(-sum(os.path.getsize(metanetx_fixtures[x]) for x in keys) // 1024) for keys in files]
+        file_ranges = [x for x in progress.ranges if x[0] in expected]
+        assert [x[0] for x in file_ranges] == expected
+        for maximum, values in file_ranges:
+            assert values == sorted(values)
+            assert values[-1] == maximum
+
+
+def modify_files(target, add_entries=True):
+    """ Write a changed version of the fixtures to target """
+
+    def rewrite(key, change, added=()):
+        with open(metanetx_fixtures[key], encoding="UTF-8") as open_file:
+            lines = open_file.readlines()
+        result = []
+        for i, line in enumerate(lines):
+            if line.startswith("#"):
+                result.append(line)
+                continue
+            line = change(i, line.rstrip("\n").split("\t"))
+            if line is not None:
+                result.append("\t".join(line) + "\n")
+        if add_entries:
+            result.extend("\t".join(x) + "\n" for x in added)
+        files[key] = str(target.join(os.path.basename(metanetx_fixtures[key])))
+        with open(files[key], "w", encoding="UTF-8") as open_file:
+            open_file.writelines(result)
+
+    def change_metabolite(i, columns):
+        if i % 25 == 3:
+            return None
+        elif i % 10 == 0:
+            columns[1] = "renamed {0}".format(i)
+        elif i % 15 == 1:
+            columns[2] = "C{0}".format(i)
+        return columns
+
+    def change_reaction(i, columns):
+        if i % 20 == 5:
+            return None
+        elif i % 7 == 2:
+            columns[4] = "9.9.9.9"
+        return columns
+
+    files = dict()
+    new_metabolites = [["MNXM90000{0}".format(i), "new {0}".format(i), "H2O", "0", "18", "", "", "", ""]
+                       for i in range(5)]
+    rewrite("Metabolites", change_metabolite, new_metabolites)
+    rewrite("MetaboliteLinks", lambda i, x: None if i % 9 == 4 else x,
+            [["chebi:900001", "MNXM900001", "inferred", "new|new synonym"]])
+    rewrite("Compartments", lambda i, x: x, [["MNXD9", "new compartment", ""]])
+    rewrite("Reactions", change_reaction,
+            [["MNXR900000", "1 MNXM900000@MNXD9 = 1 MNXM900001@MNXD1", "new", "true", "1.1.1.1", "rhea:90000"]])
+    rewrite("ReactionLinks", lambda i, x: None if i % 11 == 3 else x, [["rhea:90000", "MNXR900000"]])
+    return files
+
+
+def get_entries(path):
+    """ Get the content of the database by MetaNetX ids """
+
+    connection = sqlite3.connect(path)
+    resources = dict(connection.execute("SELECT miriam_collection, id FROM resources"))
+    metabolite_ids = dict((v, k) for k, v in connection.execute(query_mnx_ids.format("metabolite"),
+                                                                 (resources["metanetx.chemical"],)))
+    reaction_ids = dict((v, k) for k, v in connection.execute(query_mnx_ids.format("reaction"),
+                                                               (resources["metanetx.reaction"],)))
+    compartment_ids = dict(connection.execute("SELECT id, mnx_id FROM compartments"))
+
+    metabolites = dict()
+    for metabolite_id, name, formula, charge in connection.execute("SELECT * FROM metabolites"):
+        identifiers = connection.execute("SELECT resource_id, identifier FROM metabolite_ids "
+                                         "WHERE metabolite_id=?", (metabolite_id,)).fetchall()
+        names = connection.execute("SELECT name FROM metabolite_names WHERE metabolite_id=?", (metabolite_id,))
+        metabolites[metabolite_ids[metabolite_id]] = (name, formula, charge, set(identifiers), set(names))
+
+    reactions = dict()
+    for reaction_id, string in connection.execute("SELECT * FROM reactions"):
+        identifiers = connection.execute("SELECT resource_id, identifier FROM reaction_ids "
+                                         "WHERE reaction_id=?", (reaction_id,)).fetchall()
+        participants = set((metabolite_ids[x[0]], x[1], compartment_ids[x[2]]) for x in connection.execute(
+            "SELECT metabolite_id, stoichiometry, compartment_id FROM reaction_participants WHERE reaction_id=?",
+            (reaction_id,)))
+        reactions[reaction_ids[reaction_id]] = (string, set(identifiers), participants)
+
+    signatures = set(connection.execute("SELECT reaction_id, signature FROM reaction_signatures"))
+    assert signatures == set(iter_reaction_signatures(connection.cursor(), get_proton_ids(connection.cursor())))
+    for entry_type in ("metabolite", "reaction"):
+        annotations = connection.execute("SELECT * FROM {0}_annotations ORDER BY id".format(entry_type)).fetchall()
+        assert annotations == list(iter_annotation_blobs(connection.cursor(), entry_type))
+    connection.close()
+
+    return {"metabolites": metabolites, "reactions": reactions, "compartments": set(compartment_ids.values()),
+            "metabolite_ids": dict((v, k) for k, v in metabolite_ids.items()),
+            "reaction_ids": dict((v, k) for k, v in reaction_ids.items())}
+
+
+class TestUpdateDatabase:
+
+    @pytest.fixture()
+    def database(self, tmpdir):
+        path = str(tmpdir.join("database.db"))
+        setup_empty_database(path)
+        connection = sqlite3.connect(path)
+        build_database(connection, metanetx_fixtures, HeadlessProgress(), processes=1)
+        connection.close()
+        return path
+
+    @pytest.fixture()
+    def new_files(self, tmpdir):
+        return modify_files(tmpdir.mkdir("new"))
+
+    def update(self, path, files, progress=None):
+        connection = sqlite3.connect(path)
+        result = update_database(connection, files, progress or HeadlessProgress(), processes=1)
+        connection.close()
+        return result
+
+    def test_update_matches_new_build(self, tmpdir, database, new_files):
+        path = str(tmpdir.join("new.db"))
+        setup_empty_database(path)
+        connection = sqlite3.connect(path)
+        build_database(connection, new_files, HeadlessProgress(), processes=1)
+        connection.close()
+        expected = get_entries(path)
+
+        assert self.update(database, new_files) is True
+        result = get_entries(database)
+
+        for key in ("metabolites", "reactions", "compartments"):
+            assert result[key] == expected[key]
+
+        # The name search index follows the changed names
+        connection = sqlite3.connect(database)
+        assert connection.execute("INSERT INTO metabolite_names_search (metabolite_names_search) "
+                                  "VALUES ('integrity-check');")
+        hits = connection.execute("SELECT rowid FROM metabolite_names_search WHERE metabolite_names_search "
+                                  "MATCH '\"renamed 1\"' ORDER BY rowid").fetchall()
+        assert hits
+        assert hits == connection.execute("SELECT id FROM metabolite_names WHERE name LIKE '%renamed 1%' "
+                                          "ORDER BY id").fetchall()
+        connection.close()
+
+    def test_ids_are_stable(self, database, new_files):
+        old = get_entries(database)
+
+        self.update(database, new_files)
+        new = get_entries(database)
+
+        for key in ("metabolite_ids", "reaction_ids"):
+            kept = set(old[key]).intersection(new[key])
+            assert kept
+            assert all(old[key][x] == new[key][x] for x in kept)
+            # New entries do not reuse ids
+            added = set(new[key]) - set(old[key])
+            assert added
+            assert min(new[key][x] for x in added) > max(old[key].values())
+
+        assert "MNXM2" in old["metabolite_ids"] and "MNXM2" not in new["metabolite_ids"]
+        assert new["metabolites"]["MNXM900001"][0] == "new 1"
+        assert new["reactions"]["MNXR900000"][2] == {("MNXM900000", -1., "MNXD9"), ("MNXM900001", 1., "MNXD1")}
+
+    def test_ids_of_deleted_entries_are_not_reused(self, tmpdir, database, new_files):
+        self.update(database, new_files)
+        added = get_entries(database)
+
+        # Delete the added entries having the largest ids and add them again
+        self.update(database, modify_files(tmpdir.mkdir("deleted"), add_entries=False))
+        deleted = get_entries(database)
+        self.update(database, new_files)
+        result = get_entries(database)
+
+        for key in ("metabolite_ids", "reaction_ids"):
+            readded = set(added[key]) - set(deleted[key])
+            assert readded
+            assert min(result[key][x] for x in readded) > max(added[key].values())
+
+    def test_repeated_update_changes_nothing(self, database, new_files):
+        self.update(database, new_files)
+        before = get_tables(database)
+
+        self.update(database, new_files)
+
+        assert get_tables(database) == before
+
+    def test_canceled_update_is_rolled_back(self, database, new_files):
+        before = get_tables(database)
+        progress = HeadlessProgress()
+        progress.wasCanceled = lambda: True
+
+        assert self.update(database, new_files, progress) is False
+        assert get_tables(database) == before
@@ -59,60 +59,6 @@ def progress():
 #             assert not settings["metabolite_resources"]
 
 
-class Test_get_reactions_with_same_signature:
-
-    def test_get_entry_matching_signature(self, database):
-        signature = set([1, 2, 3, 4])
-        entries = set([1])
-        result = get_reactions_with_same_signature(database, entries,
-                                                   signature, set())
-        assert result == set([1])
-
-    def test_dont_get_reactions_matching_signature_not_in_entries(self, database):
-        signature = set([1, 2, 3, 4])
-        entries = set()
-        result = get_reactions_with_same_signature(database, entries,
-                                                   signature, set())
-        assert result == set()
-
-    def test_not_matching_when_one_metabolite_missing(self, database):
-        signature = set([1, 2, 3])
-        entries = set([1])
-        result = get_reactions_with_same_signature(database, entries,
-                                                   signature, set())
-        assert result == set()
-
-    def test_not_matching_if_additional_metabolite(self, database):
-        signature = set([1, 2, 3, 4, 5])
-        entries = set([1])
-        result = get_reactions_with_same_signature(database, entries,
-                                                   signature, set())
-        assert result == set()
-
-    def test_match_if_additional_metabolite_is_ignored(self, database):
-        signature = set([1, 2, 3])
-        entries = set([1])
-        result = get_reactions_with_same_signature(database, entries,
-                                                   signature, set([4]))
-        assert result == set([1])
-
-
-class Test_map_by_annotation:
-
-    def test_map_metabolites(self, database):
-        metabolite = Metabolite("m1")
-        metabolite.annotation.add(Annotation(identifier="MNXM2", collection="metanetx.chemical"))
-        metabolite.annotation.add(Annotation(identifier="MNXM215", collection="metanetx.chemical"))
-
-        assert map_by_annotation(database, metabolite) == set([1, 2])
-
-    def test_empty_result_if_not_in_db(self, database):
-        metabolite = Metabolite("m1")
-        metabolite.annotation.add(Annotation(identifier="MNXM2000", collection="metanetx.chemical"))
-
-        assert map_by_annotation(database, metabolite) == set()
-
-
 class Test_update_metabolite_database_mapping:
 
     def test_map_metabolite_by_annotation(self, database, progress):
@@ -148,6 +94,38 @@ class Test_update_metabolite_database_mapping:
         update_metabolite_database_mapping(database, model, progress)
         assert model.database_mapping[met1] == 1
 
+    def test_map_metabolites_in_order_of_evidence(self, database, progress):
+        model = Model()
+        # Annotation takes precedence over name and formula
+        met1 = Metabolite("m1", name="Water", formula="H2O")
+        met1.annotation.add(Annotation(identifier="MNXM9", collection="metanetx.chemical"))
+        # Name takes precedence over formula
+        met2 = Metabolite("m2", name="alpha-d-glucose", formula="H2O")
+        met2.annotation.add(Annotation(identifier="MNXM2000", collection="metanetx.chemical"))
+        met3 = Metabolite("m3", name="Unknown", formula="HO4P")
+        met4 = Metabolite("m4", name="Unknown", formula="C5")
+        # Metabolites with two matching annotations
+        met5 = Metabolite("m5")
+        met5.annotation.add(Annotation(identifier="MNXM2", collection="metanetx.chemical"))
+        met5.annotation.add(Annotation(identifier="MNXM215", collection="metanetx.chemical"))
+        model.add_metabolites([met1, met2, met3, met4, met5])
+
+        update_metabolite_database_mapping(database, model, progress)
+        assert model.database_mapping[met1] == 3
+        assert model.database_mapping[met2] == 4
+        assert model.database_mapping[met3] == 3
+        assert model.database_mapping[met4] is None
+        assert sorted(model.database_mapping[met5]) == [1, 2]
+
+    def test_mapped_metabolites_are_kept(self, database, progress):
+        model = Model()
+        met1 = Metabolite("m1", name="Water")
+        model.add_metabolites([met1])
+        model.database_mapping[met1] = 5
+
+        update_metabolite_database_mapping(database, model, progress)
+        assert model.database_mapping[met1] == 5
+
 
 class Test_check_ambiguous_mappings:
 
@@ -187,6 +165,23 @@ class Test_update_reaction_database_mapping:
 
         assert model.database_mapping[reaction] == 1
 
+    def test_map_reaction_by_stoichiometry_ignoring_protons(self, database, progress):
+        model = Model()
+        metabolites = [Metabolite("m{0}".format(i)) for i in range(1, 6)]
+        model.add_metabolites(metabolites)
+        model.database_mapping.update(dict((m, i) for i, m in enumerate(metabolites, 1)))
+        reaction = Reaction("r1")
+        reaction.add_metabolites(dict(zip(metabolites, (-1, -1, 1, 1, 1))))
+        # Reaction missing a metabolite
+        reaction2 = Reaction("r2")
+        reaction2.add_metabolites(dict(zip(metabolites, (-1, -1, 1))))
+        model.add_reactions([reaction, reaction2])
+
+        update_reaction_database_mapping(database, model, progress)
+
+        assert model.database_mapping[reaction] == 1
+        assert reaction2 not in model.database_mapping
+
     def test_map_reaction_by_annotation(self, database, progress):
         model = Model()
         met1 = Metabolite("m1")
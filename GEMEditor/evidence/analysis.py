@@ -122,6 +122,8 @@ class DialogEvidenceStatus(QDialog, Ui_DialogEvidenceStatus):
             else:
                 QMessageBox().warning(None, "Fix evidence", "Fixing evidence failed!")
 
+        # Fixing links genes to reactions
+        self.model.mark_sections_dirty("reactions", "genes")
         self.update_labels()
 
     @pyqtSlot()
@@ -1,15 +1,17 @@
 import logging
 import os
+from functools import partial
 import GEMEditor.rw.sbml3 as sbml3
 import GEMEditor.rw.parsers as parsers
 from GEMEditor.analysis.duplicates import group_duplicate_reactions, get_duplicated_metabolites, factory_duplicate_dialog
 from GEMEditor.analysis.formula import update_formulae_iteratively
+from GEMEditor.analysis.model_test import read_test_results, write_test_results
 from GEMEditor.analysis.statistics import run_all_statistics, DisplayStatisticsDialog
-from GEMEditor.base.classes import ProgressDialog
+from GEMEditor.base.dialogs import ProgressDialog
 from GEMEditor.base.dialogs import ListDisplayDialog
 from GEMEditor.base.functions import merge_groups_by_overlap
 from GEMEditor.database.base import DatabaseWrapper
-from GEMEditor.database.create import create_database_de_novo, database_exists
+from GEMEditor.database.create import create_database_de_novo, database_exists, update_database_from_metanetx
 from GEMEditor.database.model import run_auto_annotation, run_check_consistency, load_mapping, store_mapping,\
     run_database_mapping
 from GEMEditor.database.query import DialogDatabaseSelection
@@ -24,6 +26,7 @@ from GEMEditor.model.classes.cobra import Model, prune_gene_tree
 from GEMEditor.model.edit.evidence import BatchEvidenceDialog
 from GEMEditor.model.edit.model import EditModelDialog
 from GEMEditor.model.edit.reference import PubmedBrowser
+from GEMEditor.rw.snapshot import write_snapshot
 from PyQt5 import QtCore
 from PyQt5.QtGui import QKeySequence
 from PyQt5.QtWidgets import QFileDialog, QMainWindow
@@ -44,6 +47,12 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         # Thread pool for concurrent actions
         self.thread_pool = QtCore.QThreadPool.globalInstance()
 
+        # Models are loaded one at a time in a separate pool,
+        # so that loading is not queued behind an update check
+        self.loader_pool = QtCore.QThreadPool(self)
+        self.loader_pool.setMaxThreadCount(1)
+        self.loader = None
+
         # Time regular update checks
         self.update_timer = QtCore.QTimer()
         self.update_timer.timeout.connect(self.check_updates)
@@ -185,17 +194,46 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                                    "Unknown file type: '{0!s}'".format(os.path.splitext(filename)))
             return
 
-        # Parse model
-        model = parser.parse()
+        # Parse model in a worker thread
+        progress = ProgressDialog(self, title="Loading model..")
+        progress.setWindowModality(QtCore.Qt.ApplicationModal)
+        self.loader = parsers.ModelLoader(parser)
+        self.loader.signals.labelChanged.connect(progress.setLabelText)
+        self.loader.signals.rangeChanged.connect(progress.setRange)
+        self.loader.signals.valueChanged.connect(progress.setValue)
+        self.loader.signals.finished.connect(partial(self._model_loaded, parser, progress, save_path))
+        progress.canceled.connect(self.loader.cancel)
+        self.loader_pool.start(self.loader)
+
+    def _model_loaded(self, parser, progress, save_path, model):
+        """ Set the model returned from the loader
+
+        Parameters
+        ----------
+        parser: GEMEditor.rw.parsers.BaseParser
+            Parser used to load the model
+        progress: ProgressDialog
+            Dialog showing the loading progress
+        save_path: bool
+            Store path in settings
+        model: GEMEditor.model.classes.cobra.Model or None
+            The loaded model or None if loading failed
+        """
+        self.loader = None
+        # Closing the dialog emits canceled
+        progress.canceled.disconnect()
+        progress.close()
+
         if parser.errors or parser.warnings:
             parsers.ParserErrorDialog(parser).exec_()
 
         # Store most recent path for next model opening
         if model and save_path:
-            Settings().setValue("LastPath", os.path.dirname(filename))
+            Settings().setValue("LastPath", os.path.dirname(parser.path))
 
         if model:
-            self.set_model(model, filename)
+            read_test_results(parser.path)
+            self.set_model(model, parser.path)
 
     @QtCore.pyqtSlot()
     def open_test_model(self):
@@ -229,7 +267,15 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         filename, filter = QFileDialog.getSaveFileName(None, "Save Model", last_path,
                                                        "Sbml files (*.xml *.sbml)")
         if filename:
-            sbml3.write_sbml3_model(filename, self.model)
+            sbml3.write_sbml3_model(filename, self.model, incremental=True)
+            try:
+                write_snapshot(self.model, filename)
+            except OSError:
+                LOGGER.warning("Snapshot could not be written for '{}'".format(filename), exc_info=True)
+            try:
+                write_test_results(self.model, filename)
+            except OSError:
+                LOGGER.warning("Test results could not be written for '{}'".format(filename), exc_info=True)
             settings.setValue("LastPath", os.path.dirname(filename))
             # Set path to saved path
             self.model_path = filename
@@ -422,8 +468,17 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         None
         """
 
-        result = create_database_de_novo(parent=self,
-                                         database_path=DatabaseWrapper.get_database_path())
+        database_path = DatabaseWrapper.get_database_path()
+
+        # Update an existing database in place to keep the ids of stored mappings
+        if os.path.isfile(database_path):
+            if update_database_from_metanetx(parent=self):
+                QMessageBox().information(None, "Success!", "The database has successfully been updated.")
+            else:
+                QMessageBox().information(None, "Aborted", "Database has not been updated.")
+            return
+
+        result = create_database_de_novo(parent=self, database_path=database_path)
         if result:
             QMessageBox().information(None, "Success!", "The database has successfully been setup.")
         else:
@@ -465,11 +520,15 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         if self.model:
             for reaction in self.model.reactions:
                 # Prune tree as long as there is no further change
+                initial_rule = reaction.gene_reaction_rule
                 while True:
                     before_pruning = reaction.gene_reaction_rule
                     prune_gene_tree(reaction)
                     if reaction.gene_reaction_rule == before_pruning:
                         break
+                if reaction.gene_reaction_rule != initial_rule:
+                    self.model.mark_items_changed(reaction)
+            self.model.mark_sections_dirty("reactions")
 
     @QtCore.pyqtSlot()
     def add_batch_evidences(self):
@@ -486,6 +545,11 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             return False
 
     def closeEvent(self, event):
+        # Stop loading models
+        if self.loader is not None:
+            self.loader.cancel()
+            self.loader_pool.waitForDone()
+
         if self.close_model():
             LOGGER.debug("Update timer stopped.")
             event.accept()
@@ -1,8 +1,9 @@
 import cobra
 import logging
 from collections import OrderedDict
-from GEMEditor.analysis.model_test import run_tests
-from GEMEditor.base.classes import Settings, ProgressDialog
+from GEMEditor.analysis.model_test import incremental_run_tests
+from GEMEditor.base.classes import Settings, ProgressReporter
+from GEMEditor.base.dialogs import ProgressDialog
 from GEMEditor.base.functions import generate_copy_id, restore_state
 from GEMEditor.main.model.ui import Ui_StandardTab, Ui_AnalysisTab, Ui_SolutionTableWidget, Ui_model_stats_tab
 from GEMEditor.model.classes.cobra import Gene, Reaction, Metabolite, find_duplicate_metabolite
@@ -348,8 +349,8 @@ class ReactionTab(StandardTab):
             else:
                 compartment_mapping[compartment] = value
 
-        progress = QProgressDialog("{} reactions".format("Moving" if move else "Copying"),
-                                         "Cancel", 0, len(reactions), self)
+        progress = ProgressReporter(QProgressDialog("{} reactions".format("Moving" if move else "Copying"),
+                                                    "Cancel", 0, len(reactions), self))
 
         # Copy reactions using matching metabolite from other compartment
         for n, reaction in enumerate(reactions):
@@ -360,7 +361,6 @@ class ReactionTab(StandardTab):
                 return
             else:
                 progress.setValue(n)
-                QApplication.processEvents()
 
             metabolites = dict()
             # Collect corresponding metabolites in target compartment
@@ -470,8 +470,9 @@ class MetaboliteTab(StandardTab):
         value, status = QInputDialog().getInt(self, "Set Bound", "New bound value:", 0)
         if status:
             # Set dialog manually in order to prevent dialog popup before user input
-            progress = QProgressDialog(self)
-            progress.setWindowModality(QtCore.Qt.WindowModal)
+            dialog = QProgressDialog(self)
+            dialog.setWindowModality(QtCore.Qt.WindowModal)
+            progress = ProgressReporter(dialog)
 
             # Keep track of all reactions that need to be updated
             update_reactions = set()
@@ -483,7 +484,6 @@ class MetaboliteTab(StandardTab):
             progress.setLabelText("Changing metabolite..")
             for i, row in enumerate(rows):
                 progress.setValue(i)
-                QApplication.processEvents()
                 metabolite = self.model.QtMetaboliteTable.item(row).link
                 if metabolite.charge != value:
                     metabolite.charge = value
@@ -495,7 +495,6 @@ class MetaboliteTab(StandardTab):
             progress.setLabelText("Updating reactions..")
             for i, reaction in enumerate(update_reactions):
                 progress.setValue(i)
-                QApplication.processEvents()
                 reaction.update_balancing_status()
                 self.model.QtReactionTable.update_row_from_id(reaction.id)
 
@@ -647,6 +646,7 @@ class ReferenceTab(StandardTab):
             if status:
                 # Update the tableview to show new values
                 self.dataTable.update_row_from_link(row)
+                self.model.mark_sections_dirty("references")
                 self.dataView.clearSelection()
 
     def set_datatable(self):
@@ -730,7 +730,7 @@ class ModelTestsTab(StandardTab):
 
         with ProgressDialog(title="Running tests..") as progress:
             try:
-                test_results = run_tests(selected, self.model, progress)
+                test_results = incremental_run_tests(selected, self.model, progress)
             except Exception as e:
                 LOGGER.exception("Error running tests")
                 QMessageBox().critical(None, "Error", "The following error occured "
@@ -3,7 +3,7 @@ import GEMEditor
 import pytest
 from unittest.mock import Mock
 from GEMEditor.main import MainWindow
-from GEMEditor.model.classes.cobra import Model
+from GEMEditor.model.classes.cobra import Model, Reaction, Gene, GeneGroup
 from PyQt5.QtWidgets import QApplication, QMessageBox, QFileDialog
 from GEMEditor.base.test.fixtures import progress_not_cancelled
 
@@ -124,6 +124,12 @@ def main_window(no_update_check):
     return MainWindow()
 
 
+def wait_for_loader(main_window):
+    """ Wait for the model loader and deliver its signals """
+    main_window.loader_pool.waitForDone()
+    QApplication.processEvents()
+
+
 @pytest.mark.usefixtures("progress_not_cancelled")
 class TestOpenModel:
 
@@ -137,12 +143,14 @@ class TestOpenModel:
     def test_open_model_close_accepted_xml_path(self, main_window, openfilename_xml, mock_settings, parser_model):
         main_window.set_model = Mock()
         main_window.open_model()
+        wait_for_loader(main_window)
         mock_settings.setValue.assert_called_with("LastPath", os.path.dirname(openfilename_xml))
         main_window.set_model.assert_called_with(parser_model, openfilename_xml)
 
     def test_no_model_set_with_parsing_error(self, main_window, openfilename_xml, mock_settings, parser_none):
         main_window.set_model = Mock()
         main_window.open_model()
+        wait_for_loader(main_window)
         assert main_window.set_model.called is False
         assert mock_settings.setValue.called is False
 
@@ -226,7 +234,7 @@ class TestModelSave:
         model = Model()
         main_window.model = model
         main_window.save_model()
-        GEMEditor.rw.sbml3.write_sbml3_model.assert_called_with(getsavefilename_xml, model)
+        GEMEditor.rw.sbml3.write_sbml3_model.assert_called_with(getsavefilename_xml, model, incremental=True)
         mock_settings.setValue.assert_called_with("LastPath", os.path.dirname(getsavefilename_xml))
 
 
@@ -257,6 +265,37 @@ class TestModelEdit:
         assert main_window.update_window_title.called is False
 
 
+class TestPruneGeneTrees:
+
+    def test_prune_gene_trees_marks_reactions(self, main_window):
+        model = Model()
+        main_window.model = model
+        model.mark_sections_clean(*model.dirty_sections)
+
+        main_window.prune_gene_trees()
+        assert "reactions" in model.dirty_sections
+
+    def test_prune_gene_trees_marks_changed_items(self, main_window):
+        model = Model()
+        reaction1 = Reaction("r1")
+        reaction2 = Reaction("r2")
+        model.add_reactions([reaction1, reaction2])
+        outer_group = GeneGroup(type="or")
+        inner_group = GeneGroup(type="or")
+        reaction1.add_child(outer_group)
+        outer_group.add_child(Gene("g1"))
+        outer_group.add_child(inner_group)
+        inner_group.add_child(Gene("g2"))
+        inner_group.add_child(Gene("g3"))
+        reaction2.add_child(Gene("g4"))
+        main_window.model = model
+        model.changed_items.clear()
+
+        main_window.prune_gene_trees()
+        assert reaction1.gene_reaction_rule == "g1 or g2 or g3"
+        assert model.changed_items == set([reaction1])
+
+
 class TestModelLoaded:
 
     def test_model_loaded(self, main_window):
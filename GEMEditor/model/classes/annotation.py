@@ -1,10 +1,62 @@
+import sys
+from threading import Lock
+from weakref import WeakValueDictionary
 
 
 class Annotation:
-    def __init__(self, collection=None, identifier=None, type="is"):
-        self._collection = collection
-        self._identifier = identifier
-        self._type = type
+    """ Immutable annotation of a model item
+
+    Annotations are interned, i.e. creating an annotation with the
+    same collection, identifier and type as an existing one returns
+    the existing object. Annotations are therefore compared and
+    hashed by identity.
+
+    Parameters
+    ----------
+    collection: str
+        MIRIAM collection e.g. chebi
+    identifier: str
+        Identifier within the collection
+    type: str
+        Qualifier of the annotation, either "is" or "has"
+    """
+
+    __slots__ = ("_collection", "_identifier", "_type", "__weakref__")
+
+    # Intern table of all annotations alive
+    _instances = WeakValueDictionary()
+    _lock = Lock()
+
+    def __new__(cls, collection=None, identifier=None, type="is"):
+        key = (collection, identifier, type)
+        try:
+            return cls._instances[key]
+        except KeyError:
+            pass
+
+        # Models might be loaded in worker threads
+        with cls._lock:
+            self = cls._instances.get(key)
+            if self is None:
+                self = super(Annotation, cls).__new__(cls)
+                # There are only few distinct collections
+                if isinstance(collection, str):
+                    collection = sys.intern(collection)
+                object.__setattr__(self, "_collection", collection)
+                object.__setattr__(self, "_identifier", identifier)
+                object.__setattr__(self, "_type", type)
+                cls._instances[key] = self
+            return self
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Annotations are immutable")
+
+    def __delattr__(self, item):
+        raise AttributeError("Annotations are immutable")
+
+    def __reduce__(self):
+        # Unpickled annotations are interned as well
+        return Annotation, (self._collection, self._identifier, self._type)
 
     @property
     def collection(self):
@@ -18,16 +70,8 @@ class Annotation:
     def type(self):
         return self._type
 
-    def __eq__(self, other):
-        if isinstance(other, Annotation) and (self.collection == other.collection and
-                                                self.identifier == other.identifier and
-                                                      self.type == other.type):
-            return True
-        else:
-            return False
-
-    def __hash__(self):
-        return hash((self._collection, self._identifier, self._type))
+    def __repr__(self):
+        return "Annotation({0!r}, {1!r}, {2!r})".format(self._collection, self._identifier, self._type)
 
     def __str__(self):
-        return "Annotation({0!s}, {1!s})".format(self._collection, self._identifier)
\ No newline at end of file
+        return "Annotation({0!s}, {1!s})".format(self._collection, self._identifier)
@@ -2,16 +2,16 @@ import logging
 import uuid
 from collections import defaultdict
 from difflib import SequenceMatcher
+from functools import partial
 from weakref import WeakValueDictionary
 
-from GEMEditor.base import WindowManager, generate_copy_id, reaction_balance
+from GEMEditor.base import WindowManager, ProgressReporter, generate_copy_id, reaction_balance
 from GEMEditor.base.tables import LinkedItem
 from GEMEditor.model.classes.base import BaseTreeElement, EvidenceLink
 from GEMEditor.model.classes.modeltest import ReactionSetting
 from GEMEditor.model.display.tables import ReactionTable, MetaboliteTable, GeneTable, ReferenceTable, ModelTestTable, \
     CompartmentTable
 from PyQt5 import QtCore
-from PyQt5.QtWidgets import QApplication
 from cobra.core import Gene as cobraGene
 from cobra.core import Metabolite as cobraMetabolite
 from cobra.core import Model as cobraModel
@@ -20,6 +20,17 @@ from six import string_types
 
 LOGGER = logging.getLogger(__name__)
 
+# Sections of the model that need to be serialized again
+# when the items of the key section change e.g. reactions
+# contain the ids of metabolites and genes
+SECTION_DEPENDENCIES = {"compartments": ("metabolites",),
+                        "metabolites": ("reactions",),
+                        "genes": ("reactions", "tests"),
+                        "reactions": ("tests",),
+                        "references": ("tests",),
+                        "tests": (),
+                        "evidences": ()}
+
 
 class CleaningDict(defaultdict):
 
@@ -254,6 +265,17 @@ class Model(QtCore.QObject, EvidenceLink, cobraModel):
         # Keep track of maps for this model
         self.gem_maps = {}
 
+        # Keep track of the sections changed since
+        # they were last serialized by the writer
+        self.dirty_sections = set(SECTION_DEPENDENCIES)
+        self.serialized_sections = {}
+
+        # Keep track of the reactions, metabolites and genes
+        # changed since the test cases were last run
+        self.changed_items = set()
+        self.cached_item_states = {}
+        self.cached_test_results = {}
+
         # Setup model
         self.setup_tables()
         self.setup_connections()
@@ -289,6 +311,76 @@ class Model(QtCore.QObject, EvidenceLink, cobraModel):
         self.QtCompartmentTable.rowsRemoved.connect(self.modelChanged.emit)
         self.QtCompartmentTable.dataChanged.connect(self.modelChanged.emit)
 
+        # Track the sections changed through the tables
+        for table, section in ((self.QtReactionTable, "reactions"),
+                               (self.QtMetaboliteTable, "metabolites"),
+                               (self.QtGeneTable, "genes"),
+                               (self.QtReferenceTable, "references"),
+                               (self.QtTestsTable, "tests"),
+                               (self.QtCompartmentTable, "compartments")):
+            for signal in (table.rowsInserted, table.rowsRemoved, table.dataChanged):
+                signal.connect(partial(self._table_changed, section))
+
+        # Track the items changed through the tables
+        for table in (self.QtReactionTable, self.QtMetaboliteTable, self.QtGeneTable):
+            table.rowsInserted.connect(partial(self._rows_changed, table))
+            table.rowsAboutToBeRemoved.connect(partial(self._rows_changed, table))
+            table.dataChanged.connect(partial(self._data_changed, table))
+
+    def _table_changed(self, section, *args):
+        self.mark_sections_dirty(section)
+
+    def _rows_changed(self, table, parent, first, last):
+        self.mark_items_changed(*(table.item(row).link for row in range(first, last + 1)
+                                  if table.item(row) is not None))
+
+    def _data_changed(self, table, top_left, bottom_right, *args):
+        # All rows are changed if the indices are outside the table
+        first = top_left.row() if top_left.isValid() else 0
+        last = bottom_right.row() if bottom_right.isValid() else table.rowCount() - 1
+        self._rows_changed(table, None, first, last)
+
+    def mark_items_changed(self, *items):
+        """ Mark reactions, metabolites or genes as changed
+
+        The changed items are used to rerun only the test
+        cases that might be affected by the changes.
+
+        Parameters
+        ----------
+        items: Reaction, Metabolite or Gene
+
+        Returns
+        -------
+        None
+        """
+        self.changed_items.update(items)
+
+    def mark_sections_dirty(self, *sections):
+        """ Mark sections as changed
+
+        The sections depending on the changed sections are
+        marked as well. Evidences are linked to items of all
+        sections and are always marked.
+
+        Parameters
+        ----------
+        sections: str
+            Keys of SECTION_DEPENDENCIES
+
+        Returns
+        -------
+        None
+        """
+
+        for section in sections:
+            self.dirty_sections.add(section)
+            self.mark_sections_dirty(*SECTION_DEPENDENCIES[section])
+        self.dirty_sections.add("evidences")
+
+    def mark_sections_clean(self, *sections):
+        self.dirty_sections.difference_update(sections)
+
     def setup_tables(self):
         self.setup_reaction_table()
         self.setup_metabolite_table()
@@ -317,15 +409,19 @@ class Model(QtCore.QObject, EvidenceLink, cobraModel):
 
     def add_reference(self, reference):
         self.references[reference.id] = reference
+        self.mark_sections_dirty("references")
 
     def add_gene(self, gene):
         self.genes.append(gene)
+        self.mark_sections_dirty("genes")
 
     def add_test(self, test):
         self.tests.append(test)
+        self.mark_sections_dirty("tests")
 
     def add_evidence(self, evidence):
         self.all_evidences[evidence.internal_id] = evidence
+        self.mark_sections_dirty("evidences")
 
     def copy_metabolite(self, metabolite, compartment):
         new_metabolite = Metabolite(id=generate_copy_id(metabolite.id, self.metabolites),
@@ -361,6 +457,7 @@ class Model(QtCore.QObject, EvidenceLink, cobraModel):
                 self.gem_compartments[metabolite.compartment] = Compartment(metabolite.compartment)
 
         super(Model, self).add_metabolites(metabolite_list)
+        self.mark_sections_dirty("metabolites")
 
     def add_reactions(self, list_of_reactions):
 
@@ -370,11 +467,13 @@ class Model(QtCore.QObject, EvidenceLink, cobraModel):
         # Add subsystems
         for reaction in list_of_reactions:
             self.subsystems[reaction.subsystem].add(reaction)
+        self.mark_sections_dirty("reactions")
 
     def add_genes(self, genes):
         for gene in genes:
             self.genes.add(gene)
             gene._model = self
+        self.mark_sections_dirty("genes")
 
     def gem_add_metabolites(self, metabolites_list):
         self.add_metabolites(metabolites_list)
@@ -396,9 +495,9 @@ class Model(QtCore.QObject, EvidenceLink, cobraModel):
         if not metabolites:
             return
 
-        if progress is not None:
-            progress.setLabelText("Updating metabolite tables..")
-            progress.setRange(0, len(self.metabolites))
+        progress = ProgressReporter.wrap(progress)
+        progress.setLabelText("Updating metabolite tables..")
+        progress.setRange(0, len(self.metabolites))
 
         # Block updates for speed
         self.QtMetaboliteTable.blockSignals(True)
@@ -411,12 +510,11 @@ class Model(QtCore.QObject, EvidenceLink, cobraModel):
         for i, metabolite in enumerate(metabolites):
 
             # Update progress dialog
-            if progress:
-                progress.setValue(i)
-                QApplication.processEvents()
+            progress.setValue(i)
 
             # Update metabolite
             self.QtMetaboliteTable.update_row_from_item(metabolite, met_mapping[metabolite])
+            self.mark_items_changed(metabolite)
             reactions_to_update.update(self.reactions)
 
         # Update table
@@ -442,20 +540,19 @@ class Model(QtCore.QObject, EvidenceLink, cobraModel):
         self.QtReactionTable.blockSignals(True)
         react_mapping = self.QtReactionTable.get_item_to_row_mapping()
 
-        if progress:
-            progress.setLabelText("Updating reaction tables..")
-            progress.setRange(0, len(reactions))
+        progress = ProgressReporter.wrap(progress)
+        progress.setLabelText("Updating reaction tables..")
+        progress.setRange(0, len(reactions))
 
         for i, reaction in enumerate(reactions):
 
             # Update progress dialog
-            if progress:
-                progress.setValue(i)
-                QApplication.processEvents()
+            progress.setValue(i)
 
             # Update reaction
             reaction.update_balancing_status()
             self.QtReactionTable.update_row_from_item(reaction, react_mapping[reaction])
+            self.mark_items_changed(reaction)
 
         self.QtReactionTable.blockSignals(False)
         self.QtReactionTable.all_data_changed()
@@ -598,6 +695,9 @@ class Model(QtCore.QObject, EvidenceLink, cobraModel):
 
     def close(self):
         self.dialogs.remove_all()
+        self.serialized_sections.clear()
+        self.cached_item_states.clear()
+        self.cached_test_results.clear()
 
 
 class Metabolite(EvidenceLink, cobraMetabolite):
@@ -1,5 +1,6 @@
-from collections import namedtuple
+from threading import Lock
 from uuid import uuid4
+from weakref import WeakValueDictionary
 from GEMEditor.model.classes.annotation import Annotation
 
 
@@ -109,16 +110,89 @@ class Reference:
                                      id_strings="; ".join(id_strings))
 
 
-class Author(namedtuple("Author", ["lastname", "firstname", "initials"])):
+class Author:
+    """ Immutable author of a reference
 
-    __slots__ = ()
+    Equal authors share a single object as the same
+    authors appear in many references. Authors compare
+    equal to the tuple of their lastname, firstname
+    and initials.
+
+    Parameters
+    ----------
+    lastname: str
+    firstname: str
+    initials: str
+    """
+
+    __slots__ = ("_lastname", "_firstname", "_initials", "__weakref__")
+
+    # Intern table of all authors alive
+    _instances = WeakValueDictionary()
+    _lock = Lock()
 
     def __new__(cls, lastname="", firstname="", initials=""):
-        self = super(Author, cls).__new__(cls,
-                                          lastname=lastname,
-                                          firstname=firstname,
-                                          initials=initials)
-        return self
+        key = (lastname, firstname, initials)
+        try:
+            return cls._instances[key]
+        except KeyError:
+            pass
+
+        # Models might be loaded in worker threads
+        with cls._lock:
+            self = cls._instances.get(key)
+            if self is None:
+                self = super(Author, cls).__new__(cls)
+                object.__setattr__(self, "_lastname", lastname)
+                object.__setattr__(self, "_firstname", firstname)
+                object.__setattr__(self, "_initials", initials)
+                cls._instances[key] = self
+            return self
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Authors are immutable")
+
+    def __delattr__(self, item):
+        raise AttributeError("Authors are immutable")
+
+    def __reduce__(self):
+        # Unpickled authors are interned as well
+        return Author, tuple(self)
+
+    def __iter__(self):
+        return iter((self._lastname, self._firstname, self._initials))
+
+    def __eq__(self, other):
+        if isinstance(other, Author):
+            return self is other
+        elif isinstance(other, tuple):
+            return tuple(self) == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    @property
+    def lastname(self):
+        return self._lastname
+
+    @property
+    def firstname(self):
+        return self._firstname
+
+    @property
+    def initials(self):
+        return self._initials
+
+    def __repr__(self):
+        return "Author(lastname={0!r}, firstname={1!r}, initials={2!r})".format(self._lastname, self._firstname,
+                                                                               self._initials)
 
     @property
     def display_str(self):
@@ -1,3 +1,4 @@
+import pickle
 import pytest
 from GEMEditor.model.classes.annotation import Annotation
 
@@ -23,14 +24,17 @@ class TestAnnotation:
         """ Test that annotations containing the same information
         return the same value by __hash__()"""
 
-        assert self.annotation1 is not self.annotation2
         assert self.annotation1.__hash__() == self.annotation2.__hash__()
         assert self.annotation1.__hash__() != self.empty_annotation.__hash__()
 
     def test_annotation_eq1(self):
         """ Test equality of annotations """
         assert self.annotation1 == self.annotation2
-        assert self.annotation1 is not self.annotation2
+
+    def test_annotations_are_interned(self):
+        """ Test that equal annotations share one object """
+        assert self.annotation1 is self.annotation2
+        assert Annotation("test_collection", "test_id", "has") is not self.annotation1
 
     def test_annotation_eq2(self):
         """ Test not equality if type is different """
@@ -58,4 +62,12 @@ class TestAnnotation:
         with pytest.raises(AttributeError):
             self.annotation1.collection = "test"
         with pytest.raises(AttributeError):
-            self.annotation1.identifier = "bla"
\ No newline at end of file
+            self.annotation1.identifier = "bla"
+
+    def test_no_instance_dict(self):
+        with pytest.raises(AttributeError):
+            self.annotation1.new_attribute = "test"
+        assert not hasattr(self.annotation1, "__dict__")
+
+    def test_pickled_annotation_is_interned(self):
+        assert pickle.loads(pickle.dumps(self.annotation1)) is self.annotation1
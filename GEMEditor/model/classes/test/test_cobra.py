@@ -1,6 +1,7 @@
 import gc
 
 import pytest
+from unittest.mock import Mock
 from GEMEditor.model.classes.cobra import Reaction, GeneGroup, Gene, Model, prune_gene_tree, Metabolite, CleaningDict, Compartment
 from GEMEditor.model.classes.modeltest import ModelTest, ReactionSetting, GeneSetting, Outcome
 from GEMEditor.model.classes.reference import Reference
@@ -1405,3 +1406,72 @@ class TestModelAddItems:
         assert metabolite in model.metabolites
         assert metabolite in model.QtMetaboliteTable.get_items()
         assert "c" in model.gem_compartments
+
+
+class TestModelDirtySections:
+
+    def test_new_model_is_dirty(self):
+        model = Model()
+        assert model.dirty_sections == set(["compartments", "metabolites", "genes", "reactions",
+                                            "references", "tests", "evidences"])
+
+    def test_mark_dependent_sections(self):
+        model = Model()
+        model.mark_sections_clean(*model.dirty_sections)
+
+        model.mark_sections_dirty("genes")
+        assert model.dirty_sections == set(["genes", "reactions", "tests", "evidences"])
+
+    def test_table_change_marks_section(self):
+        model = Model()
+        model.mark_sections_clean(*model.dirty_sections)
+
+        model.QtReferenceTable.update_row_from_item(Reference())
+        assert model.dirty_sections == set(["references", "tests", "evidences"])
+
+
+class TestModelChangedItems:
+
+    @pytest.fixture(autouse=True)
+    def setup_model(self):
+        self.model = Model()
+        self.reaction1 = Reaction("r1")
+        self.reaction2 = Reaction("r2")
+        self.model.add_reactions((self.reaction1, self.reaction2))
+        self.model.setup_reaction_table()
+
+    def test_populated_table_marks_all_items(self):
+        assert self.model.changed_items == set([self.reaction1, self.reaction2])
+
+    def test_updated_row_marks_item(self):
+        self.model.changed_items.clear()
+        self.reaction2.upper_bound = 5.
+        self.model.QtReactionTable.update_row_from_link(1)
+        assert self.model.changed_items == set([self.reaction2])
+
+    def test_added_row_marks_item(self):
+        self.model.changed_items.clear()
+        gene = Gene("g1")
+        self.model.QtGeneTable.update_row_from_item(gene)
+        assert self.model.changed_items == set([gene])
+
+    def test_removed_row_marks_item(self):
+        self.model.changed_items.clear()
+        self.model.gem_remove_reactions([self.reaction1])
+        assert self.model.changed_items == set([self.reaction1])
+
+    def test_updated_reactions_marked_with_blocked_signals(self):
+        self.model.changed_items.clear()
+        self.model.QtReactionTable.all_data_changed = Mock()
+        self.model.gem_update_reactions([self.reaction2])
+        assert self.model.changed_items == set([self.reaction2])
+
+    def test_updated_metabolites_marked_with_blocked_signals(self):
+        metabolite = Metabolite("m1")
+        self.model.add_metabolites([metabolite])
+        self.model.setup_metabolite_table()
+        self.model.changed_items.clear()
+        self.model.QtMetaboliteTable.all_data_changed = Mock()
+        self.model.QtReactionTable.all_data_changed = Mock()
+        self.model.gem_update_metabolites([metabolite])
+        assert metabolite in self.model.changed_items
@@ -1,3 +1,5 @@
+import gc
+import pickle
 import pytest
 from GEMEditor.model.classes.reference import Reference, Author
 from GEMEditor.model.classes.annotation import Annotation
@@ -74,4 +76,27 @@ class TestAuthor:
     def test_author_str(self):
         """ Check author_str property returns the proper value"""
         assert Author(lastname="Last", initials="P", firstname="").display_str == "Last P"
-        assert Author("Last", "", "").display_str == "Last"
\ No newline at end of file
+        assert Author("Last", "", "").display_str == "Last"
+    def test_authors_are_interned(self):
+        assert Author("Last", "First", "F") is Author(lastname="Last", firstname="First", initials="F")
+        assert Author("Last", "First", "F") is not Author("Last", "First", "")
+
+    def test_authors_are_immutable(self):
+        with pytest.raises(AttributeError):
+            Author("Last", "First", "F").lastname = "Other"
+
+    def test_unused_authors_are_released(self):
+        Author("Unused", "Author", "UA")
+        gc.collect()
+        assert ("Unused", "Author", "UA") not in Author._instances
+
+    def test_pickled_author_is_interned(self):
+        author = Author("Last", "First", "F")
+        assert pickle.loads(pickle.dumps(author)) is author
+
+    def test_author_equals_tuple(self):
+        author = Author("Last", "First", "F")
+        assert author == ("Last", "First", "F")
+        assert author != ("Last", "First", "")
+        assert hash(author) == hash(("Last", "First", "F"))
+        assert tuple(author) == ("Last", "First", "F")
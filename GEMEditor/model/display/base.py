@@ -152,6 +152,8 @@ class EvidenceDisplayWidget(TableDisplayWidget, Ui_TableDisplayWidgetAddDel):
             evidence.setup_links()
             self.model.all_evidences[evidence.internal_id] = evidence
 
+        self.model.mark_sections_dirty("evidences")
+
 
 class CommentDisplayWidget(QWidget, Ui_CommentDisplayWidget):
 
@@ -1,5 +1,5 @@
 import string
-from GEMEditor.base.classes import ProgressDialog
+from GEMEditor.base.dialogs import ProgressDialog
 from GEMEditor.model.display.ui.MetaboliteAttributeDisplayWidget import \
     Ui_MetaboliteAttributeDisplayWidget as Ui_MetAttribs
 from GEMEditor.model.display.ui.ReactionsDisplayWidget import Ui_ReactionsDisplayWidget
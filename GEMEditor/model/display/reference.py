@@ -83,3 +83,6 @@ class ReferenceDisplayWidget(QWidget, Ui_SettingsDisplayWidget):
         # Set new references
         for x in self.dataTable.get_items():
             self.item.add_reference(x)
+
+        if self.model is not None:
+            self.model.mark_sections_dirty("references")
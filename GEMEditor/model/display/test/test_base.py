@@ -7,6 +7,7 @@ from GEMEditor.model.classes.reference import Reference
 from GEMEditor.model.classes.evidence import Evidence
 from GEMEditor.model.display.base import AnnotationDisplayWidget, CommentDisplayWidget, EvidenceDisplayWidget
 from GEMEditor.model.display.test.fixture import MockSlot
+from GEMEditor.rw.sbml3 import write_sbml3_model, read_sbml3_model
 from PyQt5 import QtTest, QtCore
 from PyQt5.QtWidgets import QWidget
 
@@ -312,3 +313,26 @@ class TestEvidenceDisplayWidget:
         # Check that new evidence is linked properly
         assert new_evidence in reaction.evidences
         assert new_evidence.internal_id in model.all_evidences
+
+    @pytest.mark.usefixtures("patch_dialog_accepted")
+    def test_edited_evidence_is_saved(self, tmpdir):
+        model = Model("model")
+        reaction = Reaction("r1")
+        model.add_reactions([reaction])
+        model.add_evidence(Evidence(entity=reaction, assertion="Catalyzed by", comment="old"))
+
+        # Store the output of all sections
+        path = str(tmpdir.join("model.xml"))
+        write_sbml3_model(path, model, incremental=True)
+        assert "evidences" not in model.dirty_sections
+
+        widget = EvidenceDisplayWidget()
+        widget.set_item(reaction, model)
+        widget.dataView.selectRow(0)
+        widget.dataTable.item(0).link.comment = "new"
+        widget.edit_item()
+        widget.save_state()
+
+        write_sbml3_model(path, model, incremental=True)
+        evidences = list(read_sbml3_model(path, None).all_evidences.values())
+        assert [x.comment for x in evidences] == ["new"]
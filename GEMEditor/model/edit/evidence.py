@@ -298,7 +298,7 @@ class BatchEvidenceDialog(CustomStandardDialog, Ui_BatchEvidenceDialog):
                 evidence.add_reference(reference)
 
             # Add evidence to model
-            self.model.all_evidences[evidence.internal_id] = evidence
+            self.model.add_evidence(evidence)
 
         if genes_added:
             QMessageBox(self).information(self, "Genes added", "{} new genes added!".format(str(genes_added)))
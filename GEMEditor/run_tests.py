@@ -0,0 +1,188 @@
+""" Run the test cases of a model without user interface
+
+The model is read from an sbml file with GEMEditor extensions and
+all test cases are run in worker processes, or in the main process
+if a single process is used. The results are written
+as JUnit XML and JSON reports, e.g. for the continuous integration of
+curated models. No PyQt widgets are imported. The tables of the model
+need a QGuiApplication, which uses the offscreen platform unless
+QT_QPA_PLATFORM is set.
+
+The exit code is 0 if all test cases passed and 1 otherwise.
+
+Usage:
+    python -m GEMEditor.run_tests model.xml [--junit report.xml] [--json report.json] [--processes 4]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import namedtuple
+import lxml.etree as ET
+from PyQt5.QtGui import QGuiApplication
+from GEMEditor import log_package_versions
+from GEMEditor.analysis.model_test import parallel_run_tests, warm_start_run_tests
+from GEMEditor.rw.sbml3 import read_sbml3_model
+from GEMEditor.solution.base import fluxes_from_solution
+
+
+ModelTestResult = namedtuple("ModelTestResult", ["testcase", "passed", "solution", "duration"])
+
+
+def run_model_tests(model, processes=None):
+    """ Run all test cases of the model
+
+    Parameters
+    ----------
+    model: GEMEditor.model.classes.Model,
+    processes: int
+        Number of worker processes, defaults to the number of cpus
+
+    Returns
+    -------
+    results: list,
+        ModelTestResult of every testcase in the order of the model
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    timings = dict()
+    if processes > 1:
+        results = parallel_run_tests(model.tests, model, None, processes=processes, timings=timings)
+    else:
+        # Starting a worker process does not pay off for a single process
+        results = warm_start_run_tests(model.tests, model, None, timings=timings)
+    return [ModelTestResult(x, results[x][0], results[x][1], timings[x]) for x in model.tests]
+
+
+def get_failure_message(result):
+    """ Describe why a testcase failed
+
+    Parameters
+    ----------
+    result: ModelTestResult
+
+    Returns
+    -------
+    message: str
+    """
+    solution = result.solution
+    if solution is None or solution.status != "optimal":
+        return "Solver status: {0!s}".format(getattr(solution, "status", None))
+
+    fluxes = fluxes_from_solution(solution)
+    failed = ["{0} {1} {2!s}, flux {3!s}".format(x.reaction.id, x.operator, x.value, fluxes[x.reaction.id])
+              for x in result.testcase.outcomes if not x.check(fluxes)]
+    return "; ".join(failed) or "No outcomes"
+
+
+def get_test_name(testcase):
+    return testcase.description or testcase.id
+
+
+def write_junit_report(path, model, results, duration):
+    """ Write the results as JUnit XML
+
+    Parameters
+    ----------
+    path: str
+    model: GEMEditor.model.classes.Model,
+    results: list,
+        ModelTestResult of the testcases
+    duration: float,
+        Time in seconds spent running the tests
+
+    Returns
+    -------
+    None
+    """
+    failures = [x for x in results if not x.passed]
+    root = ET.Element("testsuites", tests=str(len(results)), failures=str(len(failures)),
+                      errors="0", time="{0:.6f}".format(duration))
+    suite = ET.SubElement(root, "testsuite", name=str(model.id), tests=str(len(results)),
+                          failures=str(len(failures)), errors="0", time="{0:.6f}".format(duration))
+    for result in results:
+        element = ET.SubElement(suite, "testcase", classname=str(model.id), name=get_test_name(result.testcase),
+                                time="{0:.6f}".format(result.duration))
+        if not result.passed:
+            ET.SubElement(element, "failure", message=get_failure_message(result))
+    ET.ElementTree(root).write(path, encoding="UTF-8", xml_declaration=True, pretty_print=True)
+
+
+def write_json_report(path, model, results, durations):
+    """ Write the results and timings as JSON
+
+    Parameters
+    ----------
+    path: str
+    model: GEMEditor.model.classes.Model,
+    results: list,
+        ModelTestResult of the testcases
+    durations: dict,
+        Time in seconds spent on loading the model and running the tests
+
+    Returns
+    -------
+    None
+    """
+    report = {"model": model.id,
+              "tests": len(results),
+              "passed": sum(x.passed for x in results),
+              "failed": sum(not x.passed for x in results),
+              "durations": durations,
+              "results": [{"id": x.testcase.id,
+                           "name": get_test_name(x.testcase),
+                           "passed": x.passed,
+                           "status": getattr(x.solution, "status", None),
+                           "objective_value": getattr(x.solution, "objective_value", None),
+                           "duration": x.duration,
+                           "message": None if x.passed else get_failure_message(x)} for x in results]}
+    with open(path, "w", encoding="UTF-8") as open_file:
+        json.dump(report, open_file, indent=2)
+
+
+def main(args=None):
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument("path", help="Path to the sbml model")
+    argparser.add_argument("--junit", help="Path of the JUnit XML report")
+    argparser.add_argument("--json", help="Path of the JSON report")
+    argparser.add_argument("--processes", type=int, default=None,
+                           help="Number of worker processes, defaults to the number of cpus")
+    argparser.add_argument("--debug", action='store_true')
+    arguments = argparser.parse_args(args)
+
+    if arguments.debug:
+        log_package_versions()
+    else:
+        logging.disable(logging.DEBUG)
+
+    # The tables of the model need an application
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+
+    start = time.perf_counter()
+    model = read_sbml3_model(arguments.path, None)
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = run_model_tests(model, arguments.processes)
+    run_time = time.perf_counter() - start
+
+    if arguments.junit:
+        write_junit_report(arguments.junit, model, results, run_time)
+    if arguments.json:
+        write_json_report(arguments.json, model, results, {"load": load_time, "run": run_time})
+
+    num_passed = sum(x.passed for x in results)
+    for result in results:
+        if not result.passed:
+            print("FAILED {0}: {1}".format(get_test_name(result.testcase), get_failure_message(result)))
+    print("{0!s} out of {1!s} tests passed in {2:.2f}s".format(num_passed, len(results), run_time))
+    return 0 if num_passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
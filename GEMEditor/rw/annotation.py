@@ -1,3 +1,4 @@
+import re
 from warnings import warn
 
 from GEMEditor.model.classes.annotation import Annotation
@@ -6,14 +7,38 @@ from lxml.etree import SubElement
 from six.moves.urllib.parse import urlsplit
 
 
+# Fast path for the common form http://identifiers.org/collection/identifier
+miriam_pattern = re.compile(r"https?://identifiers\.org/([^/?#]+)/([^?#]+)\Z")
+miriam_format = "http://identifiers.org/{0}/{1}".format
+
+
+def sorted_annotations(annotations):
+    """ Sort annotations by collection and identifier
+
+    Annotations compare by identity, so sets of annotations
+    iterate in an arbitrary order. Serialized annotations are
+    sorted in order to get the same output for the same model.
+
+    Parameters
+    ----------
+    annotations: iterable
+
+    Returns
+    -------
+    list
+    """
+    return sorted(annotations, key=lambda x: (x.collection or "", x.identifier or "", x.type or ""))
+
+
 def annotate_xml_from_model(node, element):
     """ Write the annotation from the model to the xml tree """
 
     if not element.annotation:
         return
 
-    is_annotations = [x for x in element.annotation if x.type == "is"]
-    has_annotations = [x for x in element.annotation if x.type == "has"]
+    annotations = sorted_annotations(element.annotation)
+    is_annotations = [x for x in annotations if x.type == "is"]
+    has_annotations = [x for x in annotations if x.type == "has"]
 
     annotation_node = add_rdf_annotation(node, element)
 
@@ -42,8 +67,7 @@ def add_miriam(bag, annotation):
     """ Add mmiriam annotation to node """
 
     if annotation.collection and annotation.identifier:
-        SubElement(bag, rdf_li, attrib={rdf_resource: "http://identifiers.org/{0}/{1}".format(annotation.collection,
-                                                                                              annotation.identifier)})
+        SubElement(bag, rdf_li, attrib={rdf_resource: miriam_format(annotation.collection, annotation.identifier)})
 
 
 def add_qbiol_bag(node, bag_tag):
@@ -102,6 +126,10 @@ def add_annotations(node, element, type):
 def parse_miriam_string(miriam_link, type):
     """ Parse the miriam annotation contained in node """
 
+    match = miriam_pattern.match(miriam_link)
+    if match is not None:
+        return Annotation(match.group(1), match.group(2), type)
+
     split_url = urlsplit(miriam_link)
     # Remove leading slash and split path in collection and identifier
     collection, identifier = split_url.path.lstrip("/").split("/", 1)
@@ -109,3 +137,4 @@ def parse_miriam_string(miriam_link, type):
         raise ValueError("{0} does not start with http://identifiers.org/".format(miriam_link))
     else:
         return Annotation(collection=collection, identifier=identifier, type=type)
+
@@ -1,9 +1,14 @@
+from collections import namedtuple
+
 from GEMEditor.model.classes.cobra import Compartment
 from GEMEditor.rw import *
 from lxml.etree import SubElement
 from six import iteritems
 
 
+CompartmentRecord = namedtuple("CompartmentRecord", ["id", "name"])
+
+
 def add_compartments(model_node, model):
     """ Write the content of the model compartment
     dictionary to the xml file by adding an sbml
@@ -32,10 +37,25 @@ def parse_compartments(model_node, model=None, progress=None):
     compartments = {}
     if compartment_list_node is not None:
         for compartment_node in compartment_list_node.iterfind(sbml3_compartment):
-            compartment = Compartment(id=compartment_node.get("id"),
-                                      name=compartment_node.get("name"))
+            compartment = parse_compartment_node(compartment_node)
             if model is not None:
                 model.gem_compartments[compartment.id] = compartment
             else:
                 compartments[compartment.id] = compartment
     return compartments
+
+
+def parse_compartment_node(compartment_node):
+    """ Parse a single sbml compartment node """
+    return compartment_from_record(compartment_record(compartment_node))
+
+
+def compartment_record(compartment_node):
+    """ Decode a sbml compartment node into a plain record """
+    return CompartmentRecord(id=compartment_node.get("id"),
+                             name=compartment_node.get("name"))
+
+
+def compartment_from_record(record):
+    """ Create a compartment from a record """
+    return Compartment(id=record.id, name=record.name)
@@ -1,7 +1,12 @@
+from collections import namedtuple
+
 from GEMEditor.model.classes.evidence import Evidence
 from GEMEditor.rw import *
-from PyQt5.QtWidgets import QApplication
-from lxml.etree import SubElement
+from lxml.etree import Element, SubElement
+
+
+EvidenceRecord = namedtuple("EvidenceRecord", ["id", "assertion", "comment", "eco", "entity_id", "entity_type",
+                                               "target_id", "target_type", "references"])
 
 
 def add_evidences_to_xml(model_node, model):
@@ -28,23 +33,40 @@ def add_evidences_to_xml(model_node, model):
             if evidence is None:
                 continue
 
-            evidence_node = SubElement(list_of_evidences, ge_evidence,
-                                       attrib={"id": evidence.internal_id,
-                                               "assertion": evidence.assertion,
-                                               "entity_id": evidence.entity.id,
-                                               "entity_type": type(evidence.entity).__name__,
-                                               "eco": evidence.eco})
-            if evidence.comment:
-                evidence_node.set("comment", evidence.comment)
-            if evidence.target:
-                evidence_node.set("target_id", evidence.target.id)
-                evidence_node.set("target_type", type(evidence.target).__name__)
-
-            # Add linked references if present
-            if evidence.references:
-                list_of_reference_links_node = SubElement(evidence_node, ge_listOfReferenceLinks)
-                for reference in evidence.references:
-                    SubElement(list_of_reference_links_node, ge_referenceLink, attrib={"id": reference.id})
+            list_of_evidences.append(evidence_element(evidence))
+
+
+def evidence_element(evidence):
+    """ Create the GEMEditor element of an evidence
+
+    Parameters
+    ----------
+    evidence : GEMEditor.model.classes.evidence.Evidence
+
+    Returns
+    -------
+    lxml.etree.Element
+    """
+
+    evidence_node = Element(ge_evidence,
+                            attrib={"id": evidence.internal_id,
+                                    "assertion": evidence.assertion,
+                                    "entity_id": evidence.entity.id,
+                                    "entity_type": type(evidence.entity).__name__,
+                                    "eco": evidence.eco})
+    if evidence.comment:
+        evidence_node.set("comment", evidence.comment)
+    if evidence.target:
+        evidence_node.set("target_id", evidence.target.id)
+        evidence_node.set("target_type", type(evidence.target).__name__)
+
+    # Add linked references if present
+    if evidence.references:
+        list_of_reference_links_node = SubElement(evidence_node, ge_listOfReferenceLinks)
+        for reference in evidence.references:
+            SubElement(list_of_reference_links_node, ge_referenceLink, attrib={"id": reference.id})
+
+    return evidence_node
 
 
 def parse_evidences_from_xml(model_node, model, progress=None):
@@ -67,33 +89,86 @@ def parse_evidences_from_xml(model_node, model, progress=None):
             pass
         elif not progress.wasCanceled():
             progress.setValue(i)
-            QApplication.processEvents()
         else:
             return
 
-        new_evidence = Evidence(internal_id=evidence_node.get("id"), assertion=evidence_node.get("assertion"),
-                                comment=evidence_node.get("comment"), eco=evidence_node.get("eco"))
+        new_evidence = parse_evidence_node(evidence_node, model)
+        model.all_evidences[new_evidence.internal_id] = new_evidence
+
 
-        entity_id = evidence_node.get("entity_id")
-        entity_type = evidence_node.get("entity_type")
+def parse_evidence_node(evidence_node, model):
+    """ Parse a single GEMEditor evidence node
 
-        entity = get_item_from_model(entity_type, entity_id, model)
-        new_evidence.set_entity(entity)
+    Parameters
+    ----------
+    evidence_node : lxml.etree.Element
+    model : GEMEditor.model.classes.cobra.Model
 
-        # Add target item if present
-        target_id = evidence_node.get("target_id")
-        target_type = evidence_node.get("target_type")
-        if target_id and target_type:
-            target = get_item_from_model(target_type, target_id, model)
-            new_evidence.set_target(target)
+    Returns
+    -------
+    evidence : GEMEditor.model.classes.evidence.Evidence
+    """
+    return evidence_from_record(evidence_record(evidence_node), model)
 
-        # Add all references if present
-        reference_list_node = evidence_node.find(ge_listOfReferenceLinks)
-        if reference_list_node is not None:
-            for refLink_node in reference_list_node.iterfind(ge_referenceLink):
-                new_evidence.add_reference(model.references[refLink_node.get("id")])
 
-        model.all_evidences[new_evidence.internal_id] = new_evidence
+def evidence_record(evidence_node):
+    """ Decode a GEMEditor evidence node into a plain record
+
+    Parameters
+    ----------
+    evidence_node : lxml.etree.Element
+
+    Returns
+    -------
+    record : EvidenceRecord
+    """
+
+    references = []
+    reference_list_node = evidence_node.find(ge_listOfReferenceLinks)
+    if reference_list_node is not None:
+        for refLink_node in reference_list_node.iterfind(ge_referenceLink):
+            references.append(refLink_node.get("id"))
+
+    return EvidenceRecord(id=evidence_node.get("id"),
+                          assertion=evidence_node.get("assertion"),
+                          comment=evidence_node.get("comment"),
+                          eco=evidence_node.get("eco"),
+                          entity_id=evidence_node.get("entity_id"),
+                          entity_type=evidence_node.get("entity_type"),
+                          target_id=evidence_node.get("target_id"),
+                          target_type=evidence_node.get("target_type"),
+                          references=tuple(references))
+
+
+def evidence_from_record(record, model):
+    """ Create an evidence from a record
+
+    Parameters
+    ----------
+    record : EvidenceRecord
+    model : GEMEditor.model.classes.cobra.Model
+
+    Returns
+    -------
+    evidence : GEMEditor.model.classes.evidence.Evidence
+    """
+
+    new_evidence = Evidence(internal_id=record.id, assertion=record.assertion,
+                            comment=record.comment, eco=record.eco)
+
+    entity = get_item_from_model(record.entity_type, record.entity_id, model)
+    new_evidence.set_entity(entity)
+
+    # Add target item if present
+    if record.target_id and record.target_type:
+        target = get_item_from_model(record.target_type, record.target_id, model)
+        new_evidence.set_target(target)
+
+    # Add all references if present
+    for reference_id in record.references:
+        new_evidence.add_reference(model.references[reference_id])
+
+    return new_evidence
 
 
 def get_item_from_model(item_type, item_id, model):
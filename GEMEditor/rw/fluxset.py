@@ -1,8 +1,13 @@
+from collections import namedtuple
+
 from GEMEditor.model.classes.modeltest import ModelTest, ReactionSetting, GeneSetting, Outcome
 from GEMEditor.rw import *
-from PyQt5.QtWidgets import QApplication
 from cobra.io.sbml3 import strnum, clip
-from lxml.etree import SubElement
+from lxml.etree import Element, SubElement
+
+
+ModelTestRecord = namedtuple("ModelTestRecord", ["description", "comment", "reaction_settings", "gene_settings",
+                                                 "outcomes", "references"])
 
 
 def add_tests_to_xml(model_node, model):
@@ -11,40 +16,57 @@ def add_tests_to_xml(model_node, model):
         list_of_tests = SubElement(model_node, ge_listOfTests)
 
         for element in model.QtTestsTable.get_items():
-            test_node = SubElement(list_of_tests, ge_testCase)
-            if element.description:
-                test_node.set("description", element.description)
-            if element.comment:
-                test_node.set("comment", element.comment)
+            list_of_tests.append(modeltest_element(element))
+
+
+def modeltest_element(element):
+    """ Create the GEMEditor element of a test case
+
+    Parameters
+    ----------
+    element: GEMEditor.model.classes.modeltest.ModelTest
+
+    Returns
+    -------
+    lxml.etree.Element
+    """
+
+    test_node = Element(ge_testCase)
+    if element.description:
+        test_node.set("description", element.description)
+    if element.comment:
+        test_node.set("comment", element.comment)
+
+    # Add list of settings
+    list_of_settings_node = SubElement(test_node, ge_listOfSettings)
 
-            # Add list of settings
-            list_of_settings_node = SubElement(test_node, ge_listOfSettings)
+    for setting in element.get_reaction_settings():
+        SubElement(list_of_settings_node, ge_reactionSetting,
+                   attrib={"reactionId": "R_"+setting.reaction.id,
+                           "upperBound": strnum(setting.upper_bound),
+                           "lowerBound": strnum(setting.lower_bound),
+                           "objectiveCoefficient": strnum(setting.objective_coefficient)})
 
-            for setting in element.get_reaction_settings():
-                SubElement(list_of_settings_node, ge_reactionSetting,
-                           attrib={"reactionId": "R_"+setting.reaction.id,
-                                   "upperBound": strnum(setting.upper_bound),
-                                   "lowerBound": strnum(setting.lower_bound),
-                                   "objectiveCoefficient": strnum(setting.objective_coefficient)})
+    for setting in element.get_gene_settings():
+        SubElement(list_of_settings_node, ge_geneSetting,
+                   attrib={"geneId": "G_"+setting.gene.id,
+                           "active": str(setting.activity)})
 
-            for setting in element.get_gene_settings():
-                SubElement(list_of_settings_node, ge_geneSetting,
-                           attrib={"geneId": "G_"+setting.gene.id,
-                                   "active": str(setting.activity)})
+    list_of_outcomes_node = SubElement(test_node, ge_listOfOutcomes)
 
-            list_of_outcomes_node = SubElement(test_node, ge_listOfOutcomes)
+    for outcome in element.outcomes:
+        SubElement(list_of_outcomes_node, ge_outcome,
+                   attrib={"reactionId": "R_"+outcome.reaction.id,
+                           "operator": outcome.operator,
+                           "value": strnum(outcome.value)})
 
-            for outcome in element.outcomes:
-                SubElement(list_of_outcomes_node, ge_outcome,
-                           attrib={"reactionId": "R_"+outcome.reaction.id,
-                                   "operator": outcome.operator,
-                                   "value": strnum(outcome.value)})
+    if element.references:
 
-            if element.references:
+        list_of_reference_links_node = SubElement(test_node, ge_listOfReferenceLinks)
+        for reference in element.references:
+            SubElement(list_of_reference_links_node, ge_referenceLink, attrib={"id": reference.id})
 
-                list_of_reference_links_node = SubElement(test_node, ge_listOfReferenceLinks)
-                for reference in element.references:
-                    SubElement(list_of_reference_links_node, ge_referenceLink, attrib={"id": reference.id})
+    return test_node
 
 
 def parse_test_from_xml(model_node, model, progress=None):
@@ -67,48 +89,116 @@ def parse_test_from_xml(model_node, model, progress=None):
             pass
         elif not progress.wasCanceled():
             progress.setValue(i)
-            QApplication.processEvents()
         else:
             return
 
-        new_test = ModelTest(description=test_node.get("description"), comment=test_node.get("comment"))
-
-        settings_list_node = test_node.find(ge_listOfSettings)
-        outcomes_list_node = test_node.find(ge_listOfOutcomes)
-        reference_list_node = test_node.find(ge_listOfReferenceLinks)
-
-        # Add settings
-        if settings_list_node is not None:
-            for setting_node in settings_list_node.iterfind(ge_reactionSetting):
-                reaction = model.reactions.get_by_id(clip(setting_node.get("reactionId"), "R_"))
-                new_setting = ReactionSetting(reaction=reaction,
-                                              upper_bound=float(setting_node.get("upperBound")),
-                                              lower_bound=float(setting_node.get("lowerBound")),
-                                              objective_coefficient=float(setting_node.get("objectiveCoefficient")))
-                new_test.add_setting(new_setting)
-            for gene_setting_node in settings_list_node.iterfind(ge_geneSetting):
-                gene = model.genes.get_by_id(clip(gene_setting_node.get("geneId"), "G_"))
-                new_setting = GeneSetting(gene)
-                if gene_setting_node.get("active") == "True":
-                    new_setting.activity = True
-                elif gene_setting_node.get("active") == "False":
-                    new_setting.activity = False
-                else:
-                    raise ValueError("Unexpected value for activity in gene setting.")
-                new_test.add_setting(new_setting)
-
-        # Add outcomes
-        if outcomes_list_node is not None:
-            for outcome_node in outcomes_list_node.iterfind(ge_outcome):
-                reaction = model.reactions.get_by_id(clip(outcome_node.get("reactionId"), "R_"))
-                new_outcome = Outcome(reaction=reaction,
-                                      value=float(outcome_node.get("value")),
-                                      operator=outcome_node.get("operator"))
-                new_test.add_outcome(new_outcome)
-
-        # Add references
-        if reference_list_node is not None:
-            for refLink_node in reference_list_node.iterfind(ge_referenceLink):
-                new_test.add_reference(model.references[refLink_node.get("id")])
-
-        model.tests.append(new_test)
+        model.tests.append(parse_test_node(test_node, model))
+
+
+def parse_test_node(test_node, model):
+    """ Parse a single GEMEditor testCase node
+
+    The reactions, genes and references linked
+    in the test are looked up in the model.
+
+    Parameters
+    ----------
+    test_node: lxml.etree.Element
+    model: GEMEditor.model.classes.cobra.Model
+
+    Returns
+    -------
+    ModelTest
+    """
+    return modeltest_from_record(modeltest_record(test_node), model)
+
+
+def modeltest_record(test_node):
+    """ Decode a GEMEditor testCase node into a plain record
+
+    Parameters
+    ----------
+    test_node: lxml.etree.Element
+
+    Returns
+    -------
+    ModelTestRecord
+    """
+
+    reaction_settings, gene_settings, outcomes, references = [], [], [], []
+
+    settings_list_node = test_node.find(ge_listOfSettings)
+    outcomes_list_node = test_node.find(ge_listOfOutcomes)
+    reference_list_node = test_node.find(ge_listOfReferenceLinks)
+
+    # Collect settings
+    if settings_list_node is not None:
+        for setting_node in settings_list_node.iterfind(ge_reactionSetting):
+            reaction_settings.append((clip(setting_node.get("reactionId"), "R_"),
+                                      float(setting_node.get("upperBound")),
+                                      float(setting_node.get("lowerBound")),
+                                      float(setting_node.get("objectiveCoefficient"))))
+        for gene_setting_node in settings_list_node.iterfind(ge_geneSetting):
+            if gene_setting_node.get("active") == "True":
+                activity = True
+            elif gene_setting_node.get("active") == "False":
+                activity = False
+            else:
+                raise ValueError("Unexpected value for activity in gene setting.")
+            gene_settings.append((clip(gene_setting_node.get("geneId"), "G_"), activity))
+
+    # Collect outcomes
+    if outcomes_list_node is not None:
+        for outcome_node in outcomes_list_node.iterfind(ge_outcome):
+            outcomes.append((clip(outcome_node.get("reactionId"), "R_"),
+                             float(outcome_node.get("value")),
+                             outcome_node.get("operator")))
+
+    # Collect references
+    if reference_list_node is not None:
+        for refLink_node in reference_list_node.iterfind(ge_referenceLink):
+            references.append(refLink_node.get("id"))
+
+    return ModelTestRecord(description=test_node.get("description"),
+                           comment=test_node.get("comment"),
+                           reaction_settings=tuple(reaction_settings),
+                           gene_settings=tuple(gene_settings),
+                           outcomes=tuple(outcomes),
+                           references=tuple(references))
+
+
+def modeltest_from_record(record, model):
+    """ Create a test case from a record
+
+    Parameters
+    ----------
+    record: ModelTestRecord
+    model: GEMEditor.model.classes.cobra.Model
+
+    Returns
+    -------
+    ModelTest
+    """
+
+    new_test = ModelTest(description=record.description, comment=record.comment)
+
+    # Add settings
+    for reaction_id, upper_bound, lower_bound, objective_coefficient in record.reaction_settings:
+        new_test.add_setting(ReactionSetting(reaction=model.reactions.get_by_id(reaction_id),
+                                             upper_bound=upper_bound,
+                                             lower_bound=lower_bound,
+                                             objective_coefficient=objective_coefficient))
+    for gene_id, activity in record.gene_settings:
+        new_test.add_setting(GeneSetting(model.genes.get_by_id(gene_id), activity))
+
+    # Add outcomes
+    for reaction_id, value, operator in record.outcomes:
+        new_test.add_outcome(Outcome(reaction=model.reactions.get_by_id(reaction_id),
+                                     value=value,
+                                     operator=operator))
+
+    # Add references
+    for reference_id in record.references:
+        new_test.add_reference(model.references[reference_id])
+
+    return new_test
@@ -1,9 +1,8 @@
 from GEMEditor.model.classes.cobra import Gene
 from GEMEditor.rw import *
 from GEMEditor.rw.annotation import annotate_xml_from_model
-from PyQt5.QtWidgets import QApplication
 from cobra.io.sbml3 import SBML_DOT, clip
-from lxml.etree import SubElement
+from lxml.etree import Element, SubElement
 
 
 def add_genes(model_node, model):
@@ -11,15 +10,31 @@ def add_genes(model_node, model):
     if len(model.genes) > 0:
         genes_list_node = SubElement(model_node, fbc_listOfGeneProducts)
         for gene in model.genes:
-            gene_id = gene.id.replace(".", SBML_DOT)
-            gene_node = SubElement(genes_list_node, fbc_geneProduct,
-                                   attrib={fbc_id: cobra_gene_prefix + gene_id,
-                                           fbc_label: gene_id,
-                                           fbc_name: gene.name or gene.id})
-            if gene.genome:
-                gene_node.set(ge_genome, gene.genome)
+            genes_list_node.append(gene_element(gene))
 
-            annotate_xml_from_model(gene_node, gene)
+
+def gene_element(gene):
+    """ Create the fbc gene product element of a gene
+
+    Parameters
+    ----------
+    gene: GEMEditor.model.classes.cobra.Gene
+
+    Returns
+    -------
+    lxml.etree.Element
+    """
+
+    gene_id = gene.id.replace(".", SBML_DOT)
+    gene_node = Element(fbc_geneProduct,
+                        attrib={fbc_id: cobra_gene_prefix + gene_id,
+                                fbc_label: gene_id,
+                                fbc_name: gene.name or gene.id})
+    if gene.genome:
+        gene_node.set(ge_genome, gene.genome)
+
+    annotate_xml_from_model(gene_node, gene)
+    return gene_node
 
 
 def parse_genes(model_node, model=None, progress=None):
@@ -43,13 +58,10 @@ def parse_genes(model_node, model=None, progress=None):
             pass
         elif not progress.wasCanceled():
             progress.setValue(i)
-            QApplication.processEvents()
         else:
             return
 
-        new_gene = Gene(id=clip(gene_node.get(fbc_id), cobra_gene_prefix).replace(SBML_DOT, "."),
-                        name=gene_node.get(fbc_name),
-                        genome=gene_node.get(ge_genome))
+        new_gene = parse_gene_node(gene_node)
 
         if model is not None:
             model.add_gene(new_gene)
@@ -57,3 +69,19 @@ def parse_genes(model_node, model=None, progress=None):
             genes.append(new_gene)
 
     return genes
+
+
+def parse_gene_node(gene_node):
+    """ Parse a single fbc geneProduct node
+
+    Parameters
+    ----------
+    gene_node: lxml.etree.Element
+
+    Returns
+    -------
+    Gene
+    """
+    return Gene(id=clip(gene_node.get(fbc_id), cobra_gene_prefix).replace(SBML_DOT, "."),
+                name=gene_node.get(fbc_name),
+                genome=gene_node.get(ge_genome))
@@ -4,36 +4,52 @@ from GEMEditor import formula_validator
 from GEMEditor.model.classes.cobra import Metabolite
 from GEMEditor.rw import *
 from GEMEditor.rw.annotation import annotate_xml_from_model, annotate_element_from_xml
-from PyQt5.QtWidgets import QApplication
 from cobra.io.sbml3 import clip
-from lxml.etree import SubElement
+from lxml.etree import Element, SubElement
 
 
 def add_metabolites(model_node, model, use_fbc=True):
     # add in metabolites
     species_list = SubElement(model_node, sbml3_listOfSpecies)
     for met in model.metabolites:
-        metabolite_node = SubElement(species_list, sbml3_species,
-                             attrib={"id": "M_" + met.id,
-                                     "constant": "false",
-                                     "boundaryCondition": "false",
-                                     "hasOnlySubstanceUnits": "false"})
+        species_list.append(metabolite_element(met, use_fbc))
 
-        # Add optional attributes
-        if met.name:
-            metabolite_node.set("name", met.name)
-        if met.compartment:
-            metabolite_node.set("compartment", met.compartment)
 
-        # Set fbc specific attributes
-        if use_fbc:
-            if met.charge != 0:
-                metabolite_node.set(fbc_charge, str(met.charge))
-            if met.formula:
-                metabolite_node.set(fbc_chemicalFormula, met.formula)
+def metabolite_element(met, use_fbc=True):
+    """ Create the species element of a metabolite
 
-        # Add the annotation
-        annotate_xml_from_model(metabolite_node, met)
+    Parameters
+    ----------
+    met: GEMEditor.model.classes.cobra.Metabolite
+    use_fbc: bool
+
+    Returns
+    -------
+    lxml.etree.Element
+    """
+
+    metabolite_node = Element(sbml3_species,
+                              attrib={"id": "M_" + met.id,
+                                      "constant": "false",
+                                      "boundaryCondition": "false",
+                                      "hasOnlySubstanceUnits": "false"})
+
+    # Add optional attributes
+    if met.name:
+        metabolite_node.set("name", met.name)
+    if met.compartment:
+        metabolite_node.set("compartment", met.compartment)
+
+    # Set fbc specific attributes
+    if use_fbc:
+        if met.charge != 0:
+            metabolite_node.set(fbc_charge, str(met.charge))
+        if met.formula:
+            metabolite_node.set(fbc_chemicalFormula, met.formula)
+
+    # Add the annotation
+    annotate_xml_from_model(metabolite_node, met)
+    return metabolite_node
 
 
 def parse_metabolites(metabolites_node, model=None, progress=None, use_fbc=True):
@@ -57,33 +73,48 @@ def parse_metabolites(metabolites_node, model=None, progress=None, use_fbc=True)
             pass
         elif not progress.wasCanceled():
             progress.setValue(i)
-            QApplication.processEvents()
         else:
             return
 
-        new_metabolite = Metabolite(id=clip(xml_element.get("id"), "M_"),
-                                    name=xml_element.get("name"),
-                                    compartment=xml_element.get("compartment"))
+        metabolites.append(parse_metabolite_node(xml_element, use_fbc))
+
+    if model is not None:
+        model.add_metabolites(metabolites)
+
+    return metabolites
 
-        if use_fbc:
-            formula = xml_element.get(fbc_chemicalFormula)
-            if formula:
-                if re.match(formula_validator, formula):
-                    new_metabolite.formula = formula
-                else:
-                    # Todo: Implement logging of errors
-                    print("Formula '{}' for {} is invalid!".format(formula, new_metabolite.id))
 
-            charge = xml_element.get(fbc_charge)
-            if charge is not None:
-                new_metabolite.charge = int(charge)
-            # Defaults to the standard value of 0 if charge not set in file
+def parse_metabolite_node(xml_element, use_fbc=True):
+    """ Parse a single sbml species node
 
-        annotate_element_from_xml(xml_element, new_metabolite)
+    Parameters
+    ----------
+    xml_element: lxml.etree.Element
+    use_fbc: bool
 
-        metabolites.append(new_metabolite)
+    Returns
+    -------
+    Metabolite
+    """
 
-    if model is not None:
-        model.add_metabolites(metabolites)
+    new_metabolite = Metabolite(id=clip(xml_element.get("id"), "M_"),
+                                name=xml_element.get("name"),
+                                compartment=xml_element.get("compartment"))
 
-    return metabolites
+    if use_fbc:
+        formula = xml_element.get(fbc_chemicalFormula)
+        if formula:
+            if re.match(formula_validator, formula):
+                new_metabolite.formula = formula
+            else:
+                # Todo: Implement logging of errors
+                print("Formula '{}' for {} is invalid!".format(formula, new_metabolite.id))
+
+        charge = xml_element.get(fbc_charge)
+        if charge is not None:
+            new_metabolite.charge = int(charge)
+        # Defaults to the standard value of 0 if charge not set in file
+
+    annotate_element_from_xml(xml_element, new_metabolite)
+
+    return new_metabolite
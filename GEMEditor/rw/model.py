@@ -1,4 +1,4 @@
-from GEMEditor.model.classes.cobra import Model
+from GEMEditor.model.classes.cobra import Model, Compartment
 from GEMEditor.rw import *
 from lxml.etree import SubElement
 
@@ -20,10 +20,23 @@ def parse_sbml3_model(sbml_node):
     if sbml_node is not None:
         model_node = sbml_node.find(sbml3_model)
         if model_node is not None:
-            model = Model(id_or_model=model_node.get("id"),
-                          name=model_node.get("name"))
-
-            return model_node, model
+            return model_node, parse_model_node(model_node)
     return None
 
 
+def parse_model_node(model_node):
+    """ Create an empty model from the attributes of the model node """
+    return Model(id_or_model=model_node.get("id"),
+                 name=model_node.get("name"))
+
+
+def finalize_model(model):
+    """ Complete the model after all items have been parsed """
+
+    # Add compartments from metabolites if not saved
+    for x in model.metabolites:
+        if x.compartment not in model.gem_compartments:
+            model.gem_compartments[x.compartment] = Compartment(x.compartment, None)
+
+    model.setup_tables()
+    return model
@@ -1,7 +1,12 @@
 import logging
-from PyQt5 import QtWidgets, QtGui
-from GEMEditor.base.classes import ProgressDialog
+import os
+import threading
+from GEMEditor import RW_STREAMING_MIN_SIZE, PROGRESS_MAX_RATE
+from PyQt5 import QtCore, QtWidgets, QtGui
+from GEMEditor.base.classes import ProgressReporter
+from GEMEditor.base.dialogs import ProgressDialog
 from GEMEditor.rw.sbml3 import read_sbml3_model
+from GEMEditor.rw.snapshot import read_snapshot
 from GEMEditor.rw.ui import Ui_ParserErrorDialog
 
 
@@ -76,19 +81,34 @@ class BaseParser:
     def _parse_file(self, path, progress):
         raise NotImplementedError
 
-    def parse(self):
+    def parse(self, progress=None):
         """ Parse model from path
+
+        Parameters
+        ----------
+        progress: QProgressDialog or WorkerProgress, optional
+            Progress used while parsing. A progress dialog is
+            shown if no progress is passed.
+
+        Returns
+        -------
+        model: GEMEditor.model.classes.cobra.Model or None
         """
         LOGGER.debug("Parsing model: '{0!s}'".format(self.path))
-        with ProgressDialog(title="Loading model..") as progress:
-            try:
-                model = self._parse_file(self.path, progress)
-            except:
-                import traceback
-                self._errors.append(str(traceback.format_exc()))
-                return None
-            else:
-                return model
+        if progress is None:
+            with ProgressDialog(title="Loading model..") as progress:
+                return self._parse_with_progress(progress)
+        return self._parse_with_progress(progress)
+
+    def _parse_with_progress(self, progress):
+        try:
+            model = self._parse_file(self.path, progress)
+        except:
+            import traceback
+            self._errors.append(str(traceback.format_exc()))
+            return None
+        else:
+            return model
 
     @property
     def errors(self):
@@ -116,4 +136,114 @@ class SBMLParser(BaseParser):
         super(SBMLParser, self).__init__(*args)
 
     def _parse_file(self, path, progress):
-        return read_sbml3_model(path, progress)
+        # Use the snapshot written on saving if the file is unchanged
+        model = read_snapshot(path, progress)
+        if model is not None:
+            return model
+
+        # Parse large files incrementally to limit memory usage
+        streaming = os.path.getsize(path) >= RW_STREAMING_MIN_SIZE
+        return read_sbml3_model(path, progress, streaming=streaming)
+
+
+class LoaderSignals(QtCore.QObject):
+    """ Container for signals
+
+    QRunnable is not derived from QObject
+    and therefore can not have signals
+
+    """
+
+    labelChanged = QtCore.pyqtSignal(str)
+    rangeChanged = QtCore.pyqtSignal(int, int)
+    valueChanged = QtCore.pyqtSignal(int)
+    finished = QtCore.pyqtSignal(object)
+
+    def __init__(self):
+        super(LoaderSignals, self).__init__()
+
+
+class WorkerProgress(ProgressReporter):
+    """ Progress of a parser running in a worker thread
+
+    Stands in for the progress dialog within the worker and
+    forwards the progress to the GUI thread via signals. The
+    parse functions report every item, but the value is only
+    forwarded at most max_rate times per second.
+
+    Parameters
+    ----------
+    signals: LoaderSignals
+        Signals used to report the progress
+    max_rate: int
+        Maximum number of value updates per second
+
+    """
+
+    def __init__(self, signals, max_rate=PROGRESS_MAX_RATE):
+        super(WorkerProgress, self).__init__(None, max_rate)
+        self.signals = signals
+        self._canceled = threading.Event()
+
+    def cancel(self):
+        self._canceled.set()
+
+    def wasCanceled(self):
+        return self._canceled.is_set()
+
+    def setLabelText(self, text):
+        self.signals.labelChanged.emit(text)
+
+    def setRange(self, minimum, maximum):
+        self._maximum = maximum
+        # Always show the first value of a new range
+        self._last_update = None
+        self.signals.rangeChanged.emit(minimum, maximum)
+
+    def setMaximum(self, maximum):
+        self.setRange(0, maximum)
+
+    def _report(self, value):
+        self.signals.valueChanged.emit(value)
+
+    def close(self):
+        pass
+
+
+class ModelLoader(QtCore.QRunnable):
+    """ Worker to be run in a QThreadPool
+
+    Parses the model of a parser off the GUI thread. The
+    loaded model is moved to the thread of the application
+    and passed on via the finished signal, which emits None
+    if parsing failed or has been canceled.
+
+    Parameters
+    ----------
+    parser: BaseParser
+        Parser used to load the model
+
+    """
+
+    def __init__(self, parser, max_rate=PROGRESS_MAX_RATE):
+        super(ModelLoader, self).__init__()
+        self.parser = parser
+        self.signals = LoaderSignals()
+        self.progress = WorkerProgress(self.signals, max_rate)
+        # Keep the runnable alive for late cancel requests
+        self.setAutoDelete(False)
+
+    def cancel(self):
+        """ Request cancellation of the loading """
+        LOGGER.debug("Loading of '{0!s}' canceled.".format(self.parser.path))
+        self.progress.cancel()
+
+    def run(self):
+        model = self.parser.parse(progress=self.progress)
+        if self.progress.wasCanceled():
+            model = None
+        elif model is not None and model.thread() == QtCore.QThread.currentThread():
+            # Objects created in the worker need to be handed over to
+            # the GUI thread before the worker thread finishes
+            model.moveToThread(QtWidgets.QApplication.instance().thread())
+        self.signals.finished.emit(model)
@@ -1,79 +1,114 @@
 import logging
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 from warnings import warn
 
 from GEMEditor.model.classes.cobra import Gene, GeneGroup, Reaction
 from GEMEditor.rw import *
 from GEMEditor.rw.annotation import annotate_xml_from_model, annotate_element_from_xml
-from PyQt5.QtWidgets import QApplication
 from cobra.io.sbml3 import strnum, SBML_DOT, clip
-from lxml.etree import SubElement
+from lxml.etree import Element, SubElement
 from six import iteritems
 
 LOGGER = logging.getLogger(__name__)
 
+ReactionRecord = namedtuple("ReactionRecord", ["id", "name", "subsystem", "comment", "lower_bound", "upper_bound",
+                                               "metabolites", "gene_tree", "annotation"])
+
 
 def add_reactions(model_node, model, use_fbc=True):
 
     if len(model.reactions) > 0:
 
         bounds_map = _add_parameters(model_node, model)
-
-        objectives_list_node = SubElement(model_node, fbc_listOfObjectives, attrib={fbc_activeObjective: "obj"})
-        objective_node = SubElement(objectives_list_node, fbc_objective, attrib={fbc_id: "obj", fbc_type: "maximize"})
-        list_of_fluxobjectives = SubElement(objective_node, fbc_listOfFluxObjectives)
+        list_of_fluxobjectives = add_objective(model_node)
         reactions_list_node = SubElement(model_node, sbml3_listOfReactions)
 
         for reaction in model.reactions:
 
-            reaction_id = cobra_reaction_prefix + reaction.id
-            reaction_node = SubElement(reactions_list_node, sbml3_reaction,
-                                       attrib={"id": reaction_id,
-                                               "fast": "false",
-                                               "reversible": str(reaction.lower_bound < 0).lower()})
-            # Optional attributes
-            if reaction.name:
-                reaction_node.set("name", reaction.name)
-            if reaction.subsystem:
-                reaction_node.set(ge_subsystem, reaction.subsystem)
-            if reaction.comment:
-                reaction_node.set(ge_comment, reaction.comment)
-
-            if use_fbc:
-                reaction_node.set(fbc_lowerFluxBound, bounds_map[reaction.lower_bound])
-                reaction_node.set(fbc_upperFluxBound, bounds_map[reaction.upper_bound])
-
             # Add reaction to flux_objectives_node if the coefficient is not 0
             if reaction.objective_coefficient != 0.:
-                SubElement(list_of_fluxobjectives, fbc_fluxObjective,
-                           attrib={fbc_reaction: reaction_id,
-                                   fbc_coefficient: strnum(reaction.objective_coefficient)})
-
-            # Add metabolites to reaction node
-            reaction_sides = defaultdict(list)
-            for met, coefficient in sorted(iteritems(reaction._metabolites), key=lambda x: x[0].id):
-                met_id = "M_" + met.id
-                if coefficient < 0:
-                    reaction_sides[sbml3_listOfReactants].append({"species": met_id,
-                                                                  "stoichiometry": strnum(abs(coefficient)),
-                                                                  "constant": "true"})
-                else:
-                    reaction_sides[sbml3_listOfProducts].append({"species": met_id,
-                                                                 "stoichiometry": strnum(abs(coefficient)),
-                                                                 "constant": "true"})
+                list_of_fluxobjectives.append(flux_objective_element(reaction))
+
+            reactions_list_node.append(reaction_element(reaction, bounds_map, use_fbc))
+
+
+def add_objective(model_node):
+    """ Add the objective to the model node
+
+    Returns
+    -------
+    lxml.etree.Element
+        The list of flux objectives
+    """
+
+    objectives_list_node = SubElement(model_node, fbc_listOfObjectives, attrib={fbc_activeObjective: "obj"})
+    objective_node = SubElement(objectives_list_node, fbc_objective, attrib={fbc_id: "obj", fbc_type: "maximize"})
+    return SubElement(objective_node, fbc_listOfFluxObjectives)
+
+
+def flux_objective_element(reaction):
+    """ Create the fbc flux objective element of a reaction """
+    return Element(fbc_fluxObjective, attrib={fbc_reaction: cobra_reaction_prefix + reaction.id,
+                                              fbc_coefficient: strnum(reaction.objective_coefficient)})
+
+
+def reaction_element(reaction, bounds_map, use_fbc=True):
+    """ Create the reaction element of a reaction
+
+    Parameters
+    ----------
+    reaction: GEMEditor.model.classes.cobra.Reaction
+    bounds_map: BoundTable
+        Flux bound parameters as returned by _add_parameters
+    use_fbc: bool
+
+    Returns
+    -------
+    lxml.etree.Element
+    """
+
+    reaction_node = Element(sbml3_reaction,
+                            attrib={"id": cobra_reaction_prefix + reaction.id,
+                                    "fast": "false",
+                                    "reversible": str(reaction.lower_bound < 0).lower()})
+    # Optional attributes
+    if reaction.name:
+        reaction_node.set("name", reaction.name)
+    if reaction.subsystem:
+        reaction_node.set(ge_subsystem, reaction.subsystem)
+    if reaction.comment:
+        reaction_node.set(ge_comment, reaction.comment)
+
+    if use_fbc:
+        reaction_node.set(fbc_lowerFluxBound, bounds_map.id_of(reaction.lower_bound))
+        reaction_node.set(fbc_upperFluxBound, bounds_map.id_of(reaction.upper_bound))
+
+    # Add metabolites to reaction node
+    reaction_sides = defaultdict(list)
+    for met, coefficient in sorted(iteritems(reaction._metabolites), key=lambda x: x[0].id):
+        met_id = "M_" + met.id
+        if coefficient < 0:
+            reaction_sides[sbml3_listOfReactants].append({"species": met_id,
+                                                          "stoichiometry": strnum(abs(coefficient)),
+                                                          "constant": "true"})
+        else:
+            reaction_sides[sbml3_listOfProducts].append({"species": met_id,
+                                                         "stoichiometry": strnum(abs(coefficient)),
+                                                         "constant": "true"})
 
-            for key, participants in iteritems(reaction_sides):
-                reaction_side = SubElement(reaction_node, key)
-                for attrib_dict in participants:
-                    SubElement(reaction_side, sbml3_speciesReference, attrib=attrib_dict)
+    for key, participants in iteritems(reaction_sides):
+        reaction_side = SubElement(reaction_node, key)
+        for attrib_dict in participants:
+            SubElement(reaction_side, sbml3_speciesReference, attrib=attrib_dict)
 
-            # Add genes
-            if reaction._children:
-                genes_node = SubElement(reaction_node, fbc_geneProductAssociation)
-                _parse_gene_object_tree(genes_node, reaction)
+    # Add genes
+    if reaction._children:
+        genes_node = SubElement(reaction_node, fbc_geneProductAssociation)
+        _parse_gene_object_tree(genes_node, reaction)
 
-            # Add gene annotations
-            annotate_xml_from_model(reaction_node, reaction)
+    # Add gene annotations
+    annotate_xml_from_model(reaction_node, reaction)
+    return reaction_node
 
 
 def _parse_gene_object_tree(tree_node, root_item, level=0):
@@ -95,35 +130,44 @@ def _parse_gene_object_tree(tree_node, root_item, level=0):
                 SubElement(tree_node, fbc_geneProductRef, attrib={fbc_geneProduct: cobra_gene_prefix + element.id.replace(".", SBML_DOT)})
 
 
-def _parse_gene_xml_tree(node, reaction, genes):
-    """ Parse the gene tree as saved in an sbml file with fbc package """
+def _gene_tree_record(node):
+    """ Decode the gene tree as saved in an sbml file with fbc package
+
+    Gene groups are returned as tuples of (type, id, children),
+    while gene references are returned as the gene id.
+    """
 
-    # Check that
     if node.tag == fbc_geneProductAssociation:
-        top_level_child = _parse_gene_xml_tree(node.getchildren()[0], reaction, genes)
-        reaction.add_child(top_level_child)
+        return _gene_tree_record(node.getchildren()[0])
     elif node.tag in (fbc_and, fbc_or):
-        gene_group = GeneGroup(id=node.get(ge_id), type="and" if node.tag == fbc_and else "or")
-        for child in node.getchildren():
-            child_object = _parse_gene_xml_tree(child, reaction, genes)
-            gene_group.add_child(child_object)
-        return gene_group
-
+        return ("and" if node.tag == fbc_and else "or", node.get(ge_id),
+                tuple(_gene_tree_record(child) for child in node.getchildren()))
     elif node.tag == fbc_geneProductRef:
-        gene_id = clip(node.attrib[fbc_geneProduct], "G_")
         # Resubstitute dots
-        gene_id = gene_id.replace(SBML_DOT, ".")
-        try:
-            return genes.get_by_id(gene_id)
-        except KeyError:
-            new_gene = Gene(id=gene_id, name=gene_id)
-            genes.append(new_gene)
-            warn("Gene {0} not found in gene list. New gene created!".format(gene_id))
-            return new_gene
+        return clip(node.attrib[fbc_geneProduct], "G_").replace(SBML_DOT, ".")
     else:
         raise TypeError("Unknown node.tag {0} at line {1}".format(node.tag, node.sourceline))
 
 
+def _gene_tree_from_record(record, genes):
+    """ Create the gene tree from a record returned by _gene_tree_record """
+
+    if isinstance(record, tuple):
+        group_type, group_id, children = record
+        gene_group = GeneGroup(id=group_id, type=group_type)
+        for child in children:
+            gene_group.add_child(_gene_tree_from_record(child, genes))
+        return gene_group
+
+    try:
+        return genes.get_by_id(record)
+    except KeyError:
+        new_gene = Gene(id=record, name=record)
+        genes.append(new_gene)
+        warn("Gene {0} not found in gene list. New gene created!".format(record))
+        return new_gene
+
+
 def parse_reaction(model_node, model, progress=None):
     """ Parse cobra reactions from a sbml file """
 
@@ -141,15 +185,12 @@ def parse_reaction(model_node, model, progress=None):
             list_of_flux_objectives = objective.find(fbc_listOfFluxObjectives)
             if list_of_flux_objectives is not None:
                 for child in list_of_flux_objectives.iterfind(fbc_fluxObjective):
-                    if child.get(fbc_reaction):
-                        objectives[clip(child.get(fbc_reaction), "R_")] = child.get(fbc_coefficient) or 0.
+                    parse_flux_objective_node(child, objectives)
 
     # Read flux boundaries
-    boundary_dict = {}
+    boundary_dict = BoundTable()
     for child in boundary_list_node.iterfind(sbml3_parameter):
-        value = child.get("value")
-        if value is not None:
-            boundary_dict[child.get("id")] = float(value)
+        parse_parameter_node(child, boundary_dict)
 
     reactions = []
     if reaction_list_node is None:
@@ -168,47 +209,141 @@ def parse_reaction(model_node, model, progress=None):
             pass
         elif not progress.wasCanceled():
             progress.setValue(i)
-            QApplication.processEvents()
         else:
             return
 
-        reaction_id = clip(reaction_node.get("id"), "R_")
-        new_reaction = Reaction(id=reaction_id,
-                                name=reaction_node.get("name"),
-                                upper_bound=float(boundary_dict[reaction_node.get(fbc_upperFluxBound)]),
-                                lower_bound=float(boundary_dict[reaction_node.get(fbc_lowerFluxBound)]),
-                                subsystem=reaction_node.get(ge_subsystem),
-                                comment=reaction_node.get(ge_comment))
-
-        # Add metabolites
-        metabolites = {}
-        for x in [sbml3_listOfReactants, sbml3_listOfProducts]:
-            metabolite_list = reaction_node.find(x)
-            if metabolite_list is not None:
-                for metabolite_node in metabolite_list.iterfind(sbml3_speciesReference):
-                    metabolite = model.metabolites.get_by_id(clip(metabolite_node.get("species"), "M_"))
-                    value = float(metabolite_node.get("stoichiometry"))
-                    if x == sbml3_listOfReactants:
-                        value = -value
-                    metabolites[metabolite] = value
-        new_reaction.add_metabolites(metabolites)
-
-        # Add balancing status
-        new_reaction.update_balancing_status()
-
-        # Add genes
-        gene_node = reaction_node.find(fbc_geneProductAssociation)
-        if gene_node is not None:
-            _parse_gene_xml_tree(gene_node, new_reaction, model.genes)
-
-        # Parse annotation
-        annotate_element_from_xml(reaction_node, new_reaction)
-
-        reactions.append(new_reaction)
+        reactions.append(parse_reaction_node(reaction_node, model, boundary_dict))
 
     model.add_reactions(reactions)
     LOGGER.debug("Reactions added to model!")
 
+    set_objective_coefficients(model, objectives)
+
+    return reactions
+
+
+def parse_reaction_node(reaction_node, model, boundary_dict):
+    """ Parse a single sbml reaction node
+
+    The metabolites and genes referenced by the
+    reaction are looked up in the model.
+
+    Parameters
+    ----------
+    reaction_node: lxml.etree.Element
+    model: GEMEditor.model.classes.cobra.Model
+    boundary_dict: BoundTable,
+        Flux bound parameters of the model
+
+    Returns
+    -------
+    Reaction
+    """
+    return reaction_from_record(reaction_record(reaction_node), model, boundary_dict)
+
+
+def reaction_record(reaction_node):
+    """ Decode a sbml reaction node into a plain record
+
+    Parameters
+    ----------
+    reaction_node: lxml.etree.Element
+
+    Returns
+    -------
+    ReactionRecord
+    """
+
+    # Collect metabolites
+    metabolites = []
+    for x in [sbml3_listOfReactants, sbml3_listOfProducts]:
+        metabolite_list = reaction_node.find(x)
+        if metabolite_list is not None:
+            for metabolite_node in metabolite_list.iterfind(sbml3_speciesReference):
+                value = float(metabolite_node.get("stoichiometry"))
+                if x == sbml3_listOfReactants:
+                    value = -value
+                metabolites.append((clip(metabolite_node.get("species"), "M_"), value))
+
+    # Collect genes
+    gene_node = reaction_node.find(fbc_geneProductAssociation)
+    gene_tree = _gene_tree_record(gene_node) if gene_node is not None else None
+
+    return ReactionRecord(id=clip(reaction_node.get("id"), "R_"),
+                          name=reaction_node.get("name"),
+                          subsystem=reaction_node.get(ge_subsystem),
+                          comment=reaction_node.get(ge_comment),
+                          lower_bound=reaction_node.get(fbc_lowerFluxBound),
+                          upper_bound=reaction_node.get(fbc_upperFluxBound),
+                          metabolites=tuple(metabolites),
+                          gene_tree=gene_tree,
+                          annotation=annotate_element_from_xml(reaction_node) or set())
+
+
+def reaction_from_record(record, model, boundary_dict):
+    """ Create a reaction from a record
+
+    Parameters
+    ----------
+    record: ReactionRecord
+    model: GEMEditor.model.classes.cobra.Model
+    boundary_dict: BoundTable,
+        Flux bound parameters of the model
+
+    Returns
+    -------
+    Reaction
+    """
+
+    new_reaction = Reaction(id=record.id,
+                            name=record.name,
+                            upper_bound=boundary_dict.value_of(record.upper_bound),
+                            lower_bound=boundary_dict.value_of(record.lower_bound),
+                            subsystem=record.subsystem,
+                            comment=record.comment)
+
+    # Add metabolites
+    metabolites = {}
+    for metabolite_id, value in record.metabolites:
+        metabolites[model.metabolites.get_by_id(metabolite_id)] = value
+    new_reaction.add_metabolites(metabolites)
+
+    # Add balancing status
+    new_reaction.update_balancing_status()
+
+    # Add genes
+    if record.gene_tree is not None:
+        new_reaction.add_child(_gene_tree_from_record(record.gene_tree, model.genes))
+
+    # Add annotation
+    new_reaction.annotation.update(record.annotation)
+
+    return new_reaction
+
+
+def parse_flux_objective_node(node, objectives):
+    """ Add the coefficient of a fbc fluxObjective node to objectives """
+    if node.get(fbc_reaction):
+        objectives[clip(node.get(fbc_reaction), "R_")] = node.get(fbc_coefficient) or 0.
+
+
+def parse_parameter_node(node, boundary_dict):
+    """ Add the value of a sbml parameter node to the BoundTable boundary_dict """
+    value = node.get("value")
+    if value is not None:
+        boundary_dict.add(float(value), node.get("id"))
+
+
+def set_objective_coefficients(model, objectives):
+    """ Set the objective coefficients of the model reactions
+
+    Parameters
+    ----------
+    model: GEMEditor.model.classes.cobra.Model
+    objectives: dict,
+        Mapping of reaction ids to objective coefficients
+    """
+
     for key, value in objectives.items():
         try:
             reaction = model.reactions.get_by_id(key)
@@ -218,39 +353,103 @@ def parse_reaction(model_node, model, progress=None):
         else:
             reaction.objective_coefficient = float(value)
 
-    return reactions
-
 
 def _bound_name(number):
     return "{sign}_{value}".format(sign="neg" if number < 0 else "pos",
                                    value=str(abs(number)))
 
 
-def _add_parameters(model_node, model):
+class BoundTable:
+    """ Interned table of the flux bound parameters
+
+    Every distinct bound value is stored once as a sbml parameter.
+    The writer maps the bounds of the reactions to the parameter ids,
+    while the reader maps the ids back to the values. Parameters
+    with equal values share a single float object.
+    """
 
-    parameter_list = SubElement(model_node, sbml3_listOfParameters)
     param_attr = {"constant": "true",
                   "units": "mmol_per_gDW_per_hr"}
 
-    bounds = set(model.reactions.list_attr("lower_bound")).union(model.reactions.list_attr("upper_bound"))
-    bounds_map = {}
+    def __init__(self):
+        self._ids = {}
+        self._values = {}
+        self._sbo_terms = {}
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, parameter_id):
+        return parameter_id in self._values
+
+    @classmethod
+    def from_model(cls, model):
+        """ Setup the table for the bounds of all reactions in model """
+
+        table = cls()
+        for value, name, sboTerm in cobra_standard_boundaries:
+            table.add(value, name, sboTerm)
+
+        bounds = set(model.reactions.list_attr("lower_bound")).union(model.reactions.list_attr("upper_bound"))
+        for value in sorted(bounds):
+            table.add(value)
+        return table
+
+    def add(self, value, parameter_id=None, sboTerm="SBO:0000625"):
+        """ Add a bound to the table
+
+        Parameters
+        ----------
+        value: float
+        parameter_id: str,
+            Id of the parameter, generated from the value if None
+        sboTerm: str
+
+        Returns
+        -------
+        str
+            Id of the parameter used for the value
+        """
+
+        value = float(value)
+        if parameter_id is None:
+            if value in self._ids:
+                return self._ids[value]
+            parameter_id = _bound_name(value)
+
+        # Reuse the float object of an equal value
+        value = self._values.get(self._ids.get(value), value)
+        self._ids.setdefault(value, parameter_id)
+        self._values[parameter_id] = value
+        self._sbo_terms[parameter_id] = sboTerm
+        return self._ids[value]
+
+    def id_of(self, value):
+        """ Get the parameter id of a bound value """
+        return self._ids[value]
+
+    def value_of(self, parameter_id):
+        """ Get the value of a parameter id """
+        return self._values[parameter_id]
+
+    def add_to_xml(self, model_node):
+        """ Add the sbml parameter list to the model node """
+
+        parameter_list = SubElement(model_node, sbml3_listOfParameters)
+        for parameter_id, value in self._values.items():
+            SubElement(parameter_list, sbml3_parameter, value=strnum(value),
+                       id=parameter_id, sboTerm=self._sbo_terms[parameter_id], **self.param_attr)
+        return parameter_list
 
-    # Add standard boundaries
-    for value, name, sboTerm in cobra_standard_boundaries:
-        _add_bound(parameter_list, value=value, name=name, sboTerm=sboTerm, param_attr=param_attr)
-        bounds_map[value] = name
-        bounds.discard(value)
-
-    # Add all other boundaries
-    for value in bounds:
-        name = _bound_name(value)
-        _add_bound(parameter_list, value, name, param_attr)
-        bounds_map[value] = name
-
-    return bounds_map
 
+def _add_parameters(model_node, model):
+    """ Add the flux bound parameters of all reactions to the model node
 
-def _add_bound(parameter_list_node, value, name, param_attr, sboTerm="SBO:0000625"):
+    Returns
+    -------
+    BoundTable
+    """
 
-    SubElement(parameter_list_node, sbml3_parameter, value=strnum(value),
-               id=name, sboTerm=sboTerm, **param_attr)
+    bounds = BoundTable.from_model(model)
+    bounds.add_to_xml(model_node)
+    return bounds
@@ -1,8 +1,13 @@
+from collections import namedtuple
+
 from GEMEditor.model.classes.reference import Reference, Author
 from GEMEditor.rw import *
 from GEMEditor.rw.annotation import annotate_xml_from_model, annotate_element_from_xml
-from PyQt5.QtWidgets import QApplication
-from lxml.etree import SubElement
+from lxml.etree import Element, SubElement
+
+
+ReferenceRecord = namedtuple("ReferenceRecord", ["id", "year", "title", "journal", "url", "authors",
+                                                 "pmid", "pmc", "doi"])
 
 
 def add_references(model_node, model):
@@ -10,29 +15,44 @@ def add_references(model_node, model):
     if model.references:
         reference_list_node = SubElement(model_node, ge_listOfReferences)
         for reference in model.references.values():
-            reference_node = SubElement(reference_list_node, ge_reference, attrib={"id": reference.id})
+            reference_list_node.append(reference_element(reference))
+
+
+def reference_element(reference):
+    """ Create the GEMEditor element of a reference
+
+    Parameters
+    ----------
+    reference: GEMEditor.model.classes.reference.Reference
+
+    Returns
+    -------
+    lxml.etree.Element
+    """
 
-            # Add optional attributes
-            if reference.year:
-                reference_node.set("year", reference.year)
-            if reference.title:
-                reference_node.set("title", reference.title)
-            if reference.url:
-                reference_node.set("url", reference.url)
-            if reference.journal:
-                reference_node.set("journal", reference.journal)
+    reference_node = Element(ge_reference, attrib={"id": reference.id})
 
+    # Add optional attributes
+    if reference.year:
+        reference_node.set("year", reference.year)
+    if reference.title:
+        reference_node.set("title", reference.title)
+    if reference.url:
+        reference_node.set("url", reference.url)
+    if reference.journal:
+        reference_node.set("journal", reference.journal)
 
-            # Add authors
-            if reference.authors:
-                author_list_node = SubElement(reference_node, ge_listOfAuthors)
-                for author in reference.authors:
-                    SubElement(author_list_node, ge_author, attrib={"firstname": author.firstname,
-                                                                    "lastname": author.lastname,
-                                                                    "initials": author.initials})
+    # Add authors
+    if reference.authors:
+        author_list_node = SubElement(reference_node, ge_listOfAuthors)
+        for author in reference.authors:
+            SubElement(author_list_node, ge_author, attrib={"firstname": author.firstname,
+                                                            "lastname": author.lastname,
+                                                            "initials": author.initials})
 
-            # Add annotations
-            annotate_xml_from_model(reference_node, reference)
+    # Add annotations
+    annotate_xml_from_model(reference_node, reference)
+    return reference_node
 
 
 def parse_references(model_node, model=None, progress=None):
@@ -56,38 +76,88 @@ def parse_references(model_node, model=None, progress=None):
             pass
         elif not progress.wasCanceled():
             progress.setValue(i)
-            QApplication.processEvents()
         else:
             return
 
-        new_reference = Reference(id=reference_node.get("id"),
-                                  year=reference_node.get("year"),
-                                  title=reference_node.get("title"),
-                                  journal=reference_node.get("journal"),
-                                  url=reference_node.get("url"))
-
-        author_list_node = reference_node.find(ge_listOfAuthors)
-        if author_list_node is not None:
-            authors = []
-            for child in author_list_node.iterfind(ge_author):
-                authors.append(Author(firstname=child.get("firstname"),
-                                      lastname=child.get("lastname"),
-                                      initials=child.get("initials")))
-            new_reference.authors = authors
-
-        annotation = annotate_element_from_xml(reference_node)
-        if annotation:
-            for x in annotation:
-                if x.collection == "pubmed":
-                    new_reference.pmid = x.identifier
-                elif x.collection == "pmc":
-                    new_reference.pmc = x.identifier
-                elif x.collection == "doi":
-                    new_reference.doi = x.identifier
+        new_reference = parse_reference_node(reference_node)
 
         if model is None:
             references.append(new_reference)
         else:
             model.add_reference(new_reference)
 
-    return references
\ No newline at end of file
+    return references
+
+
+def parse_reference_node(reference_node):
+    """ Parse a single GEMEditor reference node
+
+    Parameters
+    ----------
+    reference_node: lxml.etree.Element
+
+    Returns
+    -------
+    Reference
+    """
+    return reference_from_record(reference_record(reference_node))
+
+
+def reference_record(reference_node):
+    """ Decode a GEMEditor reference node into a plain record
+
+    Parameters
+    ----------
+    reference_node: lxml.etree.Element
+
+    Returns
+    -------
+    ReferenceRecord
+    """
+
+    authors = []
+    author_list_node = reference_node.find(ge_listOfAuthors)
+    if author_list_node is not None:
+        for child in author_list_node.iterfind(ge_author):
+            authors.append(Author(firstname=child.get("firstname"),
+                                  lastname=child.get("lastname"),
+                                  initials=child.get("initials")))
+
+    identifiers = {}
+    annotation = annotate_element_from_xml(reference_node)
+    if annotation:
+        for x in annotation:
+            if x.collection in ("pubmed", "pmc", "doi"):
+                identifiers[x.collection] = x.identifier
+
+    return ReferenceRecord(id=reference_node.get("id"),
+                           year=reference_node.get("year"),
+                           title=reference_node.get("title"),
+                           journal=reference_node.get("journal"),
+                           url=reference_node.get("url"),
+                           authors=tuple(authors),
+                           pmid=identifiers.get("pubmed", ""),
+                           pmc=identifiers.get("pmc", ""),
+                           doi=identifiers.get("doi", ""))
+
+
+def reference_from_record(record):
+    """ Create a reference from a record
+
+    Parameters
+    ----------
+    record: ReferenceRecord
+
+    Returns
+    -------
+    Reference
+    """
+    return Reference(id=record.id,
+                     year=record.year,
+                     title=record.title,
+                     journal=record.journal,
+                     url=record.url,
+                     authors=list(record.authors),
+                     pmid=record.pmid,
+                     pmc=record.pmc,
+                     doi=record.doi)
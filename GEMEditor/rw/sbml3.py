@@ -1,22 +1,29 @@
 import logging
+import os
 import lxml.etree as ET
-from GEMEditor.model.classes.cobra import Compartment
 from GEMEditor.rw import *
-from GEMEditor.rw.compartment import add_compartments, parse_compartments
-from GEMEditor.rw.evidences import add_evidences_to_xml, parse_evidences_from_xml
-from GEMEditor.rw.fluxset import add_tests_to_xml, parse_test_from_xml
-from GEMEditor.rw.gene import add_genes, parse_genes
-from GEMEditor.rw.metabolite import add_metabolites, parse_metabolites
-from GEMEditor.rw.model import setup_sbml3_model, parse_sbml3_model
-from GEMEditor.rw.reaction import add_reactions, parse_reaction
-from GEMEditor.rw.reference import add_references, parse_references
+from GEMEditor.rw.compartment import add_compartments, parse_compartments, parse_compartment_node
+from GEMEditor.rw.evidences import add_evidences_to_xml, parse_evidences_from_xml, evidence_record, \
+    evidence_from_record, evidence_element
+from GEMEditor.rw.fluxset import add_tests_to_xml, parse_test_from_xml, modeltest_record, modeltest_from_record, \
+    modeltest_element
+from GEMEditor.rw.gene import add_genes, parse_genes, parse_gene_node, gene_element
+from GEMEditor.rw.metabolite import add_metabolites, parse_metabolites, parse_metabolite_node, metabolite_element
+from GEMEditor.rw.model import setup_sbml3_model, parse_sbml3_model, parse_model_node, finalize_model
+from GEMEditor.rw.reaction import add_reactions, parse_reaction, parse_parameter_node, parse_flux_objective_node, \
+    set_objective_coefficients, reaction_record, reaction_from_record, reaction_element, flux_objective_element, \
+    add_objective, _add_parameters, BoundTable
+from GEMEditor.rw.reference import add_references, parse_references, parse_reference_node, reference_element
 from GEMEditor.rw.units import add_unit_definitions
-from PyQt5.QtWidgets import QProgressDialog
-from lxml.etree import Element, register_namespace, ElementTree
+from GEMEditor.base.classes import ProgressReporter
+from lxml.etree import Element, SubElement, register_namespace, ElementTree
 
 
 LOGGER = logging.getLogger(__name__)
 
+# Indentation used by the streaming writer
+_indentation = "  "
+
 
 def setup_sbml3_node():
     sbml_node = Element(sbml3_sbml, attrib={"level": "3", "version": "1", "sboTerm": "SBO:0000624", fbc_required: "false"}, nsmap=nsmap)
@@ -27,7 +34,17 @@ def setup_sbml3_node():
     return sbml_node
 
 
-def write_sbml3_model(path, model, progress=None):
+# Sections that are serialized separately in incremental mode
+# in the order of the sbml file
+_serialized_sections = (("metabolites", add_metabolites),
+                        ("genes", add_genes),
+                        ("reactions", add_reactions),
+                        ("references", add_references),
+                        ("tests", add_tests_to_xml),
+                        ("evidences", add_evidences_to_xml))
+
+
+def write_sbml3_model(path, model, progress=None, incremental=False, streaming=False):
     """ Save current model to SBML file
 
     Parameters
@@ -35,12 +52,24 @@ def write_sbml3_model(path, model, progress=None):
     path: str
     model: GEMEditor.model.classes.cobra.Model
     progress: QProgressDialog
+    incremental: bool
+        Only serialize the sections of the model that changed
+        since the last save and reuse the stored output for
+        all other sections
+    streaming: bool
+        Write the file incrementally using stream_write_sbml3_model
 
     Returns
     -------
     Element
+        In incremental mode the model node contains
+        placeholder comments for the serialized sections.
+        None if the file has been written in streaming mode.
     """
 
+    if streaming:
+        return stream_write_sbml3_model(path, model, progress)
+
     LOGGER.debug("Saving file: {}".format(path))
 
     # Setup root SBML node
@@ -52,23 +81,171 @@ def write_sbml3_model(path, model, progress=None):
     # Add all model items to the model node
     add_unit_definitions(model_node)
     add_compartments(model_node, model)
-    add_metabolites(model_node, model)
-    add_genes(model_node, model)
-    add_reactions(model_node, model)
-    add_references(model_node, model)
-    add_tests_to_xml(model_node, model)
-    add_evidences_to_xml(model_node, model)
+    if incremental:
+        for section, _ in _serialized_sections:
+            model_node.append(ET.Comment(section))
+    else:
+        for _, add_function in _serialized_sections:
+            add_function(model_node, model)
 
     # Write model to path
     LOGGER.debug("Writing file..")
     with open(path, "wb") as write_file:
-        ElementTree(sbml_node).write(write_file, pretty_print=True, encoding="UTF-8", xml_declaration=True)
+        if incremental:
+            write_file.writelines(_splice_sections(sbml_node, model))
+        else:
+            ElementTree(sbml_node).write(write_file, pretty_print=True, encoding="UTF-8", xml_declaration=True)
     LOGGER.debug("Model saved.")
 
     return sbml_node
 
 
-def read_sbml3_model(path, progress):
+def serialize_section(model, add_function):
+    """ Serialize a single section of the model
+
+    Parameters
+    ----------
+    model: GEMEditor.model.classes.cobra.Model
+    add_function: callable
+        Function adding the section to the model node
+
+    Returns
+    -------
+    bytes
+        The pretty printed lines of the section as
+        they appear in the complete sbml file
+    """
+
+    sbml_node = setup_sbml3_node()
+    model_node = SubElement(sbml_node, sbml3_model)
+    add_function(model_node, model)
+    if len(model_node) == 0:
+        return b""
+
+    # Strip the lines of the enclosing sbml and model nodes
+    lines = ET.tostring(sbml_node, pretty_print=True, encoding="UTF-8", xml_declaration=False).splitlines(True)
+    return b"".join(lines[2:-2])
+
+
+def _splice_sections(sbml_node, model):
+    """ Yield the lines of the sbml file
+
+    The placeholder comments in the model node are replaced by
+    the stored output of the sections. Changed sections are
+    serialized again. """
+
+    placeholders = dict(("<!--{}-->".format(section).encode("UTF-8"), (section, add_function))
+                        for section, add_function in _serialized_sections)
+
+    content = ET.tostring(sbml_node, pretty_print=True, encoding="UTF-8", xml_declaration=True)
+    for line in content.splitlines(True):
+        try:
+            section, add_function = placeholders[line.strip()]
+        except KeyError:
+            yield line
+            continue
+
+        if section in model.dirty_sections or section not in model.serialized_sections:
+            LOGGER.debug("Serializing section: {}".format(section))
+            model.serialized_sections[section] = serialize_section(model, add_function)
+            model.mark_sections_clean(section)
+        yield model.serialized_sections[section]
+
+
+def stream_write_sbml3_model(path, model, progress=None):
+    """ Save the model to a SBML file without building the complete tree
+
+    The elements of the metabolites, genes, reactions, references,
+    tests and evidences are created one at a time and written
+    directly to the file using lxml.etree.xmlfile, so the memory
+    needed for saving does not grow with the size of the model.
+
+    Parameters
+    ----------
+    path: str
+    model: GEMEditor.model.classes.cobra.Model
+    progress: QProgressDialog
+
+    Returns
+    -------
+    None
+    """
+
+    LOGGER.debug("Streaming file: {}".format(path))
+
+    sbml_node = setup_sbml3_node()
+    model_node = setup_sbml3_model(sbml_node, model)
+
+    # Small sections are created as usual
+    add_unit_definitions(model_node)
+    add_compartments(model_node, model)
+    if len(model.reactions) > 0:
+        bounds_map = _add_parameters(model_node, model)
+        list_of_fluxobjectives = add_objective(model_node)
+        for reaction in model.reactions:
+            if reaction.objective_coefficient != 0.:
+                list_of_fluxobjectives.append(flux_objective_element(reaction))
+
+    with ET.xmlfile(path, encoding="UTF-8") as xml_file:
+        xml_file.write_declaration()
+        with xml_file.element(sbml_node.tag, sbml_node.attrib, nsmap=sbml_node.nsmap):
+            xml_file.write("\n" + _indentation)
+            with xml_file.element(model_node.tag, model_node.attrib):
+                for node in model_node.iterchildren(sbml3_listOfUnitDefinitions, sbml3_listOfCompartments):
+                    _write_element(xml_file, node, 2)
+
+                _write_list(xml_file, sbml3_listOfSpecies, (metabolite_element(x) for x in model.metabolites))
+                if len(model.genes) > 0:
+                    _write_list(xml_file, fbc_listOfGeneProducts, (gene_element(x) for x in model.genes))
+                if len(model.reactions) > 0:
+                    for node in model_node.iterchildren(sbml3_listOfParameters, fbc_listOfObjectives):
+                        _write_element(xml_file, node, 2)
+                    _write_list(xml_file, sbml3_listOfReactions,
+                                (reaction_element(x, bounds_map) for x in model.reactions))
+                if model.references:
+                    _write_list(xml_file, ge_listOfReferences,
+                                (reference_element(x) for x in model.references.values()))
+                if model.QtTestsTable.rowCount() > 0:
+                    _write_list(xml_file, ge_listOfTests,
+                                (modeltest_element(x) for x in model.QtTestsTable.get_items()))
+                if len(model.all_evidences) > 0:
+                    _write_list(xml_file, ge_listOfEvidences,
+                                (evidence_element(x) for x in model.all_evidences.values()))
+                xml_file.write("\n" + _indentation)
+            xml_file.write("\n")
+
+    LOGGER.debug("Model saved.")
+
+
+def _write_element(xml_file, element, level):
+    """ Write an element with its children to the xmlfile
+
+    The element is written tag by tag as writing it as a whole
+    would repeat the namespace declarations of the root node
+    on every element.
+    """
+
+    xml_file.write("\n" + _indentation * level)
+    with xml_file.element(element.tag, element.attrib):
+        if element.text:
+            xml_file.write(element.text)
+        for child in element:
+            _write_element(xml_file, child, level + 1)
+        if len(element):
+            xml_file.write("\n" + _indentation * level)
+
+
+def _write_list(xml_file, tag, elements, level=2):
+    """ Write a list node containing the elements to the xmlfile """
+
+    xml_file.write("\n" + _indentation * level)
+    with xml_file.element(tag):
+        for element in elements:
+            _write_element(xml_file, element, level + 1)
+        xml_file.write("\n" + _indentation * level)
+
+
+def read_sbml3_model(path, progress, streaming=False):
     """ Read SBML model
 
     Parameters
@@ -77,9 +254,18 @@ def read_sbml3_model(path, progress):
         Path to model file
     progress: QProgressDialog
         Progress dialog
+    streaming: bool
+        Parse the file incrementally using stream_sbml3_model
 
     """
 
+    # Limit the rate of progress dialog updates
+    if progress is not None:
+        progress = ProgressReporter.wrap(progress)
+
+    if streaming:
+        return stream_sbml3_model(path, progress)
+
     # Read file
     with open(path, "r", encoding="UTF-8") as open_file:
         tree = ET.parse(open_file)
@@ -107,10 +293,131 @@ def read_sbml3_model(path, progress):
         else:
             return
 
-    # Add compartments from metabolites if not saved
-    for x in model.metabolites:
-        if x.compartment not in model.gem_compartments:
-            model.gem_compartments[x.compartment] = Compartment(x.compartment, None)
+    return finalize_model(model)
+
+
+# Labels shown in the progress dialog while streaming the items
+# of the corresponding sections of the model
+_stream_labels = {sbml3_compartment: "Reading compartments...",
+                  sbml3_species: "Reading metabolites...",
+                  fbc_geneProduct: "Reading genes...",
+                  sbml3_parameter: "Reading reactions...",
+                  fbc_fluxObjective: "Reading reactions...",
+                  sbml3_reaction: "Reading reactions...",
+                  ge_reference: "Reading references...",
+                  ge_testCase: "Reading test cases...",
+                  ge_evidence: "Reading evidences..."}
+
+
+def stream_sbml3_model(path, progress=None):
+    """ Read SBML model incrementally
+
+    In contrast to read_sbml3_model the file is not loaded
+    into a full element tree. The items of the model are
+    parsed as soon as the corresponding xml element has been
+    read and the element is cleared right afterwards, so that
+    the memory needed for parsing does not grow with the xml
+    tree of the file.
+
+    Reactions, test cases and evidences reference items of other
+    sections. They are kept as plain records and created once
+    all sections have been read, as the gene products follow the
+    reactions in files written by libsbml.
+
+    Parameters
+    ----------
+    path: str
+        Path to model file
+    progress: QProgressDialog
+        Progress dialog
+
+    Returns
+    -------
+    model: GEMEditor.model.classes.cobra.Model
+    """
+
+    LOGGER.debug("Streaming file: {}".format(path))
+
+    # Limit the rate of progress dialog updates
+    if progress is not None:
+        progress = ProgressReporter.wrap(progress)
+
+    model = None
+    metabolites, reactions, tests, evidences = [], [], [], []
+    boundary_dict, objectives = BoundTable(), {}
+    last_tag = None
+
+    with open(path, "rb") as open_file:
+        if progress is not None:
+            progress.setLabelText("Reading model...")
+            progress.setRange(0, os.fstat(open_file.fileno()).st_size)
+
+        tags = (sbml3_model, sbml3_listOfSpecies) + tuple(_stream_labels)
+        for event, element in ET.iterparse(open_file, events=("start", "end"), tag=tags):
+            tag = element.tag
+
+            if event == "start":
+                if tag == sbml3_model:
+                    if element.getparent() is None or element.getparent().tag != sbml3_sbml:
+                        raise IOError("The file does not contain a sbml3 model")
+                    model = parse_model_node(element)
+                continue
+            elif model is None:
+                raise IOError("No model node found!")
+            elif tag == sbml3_listOfSpecies:
+                model.add_metabolites(metabolites)
+                metabolites = []
+                continue
+            elif tag == sbml3_model:
+                continue
+
+            if progress is None:
+                pass
+            elif not progress.wasCanceled():
+                if tag != last_tag:
+                    progress.setLabelText(_stream_labels[tag])
+                    last_tag = tag
+                progress.setValue(open_file.tell())
+            else:
+                return
+
+            if tag == sbml3_species:
+                metabolites.append(parse_metabolite_node(element))
+            elif tag == sbml3_reaction:
+                reactions.append(reaction_record(element))
+            elif tag == sbml3_parameter:
+                parse_parameter_node(element, boundary_dict)
+            elif tag == fbc_fluxObjective:
+                parse_flux_objective_node(element, objectives)
+            elif tag == fbc_geneProduct:
+                model.add_gene(parse_gene_node(element))
+            elif tag == sbml3_compartment:
+                compartment = parse_compartment_node(element)
+                model.gem_compartments[compartment.id] = compartment
+            elif tag == ge_reference:
+                model.add_reference(parse_reference_node(element))
+            elif tag == ge_testCase:
+                tests.append(modeltest_record(element))
+            elif tag == ge_evidence:
+                evidences.append(evidence_record(element))
+
+            # Free the parsed element and all preceding siblings
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+    if model is None:
+        raise IOError("The file does not contain a sbml3 model")
+
+    # Link the items referencing other sections
+    if progress is not None:
+        progress.setLabelText("Linking items...")
+    model.add_reactions([reaction_from_record(x, model, boundary_dict) for x in reactions])
+    set_objective_coefficients(model, objectives)
+    for record in tests:
+        model.tests.append(modeltest_from_record(record, model))
+    for record in evidences:
+        evidence = evidence_from_record(record, model)
+        model.all_evidences[evidence.internal_id] = evidence
 
-    model.setup_tables()
-    return model
+    return finalize_model(model)
@@ -0,0 +1,400 @@
+""" Binary snapshots of models
+
+A snapshot is a compact binary sidecar file that is written next to
+the sbml file when saving a model. Reopening the model from the
+snapshot avoids parsing the xml, splitting the annotations and
+recomputing the balancing status of all reactions.
+
+The snapshot stores the checksum of the sbml file it was created
+for and is only used as long as the sbml file is unchanged.
+
+Layout of the file:
+
+    magic       8 bytes
+    checksum    20 bytes, sha1 of the sbml file
+    n_blocks    unsigned int
+    blocks      n_blocks * (unsigned long long length, data)
+
+The first block contains the interned string table, the second a
+json header with the small sections of the model. All following
+blocks contain the arrays listed in _array_fields.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import sys
+from array import array
+from GEMEditor.model.classes.annotation import Annotation
+from GEMEditor.model.classes.cobra import Model, Metabolite, Reaction, Gene, GeneGroup
+from GEMEditor.model.classes.reference import Author
+from GEMEditor.rw.annotation import sorted_annotations
+from GEMEditor.rw.compartment import CompartmentRecord, compartment_from_record
+from GEMEditor.rw.evidences import EvidenceRecord, evidence_from_record
+from GEMEditor.rw.fluxset import ModelTestRecord, modeltest_from_record
+from GEMEditor.rw.model import finalize_model
+from GEMEditor.rw.reference import ReferenceRecord, reference_from_record
+from cobra.core import Reaction as cobraReaction
+
+
+LOGGER = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"GEMSNAP1"
+SNAPSHOT_SUFFIX = ".snapshot"
+
+_block_length = struct.Struct("<Q")
+_block_count = struct.Struct("<I")
+
+# Arrays stored in the snapshot given as (name, typecode)
+_array_fields = (("metabolite_strings", "i"),     # id, name, compartment, formula
+                 ("metabolite_charges", "i"),
+                 ("metabolite_annotation_offsets", "i"),
+                 ("metabolite_annotations", "i"),
+                 ("gene_strings", "i"),           # id, name, genome
+                 ("reaction_strings", "i"),       # id, name, subsystem, comment, charge balance, element balance
+                 ("reaction_values", "d"),        # lower bound, upper bound, objective coefficient
+                 ("reaction_balanced", "b"),
+                 ("reaction_stoichiometry_offsets", "i"),
+                 ("reaction_stoichiometry_metabolites", "i"),
+                 ("reaction_stoichiometry_coefficients", "d"),
+                 ("reaction_gene_offsets", "i"),
+                 ("reaction_gene_tokens", "i"),
+                 ("reaction_annotation_offsets", "i"),
+                 ("reaction_annotations", "i"),
+                 ("annotation_strings", "i"))     # collection, identifier, type
+
+# Encoding of the balanced status of reactions
+_balanced_codes = {None: 0, True: 1, False: 2, "Unknown": 3}
+_balanced_values = dict((v, k) for k, v in _balanced_codes.items())
+
+# Tokens of gene groups in the gene tree
+_group_tokens = {"and": -1, "or": -2}
+_group_types = dict((v, k) for k, v in _group_tokens.items())
+
+
+class StringTable:
+    """ Table of interned strings
+
+    Every distinct string is stored only once and referenced
+    by its index in the table. None is encoded as -1.
+    """
+
+    def __init__(self, strings=None):
+        self.strings = list(strings or [])
+        self._index = dict((x, i) for i, x in enumerate(self.strings))
+
+    def index(self, string):
+        if string is None:
+            return -1
+        try:
+            return self._index[string]
+        except KeyError:
+            self._index[string] = len(self.strings)
+            self.strings.append(string)
+            return self._index[string]
+
+    def get(self, index):
+        return None if index < 0 else self.strings[index]
+
+    def to_bytes(self):
+        # Strings in xml files can not contain null characters
+        return "\0".join(self.strings).encode("UTF-8")
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(data.decode("UTF-8").split("\0") if data else [])
+
+
+def snapshot_path(path):
+    """ Path of the snapshot belonging to the model file at path """
+    return path + SNAPSHOT_SUFFIX
+
+
+def file_checksum(path):
+    """ Get the sha1 digest of the file content """
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as open_file:
+        for chunk in iter(lambda: open_file.read(1024 ** 2), b""):
+            sha1.update(chunk)
+    return sha1.digest()
+
+
+def write_snapshot(model, path):
+    """ Write the snapshot for the model saved at path
+
+    Parameters
+    ----------
+    model: GEMEditor.model.classes.cobra.Model
+    path: str
+        Path of the sbml file the model has been saved to
+
+    Returns
+    -------
+    str
+        Path to the snapshot
+    """
+
+    strings = StringTable()
+    arrays = dict((name, array(typecode)) for name, typecode in _array_fields)
+    annotations = {}
+
+    def add_annotations(name, item):
+        indices = arrays[name + "_annotations"]
+        for annotation in sorted_annotations(item.annotation):
+            if annotation not in annotations:
+                annotations[annotation] = len(annotations)
+                arrays["annotation_strings"].extend((strings.index(annotation.collection),
+                                                     strings.index(annotation.identifier),
+                                                     strings.index(annotation.type)))
+            indices.append(annotations[annotation])
+        arrays[name + "_annotation_offsets"].append(len(indices))
+
+    # Metabolites
+    metabolite_index = {}
+    arrays["metabolite_annotation_offsets"].append(0)
+    for i, metabolite in enumerate(model.metabolites):
+        metabolite_index[metabolite] = i
+        arrays["metabolite_strings"].extend((strings.index(metabolite.id), strings.index(metabolite.name),
+                                             strings.index(metabolite.compartment),
+                                             strings.index(metabolite.formula)))
+        arrays["metabolite_charges"].append(metabolite.charge)
+        add_annotations("metabolite", metabolite)
+
+    # Genes
+    gene_index = {}
+    for i, gene in enumerate(model.genes):
+        gene_index[gene] = i
+        arrays["gene_strings"].extend((strings.index(gene.id), strings.index(gene.name),
+                                       strings.index(gene.genome)))
+
+    def add_gene_tree(tokens, element):
+        if isinstance(element, GeneGroup):
+            tokens.extend((_group_tokens[element.type], strings.index(element.id), len(element._children)))
+            for child in element._children:
+                add_gene_tree(tokens, child)
+        else:
+            tokens.append(gene_index[element])
+
+    # Reactions
+    for name in ("reaction_stoichiometry_offsets", "reaction_gene_offsets", "reaction_annotation_offsets"):
+        arrays[name].append(0)
+    for reaction in model.reactions:
+        arrays["reaction_strings"].extend((strings.index(reaction.id), strings.index(reaction.name),
+                                           strings.index(reaction.subsystem), strings.index(reaction.comment),
+                                           strings.index(reaction.charge_balanced),
+                                           strings.index(reaction.elements_balanced)))
+        arrays["reaction_values"].extend((reaction.lower_bound, reaction.upper_bound,
+                                          reaction.objective_coefficient))
+        arrays["reaction_balanced"].append(_balanced_codes[reaction.balanced])
+
+        for metabolite, coefficient in reaction.metabolites.items():
+            arrays["reaction_stoichiometry_metabolites"].append(metabolite_index[metabolite])
+            arrays["reaction_stoichiometry_coefficients"].append(coefficient)
+        arrays["reaction_stoichiometry_offsets"].append(len(arrays["reaction_stoichiometry_metabolites"]))
+
+        tokens = arrays["reaction_gene_tokens"]
+        tokens.append(len(reaction._children))
+        for child in reaction._children:
+            add_gene_tree(tokens, child)
+        arrays["reaction_gene_offsets"].append(len(tokens))
+
+        add_annotations("reaction", reaction)
+
+    # Small sections are stored as records in the json header
+    header = {"id": model.id,
+              "name": model.name,
+              "compartments": [CompartmentRecord(x.id, x.name) for x in model.gem_compartments.values()],
+              "references": [ReferenceRecord(id=x.id, year=x.year, title=x.title, journal=x.journal, url=x.url,
+                                             authors=[tuple(a) for a in x.authors], pmid=x.pmid, pmc=x.pmc, doi=x.doi)
+                             for x in model.references.values()],
+              "tests": [ModelTestRecord(description=x.description, comment=x.comment,
+                                        reaction_settings=[(s.reaction.id, s.upper_bound, s.lower_bound,
+                                                            s.objective_coefficient) for s in x.reaction_settings],
+                                        gene_settings=[(s.gene.id, s.activity) for s in x.gene_settings],
+                                        outcomes=[(o.reaction.id, o.value, o.operator) for o in x.outcomes],
+                                        references=[r.id for r in x.references])
+                        for x in model.tests],
+              "evidences": [EvidenceRecord(id=x.internal_id, assertion=x.assertion, comment=x.comment, eco=x.eco,
+                                           entity_id=x.entity.id, entity_type=type(x.entity).__name__,
+                                           target_id=x.target.id if x.target else None,
+                                           target_type=type(x.target).__name__ if x.target else None,
+                                           references=[r.id for r in x.references])
+                            for x in model.all_evidences.values() if x.entity is not None]}
+
+    blocks = [strings.to_bytes(), json.dumps(header).encode("UTF-8")]
+    for name, _ in _array_fields:
+        if sys.byteorder != "little":
+            arrays[name].byteswap()
+        blocks.append(arrays[name].tobytes())
+
+    output_path = snapshot_path(path)
+    with open(output_path, "wb") as open_file:
+        open_file.write(SNAPSHOT_MAGIC)
+        open_file.write(file_checksum(path))
+        open_file.write(_block_count.pack(len(blocks)))
+        for block in blocks:
+            open_file.write(_block_length.pack(len(block)))
+            open_file.write(block)
+
+    LOGGER.debug("Snapshot written: {}".format(output_path))
+    return output_path
+
+
+def _read_blocks(path, checksum):
+    """ Read and decode the data blocks of the snapshot
+
+    Returns None if the snapshot does not match the checksum """
+
+    with open(path, "rb") as open_file:
+        if open_file.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC or open_file.read(len(checksum)) != checksum:
+            return None
+
+        n_blocks, = _block_count.unpack(open_file.read(_block_count.size))
+        if n_blocks != len(_array_fields) + 2:
+            raise ValueError("Unexpected number of blocks")
+
+        blocks = []
+        for _ in range(n_blocks):
+            length, = _block_length.unpack(open_file.read(_block_length.size))
+            blocks.append(open_file.read(length))
+            if len(blocks[-1]) != length:
+                raise ValueError("Truncated block")
+
+    arrays = {}
+    for (name, typecode), block in zip(_array_fields, blocks[2:]):
+        arrays[name] = array(typecode)
+        arrays[name].frombytes(block)
+        if sys.byteorder != "little":
+            arrays[name].byteswap()
+
+    return StringTable.from_bytes(blocks[0]), json.loads(blocks[1].decode("UTF-8")), arrays
+
+
+def read_snapshot(path, progress=None):
+    """ Read the model from the snapshot belonging to the sbml file
+
+    Parameters
+    ----------
+    path: str
+        Path to the sbml file
+    progress: QProgressDialog
+
+    Returns
+    -------
+    model: GEMEditor.model.classes.cobra.Model or None
+        None if there is no snapshot or the snapshot
+        does not match the current sbml file
+    """
+
+    if not os.path.isfile(snapshot_path(path)):
+        return None
+
+    try:
+        content = _read_blocks(snapshot_path(path), file_checksum(path))
+    except (OSError, ValueError, struct.error):
+        LOGGER.warning("Snapshot could not be read: {}".format(snapshot_path(path)), exc_info=True)
+        return None
+
+    if content is None:
+        LOGGER.debug("Snapshot outdated: {}".format(snapshot_path(path)))
+        return None
+
+    LOGGER.debug("Reading snapshot: {}".format(snapshot_path(path)))
+    if progress is not None:
+        progress.setLabelText("Reading snapshot...")
+        progress.setRange(0, 0)
+
+    strings, header, arrays = content
+    get = strings.get
+    model = Model(id_or_model=header["id"], name=header["name"])
+
+    for values in header["compartments"]:
+        compartment = compartment_from_record(CompartmentRecord(*values))
+        model.gem_compartments[compartment.id] = compartment
+
+    values = arrays["annotation_strings"]
+    annotations = [Annotation(get(values[i]), get(values[i+1]), get(values[i+2]))
+                   for i in range(0, len(values), 3)]
+
+    def item_annotations(name, i):
+        offsets = arrays[name + "_annotation_offsets"]
+        return [annotations[x] for x in arrays[name + "_annotations"][offsets[i]:offsets[i+1]]]
+
+    # Metabolites
+    metabolites = []
+    values = arrays["metabolite_strings"]
+    for i, charge in enumerate(arrays["metabolite_charges"]):
+        metabolite = Metabolite(id=get(values[4*i]), name=get(values[4*i+1]), compartment=get(values[4*i+2]),
+                                formula=get(values[4*i+3]), charge=charge)
+        metabolite.annotation.update(item_annotations("metabolite", i))
+        metabolites.append(metabolite)
+    model.add_metabolites(metabolites)
+
+    # Genes
+    genes = []
+    values = arrays["gene_strings"]
+    for i in range(0, len(values), 3):
+        gene = Gene(id=get(values[i]), name=get(values[i+1]), genome=get(values[i+2]))
+        model.add_gene(gene)
+        genes.append(gene)
+
+    def read_gene_tree(tokens, position):
+        token = tokens[position]
+        if token >= 0:
+            return genes[token], position + 1
+        group = GeneGroup(id=get(tokens[position+1]), type=_group_types[token])
+        position += 3
+        for _ in range(tokens[position-1]):
+            child, position = read_gene_tree(tokens, position)
+            group.add_child(child)
+        return group, position
+
+    # Reactions
+    reactions, objectives = [], []
+    values = arrays["reaction_strings"]
+    numbers = arrays["reaction_values"]
+    stoichiometry_offsets = arrays["reaction_stoichiometry_offsets"]
+    gene_tokens = arrays["reaction_gene_tokens"]
+    gene_offsets = arrays["reaction_gene_offsets"]
+    for i, balanced in enumerate(arrays["reaction_balanced"]):
+        reaction = Reaction(id=get(values[6*i]), name=get(values[6*i+1]), subsystem=get(values[6*i+2]),
+                            comment=get(values[6*i+3]), lower_bound=numbers[3*i], upper_bound=numbers[3*i+1])
+
+        # The balancing status is restored from the snapshot instead of recomputing it
+        start, end = stoichiometry_offsets[i], stoichiometry_offsets[i+1]
+        stoichiometry = dict((metabolites[m], c) for m, c in
+                             zip(arrays["reaction_stoichiometry_metabolites"][start:end],
+                                 arrays["reaction_stoichiometry_coefficients"][start:end]))
+        cobraReaction.add_metabolites(reaction, stoichiometry)
+        reaction.charge_balanced = get(values[6*i+4])
+        reaction.elements_balanced = get(values[6*i+5])
+        reaction.balanced = _balanced_values[balanced]
+
+        position = gene_offsets[i] + 1
+        for _ in range(gene_tokens[gene_offsets[i]]):
+            child, position = read_gene_tree(gene_tokens, position)
+            reaction.add_child(child)
+
+        reaction.annotation.update(item_annotations("reaction", i))
+        reactions.append(reaction)
+        if numbers[3*i+2]:
+            objectives.append((reaction, numbers[3*i+2]))
+
+    model.add_reactions(reactions)
+    for reaction, coefficient in objectives:
+        reaction.objective_coefficient = coefficient
+
+    for values in header["references"]:
+        record = ReferenceRecord(*values)
+        model.add_reference(reference_from_record(record._replace(authors=[Author(*x) for x in record.authors])))
+
+    for values in header["tests"]:
+        model.tests.append(modeltest_from_record(ModelTestRecord(*values), model))
+
+    for values in header["evidences"]:
+        evidence = evidence_from_record(EvidenceRecord(*values), model)
+        model.all_evidences[evidence.internal_id] = evidence
+
+    return finalize_model(model)
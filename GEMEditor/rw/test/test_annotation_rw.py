@@ -149,6 +149,17 @@ class TestAnnotateXMLFromModel:
         assert is_annotation_node.attrib == {rdf_resource: "http://identifiers.org/collection/identifier"}
         assert has_annotation_node.attrib == {rdf_resource: "http://identifiers.org/collection2/identifier2"}
 
+    def test_annotations_sorted(self):
+        element = MockElement()
+        element.annotation.update([Annotation("kegg", "C00031"), Annotation("chebi", "CHEBI:2"),
+                                   Annotation("chebi", "CHEBI:1")])
+
+        annotate_xml_from_model(self.node, element)
+        assert [x.get(rdf_resource) for x in self.node.iter(rdf_li)] == \
+               ["http://identifiers.org/chebi/CHEBI:1",
+                "http://identifiers.org/chebi/CHEBI:2",
+                "http://identifiers.org/kegg/C00031"]
+
     def test_is_bag_not_added(self):
         """ Test that no empty bags are created if a certain type of annotation is missing """
 
@@ -205,6 +216,28 @@ def test_parse_annotation_invalid():
         parse_miriam_string(invalid_annotation2, "is")
 
 
+@pytest.mark.parametrize("miriam_link", ["http://identifiers.org/chebi/CHEBI:17283",
+                                         "https://identifiers.org/chebi/CHEBI:17283",
+                                         "http://identifiers.org/chebi/CHEBI:17283?format=rdf"])
+def test_parse_annotation_variants(miriam_link):
+    assert parse_miriam_string(miriam_link, "is") == Annotation("chebi", "CHEBI:17283", "is")
+
+
+def test_parsed_annotations_are_shared():
+    annotation = parse_miriam_string("http://identifiers.org/chebi/CHEBI:17283", "is")
+
+    assert parse_miriam_string("http://identifiers.org/chebi/CHEBI:17283", "is") is annotation
+    assert Annotation("chebi", "CHEBI:17283", "is") is annotation
+    assert parse_miriam_string("http://identifiers.org/chebi/CHEBI:17283", "has") is not annotation
+
+
+def test_collections_are_interned():
+    first = parse_miriam_string("http://identifiers.org/" + "".join(["che", "bi"]) + "/CHEBI:1", "is")
+    second = parse_miriam_string("http://identifiers.org/" + "".join(["ch", "ebi"]) + "/CHEBI:2", "is")
+
+    assert first.collection is second.collection
+
+
 class TestParseValidAnnotation:
 
     @pytest.fixture(autouse=True)
@@ -0,0 +1,106 @@
+from unittest.mock import Mock
+from GEMEditor.model.classes.cobra import Model, Metabolite, Reaction
+from GEMEditor.rw.parsers import SBMLParser, ModelLoader, WorkerProgress, LoaderSignals
+from GEMEditor.rw.sbml3 import write_sbml3_model
+from PyQt5.QtCore import QThreadPool
+from PyQt5.QtWidgets import QApplication
+
+
+# Make sure to only start an application
+# if there is no active one. Opening multiple
+# applications will lead to a crash.
+app = QApplication.instance()
+if app is None:
+    app = QApplication([])
+
+
+class TestWorkerProgress:
+
+    def test_values_are_throttled(self):
+        signals = LoaderSignals()
+        values = []
+        signals.valueChanged.connect(values.append)
+
+        progress = WorkerProgress(signals, max_rate=30)
+        progress.setRange(0, 100000)
+        for i in range(100000):
+            progress.setValue(i)
+
+        # First value is reported immediately
+        assert values[0] == 0
+        assert len(values) < 1000
+
+    def test_last_value_is_reported(self):
+        signals = LoaderSignals()
+        values = []
+        signals.valueChanged.connect(values.append)
+
+        progress = WorkerProgress(signals, max_rate=1)
+        progress.setRange(0, 10)
+        for i in range(11):
+            progress.setValue(i)
+
+        assert values == [0, 10]
+
+    def test_cancel(self):
+        progress = WorkerProgress(LoaderSignals())
+        assert progress.wasCanceled() is False
+        progress.cancel()
+        assert progress.wasCanceled() is True
+
+
+class TestModelLoader:
+
+    def setup_model(self, tmpdir):
+        model = Model("model_id")
+        metabolite = Metabolite("m1", compartment="c")
+        model.add_metabolites([metabolite])
+        reaction = Reaction("r1", lower_bound=-1000., upper_bound=1000.)
+        reaction.add_metabolites({metabolite: -1.})
+        model.add_reactions([reaction])
+        model.setup_tables()
+
+        path = str(tmpdir.join("model.xml"))
+        write_sbml3_model(path, model)
+        return path
+
+    def test_model_loaded_in_worker(self, tmpdir):
+        path = self.setup_model(tmpdir)
+        loader = ModelLoader(SBMLParser(path))
+        results = []
+        loader.signals.finished.connect(results.append)
+
+        pool = QThreadPool()
+        pool.start(loader)
+        pool.waitForDone()
+        QApplication.processEvents()
+
+        model, = results
+        assert model.id == "model_id"
+        assert model.reactions.get_by_id("r1").lower_bound == -1000.
+        # Model is handed over to the GUI thread
+        assert model.thread() == app.thread()
+        assert model.QtReactionTable.thread() == app.thread()
+
+    def test_canceled_loading_returns_none(self, tmpdir):
+        path = self.setup_model(tmpdir)
+        loader = ModelLoader(SBMLParser(path))
+        results = []
+        loader.signals.finished.connect(results.append)
+
+        loader.cancel()
+        loader.run()
+
+        assert results == [None]
+
+    def test_parser_errors_are_kept(self, tmpdir):
+        path = str(tmpdir.join("missing.xml"))
+        parser = SBMLParser(path)
+        loader = ModelLoader(parser)
+        finished = Mock()
+        loader.signals.finished.connect(finished)
+
+        loader.run()
+
+        finished.assert_called_once_with(None)
+        assert parser.errors
@@ -1,8 +1,17 @@
 import pytest
 from GEMEditor.model.classes.cobra import Reaction, Gene, GeneGroup, Metabolite, Model
 from GEMEditor.rw import *
-from GEMEditor.rw.reaction import add_reactions, parse_reaction, _bound_name
+from GEMEditor.rw.reaction import add_reactions, parse_reaction, _bound_name, BoundTable, parse_parameter_node
 from lxml.etree import Element
+from PyQt5.QtWidgets import QApplication
+
+
+# Make sure to only start an application
+# if there is no active one. Opening multiple
+# applications will lead to a crash.
+app = QApplication.instance()
+if app is None:
+    app = QApplication([])
 
 
 class TestAddReactions:
@@ -259,3 +268,48 @@ class TestBoundName:
         assert _bound_name(0.) == "pos_0.0"
         assert _bound_name(0) == "pos_0"
         assert _bound_name(1000) == "pos_1000"
+
+
+class TestBoundTable:
+
+    def test_standard_bounds(self):
+        table = BoundTable.from_model(Model())
+
+        assert len(table) == 3
+        assert table.id_of(cobra_default_lb_value) == cobra_default_lb_name
+        assert table.id_of(cobra_default_ub_value) == cobra_default_ub_name
+        assert table.id_of(cobra_default_zb_value) == cobra_default_zb_name
+
+    def test_distinct_bounds_added_once(self):
+        model = Model()
+        model.add_reactions([Reaction("r1", lower_bound=-5.5, upper_bound=12.25),
+                             Reaction("r2", lower_bound=-5.5, upper_bound=1000.),
+                             Reaction("r3", lower_bound=0., upper_bound=12.25)])
+        table = BoundTable.from_model(model)
+
+        assert len(table) == 5
+        assert table.id_of(-5.5) == "neg_5.5"
+        assert table.id_of(12.25) == "pos_12.25"
+
+    def test_xml_parameters(self):
+        table = BoundTable()
+        table.add(1.5)
+        table.add(1.5)
+        model_node = Element("model")
+        parameter_list = table.add_to_xml(model_node)
+
+        assert len(parameter_list) == 1
+        assert parameter_list[0].get("id") == "pos_1.5"
+        assert parameter_list[0].get("value") == "1.5"
+        assert parameter_list[0].get("sboTerm") == "SBO:0000625"
+
+    def test_equal_values_are_interned(self):
+        table = BoundTable()
+        for i in range(3):
+            parse_parameter_node(Element(sbml3_parameter, attrib={"id": "R_{}_upper_bound".format(i),
+                                                                  "value": "7.5"}), table)
+
+        assert len(table) == 3
+        assert table.value_of("R_0_upper_bound") == 7.5
+        assert table.value_of("R_0_upper_bound") is table.value_of("R_2_upper_bound")
+        assert table.id_of(7.5) == "R_0_upper_bound"
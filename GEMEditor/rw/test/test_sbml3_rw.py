@@ -1,5 +1,21 @@
+import lxml.etree as ET
+import pytest
+import GEMEditor.rw.sbml3 as sbml3
+from GEMEditor.model.classes.annotation import Annotation
+from GEMEditor.model.classes.cobra import Model, Metabolite, Reaction, Gene, GeneGroup, Compartment
+from GEMEditor.model.classes.evidence import Evidence
+from GEMEditor.model.classes.modeltest import ModelTest, ReactionSetting, GeneSetting, Outcome
+from GEMEditor.model.classes.reference import Reference, Author
 from GEMEditor.rw import *
-from GEMEditor.rw.sbml3 import setup_sbml3_node
+from GEMEditor.rw.sbml3 import setup_sbml3_node, write_sbml3_model, read_sbml3_model, stream_sbml3_model
+from PyQt5.QtWidgets import QApplication
+
+# Make sure to only start an application
+# if there is no active one. Opening multiple
+# applications will lead to a crash.
+app = QApplication.instance()
+if app is None:
+    app = QApplication([])
 
 
 class TestSetupModel:
@@ -14,9 +30,249 @@ class TestSetupModel:
         assert sbml_node.get(fbc_required) == "false"
 
 
+class TestStreamSbml3Model:
+
+    @pytest.fixture(autouse=True)
+    def setup_items(self, tmpdir):
+        self.model = Model("model_id", name="model name")
+        self.compartment = Compartment("c", "Cytoplasm")
+        self.model.gem_compartments["c"] = self.compartment
+
+        self.met1 = Metabolite("m1", formula="C6H12O6", name="Glucose", charge=-1, compartment="c")
+        self.met1.annotation.add(Annotation("chebi", "CHEBI:17234"))
+        self.met2 = Metabolite("m2", name="Glucose-6-phosphate", compartment="c")
+        self.model.add_metabolites([self.met1, self.met2])
+
+        self.gene1 = Gene("g1", name="Gene 1", genome="genome")
+        self.gene2 = Gene("g2")
+        self.model.add_gene(self.gene1)
+        self.model.add_gene(self.gene2)
+
+        self.r1 = Reaction("r1", name="Hexokinase", subsystem="Glycolysis", lower_bound=-20.5,
+                           upper_bound=500., comment="comment")
+        self.r1.add_metabolites({self.met1: -1, self.met2: 1})
+        self.r1.annotation.add(Annotation("ec-code", "2.7.1.1"))
+        group = GeneGroup(type="or")
+        self.r1.add_child(group)
+        group.add_child(self.gene1)
+        group.add_child(self.gene2)
+        self.r2 = Reaction("r2", lower_bound=-1000.)
+        self.r2.add_metabolites({self.met1: -1})
+        self.model.add_reactions([self.r1, self.r2])
+        self.r1.objective_coefficient = 1.
+
+        self.reference = Reference(id="ref1", pmid="1234", title="title", year="2017",
+                                   authors=[Author("Doe", "John", "J")])
+        self.model.add_reference(self.reference)
+
+        self.test = ModelTest(description="description")
+        self.test.add_setting(ReactionSetting(self.r2, 0., -10., 0.))
+        self.test.add_setting(GeneSetting(self.gene1, False))
+        self.test.add_outcome(Outcome(self.r1, 0., "greater than"))
+        self.test.add_reference(self.reference)
+        self.model.add_test(self.test)
+
+        self.evidence = Evidence(entity=self.r1, eco="ECO:0000000", assertion="Catalyzed by", target=self.gene2)
+        self.evidence.add_reference(self.reference)
+        self.model.add_evidence(self.evidence)
+
+        self.model.setup_tables()
+        self.path = str(tmpdir.join("model.xml"))
+        write_sbml3_model(self.path, self.model)
+
+    def test_streaming_matches_tree_parsing(self):
+        tree_model = read_sbml3_model(self.path, None)
+        stream_model = read_sbml3_model(self.path, None, streaming=True)
+        self.check_models_equal(stream_model, tree_model)
+
+    def test_gene_products_after_reactions(self, tmpdir):
+        # Files written by libsbml list the gene products after the reactions
+        tree = ET.parse(self.path)
+        model_node = tree.getroot().find(sbml3_model)
+        model_node.append(model_node.find(fbc_listOfGeneProducts))
+        assert model_node.index(model_node.find(fbc_listOfGeneProducts)) > \
+               model_node.index(model_node.find(sbml3_listOfReactions))
+        path = str(tmpdir.join("libsbml.xml"))
+        tree.write(path, encoding="UTF-8", xml_declaration=True)
+
+        stream_model = read_sbml3_model(path, None, streaming=True)
+        self.check_models_equal(stream_model, read_sbml3_model(self.path, None))
+        assert stream_model.genes.get_by_id("g2") in stream_model.reactions.get_by_id("r1").genes
+
+    @staticmethod
+    def check_models_equal(stream_model, tree_model):
+
+        assert stream_model.id == tree_model.id
+        assert stream_model.name == tree_model.name
+        assert set(stream_model.gem_compartments) == set(tree_model.gem_compartments)
+
+        assert len(stream_model.metabolites) == len(tree_model.metabolites) == 2
+        for metabolite in tree_model.metabolites:
+            streamed = stream_model.metabolites.get_by_id(metabolite.id)
+            assert (streamed.name, streamed.formula, streamed.charge, streamed.compartment) == \
+                   (metabolite.name, metabolite.formula, metabolite.charge, metabolite.compartment)
+            assert streamed.annotation == metabolite.annotation
+
+        assert len(stream_model.genes) == len(tree_model.genes) == 2
+        assert stream_model.genes.get_by_id("g1").genome == "genome"
+
+        assert len(stream_model.reactions) == len(tree_model.reactions) == 2
+        for reaction in tree_model.reactions:
+            streamed = stream_model.reactions.get_by_id(reaction.id)
+            assert (streamed.name, streamed.subsystem, streamed.comment) == \
+                   (reaction.name, reaction.subsystem, reaction.comment)
+            assert (streamed.lower_bound, streamed.upper_bound, streamed.objective_coefficient) == \
+                   (reaction.lower_bound, reaction.upper_bound, reaction.objective_coefficient)
+            assert streamed.reaction == reaction.reaction
+            assert streamed.gene_reaction_rule == reaction.gene_reaction_rule
+            assert streamed.annotation == reaction.annotation
+            assert streamed.model is stream_model
+
+        assert stream_model.reactions.get_by_id("r1").objective_coefficient == 1.
+
+    def test_gem_extensions(self):
+        model = stream_sbml3_model(self.path)
+
+        reference = model.references["ref1"]
+        assert reference.pmid == "1234"
+        assert reference.authors[0].lastname == "Doe"
+
+        assert len(model.tests) == 1
+        test = model.tests[0]
+        assert test.description == "description"
+        assert test.reaction_settings[0].reaction is model.reactions.get_by_id("r2")
+        assert test.gene_settings[0].gene is model.genes.get_by_id("g1")
+        assert test.outcomes[0].reaction is model.reactions.get_by_id("r1")
+        assert test.references == set([reference])
+
+        assert len(model.all_evidences) == 1
+        evidence = list(model.all_evidences.values())[0]
+        assert evidence.entity is model.reactions.get_by_id("r1")
+        assert evidence.target is model.genes.get_by_id("g2")
+        assert evidence.references == set([reference])
+
+        assert model.QtReactionTable.rowCount() == 2
+
+    def test_streaming_clears_parsed_elements(self, monkeypatch):
+        parsed_nodes = []
+        original = sbml3.parse_metabolite_node
+
+        def record_node(node):
+            parsed_nodes.append(node)
+            return original(node)
+
+        monkeypatch.setattr(sbml3, "parse_metabolite_node", record_node)
+        stream_sbml3_model(self.path)
+
+        assert len(parsed_nodes) == 2
+        assert all(len(node) == 0 and not node.attrib for node in parsed_nodes)
+
+    def test_non_sbml_file(self, tmpdir):
+        path = str(tmpdir.join("other.xml"))
+        with open(path, "w") as open_file:
+            open_file.write("<root><model/></root>")
+
+        with pytest.raises(IOError):
+            stream_sbml3_model(path)
+
+    def test_streamed_file_matches_tree_writer(self, tmpdir):
+        stream_path = str(tmpdir.join("streamed.xml"))
+        write_sbml3_model(stream_path, self.model, streaming=True)
+
+        self.check_models_equal(read_sbml3_model(stream_path, None), read_sbml3_model(self.path, None))
+
+    def test_namespaces_declared_once(self, tmpdir):
+        stream_path = str(tmpdir.join("streamed.xml"))
+        write_sbml3_model(stream_path, self.model, streaming=True)
+
+        with open(stream_path, "rb") as open_file:
+            content = open_file.read()
+        for prefix in nsmap:
+            assert content.count("xmlns:{}=".format(prefix).encode()) == 1
+
+    def test_streamed_file_is_indented(self, tmpdir):
+        stream_path = str(tmpdir.join("streamed.xml"))
+        write_sbml3_model(stream_path, self.model, streaming=True)
+
+        with open(stream_path, "rb") as open_file:
+            lines = open_file.read().splitlines()
+        with open(self.path, "rb") as open_file:
+            assert len(lines) == len(open_file.read().splitlines())
+
+
+class TestIncrementalWriteSbml3Model:
+
+    @pytest.fixture(autouse=True)
+    def setup_items(self, tmpdir, monkeypatch):
+        self.model = Model("model_id", name="model name")
+        self.met1 = Metabolite("m1", name="Glucose", compartment="c")
+        self.met2 = Metabolite("m2", name="Glucose-6-phosphate", compartment="c")
+        self.model.add_metabolites([self.met1, self.met2])
+        self.gene1 = Gene("g1")
+        self.model.add_gene(self.gene1)
+        self.reaction = Reaction("r1", name="Hexokinase", lower_bound=-1000.)
+        self.reaction.add_metabolites({self.met1: -1., self.met2: 1.})
+        self.reaction.add_child(self.gene1)
+        self.model.add_reactions([self.reaction])
+        self.reference = Reference(id="ref1", title="title")
+        self.model.add_reference(self.reference)
+        self.model.add_evidence(Evidence(entity=self.reaction, eco="ECO:0000000", assertion="Catalyzed by",
+                                         target=self.gene1))
+        self.model.setup_tables()
+
+        self.path = str(tmpdir.join("incremental.xml"))
+        self.full_path = str(tmpdir.join("full.xml"))
+
+        # Keep track of the serialized sections
+        self.serialized = []
+        original = sbml3.serialize_section
+
+        def record_section(model, add_function):
+            self.serialized.append(add_function.__name__)
+            return original(model, add_function)
+
+        monkeypatch.setattr(sbml3, "serialize_section", record_section)
+
+    def check_output_equal(self):
+        write_sbml3_model(self.full_path, self.model)
+        with open(self.path, "rb") as incremental_file, open(self.full_path, "rb") as full_file:
+            assert incremental_file.read() == full_file.read()
+
+    def test_first_save_serializes_all_sections(self):
+        write_sbml3_model(self.path, self.model, incremental=True)
+
+        assert len(self.serialized) == 6
+        self.check_output_equal()
+
+    def test_unchanged_model_reuses_sections(self):
+        write_sbml3_model(self.path, self.model, incremental=True)
+        del self.serialized[:]
+        write_sbml3_model(self.path, self.model, incremental=True)
+
+        assert self.serialized == []
+        self.check_output_equal()
+
+    def test_changed_reaction(self):
+        write_sbml3_model(self.path, self.model, incremental=True)
+        del self.serialized[:]
 
+        self.reaction.upper_bound = 500.
+        self.model.QtReactionTable.update_row_from_link(0)
+        write_sbml3_model(self.path, self.model, incremental=True)
 
+        assert self.serialized == ["add_reactions", "add_tests_to_xml", "add_evidences_to_xml"]
+        self.check_output_equal()
 
+    def test_changed_metabolite(self):
+        write_sbml3_model(self.path, self.model, incremental=True)
+        del self.serialized[:]
 
+        self.met1.id = "m3"
+        self.model.QtMetaboliteTable.update_row_from_item(self.met1, 0)
+        write_sbml3_model(self.path, self.model, incremental=True)
 
+        assert "add_genes" not in self.serialized
+        assert "add_references" not in self.serialized
+        assert "add_reactions" in self.serialized
+        self.check_output_equal()
 
@@ -0,0 +1,145 @@
+import os
+import pytest
+from GEMEditor.model.classes.annotation import Annotation
+from GEMEditor.model.classes.cobra import Model, Metabolite, Reaction, Gene, GeneGroup, Compartment
+from GEMEditor.model.classes.evidence import Evidence
+from GEMEditor.model.classes.modeltest import ModelTest, ReactionSetting, GeneSetting, Outcome
+from GEMEditor.model.classes.reference import Reference, Author
+from GEMEditor.rw.sbml3 import write_sbml3_model, read_sbml3_model
+from GEMEditor.rw.snapshot import write_snapshot, read_snapshot, snapshot_path
+from PyQt5.QtWidgets import QApplication
+
+
+# Make sure to only start an application
+# if there is no active one. Opening multiple
+# applications will lead to a crash.
+app = QApplication.instance()
+if app is None:
+    app = QApplication([])
+
+
+class TestSnapshot:
+
+    @pytest.fixture(autouse=True)
+    def setup_items(self, tmpdir):
+        self.model = Model("model_id", name="model name")
+        self.model.gem_compartments["c"] = Compartment("c", "Cytoplasm")
+
+        self.met1 = Metabolite("m1", formula="C6H12O6", name="Glucose", charge=-1, compartment="c")
+        self.met1.annotation.add(Annotation("chebi", "CHEBI:17234"))
+        self.met2 = Metabolite("m2", formula="C6H11O9P", name="Glucose-6-phosphate", compartment="c")
+        self.met2.annotation.add(Annotation("chebi", "CHEBI:17234"))
+        self.model.add_metabolites([self.met1, self.met2])
+
+        self.gene1 = Gene("g1", name="Gene 1", genome="genome")
+        self.gene2 = Gene("g2")
+        self.gene3 = Gene("g3")
+        self.model.add_genes([self.gene1, self.gene2, self.gene3])
+
+        self.r1 = Reaction("r1", name="Hexokinase", subsystem="Glycolysis", lower_bound=-20.5,
+                           upper_bound=500., comment="comment")
+        self.r1.add_metabolites({self.met1: -1., self.met2: 1.})
+        self.r1.annotation.add(Annotation("ec-code", "2.7.1.1"))
+        or_group = GeneGroup(type="or")
+        self.r1.add_child(or_group)
+        or_group.add_child(self.gene1)
+        and_group = GeneGroup(type="and")
+        or_group.add_child(and_group)
+        and_group.add_child(self.gene2)
+        and_group.add_child(self.gene3)
+        self.r2 = Reaction("r2", lower_bound=-1000.)
+        self.r2.add_metabolites({self.met1: -1.})
+        self.r2.add_child(self.gene3)
+        self.model.add_reactions([self.r1, self.r2])
+        self.r1.objective_coefficient = 1.
+
+        self.reference = Reference(id="ref1", pmid="1234", title="title", year="2017",
+                                   authors=[Author("Doe", "John", "J")])
+        self.model.add_reference(self.reference)
+
+        self.test = ModelTest(description="description")
+        self.test.add_setting(ReactionSetting(self.r2, 0., -10., 0.))
+        self.test.add_setting(GeneSetting(self.gene1, False))
+        self.test.add_outcome(Outcome(self.r1, 0., "greater than"))
+        self.test.add_reference(self.reference)
+        self.model.add_test(self.test)
+
+        self.evidence = Evidence(entity=self.r1, eco="ECO:0000000", assertion="Catalyzed by", target=self.gene2)
+        self.evidence.add_reference(self.reference)
+        self.model.add_evidence(self.evidence)
+
+        self.model.setup_tables()
+        self.path = str(tmpdir.join("model.xml"))
+        write_sbml3_model(self.path, self.model)
+
+    def test_snapshot_matches_sbml(self):
+        write_snapshot(self.model, self.path)
+        model = read_snapshot(self.path)
+        sbml_model = read_sbml3_model(self.path, None)
+
+        assert (model.id, model.name) == (sbml_model.id, sbml_model.name)
+        assert set(model.gem_compartments) == set(sbml_model.gem_compartments)
+
+        for metabolite in sbml_model.metabolites:
+            restored = model.metabolites.get_by_id(metabolite.id)
+            assert (restored.name, restored.formula, restored.charge, restored.compartment) == \
+                   (metabolite.name, metabolite.formula, metabolite.charge, metabolite.compartment)
+            assert restored.annotation == metabolite.annotation
+
+        assert model.genes.get_by_id("g1").genome == "genome"
+        for reaction in sbml_model.reactions:
+            restored = model.reactions.get_by_id(reaction.id)
+            assert (restored.name, restored.subsystem, restored.comment) == \
+                   (reaction.name, reaction.subsystem, reaction.comment)
+            assert (restored.lower_bound, restored.upper_bound, restored.objective_coefficient) == \
+                   (reaction.lower_bound, reaction.upper_bound, reaction.objective_coefficient)
+            assert restored.reaction == reaction.reaction
+            assert restored.gene_reaction_rule == reaction.gene_reaction_rule
+            assert restored.annotation == reaction.annotation
+            assert (restored.charge_balanced, restored.elements_balanced, restored.balanced) == \
+                   (reaction.charge_balanced, reaction.elements_balanced, reaction.balanced)
+            assert restored.model is model
+
+    def test_annotations_are_shared(self):
+        write_snapshot(self.model, self.path)
+        model = read_snapshot(self.path)
+
+        annotation1, = model.metabolites.get_by_id("m1").annotation
+        annotation2, = model.metabolites.get_by_id("m2").annotation
+        assert annotation1 is annotation2
+
+    def test_gem_extensions(self):
+        write_snapshot(self.model, self.path)
+        model = read_snapshot(self.path)
+
+        reference = model.references["ref1"]
+        assert reference.authors == [Author("Doe", "John", "J")]
+
+        test = model.tests[0]
+        assert test.reaction_settings[0].reaction is model.reactions.get_by_id("r2")
+        assert test.gene_settings[0].gene is model.genes.get_by_id("g1")
+        assert test.outcomes[0].reaction is model.reactions.get_by_id("r1")
+        assert test.references == set([reference])
+
+        evidence = model.all_evidences[self.evidence.internal_id]
+        assert evidence.entity is model.reactions.get_by_id("r1")
+        assert evidence.target is model.genes.get_by_id("g2")
+        assert evidence.references == set([reference])
+
+    def test_missing_snapshot(self):
+        assert not os.path.exists(snapshot_path(self.path))
+        assert read_snapshot(self.path) is None
+
+    def test_outdated_snapshot(self):
+        write_snapshot(self.model, self.path)
+        self.model.reactions.get_by_id("r1").name = "changed"
+        write_sbml3_model(self.path, self.model)
+
+        assert read_snapshot(self.path) is None
+
+    def test_corrupt_snapshot(self):
+        write_snapshot(self.model, self.path)
+        with open(snapshot_path(self.path), "r+b") as open_file:
+            open_file.truncate(40)
+
+        assert read_snapshot(self.path) is None
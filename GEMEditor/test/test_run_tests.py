@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+import lxml.etree as ET
+import pytest
+import GEMEditor
+from GEMEditor.model.classes.cobra import Reaction, Metabolite, Model
+from GEMEditor.model.classes.modeltest import ModelTest, ReactionSetting, Outcome
+from GEMEditor.run_tests import main
+from GEMEditor.rw.sbml3 import write_sbml3_model
+from PyQt5.QtWidgets import QApplication
+
+# Make sure to only start an application
+# if there is no active one. Opening multiple
+# applications will lead to a crash.
+app = QApplication.instance()
+if app is None:
+    app = QApplication([])
+
+
+class TestRunTests:
+
+    @pytest.fixture(autouse=True)
+    def setup_model(self, tmpdir):
+        model = Model("test_model")
+        m1 = Metabolite("m1", compartment="c")
+        m2 = Metabolite("m2", compartment="c")
+        uptake = Reaction("uptake", lower_bound=-1000., upper_bound=1000.)
+        uptake.add_metabolites({m1: -1})
+        conversion = Reaction("conversion", lower_bound=0., upper_bound=1000.)
+        conversion.add_metabolites({m1: -1, m2: 1})
+        secretion = Reaction("secretion", lower_bound=0., upper_bound=1000.)
+        secretion.add_metabolites({m2: -1})
+        model.add_reactions((uptake, conversion, secretion))
+
+        for description, value, operator in (("passing", 5., "greater than"), ("failing", 5., "less than")):
+            testcase = ModelTest(description=description)
+            testcase.add_setting(ReactionSetting(uptake, 1000., -10., 0.))
+            testcase.add_setting(ReactionSetting(secretion, 1000., 0., 1.))
+            testcase.add_outcome(Outcome(secretion, value, operator))
+            model.add_test(testcase)
+        model.setup_tables()
+
+        self.model = model
+        self.path = str(tmpdir.join("model.xml"))
+        self.junit = str(tmpdir.join("report.xml"))
+        self.json = str(tmpdir.join("report.json"))
+        write_sbml3_model(self.path, model)
+
+    @pytest.mark.parametrize("processes", ("1", "2"))
+    def test_reports(self, processes):
+        assert main([self.path, "--junit", self.junit, "--json", self.json, "--processes", processes]) == 1
+
+        suite = ET.parse(self.junit).getroot().find("testsuite")
+        assert suite.get("tests") == "2"
+        assert suite.get("failures") == "1"
+        testcases = dict((x.get("name"), x) for x in suite.findall("testcase"))
+        assert set(testcases) == set(["passing", "failing"])
+        assert testcases["passing"].find("failure") is None
+        assert testcases["failing"].find("failure").get("message") == "secretion less than 5.0, flux 10.0"
+
+        with open(self.json) as open_file:
+            report = json.load(open_file)
+        assert (report["model"], report["passed"], report["failed"]) == ("test_model", 1, 1)
+        assert set(report["durations"]) == set(["load", "run"])
+        assert sorted((x["name"], x["passed"], x["status"], x["objective_value"]) for x in report["results"]) == \
+            [("failing", False, "optimal", 10.), ("passing", True, "optimal", 10.)]
+        assert all(x["duration"] >= 0. for x in report["results"])
+
+    def test_exit_code_all_passed(self):
+        self.model.tests.pop()
+        self.model.setup_tests_table()
+        write_sbml3_model(self.path, self.model)
+        assert main([self.path, "--processes", "1"]) == 0
+
+
+def test_no_widgets_imported():
+    code = "import sys, GEMEditor.run_tests; print('PyQt5.QtWidgets' in sys.modules)"
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(GEMEditor.__file__)))
+    output = subprocess.check_output([sys.executable, "-c", code], env=env, stderr=subprocess.DEVNULL)
+    assert output.decode().strip() == "False"
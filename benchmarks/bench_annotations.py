@@ -0,0 +1,107 @@
+""" Benchmark decoding of MIRIAM annotations
+
+Decodes the annotations of a synthetic set of elements with the
+previous decoder (urlsplit and a new Annotation per rdf:li) and with
+the codec in GEMEditor.rw.annotation (identifiers.org fast path,
+interned collections and shared Annotation objects).
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_annotations.py [--annotations 100000]
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from six.moves.urllib.parse import urlsplit
+import lxml.etree as ET
+
+COLLECTIONS = ("chebi", "kegg.compound", "metanetx.chemical", "bigg.metabolite", "seed.compound",
+               "hmdb", "biocyc", "reactome", "lipidmaps", "inchikey")
+
+
+def legacy_parse_miriam_string(miriam_link, type):
+    """ Decoder used before the codec was introduced """
+    from GEMEditor.model.classes.annotation import Annotation
+
+    split_url = urlsplit(miriam_link)
+    collection, identifier = split_url.path.lstrip("/").split("/", 1)
+    if split_url.netloc != "identifiers.org":
+        raise ValueError("{0} does not start with http://identifiers.org/".format(miriam_link))
+    return Annotation(collection=collection, identifier=identifier, type=type)
+
+
+def build_elements(n_annotations, per_element=5, seed=42):
+    """ Build annotated species nodes
+
+    Identifiers are drawn from a pool a third of the size of the
+    annotations, as metabolites in different compartments share
+    their annotations. """
+
+    from GEMEditor.model.classes.annotation import Annotation
+    from GEMEditor.rw.annotation import annotate_xml_from_model
+    from GEMEditor.rw import sbml3_species
+
+    class Item:
+        def __init__(self, id, annotation):
+            self.id = id
+            self.annotation = annotation
+
+    rand = random.Random(seed)
+    pool = [(rand.choice(COLLECTIONS), "ID:{0}".format(i)) for i in range(n_annotations // 3)]
+    nodes = []
+    for i in range(n_annotations // per_element):
+        item = Item("m{0}".format(i), set(Annotation(*x) for x in rand.sample(pool, per_element)))
+        node = ET.Element(sbml3_species)
+        annotate_xml_from_model(node, item)
+        nodes.append(node)
+    return nodes
+
+
+def decode(nodes, parse_function):
+    import GEMEditor.rw.annotation as codec
+
+    original = codec.parse_miriam_string
+    codec.parse_miriam_string = parse_function
+    try:
+        gc.collect()
+        start = time.perf_counter()
+        result = [codec.annotate_element_from_xml(node) for node in nodes]
+        duration = time.perf_counter() - start
+
+        # Measure the memory held by the decoded annotations in a separate run
+        del result
+        gc.collect()
+        tracemalloc.start()
+        result = [codec.annotate_element_from_xml(node) for node in nodes]
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+    finally:
+        codec.parse_miriam_string = original
+    return result, duration, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--annotations", type=int, default=100000)
+    args = parser.parse_args()
+
+    from GEMEditor.rw.annotation import parse_miriam_string
+
+    nodes = build_elements(args.annotations)
+    print("Decoding {0} annotations of {1} elements".format(args.annotations, len(nodes)))
+    print("{0:<8} {1:>10} {2:>13} {3:>14}".format("decoder", "time [s]", "memory [MB]", "objects"))
+
+    results = {}
+    for name, function in (("legacy", legacy_parse_miriam_string), ("codec", parse_miriam_string)):
+        result, duration, memory = decode(nodes, function)
+        objects = len(set(id(x) for annotations in result for x in annotations))
+        print("{0:<8} {1:>10.2f} {2:>13.1f} {3:>14}".format(name, duration, memory / 1024. ** 2, objects))
+        results[name] = result
+
+    assert results["legacy"] == results["codec"]
+
+
+if __name__ == '__main__':
+    main()
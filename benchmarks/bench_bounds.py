@@ -0,0 +1,86 @@
+""" Benchmark the shared flux bound parameter table
+
+A model with measured, i.e. mostly distinct, flux bounds is saved
+with the shared bound table and in the per-reaction parameter
+layout used by other tools, where every reaction references its
+own pair of parameters. Both files are read back with GEMEditor.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_bounds.py [--reactions 20000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import lxml.etree as ET
+
+
+def write_per_reaction_parameters(source, target):
+    """ Rewrite the file so that every reaction has its own bound parameters """
+    from GEMEditor.rw import sbml3_listOfParameters, sbml3_listOfReactions, sbml3_model, sbml3_parameter, \
+        sbml3_reaction, fbc_lowerFluxBound, fbc_upperFluxBound
+
+    tree = ET.parse(source)
+    model_node = tree.getroot().find(sbml3_model)
+    parameter_list = model_node.find(sbml3_listOfParameters)
+    values = dict((x.get("id"), x) for x in parameter_list)
+    parameter_list.clear()
+
+    for reaction_node in model_node.find(sbml3_listOfReactions).iterfind(sbml3_reaction):
+        for attribute, suffix in ((fbc_lowerFluxBound, "lower_bound"), (fbc_upperFluxBound, "upper_bound")):
+            parameter_id = "{0}_{1}".format(reaction_node.get("id"), suffix)
+            attrib = dict(values[reaction_node.get(attribute)].attrib, id=parameter_id)
+            ET.SubElement(parameter_list, sbml3_parameter, attrib=attrib)
+            reaction_node.set(attribute, parameter_id)
+
+    tree.write(target, pretty_print=True, encoding="UTF-8", xml_declaration=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reactions", type=int, default=20000)
+    args = parser.parse_args()
+
+    from PyQt5.QtWidgets import QApplication
+    from GEMEditor.rw import sbml3_listOfParameters, sbml3_model
+    from GEMEditor.rw.reaction import BoundTable
+    from GEMEditor.rw.sbml3 import read_sbml3_model, write_sbml3_model
+    from synthetic import build_synthetic_model
+
+    app = QApplication.instance() or QApplication([])
+    model = build_synthetic_model(n_reactions=args.reactions, distinct_bounds=True)
+
+    start = time.perf_counter()
+    table = BoundTable.from_model(model)
+    table.add_to_xml(ET.Element(sbml3_model))
+    print("Bound table with {0} parameters for {1} reactions built in {2:.3f}s".format(
+        len(table), len(model.reactions), time.perf_counter() - start))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        shared_path = os.path.join(tmpdir, "shared.xml")
+        per_reaction_path = os.path.join(tmpdir, "per_reaction.xml")
+        write_sbml3_model(shared_path, model)
+        write_per_reaction_parameters(shared_path, per_reaction_path)
+
+        print("{0:<14} {1:>11} {2:>10} {3:>10} {4:>14}".format("layout", "parameters", "size [MB]", "read [s]",
+                                                               "bound floats"))
+        for layout, path in (("per reaction", per_reaction_path), ("shared table", shared_path)):
+            n_parameters = len(ET.parse(path).getroot().find(sbml3_model).find(sbml3_listOfParameters))
+
+            start = time.perf_counter()
+            read_model = read_sbml3_model(path, None)
+            duration = time.perf_counter() - start
+
+            # Count the float objects referenced as bounds
+            bound_objects = set()
+            for reaction in read_model.reactions:
+                bound_objects.update((id(reaction.lower_bound), id(reaction.upper_bound)))
+
+            print("{0:<14} {1:>11} {2:>10.1f} {3:>10.2f} {4:>14}".format(layout, n_parameters,
+                                                                        os.path.getsize(path) / 1024. ** 2,
+                                                                        duration, len(bound_objects)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+""" Benchmark retrieving the annotations of a mapped model
+
+The annotations of all metabolites mapped to the database are
+retrieved with one get_annotations_from_id query per metabolite,
+as before the packed annotations, and with get_annotations_from_ids.
+The mapped ids are either spread over the whole database or a
+dense block of ids.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_database_annotations.py [--entries 200000] [--metabolites 5000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from bench_database_mapping import build_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=200000)
+    parser.add_argument("--metabolites", type=int, default=5000)
+    args = parser.parse_args()
+
+    from GEMEditor.base.classes import HeadlessProgress
+    from GEMEditor.database import base
+    from GEMEditor.database.create import load_annotations
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "database.db")
+        build_database(path, args.entries)
+        connection = sqlite3.connect(path)
+        load_annotations(connection, HeadlessProgress())
+        connection.close()
+
+        rand = random.Random(42)
+        start = rand.randint(1, args.entries - args.metabolites)
+        print("Annotations of {0} metabolites out of {1} entries".format(args.metabolites, args.entries))
+        print("{0:<8} {1:>12} {2:>12}".format("ids", "per id [s]", "batched [s]"))
+
+        for name, ids in (("spread", rand.sample(range(1, args.entries + 1), args.metabolites)),
+                          ("dense", list(range(start, start + args.metabolites)))):
+            # Measure the queries, not the lookup cache
+            base.lookup_cache = base.LookupCache(0)
+            with base.DatabaseWrapper(path) as database:
+                begin = time.perf_counter()
+                single = dict((x, database.get_annotations_from_id(x, "metabolite")) for x in ids)
+                single_time = time.perf_counter() - begin
+
+                begin = time.perf_counter()
+                batched = database.get_annotations_from_ids(ids, "metabolite")
+                batched_time = time.perf_counter() - begin
+
+            assert batched == dict((k, v) for k, v in single.items() if v)
+            print("{0:<8} {1:>12.3f} {2:>12.3f}".format(name, single_time, batched_time))
+
+
+if __name__ == '__main__':
+    main()
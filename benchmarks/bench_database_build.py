@@ -0,0 +1,134 @@
+""" Benchmark building the MetaNetX database
+
+The MetaNetX test files bundled in GEMEditor/database/test/data are
+replicated with renumbered MetaNetX ids and loaded with the previous
+sequential loaders and with build_database. Every build runs in a
+fresh interpreter to measure its peak resident memory and the cpu
+time spent in the main process, which bounds the build time when
+parsing is spread over enough cpus.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_database_build.py [--scale 200] [--processes 4]
+"""
+
+import argparse
+import json
+import os
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                        "GEMEditor", "database", "test", "data", "metanetx")
+
+
+def replicate_files(target, scale):
+    """ Write the fixtures scale times with distinct MetaNetX ids """
+    from GEMEditor.database import metanetx_files
+
+    files = dict()
+    for key, filename in metanetx_files.items():
+        with open(os.path.join(FIXTURES, filename), encoding="UTF-8") as open_file:
+            lines = open_file.readlines()
+        files[key] = os.path.join(target, filename)
+        with open(files[key], "w", encoding="UTF-8") as open_file:
+            # Compartments are shared by all copies
+            copies = range(1) if key == "Compartments" else range(scale)
+            for i in copies:
+                prefix = "{0}0".format(i) if i else ""
+                for line in lines:
+                    if i and line.startswith("#"):
+                        continue
+                    open_file.write(line.replace("MNXM", "MNXM" + prefix).replace("MNXR", "MNXR" + prefix))
+    return files
+
+
+def build(variant, files, path, processes):
+    """ Build the database in the current process """
+    from GEMEditor.base.classes import HeadlessProgress
+    from GEMEditor.database.create import load_metabolites, load_metabolites_xref, load_compartments, \
+        load_reactions, load_reaction_xrefs, load_reaction_signatures, load_annotations, create_indices, \
+        build_database
+    from GEMEditor.database.tables import setup_empty_database
+
+    setup_empty_database(path)
+    connection = sqlite3.connect(path)
+    progress = HeadlessProgress()
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpu = usage.ru_utime + usage.ru_stime
+    start = time.perf_counter()
+    if variant == "sequential":
+        load_metabolites(connection, files, progress)
+        load_metabolites_xref(connection, files, progress)
+        load_compartments(connection, files, progress)
+        load_reactions(connection, files, progress)
+        load_reaction_xrefs(connection, files, progress)
+        load_reaction_signatures(connection, progress)
+        load_annotations(connection, progress)
+        create_indices(connection, progress)
+    else:
+        build_database(connection, files, progress, processes=processes)
+    duration = time.perf_counter() - start
+    connection.close()
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return {"time": duration,
+            "main_cpu": usage.ru_utime + usage.ru_stime - cpu,
+            "main_rss": usage.ru_maxrss / 1024.,
+            "worker_rss": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024.}
+
+
+def table_contents(path):
+    connection = sqlite3.connect(path)
+    tables = [x[0] for x in connection.execute("SELECT name FROM sqlite_master WHERE type='table' "
+                                               "AND name NOT IN ('resources') AND name NOT LIKE '%_search%' "
+                                               "ORDER BY name")]
+    result = dict((table, connection.execute("SELECT * FROM {0} ORDER BY id".format(table)).fetchall())
+                  for table in tables)
+    connection.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=200)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--variant", help=argparse.SUPPRESS)
+    parser.add_argument("--data", help=argparse.SUPPRESS)
+    parser.add_argument("--database", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        files = json.loads(args.data)
+        print(json.dumps(build(args.variant, files, args.database, args.processes)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        files = replicate_files(tmpdir, args.scale)
+        size = sum(os.path.getsize(x) for x in files.values())
+        print("Building the database from {0:.1f} MB of MetaNetX files with {1} processes".format(
+            size / 1024. ** 2, args.processes))
+        print("{0:<11} {1:>9} {2:>13} {3:>14} {4:>16}".format("build", "time [s]", "main CPU [s]", "main RSS [MB]",
+                                                               "worker RSS [MB]"))
+
+        paths = dict()
+        for variant in ("sequential", "pipeline"):
+            paths[variant] = os.path.join(tmpdir, "{0}.db".format(variant))
+            output = subprocess.check_output([sys.executable, __file__, "--variant", variant,
+                                              "--data", json.dumps(files), "--database", paths[variant],
+                                              "--processes", str(args.processes)],
+                                             stderr=subprocess.DEVNULL)
+            result = json.loads(output.decode().strip().splitlines()[-1])
+            print("{0:<11} {1:>9.2f} {2:>13.2f} {3:>14.1f} {4:>16.1f}".format(variant, result["time"],
+                                                                             result["main_cpu"], result["main_rss"],
+                                                                             result["worker_rss"]))
+
+        assert table_contents(paths["sequential"]) == table_contents(paths["pipeline"])
+
+
+if __name__ == '__main__':
+    main()
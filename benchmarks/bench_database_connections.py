@@ -0,0 +1,79 @@
+""" Benchmark opening the database for short lookups
+
+Dialogs open a DatabaseWrapper, run a few lookups and close it
+again. This is repeated with a new sqlite3 connection per wrapper,
+as before the connection pool, and with the pooled connections.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_database_connections.py [--entries 200000] [--repeats 500]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from bench_database_mapping import build_database
+
+
+def open_legacy(path):
+    """ Wrapper with its own connection as before the pool """
+    from GEMEditor.database.base import DatabaseWrapper
+
+    class LegacyDatabaseWrapper(DatabaseWrapper):
+
+        def setup_connection(self, database_path):
+            self.connection = sqlite3.connect(database_path)
+            self.connection.row_factory = sqlite3.Row
+            self.cursor = self.connection.cursor()
+
+        def close(self):
+            self.cursor.close()
+            self.connection.close()
+
+    return LegacyDatabaseWrapper(path)
+
+
+def open_pooled(path):
+    from GEMEditor.database.base import DatabaseWrapper
+    return DatabaseWrapper(path)
+
+
+def lookups(database, entry_id):
+    """ Queries run when populating a database dialog """
+    database.get_miriam_collections("metabolite")
+    metabolite = database.get_metabolite_from_id(entry_id)
+    database.get_synonyms_from_id(entry_id, "metabolite")
+    return metabolite.name
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=200000)
+    parser.add_argument("--repeats", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "database.db")
+        build_database(path, args.entries)
+        ids = [random.Random(42).randint(1, args.entries) for _ in range(args.repeats)]
+        print("Opening the database {0} times for lookups of {1} entries".format(args.repeats, args.entries))
+
+        results = dict()
+        for name, function in (("connect", open_legacy), ("pooled", open_pooled)):
+            start = time.perf_counter()
+            names = []
+            for entry_id in ids:
+                with function(path) as database:
+                    names.append(lookups(database, entry_id))
+            duration = time.perf_counter() - start
+            results[name] = names
+            print("{0:<8} {1:>8.3f} ms per dialog".format(name, duration / args.repeats * 1000))
+
+        assert results["connect"] == results["pooled"]
+
+
+if __name__ == '__main__':
+    main()
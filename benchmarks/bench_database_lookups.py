@@ -0,0 +1,60 @@
+""" Benchmark repeated lookups of database entries
+
+Browsing matches or updating a model from the database looks up the
+same entries repeatedly. Metabolites, their annotations and synonyms
+are looked up for ids drawn from a small set of entries, without
+caching and with the lookup cache of DatabaseWrapper.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_database_lookups.py [--entries 200000] [--lookups 20000] [--distinct 2000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from bench_database_mapping import build_database
+
+
+def lookups(database, ids):
+    result = []
+    for entry_id in ids:
+        metabolite = database.get_metabolite_from_id(entry_id)
+        synonyms = database.get_synonyms_from_id(entry_id, "metabolite")
+        result.append((metabolite.name, sorted(str(x) for x in metabolite.annotation), synonyms))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=200000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--distinct", type=int, default=2000)
+    args = parser.parse_args()
+
+    from GEMEditor.database import base
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "database.db")
+        build_database(path, args.entries)
+        rand = random.Random(42)
+        entries = rand.sample(range(1, args.entries + 1), args.distinct)
+        ids = [rand.choice(entries) for _ in range(args.lookups)]
+        print("{0} lookups of {1} distinct entries".format(args.lookups, args.distinct))
+
+        results = dict()
+        for name, maxsize in (("uncached", 0), ("cached", base.lookup_cache.maxsize)):
+            base.lookup_cache = base.LookupCache(maxsize)
+            with base.DatabaseWrapper(path) as database:
+                start = time.perf_counter()
+                results[name] = lookups(database, ids)
+                duration = time.perf_counter() - start
+            print("{0:<9} {1:>8.2f}s {2!s}".format(name, duration, base.lookup_cache.info()))
+
+        assert results["uncached"] == results["cached"]
+
+
+if __name__ == '__main__':
+    main()
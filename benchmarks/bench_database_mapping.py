@@ -0,0 +1,136 @@
+""" Benchmark mapping metabolites to the MetaNetX database
+
+A synthetic database is mapped against a synthetic model with
+the previous loop, which queries the database for every
+annotation, name and formula of every metabolite, and with the
+batched update_metabolite_database_mapping.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_database_mapping.py [--entries 200000] [--metabolites 5000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+COLLECTIONS = ("metanetx.chemical", "chebi")
+
+
+def build_database(path, n_entries, seed=42):
+    """ Setup a database with n_entries metabolites """
+    from GEMEditor.base.classes import HeadlessProgress
+    from GEMEditor.database.create import create_indices
+    from GEMEditor.database.tables import setup_empty_database
+
+    setup_empty_database(path)
+    rand = random.Random(seed)
+    connection = sqlite3.connect(path)
+    cursor = connection.cursor()
+    resources = dict(cursor.execute("SELECT miriam_collection, id FROM resources WHERE type='metabolite'"))
+
+    metabolites, names, identifiers = [], [], []
+    for i in range(1, n_entries + 1):
+        formula = "C{0}H{1}O{2}".format(rand.randint(1, 40), rand.randint(1, 80), rand.randint(0, 20))
+        metabolites.append((i, "Metabolite {0}".format(i), formula, 0))
+        names.append((i, "Metabolite {0}".format(i)))
+        names.append((i, "Synonym {0}".format(i)))
+        identifiers.append((i, resources["metanetx.chemical"], "MNXM{0}".format(i)))
+        identifiers.append((i, resources["chebi"], "CHEBI:{0}".format(i)))
+
+    cursor.executemany("INSERT INTO metabolites VALUES (?, ?, ?, ?)", metabolites)
+    cursor.executemany("INSERT INTO metabolite_names VALUES (NULL, ?, ?)", names)
+    cursor.executemany("INSERT INTO metabolite_ids VALUES (NULL, ?, ?, ?)", identifiers)
+    connection.commit()
+    create_indices(connection, HeadlessProgress())
+    connection.close()
+    return [x[2] for x in metabolites]
+
+
+def build_model(n_metabolites, n_entries, formulas, seed=42):
+    """ Model with metabolites matching by annotation, name, formula or not at all """
+    from GEMEditor.model.classes.annotation import Annotation
+    from GEMEditor.model.classes.cobra import Model, Metabolite
+
+    rand = random.Random(seed)
+    model = Model("synthetic")
+    metabolites = []
+    for i in range(n_metabolites):
+        entry = rand.randint(1, n_entries)
+        kind = rand.random()
+        metabolite = Metabolite("m{0}".format(i), name="Unknown {0}".format(i), formula="X{0}".format(i))
+        # Unknown annotation that has to be looked up as well
+        metabolite.annotation.add(Annotation("chebi", "CHEBI:0{0}".format(i)))
+        if kind < 0.5:
+            metabolite.annotation.add(Annotation(rand.choice(COLLECTIONS),
+                                                 "MNXM{0}".format(entry) if rand.random() < 0.5 else
+                                                 "CHEBI:{0}".format(entry)))
+        elif kind < 0.7:
+            metabolite.name = "synonym {0}".format(entry)
+        elif kind < 0.85:
+            metabolite.formula = formulas[entry - 1]
+        metabolites.append(metabolite)
+    model.add_metabolites(metabolites)
+    return model
+
+
+def legacy_update_metabolite_database_mapping(database, model):
+    """ Mapping loop used before the batched queries """
+    from GEMEditor.base.functions import unpack
+
+    for metabolite in model.metabolites:
+        if metabolite in model.database_mapping:
+            continue
+
+        entries = set()
+        for annotation in metabolite.annotation:
+            entries.update(database.get_ids_from_annotation(identifier=annotation.identifier,
+                                                            collection=annotation.collection))
+        if not entries and metabolite.name:
+            entries.update(database.get_ids_from_name(name=metabolite.name, entry_type="Metabolite"))
+        if not entries and metabolite.formula:
+            entries.update(database.get_ids_from_formula(formula=metabolite.formula))
+
+        model.database_mapping[metabolite] = unpack(entries, list) if entries else None
+
+
+def normalized(mapping):
+    return dict((k.id, sorted(v) if isinstance(v, list) else v) for k, v in mapping.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=200000)
+    parser.add_argument("--metabolites", type=int, default=5000)
+    args = parser.parse_args()
+
+    from PyQt5.QtWidgets import QApplication
+    from GEMEditor.database.base import DatabaseWrapper
+    from GEMEditor.database.model import update_metabolite_database_mapping
+
+    app = QApplication.instance() or QApplication([])
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "database.db")
+        formulas = build_database(path, args.entries)
+        print("Mapping {0} metabolites to {1} database entries".format(args.metabolites, args.entries))
+
+        results = {}
+        for name, function in (("loop", lambda d, m: legacy_update_metabolite_database_mapping(d, m)),
+                               ("batched", lambda d, m: update_metabolite_database_mapping(d, m, None))):
+            model = build_model(args.metabolites, args.entries, formulas)
+            with DatabaseWrapper(path) as database:
+                start = time.perf_counter()
+                function(database, model)
+                duration = time.perf_counter() - start
+            results[name] = normalized(model.database_mapping)
+            mapped = sum(1 for x in model.database_mapping.values() if x is not None)
+            print("{0:<8} {1:>8.2f}s {2:>8} mapped".format(name, duration, mapped))
+
+        assert results["loop"] == results["batched"]
+
+
+if __name__ == '__main__':
+    main()
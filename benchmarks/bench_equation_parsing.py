@@ -0,0 +1,84 @@
+""" Benchmark parsing the reaction equations of MetaNetX
+
+Every equation of a reaction property file is parsed into the rows of
+reaction_participants with parse_reaction_formula, as before the
+memoized side parser, and with get_equation_inserts. Both have to
+return the same rows, or raise the same error, for every equation.
+Without --file the reaction fixtures are replicated with renumbered
+MetaNetX ids.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_equation_parsing.py [--file reac_prop.tsv] [--scale 200]
+"""
+
+import argparse
+import tempfile
+import time
+
+from bench_database_build import replicate_files
+
+
+def reference_inserts(metabolite_map, reaction_id, equation, compartment_map):
+    """ Rows as computed before the memoized side parser """
+    from GEMEditor.database.create import parse_reaction_formula
+
+    inserts = []
+    educts, products = parse_reaction_formula(equation)
+    for key, value in educts.items():
+        mnx_id, compartment = key.split("@")
+        inserts.append((reaction_id, metabolite_map[mnx_id], -float(value), compartment_map[compartment]))
+    for key, value in products.items():
+        mnx_id, compartment = key.split("@")
+        inserts.append((reaction_id, metabolite_map[mnx_id], float(value), compartment_map[compartment]))
+    return inserts
+
+
+def parse_all(function, equations):
+    from GEMEditor.database.create import _IdentityMap
+
+    identity = _IdentityMap()
+    result = []
+    for i, equation in enumerate(equations):
+        try:
+            result.append(function(identity, i, equation, identity))
+        except Exception as e:
+            result.append((type(e), str(e)))
+    return result
+
+
+def read_equations(path):
+    with open(path, encoding="UTF-8") as open_file:
+        return [line.rstrip("\n").split("\t")[1] for line in open_file if not line.startswith("#")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--file", help="MetaNetX reaction property file")
+    parser.add_argument("--scale", type=int, default=200)
+    args = parser.parse_args()
+
+    from GEMEditor.database.create import get_equation_inserts, parse_side_stoichiometry
+
+    if args.file:
+        equations = read_equations(args.file)
+    else:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            equations = read_equations(replicate_files(tmpdir, args.scale)["Reactions"])
+    print("Parsing {0} equations".format(len(equations)))
+
+    start = time.perf_counter()
+    reference = parse_all(reference_inserts, equations)
+    reference_time = time.perf_counter() - start
+
+    parse_side_stoichiometry.cache_clear()
+    start = time.perf_counter()
+    result = parse_all(get_equation_inserts, equations)
+    duration = time.perf_counter() - start
+
+    assert result == reference
+    print("{0:<10} {1:>8.2f}s".format("reference", reference_time))
+    print("{0:<10} {1:>8.2f}s {2!s}".format("memoized", duration, parse_side_stoichiometry.cache_info()))
+
+
+if __name__ == '__main__':
+    main()
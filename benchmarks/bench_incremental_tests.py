@@ -0,0 +1,68 @@
+""" Benchmark rerunning the test cases of a model after an edit
+
+All test cases are run with run_tests after every edit, as before the
+incremental runs, and with incremental_run_tests, which reruns only
+the test cases affected by the reactions changed through the reaction
+table. The model is edited by renaming a reaction, which does not
+affect the results, and by changing the bounds of a reaction. Both
+have to return the same solver status and objective value for every
+test case.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_incremental_tests.py [--reactions 2000] [--tests 800]
+"""
+
+import argparse
+import time
+
+from synthetic import build_synthetic_model
+
+
+def summarize(results):
+    """ Solver status and objective value of every test case """
+    return [(solution.status, round(solution.objective_value, 6) if solution.status == "optimal" else None)
+            for _, solution in results.values()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reactions", type=int, default=2000)
+    parser.add_argument("--tests", type=int, default=800)
+    args = parser.parse_args()
+
+    from PyQt5.QtWidgets import QApplication
+    from GEMEditor.analysis.model_test import run_tests, incremental_run_tests
+
+    app = QApplication.instance() or QApplication([])
+    model = build_synthetic_model(args.reactions, n_tests=args.tests, distinct_bounds=True)
+    table = model.QtReactionTable
+    reaction = model.reactions[1]
+
+    def rename():
+        reaction.name = reaction.name + " renamed"
+        table.update_row_from_link(table.get_item_to_row_mapping()[reaction])
+
+    def change_bounds():
+        reaction.upper_bound = reaction.upper_bound / 2.
+        table.update_row_from_link(table.get_item_to_row_mapping()[reaction])
+
+    print("{0} tests, {1} reactions".format(len(model.tests), len(model.reactions)))
+    print("{0:<10} {1:>10} {2:>14}".format("edit", "all [s]", "incremental [s]"))
+    for name, edit in (("none", None), ("unchanged", lambda: None), ("rename", rename), ("bounds", change_bounds)):
+        if edit is not None:
+            edit()
+
+        start = time.perf_counter()
+        reference = summarize(run_tests(model.tests, model, None))
+        reference_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = summarize(incremental_run_tests(model.tests, model, None))
+        duration = time.perf_counter() - start
+
+        assert result == reference
+        print("{0:<10} {1:>10.2f} {2:>14.2f}".format(name, reference_time, duration))
+
+
+if __name__ == '__main__':
+    main()
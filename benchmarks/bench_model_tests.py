@@ -0,0 +1,96 @@
+""" Benchmark running the test cases of a model
+
+The test cases of a model are run one after the other on the model,
+as by run_tests, with warm_start_run_tests reusing the solver problem
+between test cases and by a pool of worker processes with
+parallel_run_tests. The bundled glycolysis model is run with random
+test cases opening boundary reactions, knocking out genes and
+switching the objective. The synthetic model is a large model with
+its own test cases. All runners have to return the same solver status
+and objective value for every test case. Where a test case has
+alternative optimal fluxes, the fluxes found depend on the previously
+solved test cases, even for run_tests run twice in a row. Hence, the
+number of test cases with the same result and fluxes as the serial run
+is reported.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_model_tests.py [--reactions 2000] [--tests 800] [--processes 4]
+"""
+
+import argparse
+import os
+import random
+import time
+
+from synthetic import build_synthetic_model
+
+GLYCOLYSIS = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                          "GEMEditor", "analysis", "test", "glycolysis.xml")
+
+
+def add_random_tests(model, n_tests, seed=42):
+    """ Add test cases with random settings to model """
+    from GEMEditor.model.classes.modeltest import ModelTest, ReactionSetting, GeneSetting, Outcome
+
+    rand = random.Random(seed)
+    reactions = list(model.reactions)
+    boundary = [x for x in reactions if len(x.metabolites) == 1] or reactions
+    genes = list(model.genes)
+    for i in range(n_tests):
+        test = ModelTest(description="Test {0}".format(i))
+        for reaction in rand.sample(boundary, min(len(boundary), rand.randint(1, 3))):
+            test.add_setting(ReactionSetting(reaction, 1000., -rand.choice((1., 10., 1000.)), 0.))
+        test.add_setting(ReactionSetting(rand.choice(reactions), 1000., -1000., 1.))
+        if genes and rand.random() < 0.5:
+            test.add_setting(GeneSetting(rand.choice(genes), False))
+        test.add_outcome(Outcome(rand.choice(reactions), 0., rand.choice(("greater than", "less than"))))
+        model.add_test(test)
+    return model
+
+
+def summarize(results):
+    """ Status, solver status, objective value and fluxes of every test case """
+    return [(status, solution.status, solution.objective_value if solution.status == "optimal" else None,
+             solution.fluxes.to_dict() if solution.status == "optimal" else None)
+            for status, solution in results.values()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reactions", type=int, default=2000)
+    parser.add_argument("--tests", type=int, default=800)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    from PyQt5.QtWidgets import QApplication
+    from GEMEditor.analysis.model_test import run_tests
+    from GEMEditor.rw.sbml3 import read_sbml3_model
+
+    app = QApplication.instance() or QApplication([])
+    models = (("glycolysis", lambda: add_random_tests(read_sbml3_model(GLYCOLYSIS, None), args.tests)),
+              ("synthetic", lambda: build_synthetic_model(args.reactions, n_tests=args.tests, distinct_bounds=True)))
+    runners = (("serial", dict()),
+               ("warm start", dict(warm_start=True)),
+               ("parallel x{0}".format(args.processes), dict(processes=args.processes)))
+
+    for name, function in models:
+        model = function()
+        print("{0}: {1} tests, {2} reactions".format(name, len(model.tests), len(model.reactions)))
+
+        reference = None
+        for runner, kwargs in runners:
+            start = time.perf_counter()
+            result = summarize(run_tests(model.tests, model, None, **kwargs))
+            duration = time.perf_counter() - start
+
+            if reference is None:
+                reference = result
+            assert [x[1] for x in result] == [x[1] for x in reference]
+            assert all(x[2] is None and y[2] is None or abs(x[2] - y[2]) < 1e-6 for x, y in zip(result, reference))
+            print("  {0:<14} {1:>8.2f}s {2:>5} results {3:>5} fluxes of {4} identical".format(
+                runner, duration, sum(x[0] == y[0] for x, y in zip(result, reference)),
+                sum(x[3] == y[3] for x, y in zip(result, reference)), len(result)))
+
+
+if __name__ == '__main__':
+    main()
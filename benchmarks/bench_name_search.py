@@ -0,0 +1,98 @@
+""" Benchmark searching metabolites by name
+
+A synthetic database with names built from chemical name
+fragments is searched with the previous LIKE query of the
+database search widget and with the full text search of
+DatabaseWrapper.search_names, for correctly spelled and
+misspelled search terms.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_name_search.py [--names 2000000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+PREFIXES = ("alpha-D-", "beta-D-", "L-", "D-", "N-acetyl-", "2-oxo-", "3-hydroxy-", "", "", "")
+STEMS = ("glucose", "galactose", "mannose", "fructose", "ribose", "glutamate", "aspartate", "pyruvate",
+         "citrate", "succinate", "malate", "fumarate", "lactate", "acetyl-CoA", "butanoyl", "hexadecanoate")
+SUFFIXES = (" 6-phosphate", " 1-phosphate", " 1,6-bisphosphate", "-CoA", " dehydrogenase", "", "", "")
+
+SEARCHES = ("glucose 6-phosphate", "fumarate", "N-acetyl-L-glutamate", "glucose 6-phosphtae", "fumrate", "xyz")
+
+# Query used by the search widget before the full text index
+LEGACY_QUERY = ("SELECT metabolites.id, metabolites.name, metabolites.formula, metabolites.charge "
+                "FROM metabolite_names JOIN metabolites "
+                "ON metabolite_names.metabolite_id = metabolites.id "
+                "WHERE metabolite_names.name LIKE '%{input}%' "
+                "GROUP BY metabolite_names.metabolite_id;")
+
+QUERY = ("WITH hits (id, rank) AS (VALUES {hits}) "
+         "SELECT metabolites.id, metabolites.name, metabolites.formula, metabolites.charge "
+         "FROM hits JOIN metabolites ON metabolites.id = hits.id "
+         "ORDER BY hits.rank;")
+
+
+def build_database(path, n_names, seed=42):
+    """ Setup a database with n_names names of n_names / 4 metabolites """
+    from GEMEditor.base.classes import HeadlessProgress
+    from GEMEditor.database.create import create_indices
+    from GEMEditor.database.tables import setup_empty_database
+
+    setup_empty_database(path)
+    rand = random.Random(seed)
+    connection = sqlite3.connect(path)
+    n_metabolites = n_names // 4
+    connection.executemany("INSERT INTO metabolites VALUES (?, ?, ?, 0)",
+                           ((i, "Metabolite {0}".format(i), "C6H12O6") for i in range(1, n_metabolites + 1)))
+    connection.executemany("INSERT INTO metabolite_names VALUES (NULL, ?, ?)",
+                           ((i % n_metabolites + 1, "{0}{1}{2} {3}".format(rand.choice(PREFIXES), rand.choice(STEMS),
+                                                                           rand.choice(SUFFIXES), i))
+                            for i in range(n_names)))
+    connection.commit()
+
+    start = time.perf_counter()
+    create_indices(connection, HeadlessProgress())
+    connection.close()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--names", type=int, default=2000000)
+    args = parser.parse_args()
+
+    from GEMEditor.database.base import DatabaseWrapper
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "database.db")
+        duration = build_database(path, args.names)
+        print("Searching {0} names, indices created in {1:.1f}s".format(args.names, duration))
+        print("{0:<22} {1:>10} {2:>6} {3:>11} {4:>6}".format("term", "LIKE [ms]", "rows", "search [ms]", "rows"))
+
+        connection = sqlite3.connect(path)
+        with DatabaseWrapper(path) as database:
+            for term in SEARCHES:
+                start = time.perf_counter()
+                legacy = connection.execute(LEGACY_QUERY.format(input=term)).fetchall()
+                legacy_time = time.perf_counter() - start
+
+                start = time.perf_counter()
+                hits = ", ".join("({0:d}, {1:d})".format(x, i) for i, x in
+                                 enumerate(database.search_names(term, "metabolite"))) or "(NULL, NULL)"
+                rows = connection.execute(QUERY.format(hits=hits)).fetchall()
+                search_time = time.perf_counter() - start
+
+                # The best ranked hits are found by the LIKE query as well
+                assert not legacy or set(x[0] for x in rows[:10]) <= set(x[0] for x in legacy)
+                print("{0:<22} {1:>10.1f} {2:>6} {3:>11.1f} {4:>6}".format(term, legacy_time * 1000, len(legacy),
+                                                                           search_time * 1000, len(rows)))
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+""" Benchmark the different modes of reading SBML files
+
+Every mode is run in a fresh interpreter so that the timings
+and the peak memory usage are not affected by previous runs.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_sbml_read.py [--reactions 20000]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = {"tree": {},
+         "streaming": {"streaming": True}}
+
+
+def run_mode(path, mode):
+    """ Read the model in the current process and print timings """
+    from PyQt5.QtWidgets import QApplication
+    from GEMEditor.rw.sbml3 import read_sbml3_model
+
+    app = QApplication.instance() or QApplication([])
+    start = time.perf_counter()
+    model = read_sbml3_model(path, None, **MODES[mode])
+    duration = time.perf_counter() - start
+
+    print(json.dumps({"duration": duration,
+                      "reactions": len(model.reactions),
+                      "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reactions", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    parser.add_argument("--run-mode", choices=sorted(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_mode:
+        run_mode(args.path, args.run_mode)
+        return
+
+    from PyQt5.QtWidgets import QApplication
+    from synthetic import write_synthetic_model
+
+    app = QApplication.instance() or QApplication([])
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "synthetic.xml")
+        start = time.perf_counter()
+        write_synthetic_model(path, n_reactions=args.reactions)
+        print("Generated model with {0} reactions ({1:.1f} MB) in {2:.2f}s".format(
+            args.reactions, os.path.getsize(path) / 1024 ** 2, time.perf_counter() - start))
+
+        results = {}
+        for mode in ("tree", "streaming"):
+            runs = []
+            for _ in range(args.repeat):
+                output = subprocess.check_output([sys.executable, __file__, "--run-mode", mode, "--path", path],
+                                                 stderr=subprocess.DEVNULL)
+                runs.append(json.loads(output.decode().strip().splitlines()[-1]))
+            results[mode] = min(runs, key=lambda x: x["duration"])
+
+        print("{0:<12} {1:>10} {2:>10} {3:>14}".format("mode", "time [s]", "speed-up", "peak RSS [MB]"))
+        for mode, result in results.items():
+            print("{0:<12} {1:>10.2f} {2:>9.2f}x {3:>14.0f}".format(mode, result["duration"],
+                                                                  results["tree"]["duration"] / result["duration"],
+                                                                  result["max_rss"]))
+
+
+if __name__ == '__main__':
+    main()
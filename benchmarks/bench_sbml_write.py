@@ -0,0 +1,77 @@
+""" Benchmark the different modes of writing SBML files
+
+Every mode is run in a fresh interpreter. The memory reported is
+the growth of the peak resident set size while saving, i.e. the
+memory needed in addition to the model itself.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_sbml_write.py [--reactions 20000 40000]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = {"tree": {},
+         "streaming": {"streaming": True}}
+
+
+def current_rss():
+    """ Current resident set size in MB """
+    with open("/proc/self/statm") as open_file:
+        return int(open_file.read().split()[1]) * resource.getpagesize() / 1024. ** 2
+
+
+def run_mode(path, mode, reactions):
+    """ Build a model and save it in the current process """
+    from PyQt5.QtWidgets import QApplication
+    from GEMEditor.rw.sbml3 import write_sbml3_model
+    from synthetic import build_synthetic_model
+
+    app = QApplication.instance() or QApplication([])
+    model = build_synthetic_model(n_reactions=reactions)
+    before = current_rss()
+
+    start = time.perf_counter()
+    write_sbml3_model(path, model, **MODES[mode])
+    duration = time.perf_counter() - start
+
+    print(json.dumps({"duration": duration,
+                      "size": os.path.getsize(path) / 1024. ** 2,
+                      "rss_growth": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024. - before}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reactions", type=int, nargs="+", default=[10000, 20000])
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    parser.add_argument("--run-mode", choices=sorted(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_mode:
+        run_mode(args.path, args.run_mode, args.reactions[0])
+        return
+
+    print("{0:<10} {1:<12} {2:>10} {3:>10} {4:>16}".format("reactions", "mode", "size [MB]", "time [s]",
+                                                           "RSS growth [MB]"))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "synthetic.xml")
+        for reactions in args.reactions:
+            for mode in sorted(MODES, reverse=True):
+                output = subprocess.check_output([sys.executable, __file__, "--run-mode", mode, "--path", path,
+                                                  "--reactions", str(reactions)],
+                                                 stderr=subprocess.DEVNULL,
+                                                 env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)))
+                result = json.loads(output.decode().strip().splitlines()[-1])
+                print("{0:<10} {1:<12} {2:>10.1f} {3:>10.2f} {4:>16.0f}".format(reactions, mode, result["size"],
+                                                                              result["duration"],
+                                                                              result["rss_growth"]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+""" Benchmark the test statistics of a reopened model
+
+The statistics of the test cases are computed by modeltest_statistics
+for a model without cached results, as when opening the statistics
+dialog after opening the model before the result cache, and with the
+results read from the file written next to the model when saving it.
+Both have to return the same statistics.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_test_results.py [--reactions 2000] [--tests 800]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from synthetic import build_synthetic_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reactions", type=int, default=2000)
+    parser.add_argument("--tests", type=int, default=800)
+    args = parser.parse_args()
+
+    from PyQt5.QtWidgets import QApplication
+    from GEMEditor.analysis import model_test
+    from GEMEditor.analysis.statistics.functions import modeltest_statistics
+
+    app = QApplication.instance() or QApplication([])
+    model = build_synthetic_model(args.reactions, n_tests=args.tests, distinct_bounds=True)
+    print("{0} tests, {1} reactions".format(len(model.tests), len(model.reactions)))
+
+    def reopen():
+        # Drop all results kept in memory
+        model.cached_test_results.clear()
+        model.cached_item_states.clear()
+        model.mark_items_changed(*model.reactions)
+        model_test.result_cache.clear()
+
+    reopen()
+    start = time.perf_counter()
+    reference = modeltest_statistics(model, None)
+    reference_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "model.xml")
+        start = time.perf_counter()
+        model_test.write_test_results(model, path)
+        write_time = time.perf_counter() - start
+        size = os.path.getsize(model_test.results_path(path))
+
+        reopen()
+        start = time.perf_counter()
+        model_test.read_test_results(path)
+        read_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = modeltest_statistics(model, None)
+        duration = time.perf_counter() - start
+
+    assert result == reference
+    print("{0:<20} {1:>8.2f}s".format("without cache", reference_time))
+    print("{0:<20} {1:>8.2f}s {2:.1f} MB".format("write results", write_time, size / 1024 ** 2))
+    print("{0:<20} {1:>8.2f}s".format("read results", read_time))
+    print("{0:<20} {1:>8.2f}s {2} hits".format("with cache", duration, model_test.result_cache.hits))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+""" Synthetic genome-scale models for benchmarking
+
+The models generated here are structurally similar to curated
+genome-scale models i.e. every reaction has a handful of
+participants, a gene reaction rule and a couple of annotations.
+"""
+
+import random
+from GEMEditor.model.classes.annotation import Annotation
+from GEMEditor.model.classes.cobra import Model, Metabolite, Reaction, Gene, GeneGroup
+from GEMEditor.model.classes.modeltest import ModelTest, ReactionSetting, Outcome
+from GEMEditor.rw.sbml3 import write_sbml3_model
+
+
+def build_synthetic_model(n_reactions=20000, n_metabolites=None, n_genes=None, n_tests=0,
+                          distinct_bounds=False, seed=42):
+    """ Build a random model
+
+    Parameters
+    ----------
+    n_reactions: int
+    n_metabolites: int,
+        Defaults to half the number of reactions
+    n_genes: int,
+        Defaults to a third of the number of reactions
+    n_tests: int,
+        Number of test cases added to the model
+    distinct_bounds: bool,
+        Use measured i.e. mostly unique flux bounds
+    seed: int
+
+    Returns
+    -------
+    model: GEMEditor.model.classes.cobra.Model
+    """
+
+    rand = random.Random(seed)
+    n_metabolites = n_metabolites or max(n_reactions // 2, 2)
+    n_genes = n_genes or max(n_reactions // 3, 1)
+
+    model = Model("synthetic", name="Synthetic model")
+
+    metabolites = []
+    for i in range(n_metabolites):
+        metabolite = Metabolite("m{0}_c".format(i), formula="C{0}H{1}O{2}".format(*rand.sample(range(1, 20), 3)),
+                                name="Metabolite {0}".format(i), charge=rand.randint(-2, 1), compartment="c")
+        metabolite.annotation.add(Annotation("chebi", "CHEBI:{0}".format(i)))
+        metabolite.annotation.add(Annotation("kegg.compound", "C{0:05d}".format(i)))
+        metabolite.annotation.add(Annotation("metanetx.chemical", "MNXM{0}".format(i)))
+        metabolites.append(metabolite)
+    model.add_metabolites(metabolites)
+
+    genes = [Gene("g{0}".format(i), name="Gene {0}".format(i)) for i in range(n_genes)]
+    for gene in genes:
+        model.add_gene(gene)
+
+    reactions = []
+    for i in range(n_reactions):
+        if distinct_bounds:
+            lower_bound = -round(rand.uniform(0., 20.), 3) if rand.random() < 0.5 else 0.
+            upper_bound = round(rand.uniform(0., 20.), 3)
+        else:
+            lower_bound = rand.choice((-1000., 0.))
+            upper_bound = 1000.
+
+        reaction = Reaction("r{0}".format(i), name="Reaction {0}".format(i),
+                            subsystem="Subsystem {0}".format(i % 50),
+                            lower_bound=lower_bound, upper_bound=upper_bound)
+        participants = rand.sample(metabolites, rand.randint(2, 6))
+        split = len(participants) // 2
+        reaction.add_metabolites(dict([(m, -float(rand.randint(1, 3))) for m in participants[:split]] +
+                                      [(m, float(rand.randint(1, 3))) for m in participants[split:]]))
+        reaction.annotation.add(Annotation("metanetx.reaction", "MNXR{0}".format(i)))
+        reaction.annotation.add(Annotation("ec-code", "1.1.1.{0}".format(i % 300)))
+
+        # Add gene reaction rule
+        group = GeneGroup(type=rand.choice(("and", "or")))
+        reaction.add_child(group)
+        for gene in rand.sample(genes, min(len(genes), rand.randint(1, 3))):
+            group.add_child(gene)
+        reactions.append(reaction)
+    model.add_reactions(reactions)
+    reactions[0].objective_coefficient = 1.
+
+    for i in range(n_tests):
+        test = ModelTest(description="Test {0}".format(i))
+        for reaction in rand.sample(reactions, 2):
+            test.add_setting(ReactionSetting(reaction, 1000., -10., 0.))
+        test.add_outcome(Outcome(rand.choice(reactions), 0., rand.choice(("greater than", "less than"))))
+        model.add_test(test)
+
+    model.setup_tables()
+    return model
+
+
+def write_synthetic_model(path, *args, **kwargs):
+    """ Build a random model and save it to path """
+
+    model = build_synthetic_model(*args, **kwargs)
+    write_sbml3_model(path, model)
+    return model